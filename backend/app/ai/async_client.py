@@ -0,0 +1,580 @@
+from __future__ import annotations
+
+"""
+Async counterparts of `call_text` / `call_json` on the `AsyncOpenAI` SDK.
+
+Async routes and workers can fan out many model calls without holding a
+threadpool thread per call. Behaviour matches `app/ai/client.py`: the same
+model fallback chain, retry feedback, validators, circuit breakers, token
+budget tracking, `AiMeta` accounting and opt-in response cache.
+
+Each upstream request holds a per-model slot (`AI_ASYNC_MODEL_CONCURRENCY`,
+"model=N,...,default=N"), so a burst of fan-out calls queues here instead of
+flooding one model's rate limit. Slots are asyncio semaphores, one set per
+event loop. The process-wide adaptive limit (`concurrency.py`) applies on top.
+
+`acall_text` hedges slow interactive calls to the next fallback model
+(`hedging.py`); the losing request is cancelled.
+
+Coalescing of identical in-flight calls (`single_flight.py`) is thread-based
+and not applied here; cached responses are shared with the sync path.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from app.ai import client as _c
+from app.ai.client import (
+    AiCircuitOpen,
+    AiMeta,
+    AiNotConfigured,
+    AiParseError,
+    AiQueueTimeout,
+)
+from app.ai.tuning import Validator
+from app.observability.logging import get_logger
+from app.settings import settings
+
+log = get_logger("ai_async")
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _concurrency_limits() -> tuple[dict[str, int], int]:
+    """(per-model limits, default) from `AI_ASYNC_MODEL_CONCURRENCY`."""
+    limits: dict[str, int] = {}
+    default = 8
+    for part in str(settings.ai_async_model_concurrency or "").split(","):
+        name, _, n = part.partition("=")
+        try:
+            if name.strip() and n.strip():
+                if name.strip().lower() == "default":
+                    default = max(1, int(n))
+                else:
+                    limits[name.strip().lower()] = max(1, int(n))
+        except ValueError:
+            continue
+    return limits, default
+
+
+class ModelConcurrency:
+    """Per-model asyncio semaphores with queue/in-flight counters."""
+
+    def __init__(self, limits: dict[str, int] | None = None, default: int = 8):
+        self.limits = {k.lower(): max(1, int(v)) for k, v in (limits or {}).items()}
+        self.default = max(1, int(default))
+        self._sems: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self._inflight: dict[str, int] = {}
+        self._waiting: dict[str, int] = {}
+        self._acquired: dict[str, int] = {}
+        self._wait_s: dict[str, float] = {}
+
+    def limit_for(self, model: str) -> int:
+        return self.limits.get(str(model or "").lower(), self.default)
+
+    def _sem(self, model: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        m = str(model or "").lower()
+        with self._lock:
+            per_loop = self._sems.get(loop)
+            if per_loop is None:
+                per_loop = self._sems[loop] = {}
+            sem = per_loop.get(m)
+            if sem is None:
+                sem = per_loop[m] = asyncio.Semaphore(self.limit_for(m))
+            return sem
+
+    def _add(self, counter: dict[str, int], model: str, n: int) -> None:
+        with self._lock:
+            counter[model] = counter.get(model, 0) + n
+
+    @asynccontextmanager
+    async def slot(self, model: str) -> AsyncIterator[None]:
+        m = str(model or "").lower()
+        sem = self._sem(m)
+        t0 = time.perf_counter()
+        self._add(self._waiting, m, 1)
+        try:
+            await sem.acquire()
+        finally:
+            self._add(self._waiting, m, -1)
+        with self._lock:
+            self._wait_s[m] = self._wait_s.get(m, 0.0) + (time.perf_counter() - t0)
+            self._acquired[m] = self._acquired.get(m, 0) + 1
+            self._inflight[m] = self._inflight.get(m, 0) + 1
+        try:
+            yield
+        finally:
+            self._add(self._inflight, m, -1)
+            sem.release()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            models = sorted(set(self._acquired) | set(self._waiting))
+            return {
+                m: {
+                    "limit": self.limit_for(m),
+                    "inflight": self._inflight.get(m, 0),
+                    "waiting": self._waiting.get(m, 0),
+                    "acquired": self._acquired.get(m, 0),
+                    "waitS": round(self._wait_s.get(m, 0.0), 3),
+                }
+                for m in models
+            }
+
+
+_LOCK = threading.Lock()
+_LIMITER: ModelConcurrency | None = None
+
+
+def get_model_concurrency() -> ModelConcurrency:
+    global _LIMITER
+    if _LIMITER is None:
+        with _LOCK:
+            if _LIMITER is None:
+                limits, default = _concurrency_limits()
+                _LIMITER = ModelConcurrency(limits, default)
+    return _LIMITER
+
+
+def set_model_concurrency(limiter: ModelConcurrency | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _LIMITER
+    with _LOCK:
+        _LIMITER = limiter
+
+
+def async_ai_stats() -> dict[str, Any]:
+    return {"models": get_model_concurrency().stats()}
+
+
+# AsyncOpenAI wraps an httpx.AsyncClient, which belongs to the loop it was first used on.
+_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[int, Any]] = weakref.WeakKeyDictionary()
+
+
+def _aclient(*, timeout_s: int = 60) -> Any:
+    if not settings.openai_api_key:
+        raise AiNotConfigured("OPENAI_API_KEY not configured")
+    try:
+        from openai import AsyncOpenAI
+    except Exception as e:
+        raise AiNotConfigured(
+            "OpenAI SDK is missing or incompatible. Install a v1.x SDK (e.g. openai>=1.0.0)."
+        ) from e
+    loop = asyncio.get_running_loop()
+    t = max(5, int(timeout_s or 60))
+    with _LOCK:
+        per_loop = _CLIENTS.setdefault(loop, {})
+        c = per_loop.get(t)
+        if c is None:
+            # We do our own retries; keep OpenAI client retries minimal.
+            c = per_loop[t] = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                max_retries=0,
+                timeout=t,
+                default_headers=_c._sdk_default_headers() or None,
+            )
+        return c
+
+
+async def _responses_http_create_text(
+    *,
+    model: str,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    reasoning_effort: str,
+    verbosity: str,
+    timeout_s: int,
+) -> tuple[str, AiMeta]:
+    """Direct HTTP fallback to the Responses API (SDK without `client.responses`)."""
+    payload = _c._responses_kwargs(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        reasoning_effort=reasoning_effort,
+        verbosity=verbosity,
+    )
+    async with httpx.AsyncClient(timeout=max(5.0, float(timeout_s or 60))) as http:
+        r = await http.post("https://api.openai.com/v1/responses", headers=_c._openai_http_headers(), json=payload)
+    return _c._responses_http_result(r, purpose=purpose, model=model)
+
+
+async def _chat_create(client: Any, kwargs_base: dict[str, Any], max_tokens: int) -> Any:
+    try:
+        return await client.chat.completions.create(**(kwargs_base | {"max_completion_tokens": max_tokens}))
+    except Exception as e:
+        if _c._should_retry_with_legacy_max_tokens(e):
+            return await client.chat.completions.create(**(kwargs_base | {"max_tokens": max_tokens}))
+        raise
+
+
+@asynccontextmanager
+async def _slot(slots: ModelConcurrency, model: str, endpoint: str) -> AsyncIterator[None]:
+    """
+    Circuit breaker admission (see circuit_breaker.py), then a per-model slot, then a
+    process-wide adaptive slot (see concurrency.py). The outcome feeds the breaker.
+    """
+    from app.ai.circuit_breaker import get_circuit_breakers
+    from app.ai.concurrency import get_ai_limiter
+
+    breaker = get_circuit_breakers().get(model, endpoint)
+    if not breaker.allow():
+        raise AiCircuitOpen("ai_temporarily_unavailable")
+    limiter = get_ai_limiter()
+    try:
+        async with slots.slot(model):
+            if limiter is None:
+                yield
+            else:
+                async with limiter.aslot():
+                    yield
+    except (AiQueueTimeout, asyncio.CancelledError):
+        breaker.abandon()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+
+
+async def _acall_text(
+    *,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    validate: Validator | list[Validator] | None,
+    retries: int,
+    timeout_s: int,
+    max_prompt_chars: int,
+    token_budget_tracker: Any | None,
+    models: list[str] | None = None,
+) -> tuple[str, AiMeta]:
+    client = _aclient(timeout_s=timeout_s)
+    slots = get_model_concurrency()
+    loop = _c._AttemptLoop(
+        purpose=purpose,
+        kind="text",
+        messages=_c._normalize_messages(messages, max_prompt_chars),
+        max_tokens=_c._clamp_max_tokens(max_tokens),
+        attempts=int(retries) + 1,
+        models=models,
+        mode="async",
+    )
+    for a in loop:
+        out: str | None = None
+        try:
+            async with _slot(slots, a.model, "responses" if _c._is_gpt5_family(a.model) else "chat"):
+                # Prefer Responses API for GPT-5 family (supports reasoning/verbosity).
+                if _c._is_gpt5_family(a.model):
+                    t = loop.tuning(a)
+                    kw: dict[str, Any] = {
+                        "model": a.model,
+                        "messages": a.messages,
+                        "max_tokens": a.max_tokens,
+                        "temperature": temperature,
+                        "reasoning_effort": t.reasoning_effort,
+                        "verbosity": t.verbosity,
+                    }
+                    if _c._supports_responses_api(client):
+                        resp = await client.responses.create(**_c._responses_kwargs(**kw))
+                        out = _c._responses_text(resp).strip()
+                        if not out:
+                            raise AiParseError("empty_model_response")
+                        meta = _c._responses_meta(
+                            resp, purpose=purpose, model=a.model, used_response_format="responses_text"
+                        )
+                    else:
+                        out, meta = await _responses_http_create_text(purpose=purpose, timeout_s=timeout_s, **kw)
+                else:
+                    # Chat Completions (older models).
+                    completion = await _chat_create(
+                        client, {"model": a.model, "messages": a.messages, "temperature": temperature}, a.max_tokens
+                    )
+                    out = _c._chat_content(completion)
+                    if not out:
+                        raise AiParseError("empty_model_response")
+                    meta = _c._chat_meta(completion, purpose=purpose, model=a.model, used_response_format="chat_text")
+            text = out
+            return text, loop.succeeded(
+                a, meta, tracker=token_budget_tracker, check=lambda: _c._run_validator(validate, text)
+            )
+        except Exception as e:
+            if loop.failed(a, e, event="ai_text_failed", output=out):
+                await asyncio.sleep(loop.backoff_s(a))
+    raise loop.exhausted()
+
+
+async def _acall_json(
+    *,
+    purpose: str,
+    response_model: type[T],
+    messages: list[dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    retries: int,
+    allow_json_extract: bool,
+    validate_parsed: Callable[[T], str | None] | None,
+    fallback: Callable[[], T] | None,
+    timeout_s: int,
+    max_prompt_chars: int,
+    token_budget_tracker: Any | None,
+) -> tuple[T, AiMeta]:
+    client = _aclient(timeout_s=timeout_s)
+    slots = get_model_concurrency()
+    modes = _c._json_modes(response_model, temperature)
+    loop = _c._AttemptLoop(
+        purpose=purpose,
+        kind="json",
+        messages=_c._normalize_messages(messages, max_prompt_chars),
+        max_tokens=_c._clamp_max_tokens(max_tokens),
+        attempts=int(retries),
+        mode="async",
+    )
+    for a in loop:
+        # Prefer Responses API for GPT-5 family.
+        if _c._is_gpt5_family(a.model) and _c._supports_responses_api(client):
+            try:
+                t = loop.tuning(a)
+                async with _slot(slots, a.model, "responses"):
+                    resp = await client.responses.create(
+                        **_c._responses_kwargs(
+                            model=a.model,
+                            messages=a.messages,
+                            max_tokens=a.max_tokens,
+                            temperature=temperature,
+                            reasoning_effort=t.reasoning_effort,
+                            verbosity=t.verbosity,
+                            response_model=response_model,
+                        )
+                    )
+                parsed = _c._parse_json_output(_c._responses_text(resp).strip(), response_model, extract=True)
+                meta = _c._responses_meta(
+                    resp, purpose=purpose, model=a.model, used_response_format="responses_json_schema"
+                )
+                check = _c._parsed_check(validate_parsed, parsed)
+                return parsed, loop.succeeded(a, meta, tracker=token_budget_tracker, check=check)
+            except Exception as e:
+                # Fall through to the Chat Completions modes for this attempt.
+                loop.fell_back(a, e)
+
+        for response_format, temp in modes:
+            used_rf = response_format.get("type") if isinstance(response_format, dict) else None
+            content = ""
+            try:
+                kwargs_base: dict[str, Any] = {"model": a.model, "messages": a.messages, "temperature": temp}
+                if response_format is not None:
+                    kwargs_base["response_format"] = response_format
+                async with _slot(slots, a.model, "chat"):
+                    completion = await _chat_create(client, kwargs_base, a.max_tokens)
+                content = _c._chat_content(completion)
+                parsed = _c._parse_json_output(content, response_model, extract=used_rf is None and allow_json_extract)
+                meta = _c._chat_meta(
+                    completion, purpose=purpose, model=a.model, used_response_format=f"chat_{used_rf or 'none'}"
+                )
+                check = _c._parsed_check(validate_parsed, parsed)
+                return parsed, loop.succeeded(a, meta, tracker=token_budget_tracker, check=check)
+            except Exception as e:
+                preview = content[:240]
+                if not loop.failed(a, e, event="ai_json_failed", response_format=used_rf, content_preview=preview):
+                    break
+        if not loop.next_model:
+            await asyncio.sleep(loop.backoff_s(a))
+
+    if fallback is not None:
+        return fallback(), _c._fallback_meta(purpose, retries)
+    raise loop.exhausted()
+
+
+async def _hedged_text(**kw: Any) -> tuple[str, AiMeta]:
+    """`_acall_text`, hedged to the next fallback model for interactive purposes (see hedging.py)."""
+    from app.ai.hedging import get_hedger, run_hedged
+
+    purpose = kw["purpose"]
+    hedger = get_hedger()
+    if not hedger.enabled_for(purpose):
+        return await _acall_text(**kw)
+    hedger.admit(purpose)
+    chain = _c._models_to_try(purpose)
+    t0 = time.monotonic()
+    delay = hedger.delay_for(purpose)
+    if delay is None:
+        res = await _acall_text(**(kw | {"models": chain}))
+        hedger.record_latency(purpose, time.monotonic() - t0)
+        return res
+    # The hedge is a single attempt on the next model (same model if there is no fallback).
+    (out, meta), by_hedge = await run_hedged(
+        lambda: _acall_text(**(kw | {"models": chain})),
+        lambda: _acall_text(**(kw | {"models": chain[1:] or chain, "retries": 0})),
+        delay_s=delay,
+        allow_hedge=lambda: hedger.try_spend(purpose),
+    )
+    # Latency of the whole call from the caller's side. A primary cancelled by a
+    # winning hedge was still running, so it counts as at least the hedge delay.
+    elapsed = time.monotonic() - t0
+    hedger.record_latency(purpose, max(elapsed, delay) if by_hedge else elapsed)
+    if by_hedge:
+        hedger.record_hedge_win(purpose)
+        log.info("ai_hedge_won", purpose=purpose, model=meta.model, delay_ms=round(1000 * delay))
+        meta = AiMeta(**(meta.__dict__ | {"hedged": True}))
+    return out, meta
+
+
+async def _cache_get(rc: Any, key: str, purpose: str, accept: Callable[[Any], bool]) -> Any:
+    if rc.shared:
+        return await asyncio.to_thread(rc.get, key, purpose, accept=accept)
+    return rc.get(key, purpose, accept=accept)
+
+
+async def _cache_put(rc: Any, key: str, purpose: str, **kw: Any) -> None:
+    if rc.shared:
+        await asyncio.to_thread(lambda: rc.put(key, purpose, **kw))
+    else:
+        rc.put(key, purpose, **kw)
+
+
+async def acall_text(
+    *,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int = 1200,
+    temperature: float = 0.4,
+    validate: Validator | list[Validator] | None = None,
+    retries: int = 2,
+    timeout_s: int = 60,
+    max_prompt_chars: int = 220_000,
+    token_budget_tracker: Any | None = None,  # TokenBudgetTracker
+    cache: bool = False,
+) -> tuple[str, AiMeta]:
+    """Async `call_text`: same arguments, result and errors."""
+    if not settings.openai_api_key:
+        raise AiNotConfigured("OPENAI_API_KEY not configured")
+    rc, ttl, key = None, 0.0, ""
+    if cache:
+        rc, ttl = _c._response_cache_for(purpose)
+    if rc is not None:
+        key = _c._response_key(
+            kind="text",
+            purpose=purpose,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            max_prompt_chars=max_prompt_chars,
+        )
+        entry = await _cache_get(
+            rc, key, purpose, lambda v: isinstance(v, str) and _c._run_validator(validate, v) is None
+        )
+        if entry is not None:
+            return entry.value, _c._cached_meta(purpose, entry)
+
+    out, meta = await _hedged_text(
+        purpose=purpose,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        validate=validate,
+        retries=retries,
+        timeout_s=timeout_s,
+        max_prompt_chars=max_prompt_chars,
+        token_budget_tracker=token_budget_tracker,
+    )
+    if rc is not None:
+        await _cache_put(
+            rc,
+            key,
+            purpose,
+            value=out,
+            model=meta.model,
+            response_format=meta.used_response_format,
+            input_tokens=meta.input_tokens,
+            output_tokens=meta.output_tokens,
+            ttl_s=ttl,
+        )
+    return out, meta
+
+
+async def acall_json(
+    *,
+    purpose: str,
+    response_model: type[T],
+    messages: list[dict[str, str]],
+    max_tokens: int = 1200,
+    temperature: float = 0.2,
+    retries: int = 3,
+    allow_json_extract: bool = True,
+    validate_parsed: Callable[[T], str | None] | None = None,
+    fallback: Callable[[], T] | None = None,
+    timeout_s: int = 60,
+    max_prompt_chars: int = 220_000,
+    token_budget_tracker: Any | None = None,  # TokenBudgetTracker
+    cache: bool = False,
+) -> tuple[T, AiMeta]:
+    """Async `call_json`: same arguments, result and errors (including `fallback`)."""
+    if not settings.openai_api_key:
+        raise AiNotConfigured("OPENAI_API_KEY not configured")
+    rc, ttl, key = None, 0.0, ""
+    if cache:
+        rc, ttl = _c._response_cache_for(purpose)
+
+    def _accept(v: Any) -> bool:
+        try:
+            p = response_model.model_validate(v)
+        except Exception:
+            return False
+        return not (validate_parsed(p) if validate_parsed else None)
+
+    if rc is not None:
+        key = _c._response_key(
+            kind="json",
+            purpose=purpose,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            max_prompt_chars=max_prompt_chars,
+            schema=_c._normalize_openai_strict_json_schema(response_model.model_json_schema()),
+            extra={"model_name": response_model.__name__, "allow_json_extract": bool(allow_json_extract)},
+        )
+        entry = await _cache_get(rc, key, purpose, _accept)
+        if entry is not None:
+            return response_model.model_validate(entry.value), _c._cached_meta(purpose, entry)
+
+    parsed, meta = await _acall_json(
+        purpose=purpose,
+        response_model=response_model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        retries=retries,
+        allow_json_extract=allow_json_extract,
+        validate_parsed=validate_parsed,
+        fallback=fallback,
+        timeout_s=timeout_s,
+        max_prompt_chars=max_prompt_chars,
+        token_budget_tracker=token_budget_tracker,
+    )
+    if rc is not None and meta.used_response_format is not None:
+        await _cache_put(
+            rc,
+            key,
+            purpose,
+            value=parsed.model_dump(mode="json"),
+            model=meta.model,
+            response_format=meta.used_response_format,
+            input_tokens=meta.input_tokens,
+            output_tokens=meta.output_tokens,
+            ttl_s=ttl,
+        )
+    return parsed, meta
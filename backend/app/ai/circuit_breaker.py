@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+"""
+Per-model, per-endpoint circuit breakers for upstream model requests.
+
+One breaker per (model, endpoint) pair, where endpoint is "responses" or
+"chat". Each breaker works like this:
+
+- closed: requests flow. `failure_threshold` retryable failures (5xx, 429,
+  timeouts, connection errors) within `window_s` open it.
+- open: requests are refused for `open_s`, and `_models_to_try` drops the model
+  so callers go straight to the next model in the fallback chain.
+- half-open: after `open_s` exactly one caller is let through as a probe.
+  Success closes the breaker and failure re-opens it. A probe that never
+  reports back (lost thread, queue timeout) is replaced after `probe_timeout_s`.
+
+Every transition is logged (`ai_circuit_*`) and counted in `circuit_stats()`.
+"""
+
+import threading
+import time
+from typing import Any, Callable
+
+from app.observability.logging import get_logger
+
+log = get_logger("ai_circuit")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _counts_as_failure(exc: BaseException) -> bool:
+    from app.ai.client import _is_retryable
+
+    return isinstance(exc, Exception) and _is_retryable(exc)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        window_s: float = 60.0,
+        open_s: float = 15.0,
+        probe_timeout_s: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.window_s = max(0.0, float(window_s))
+        self.open_s = max(0.0, float(open_s))
+        self.probe_timeout_s = max(0.0, float(probe_timeout_s))
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.state = CLOSED
+        self.failures = 0
+        self._last_failure_at = 0.0
+        self._open_until = 0.0
+        self._probe_started_at: float | None = None
+
+        self.opens = 0
+        self.rejected = 0
+        self.probes = 0
+        self.transitions = 0
+
+    # --- internals (lock held) ---
+
+    def _to(self, state: str, **fields: Any) -> None:
+        prev, self.state = self.state, state
+        self.transitions += 1
+        if state == OPEN:
+            self.opens += 1
+            log.warning("ai_circuit_opened", breaker=self.name, previous=prev, open_s=self.open_s, **fields)
+        elif state == HALF_OPEN:
+            log.info("ai_circuit_half_open", breaker=self.name)
+        else:
+            log.info("ai_circuit_closed", breaker=self.name, previous=prev)
+
+    def _open(self, now: float, **fields: Any) -> None:
+        self._open_until = now + self.open_s
+        self._probe_started_at = None
+        self._to(OPEN, **fields)
+
+    # --- public API ---
+
+    def is_open(self) -> bool:
+        """True while requests would be refused (no probe due yet). Doesn't consume the probe."""
+        with self._lock:
+            if self.state == OPEN:
+                return self._clock() < self._open_until
+            if self.state == HALF_OPEN:
+                started = self._probe_started_at
+                return started is not None and self._clock() - started < self.probe_timeout_s
+            return False
+
+    def allow(self) -> bool:
+        """Admit one request. In half-open only the single probe is admitted."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = self._clock()
+            if self.state == OPEN:
+                if now < self._open_until:
+                    self.rejected += 1
+                    return False
+                self._to(HALF_OPEN)
+            started = self._probe_started_at
+            if started is not None and now - started < self.probe_timeout_s:
+                self.rejected += 1
+                return False
+            self._probe_started_at = now
+            self.probes += 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == OPEN:
+                return  # a request admitted before the breaker opened; wait for the probe
+            self.failures = 0
+            self._last_failure_at = 0.0
+            if self.state == HALF_OPEN:
+                self._probe_started_at = None
+                self._to(CLOSED)
+
+    def record_failure(self, exc: BaseException) -> None:
+        counts = _counts_as_failure(exc)
+        with self._lock:
+            if not counts:
+                # The upstream answered (bad request, parse failure...): it is healthy.
+                if self.state == HALF_OPEN:
+                    self._probe_started_at = None
+                    self._to(CLOSED)
+                return
+            now = self._clock()
+            if self.state == HALF_OPEN:
+                self._open(now, error=str(exc)[:200])
+                return
+            if self.state == OPEN:
+                return
+            # Failures spaced further apart than the window don't accumulate.
+            if self._last_failure_at and now - self._last_failure_at > self.window_s:
+                self.failures = 0
+            self._last_failure_at = now
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._open(now, failures=self.failures, error=str(exc)[:200])
+
+    def abandon(self) -> None:
+        """The admitted request never reached the upstream; free the probe for someone else."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_started_at = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+                "probes": self.probes,
+                "transitions": self.transitions,
+                "openForS": round(max(0.0, self._open_until - self._clock()), 2) if self.state == OPEN else 0.0,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Thread-safe lazy map of `model|endpoint` -> CircuitBreaker."""
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        window_s: float = 60.0,
+        open_s: float = 15.0,
+        probe_timeout_s: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._kw: dict[str, Any] = {
+            "failure_threshold": failure_threshold,
+            "window_s": window_s,
+            "open_s": open_s,
+            "probe_timeout_s": probe_timeout_s,
+            "clock": clock,
+        }
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str, endpoint: str) -> CircuitBreaker:
+        key = f"{model}|{endpoint}"
+        b = self._breakers.get(key)
+        if b is None:
+            with self._lock:
+                b = self._breakers.get(key)
+                if b is None:
+                    b = CircuitBreaker(key, **self._kw)
+                    self._breakers[key] = b
+        return b
+
+    def model_open(self, model: str) -> bool:
+        """True if any endpoint of `model` is currently refusing requests."""
+        prefix = f"{model}|"
+        with self._lock:
+            breakers = [b for k, b in self._breakers.items() if k.startswith(prefix)]
+        return any(b.is_open() for b in breakers)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        per = {k: b.stats() for k, b in sorted(breakers.items())}
+        return {
+            "open": sorted(k for k, s in per.items() if s["state"] != CLOSED),
+            "breakers": per,
+        }
+
+
+_LOCK = threading.Lock()
+_REGISTRY: CircuitBreakerRegistry | None = None
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Process singleton configured from settings."""
+    global _REGISTRY
+    if _REGISTRY is not None:
+        return _REGISTRY
+    with _LOCK:
+        if _REGISTRY is None:
+            from app.settings import settings
+
+            _REGISTRY = CircuitBreakerRegistry(
+                failure_threshold=settings.ai_circuit_failure_threshold,
+                window_s=settings.ai_circuit_window_s,
+                open_s=settings.ai_circuit_open_s,
+            )
+    return _REGISTRY
+
+
+def set_circuit_breakers(registry: CircuitBreakerRegistry | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _REGISTRY
+    with _LOCK:
+        _REGISTRY = registry
+
+
+def circuit_stats() -> dict[str, Any]:
+    return get_circuit_breakers().stats()
@@ -3,16 +3,17 @@ from __future__ import annotations
 import json
 import random
 import re
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, Iterator, TypeVar
 
 import httpx
 from pydantic import BaseModel
 
 from app.observability.logging import get_logger
 from app.settings import settings
-from app.ai.tuning import Validator, tuning_for
+from app.ai.tuning import AiKind, Validator, tuning_for
 
 log = get_logger("ai")
 
@@ -36,9 +37,22 @@ class AiParseError(AiError):
     pass
 
 
-_CIRCUIT_OPEN_UNTIL: float = 0.0
-_CONSECUTIVE_FAILURES: int = 0
-_LAST_FAILURE_AT: float = 0.0
+class AiQueueTimeout(AiUpstreamError):
+    """No upstream slot freed up in time (adaptive concurrency limit); not retried."""
+
+
+class AiCircuitOpen(AiUpstreamError):
+    """Every model in the fallback chain has an open circuit breaker; not retried."""
+
+
+class _FallbackUsed(AiError):
+    """Internal: a coalesced `call_json` ended in its fallback (never shared)."""
+
+    def __init__(self, parsed: Any, meta: Any):
+        super().__init__("ai_json_fallback")
+        self.parsed = parsed
+        self.meta = meta
+        self.leader_thread = threading.get_ident()
 
 
 def _status_code(exc: Exception) -> int | None:
@@ -69,37 +83,34 @@ def _is_retryable(exc: Exception) -> bool:
     return False
 
 
-def _circuit_check() -> None:
-    global _CIRCUIT_OPEN_UNTIL
-    now = time.time()
-    if _CIRCUIT_OPEN_UNTIL and now < _CIRCUIT_OPEN_UNTIL:
-        raise AiUpstreamError("ai_temporarily_unavailable")
-
-
-def _circuit_record_success() -> None:
-    global _CONSECUTIVE_FAILURES, _LAST_FAILURE_AT, _CIRCUIT_OPEN_UNTIL
-    _CONSECUTIVE_FAILURES = 0
-    _LAST_FAILURE_AT = 0.0
-    _CIRCUIT_OPEN_UNTIL = 0.0
-
-
-def _circuit_record_failure(exc: Exception) -> None:
+def _send(endpoint: str, fn: Callable[..., Any], **kwargs: Any) -> Any:
     """
-    Basic circuit breaker:
-    - If we see repeated retryable upstream failures, open the circuit briefly to avoid stampedes.
+    Run one upstream request to `endpoint` ("responses" / "chat") for `kwargs["model"]`.
+
+    The request must pass the model's circuit breaker (see circuit_breaker.py), then
+    holds an adaptive concurrency slot (see concurrency.py). Its outcome feeds both.
     """
-    global _CONSECUTIVE_FAILURES, _LAST_FAILURE_AT, _CIRCUIT_OPEN_UNTIL
-    if not _is_retryable(exc):
-        return
-    now = time.time()
-    # If failures are spaced out, decay the counter.
-    if _LAST_FAILURE_AT and (now - _LAST_FAILURE_AT) > 60:
-        _CONSECUTIVE_FAILURES = 0
-    _LAST_FAILURE_AT = now
-    _CONSECUTIVE_FAILURES += 1
-    if _CONSECUTIVE_FAILURES >= 5:
-        # Open for a short period; callers should surface a retryable error.
-        _CIRCUIT_OPEN_UNTIL = now + 15
+    from app.ai.circuit_breaker import get_circuit_breakers
+    from app.ai.concurrency import get_ai_limiter
+
+    breaker = get_circuit_breakers().get(str(kwargs.get("model") or ""), endpoint)
+    if not breaker.allow():
+        raise AiCircuitOpen("ai_temporarily_unavailable")
+    limiter = get_ai_limiter()
+    try:
+        if limiter is None:
+            out = fn(**kwargs)
+        else:
+            with limiter.slot():
+                out = fn(**kwargs)
+    except AiQueueTimeout:
+        breaker.abandon()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return out
 
 
 def _is_gpt5_family(model: str) -> bool:
@@ -126,7 +137,7 @@ def _is_model_access_error(e: Exception, *, model: str) -> bool:
     return False
 
 
-def _models_to_try(purpose: str) -> list[str]:
+def _model_chain(purpose: str) -> list[str]:
     """
     Prefer per-purpose model, then fall back to OPENAI_MODEL, then GPT-5.2-pro for complex tasks, then a known-safe default.
     
@@ -153,6 +164,23 @@ def _models_to_try(purpose: str) -> list[str]:
     return out
 
 
+def _models_to_try(purpose: str) -> list[str]:
+    """
+    The configured chain minus models whose circuit breaker is open, so traffic goes
+    straight to the fallbacks during an incident. Raises AiCircuitOpen if none are left.
+    """
+    from app.ai.circuit_breaker import get_circuit_breakers
+
+    chain = _model_chain(purpose)
+    breakers = get_circuit_breakers()
+    out = [m for m in chain if not breakers.model_open(m)]
+    if not out:
+        raise AiCircuitOpen("ai_temporarily_unavailable")
+    if len(out) < len(chain):
+        log.info("ai_models_skipped_open_circuit", purpose=purpose, skipped=[m for m in chain if m not in out])
+    return out
+
+
 @dataclass(frozen=True)
 class AiMeta:
     purpose: str
@@ -163,6 +191,11 @@ class AiMeta:
     input_tokens: int | None = None
     output_tokens: int | None = None
     total_tokens: int | None = None
+    cached: bool = False  # served from the response cache
+    coalesced: bool = False  # shared another caller's in-flight request
+    hedged: bool = False  # answered by a hedge request (see hedging.py)
+    prompt_tokens: int | None = None  # measured before sending (see tokens.py)
+    prompt_truncated_tokens: int = 0  # cut to fit the model's context budget
 
 
 def _client(*, timeout_s: int = 60) -> Any:
@@ -179,6 +212,15 @@ def _client(*, timeout_s: int = 60) -> Any:
             "OpenAI SDK is missing or incompatible. Install a v1.x SDK (e.g. openai>=1.0.0)."
         ) from e
     # We do our own retries; keep OpenAI client retries minimal.
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        max_retries=0,
+        timeout=max(5, int(timeout_s or 60)),
+        default_headers=_sdk_default_headers() or None,
+    )
+
+
+def _sdk_default_headers() -> dict[str, str]:
     headers: dict[str, str] = {}
     # Force project routing if configured (matches OpenAI dashboard project id).
     if settings.openai_project_id and str(settings.openai_project_id).strip():
@@ -187,12 +229,7 @@ def _client(*, timeout_s: int = 60) -> Any:
     # but we also allow forcing it via headers for safety.
     if settings.openai_organization_id and str(settings.openai_organization_id).strip():
         headers["OpenAI-Organization"] = str(settings.openai_organization_id).strip()
-    return OpenAI(
-        api_key=settings.openai_api_key,
-        max_retries=0,
-        timeout=max(5, int(timeout_s or 60)),
-        default_headers=headers or None,
-    )
+    return headers
 
 
 def _supports_responses_api(client: Any) -> bool:
@@ -272,23 +309,24 @@ def _responses_http_create_text(
     Use this when the installed OpenAI SDK is too old to expose `client.responses`,
     but we still want GPT-5 family models.
     """
-    inp = _messages_to_single_input(messages)
-    payload: dict[str, Any] = {
-        "model": model,
-        "input": inp,
-        "max_output_tokens": int(max_tokens),
-        "reasoning": {"effort": reasoning_effort},
-        "text": {"verbosity": verbosity},
-    }
-    if str(reasoning_effort).strip().lower() == "none":
-        payload["temperature"] = float(temperature)
-
+    payload = _responses_kwargs(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        reasoning_effort=reasoning_effort,
+        verbosity=verbosity,
+    )
     r = httpx.post(
         "https://api.openai.com/v1/responses",
         headers=_openai_http_headers(),
         json=payload,
         timeout=max(5.0, float(timeout_s or 60)),
     )
+    return _responses_http_result(r, purpose=purpose, model=model)
+
+
+def _responses_http_result(r: httpx.Response, *, purpose: str, model: str) -> tuple[str, AiMeta]:
     if int(r.status_code) >= 400:
         # Let the retry logic see status codes where possible.
         raise AiUpstreamError(f"responses_api_http_error {r.status_code}: {r.text[:800]}")
@@ -375,7 +413,7 @@ def _run_validator(validate: Validator | list[Validator] | None, text: str) -> s
 
 
 def _normalize_messages(messages: list[dict[str, str]], max_chars: int) -> list[dict[str, str]]:
-    # Guard against accidentally sending huge prompts (which can time out or explode costs).
+    # Coarse guard against accidentally huge prompts; exact per-model sizing is `_fit_prompt`.
     out: list[dict[str, str]] = []
     for m in messages or []:
         role = str(m.get("role") or "user")
@@ -384,6 +422,19 @@ def _normalize_messages(messages: list[dict[str, str]], max_chars: int) -> list[
     return out
 
 
+def _fit_prompt(messages: list[dict[str, str]], *, model: str, max_tokens: int) -> tuple[list[dict[str, str]], Any]:
+    """Fit `messages` to `model`'s context, reserving room for the larger retry output."""
+    from app.ai.tokens import fit_messages
+
+    reserve = int(max_tokens * 1.5)
+    cap = int(settings.openai_max_output_tokens_cap or reserve)
+    return fit_messages(messages, model=model, max_output_tokens=max(int(max_tokens), min(reserve, cap)))
+
+
+def _fit_fields(fit: Any) -> dict[str, Any]:
+    return {"prompt_tokens": fit.prompt_tokens, "prompt_truncated_tokens": fit.truncated_tokens}
+
+
 def _messages_to_single_input(messages: list[dict[str, str]]) -> str:
     """
     Convert chat-style messages to a single Responses API input string.
@@ -464,56 +515,65 @@ def _responses_text(resp: Any) -> str:
         return ""
 
 
-def _responses_create_text(
+def _usage_tokens(usage_obj: Any) -> tuple[int | None, int | None, int | None]:
+    """(input, output, total) tokens from a Responses or Chat Completions `usage` object."""
+    if not usage_obj:
+        return None, None, None
+    input_tokens = getattr(usage_obj, "input_tokens", None) or getattr(usage_obj, "prompt_tokens", None)
+    output_tokens = getattr(usage_obj, "output_tokens", None) or getattr(usage_obj, "completion_tokens", None)
+    total_tokens = getattr(usage_obj, "total_tokens", None)
+    # Calculate total if not provided
+    if total_tokens is None and input_tokens is not None and output_tokens is not None:
+        total_tokens = input_tokens + output_tokens
+    return input_tokens, output_tokens, total_tokens
+
+
+def _responses_kwargs(
     *,
-    client: Any,
     model: str,
-    purpose: str,
     messages: list[dict[str, str]],
     max_tokens: int,
     temperature: float,
     reasoning_effort: str,
     verbosity: str,
-) -> tuple[str, AiMeta]:
-    """
-    Call the Responses API and return plain text.
-    """
-    inp = _messages_to_single_input(messages)
+    response_model: type[BaseModel] | None = None,
+) -> dict[str, Any]:
+    """Responses API request for plain text, or structured output when `response_model` is set."""
+    text: dict[str, Any] = {"verbosity": verbosity}
+    if response_model is not None:
+        schema = response_model.model_json_schema()
+        schema = _normalize_openai_strict_json_schema(schema)
+        # Responses API structured outputs: text.format
+        # (If an upstream model doesn't support this, we'll fall back to Chat Completions.)
+        text["format"] = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": response_model.__name__,
+                "schema": schema,
+                "strict": True,
+            },
+        }
     kwargs: dict[str, Any] = {
         "model": model,
-        "input": inp,
+        "input": _messages_to_single_input(messages),
         "max_output_tokens": int(max_tokens),
         "reasoning": {"effort": reasoning_effort},
-        "text": {"verbosity": verbosity},
+        "text": text,
     }
     # Per GPT-5.2 guidance: temperature/top_p/logprobs are only accepted with effort="none".
     if str(reasoning_effort).strip().lower() == "none":
         kwargs["temperature"] = float(temperature)
+    return kwargs
 
-    resp = client.responses.create(**kwargs)
-    out = _responses_text(resp).strip()
-    if not out:
-        raise AiParseError("empty_model_response")
-    
-    # Extract token usage from response (may not be available in Responses API)
-    usage_obj = getattr(resp, "usage", None)
-    input_tokens = None
-    output_tokens = None
-    total_tokens = None
-    
-    if usage_obj:
-        input_tokens = getattr(usage_obj, "input_tokens", None) or getattr(usage_obj, "prompt_tokens", None)
-        output_tokens = getattr(usage_obj, "output_tokens", None) or getattr(usage_obj, "completion_tokens", None)
-        total_tokens = getattr(usage_obj, "total_tokens", None)
-        # Calculate total if not provided
-        if total_tokens is None and input_tokens is not None and output_tokens is not None:
-            total_tokens = input_tokens + output_tokens
-    
-    return out, AiMeta(
+
+def _responses_meta(resp: Any, *, purpose: str, model: str, used_response_format: str) -> AiMeta:
+    # Token usage may not be available in Responses API
+    input_tokens, output_tokens, total_tokens = _usage_tokens(getattr(resp, "usage", None))
+    return AiMeta(
         purpose=purpose,
         model=model,
         attempts=1,
-        used_response_format="responses_text",
+        used_response_format=used_response_format,
         response_id=getattr(resp, "id", None),
         input_tokens=input_tokens,
         output_tokens=output_tokens,
@@ -521,6 +581,55 @@ def _responses_create_text(
     )
 
 
+def _parse_json_output(content: str, response_model: type[T], *, extract: bool) -> T:
+    """Parse model output into `response_model`; raises AiParseError (retryable with feedback)."""
+    if not content:
+        raise AiParseError("empty_model_response")
+    raw_json = content
+    if extract:
+        extracted = _extract_first_json_object(content)
+        if extracted:
+            raw_json = extracted
+    try:
+        data = json.loads(raw_json)
+    except Exception as e:
+        raise AiParseError(f"json_decode_error: {e}")
+    try:
+        return response_model.model_validate(data)
+    except Exception as e:
+        raise AiParseError(f"schema_validation_error: {e}")
+
+
+def _responses_create_text(
+    *,
+    client: Any,
+    model: str,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    reasoning_effort: str,
+    verbosity: str,
+) -> tuple[str, AiMeta]:
+    """
+    Call the Responses API and return plain text.
+    """
+    resp = client.responses.create(
+        **_responses_kwargs(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            reasoning_effort=reasoning_effort,
+            verbosity=verbosity,
+        )
+    )
+    out = _responses_text(resp).strip()
+    if not out:
+        raise AiParseError("empty_model_response")
+    return out, _responses_meta(resp, purpose=purpose, model=model, used_response_format="responses_text")
+
+
 def _responses_create_json(
     *,
     client: Any,
@@ -538,77 +647,261 @@ def _responses_create_json(
 
     We still parse/validate server-side (do not trust the model).
     """
-    inp = _messages_to_single_input(messages)
-
-    schema = response_model.model_json_schema()
-    schema = _normalize_openai_strict_json_schema(schema)
-
-    # Responses API structured outputs: text.format
-    # (If an upstream model doesn't support this, we'll fall back to Chat Completions.)
-    fmt: dict[str, Any] = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": response_model.__name__,
-            "schema": schema,
-            "strict": True,
-        },
-    }
-
-    kwargs: dict[str, Any] = {
-        "model": model,
-        "input": inp,
-        "max_output_tokens": int(max_tokens),
-        "reasoning": {"effort": reasoning_effort},
-        "text": {"verbosity": verbosity, "format": fmt},
-    }
-    if str(reasoning_effort).strip().lower() == "none":
-        kwargs["temperature"] = float(temperature)
-
-    resp = client.responses.create(**kwargs)
-    content = _responses_text(resp).strip()
-    if not content:
-        raise AiParseError("empty_model_response")
+    resp = client.responses.create(
+        **_responses_kwargs(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            reasoning_effort=reasoning_effort,
+            verbosity=verbosity,
+            response_model=response_model,
+        )
+    )
+    parsed = _parse_json_output(_responses_text(resp).strip(), response_model, extract=True)
+    return parsed, _responses_meta(resp, purpose=purpose, model=model, used_response_format="responses_json_schema")
 
-    raw_json = content
-    extracted = _extract_first_json_object(content)
-    if extracted:
-        raw_json = extracted
-    try:
-        data = json.loads(raw_json)
-    except Exception as e:
-        raise AiParseError(f"json_decode_error: {e}")
-    try:
-        parsed = response_model.model_validate(data)
-    except Exception as e:
-        raise AiParseError(f"schema_validation_error: {e}")
 
-    # Extract token usage from response (may not be available in Responses API)
-    usage_obj = getattr(resp, "usage", None)
-    input_tokens = None
-    output_tokens = None
-    total_tokens = None
-    
-    if usage_obj:
-        input_tokens = getattr(usage_obj, "input_tokens", None) or getattr(usage_obj, "prompt_tokens", None)
-        output_tokens = getattr(usage_obj, "output_tokens", None) or getattr(usage_obj, "completion_tokens", None)
-        total_tokens = getattr(usage_obj, "total_tokens", None)
-        # Calculate total if not provided
-        if total_tokens is None and input_tokens is not None and output_tokens is not None:
-            total_tokens = input_tokens + output_tokens
-
-    return parsed, AiMeta(
+def _chat_meta(completion: Any, *, purpose: str, model: str, used_response_format: str) -> AiMeta:
+    input_tokens, output_tokens, total_tokens = _usage_tokens(getattr(completion, "usage", None))
+    return AiMeta(
         purpose=purpose,
         model=model,
         attempts=1,
-        used_response_format="responses_json_schema",
-        response_id=getattr(resp, "id", None),
+        used_response_format=used_response_format,
         input_tokens=input_tokens,
         output_tokens=output_tokens,
         total_tokens=total_tokens,
     )
 
 
-def call_text(
+def _chat_content(completion: Any) -> str:
+    return (completion.choices[0].message.content or "").strip()
+
+
+def _chat_completion(client: Any, kwargs_base: dict[str, Any], max_tokens: int) -> Any:
+    try:
+        return _send("chat", client.chat.completions.create, **(kwargs_base | {"max_completion_tokens": max_tokens}))
+    except Exception as e:
+        if _should_retry_with_legacy_max_tokens(e):
+            return _send("chat", client.chat.completions.create, **(kwargs_base | {"max_tokens": max_tokens}))
+        raise
+
+
+def _json_modes(response_model: type[BaseModel], temperature: float) -> list[tuple[dict[str, Any] | None, float]]:
+    """Chat Completions (response_format, temperature) modes tried in order on each JSON attempt."""
+    schema = _normalize_openai_strict_json_schema(response_model.model_json_schema())
+    # OpenAI structured output format wrapper.
+    rf_json_schema: dict[str, Any] = {
+        "type": "json_schema",
+        "json_schema": {"name": response_model.__name__, "schema": schema, "strict": True},
+    }
+    return [(rf_json_schema, 0.0), ({"type": "json_object"}, 0.0), (None, temperature)]
+
+
+def _clamp_max_tokens(max_tokens: int) -> int:
+    # Clamp token output to reduce accidental cost explosions.
+    return int(min(int(max_tokens), int(settings.openai_max_output_tokens_cap or max_tokens)))
+
+
+def _fallback_meta(purpose: str, retries: int) -> AiMeta:
+    # Use the primary model for meta; even if it failed, this is just telemetry.
+    primary = str(settings.openai_model_for(purpose) or "").strip() or "unknown"
+    return AiMeta(purpose=purpose, model=primary, attempts=max(1, int(retries)), used_response_format=None)
+
+
+@dataclass(frozen=True)
+class _Attempt:
+    model: str
+    number: int
+    messages: list[dict[str, str]]
+    max_tokens: int
+    prev_err: Exception | None
+    fit: Any
+
+
+# (base, jitter, cap) seconds of the backoff before the next attempt on the same model.
+_BACKOFF = {"text": (0.3, 0.15, 2.5), "json": (0.4, 0.2, 3.0)}
+
+
+class _AttemptLoop:
+    """
+    Model fallback chain and per-model retries shared by the sync calls here and
+    the async ones in async_client.py, which only send the requests and sleep.
+
+    Iterating yields one `_Attempt` per request round: the prompt fitted to the
+    model, retry feedback after a parse/validation failure, and a larger output
+    budget for that retry. Callers report each outcome with `succeeded` or
+    `failed`; after a circuit-open or model-access error the next model is tried
+    without further retries.
+    """
+
+    def __init__(
+        self,
+        *,
+        purpose: str,
+        kind: AiKind,
+        messages: list[dict[str, str]],
+        max_tokens: int,
+        attempts: int,
+        models: list[str] | None = None,
+        mode: str | None = None,
+    ):
+        self.purpose = purpose
+        self.kind = kind
+        self.messages = messages
+        self.max_tokens = max_tokens
+        self.attempts = max(1, int(attempts))
+        self.models = models or _models_to_try(purpose)
+        self.last_err: Exception | None = None
+        self._log_extra = {"mode": mode} if mode else {}
+        self._prev_err: Exception | None = None
+        self._prev_output: str | None = None
+        self._next_model = False
+
+    def __iter__(self) -> Iterator[_Attempt]:
+        for model in self.models:
+            model_messages, fit = _fit_prompt(self.messages, model=model, max_tokens=self.max_tokens)
+            self._prev_err, self._prev_output, self._next_model = None, None, False
+            for n in range(1, self.attempts + 1):
+                attempt_messages = list(model_messages)
+                mt = self.max_tokens
+                if n >= 2 and self._prev_err is not None and _is_parse_failure(self._prev_err):
+                    attempt_messages.append(
+                        _retry_feedback_message(
+                            kind=self.kind, purpose=self.purpose, prev_err=self._prev_err, last_output=self._prev_output
+                        )
+                    )
+                    # Give retries more room when parsing/validation fails (bounded by cap).
+                    mt = int(min(int(settings.openai_max_output_tokens_cap or mt), int(mt * 1.5)))
+                yield _Attempt(model, n, attempt_messages, mt, self._prev_err, fit)
+                if self._next_model:
+                    break
+
+    @property
+    def next_model(self) -> bool:
+        """True once the current model is abandoned; the round should end without a backoff."""
+        return self._next_model
+
+    def tuning(self, a: _Attempt) -> Any:
+        return tuning_for(purpose=self.purpose, kind=self.kind, attempt=a.number, prev_err=a.prev_err)
+
+    def backoff_s(self, a: _Attempt) -> float:
+        base, jitter, cap = _BACKOFF.get(self.kind, _BACKOFF["text"])
+        return min(cap, base * (2 ** (a.number - 1)) + random.random() * jitter)
+
+    def succeeded(
+        self,
+        a: _Attempt,
+        meta: AiMeta,
+        *,
+        tracker: Any | None = None,  # TokenBudgetTracker
+        check: Callable[[], str | None] | None = None,
+    ) -> AiMeta:
+        """
+        Record token usage, then run the caller's validator (`check` returns an
+        error message; raises AiParseError) and return the final meta.
+        """
+        _record_budget(tracker, meta)
+        msg = check() if check is not None else None
+        if msg:
+            raise AiParseError(f"validation_failed: {msg}")
+        try:
+            log.info(
+                "ai_call_ok",
+                purpose=self.purpose,
+                model=a.model,
+                attempts=a.number,
+                response_format=meta.used_response_format,
+                response_id=meta.response_id,
+                input_tokens=meta.input_tokens,
+                output_tokens=meta.output_tokens,
+                total_tokens=meta.total_tokens,
+                **self._log_extra,
+            )
+        except Exception:
+            pass
+        return AiMeta(**(meta.__dict__ | {"attempts": a.number} | _fit_fields(a.fit)))
+
+    def failed(self, a: _Attempt, e: Exception, *, event: str, output: str | None = None, **fields: Any) -> bool:
+        """
+        Record a failed request. Returns True when the model may be retried and False
+        when the loop moves on to the next model. Queue timeouts are re-raised.
+        """
+        if isinstance(e, AiQueueTimeout):
+            raise e
+        self.last_err = e
+        if isinstance(e, AiCircuitOpen):
+            # Opened since the chain was built: move on to the next model.
+            self._next_model = True
+            return False
+        self._prev_err = e
+        if output is not None and self.kind == "text":
+            self._prev_output = output
+        if _is_model_access_error(e, model=a.model):
+            log.warning("ai_model_unavailable", purpose=self.purpose, model=a.model, error=str(e), **self._log_extra)
+            self._next_model = True
+            return False
+        log.warning(
+            event,
+            purpose=self.purpose,
+            model=a.model,
+            attempt=a.number,
+            error=str(e),
+            status_code=_status_code(e),
+            **fields,
+            **self._log_extra,
+        )
+        return True
+
+    def fell_back(self, a: _Attempt, e: Exception) -> None:
+        """A Responses API JSON request failed; the caller falls through to the Chat Completions modes."""
+        if isinstance(e, AiQueueTimeout):
+            raise e
+        self.last_err = e
+        if isinstance(e, AiCircuitOpen):
+            return
+        self._prev_err = e
+        log.warning(
+            "ai_json_responses_failed",
+            purpose=self.purpose,
+            model=a.model,
+            attempt=a.number,
+            error=str(e),
+            status_code=_status_code(e),
+            **self._log_extra,
+        )
+
+    def exhausted(self) -> Exception:
+        """The error to raise once every model and attempt has failed."""
+        last_err = self.last_err
+        # If it looks like a model access issue, surface a config-style error.
+        if last_err and _is_model_access_error(last_err, model=str(settings.openai_model_for(self.purpose) or "")):
+            return AiNotConfigured(
+                f"Configured OpenAI model is not available for this project (purpose '{self.purpose}'). "
+                f"Check OPENAI_MODEL / OPENAI_MODEL_* overrides."
+            )
+        return AiUpstreamError(str(last_err) if last_err else f"ai_{self.kind}_failed")
+
+
+def _record_budget(tracker: Any | None, meta: AiMeta) -> None:
+    if tracker and (meta.input_tokens is not None or meta.output_tokens is not None):
+        try:
+            tracker.record_llm_call(input_tokens=meta.input_tokens, output_tokens=meta.output_tokens)
+            # Check if budget exhausted
+            if tracker.is_budget_exhausted():
+                log.warning("token_budget_exhausted", purpose=meta.purpose, model=meta.model)
+        except Exception as e:
+            log.warning("token_budget_record_failed", error=str(e))
+
+
+def _parsed_check(validate_parsed: Callable[[T], str | None] | None, parsed: T) -> Callable[[], str | None] | None:
+    if validate_parsed is None:
+        return None
+    return lambda: validate_parsed(parsed)
+
+
+def _call_text(
     *,
     purpose: str,
     messages: list[dict[str, str]],
@@ -622,196 +915,297 @@ def call_text(
 ) -> tuple[str, AiMeta]:
     if not settings.openai_api_key:
         raise AiNotConfigured("OPENAI_API_KEY not configured")
-    _circuit_check()
-    # Clamp token output to reduce accidental cost explosions.
-    max_tokens = int(min(int(max_tokens), int(settings.openai_max_output_tokens_cap or max_tokens)))
     client = _client(timeout_s=timeout_s)
-    messages = _normalize_messages(messages, max_prompt_chars)
-
-    last_err: Exception | None = None
-    for model in _models_to_try(purpose):
-        prev_err: Exception | None = None
-        prev_output: str | None = None
-        for attempt in range(1, max(1, int(retries) + 1) + 1):
-            attempt_messages = list(messages)
-            if attempt >= 2 and _is_parse_failure(prev_err) and prev_err is not None:
-                attempt_messages.append(
-                    _retry_feedback_message(kind="text", purpose=purpose, prev_err=prev_err, last_output=prev_output)
-                )
-            # Give retries more room when validation fails (bounded by cap).
-            mt = max_tokens
-            if attempt >= 2 and _is_parse_failure(prev_err):
-                mt = int(min(int(settings.openai_max_output_tokens_cap or mt), int(mt * 1.5)))
-            try:
-                # Prefer Responses API for GPT-5 family (supports reasoning/verbosity).
-                if _is_gpt5_family(model):
-                    t = tuning_for(purpose=purpose, kind="text", attempt=attempt, prev_err=prev_err)
-                    if _supports_responses_api(client):
-                        out, meta = _responses_create_text(
-                            client=client,
-                            model=model,
-                            purpose=purpose,
-                            messages=attempt_messages,
-                            max_tokens=mt,
-                            temperature=temperature,
-                            reasoning_effort=t.reasoning_effort,
-                            verbosity=t.verbosity,
-                        )
-                    else:
-                        out, meta = _responses_http_create_text(
-                            model=model,
-                            purpose=purpose,
-                            messages=attempt_messages,
-                            max_tokens=mt,
-                            temperature=temperature,
-                            reasoning_effort=t.reasoning_effort,
-                            verbosity=t.verbosity,
-                            timeout_s=timeout_s,
-                        )
-                    msg = _run_validator(validate, out)
-                    if msg:
-                        raise AiParseError(f"validation_failed: {msg}")
-                    
-                    # Record token usage to budget tracker if provided
-                    if token_budget_tracker and (meta.input_tokens is not None or meta.output_tokens is not None):
-                        try:
-                            token_budget_tracker.record_llm_call(
-                                input_tokens=meta.input_tokens,
-                                output_tokens=meta.output_tokens,
-                            )
-                            # Check if budget exhausted
-                            if token_budget_tracker.is_budget_exhausted():
-                                log.warning("token_budget_exhausted", purpose=purpose, model=model)
-                        except Exception as e:
-                            log.warning("token_budget_record_failed", error=str(e))
-                    
-                    # Preserve retry semantics: stamp attempt count.
-                    _circuit_record_success()
-                    try:
-                        log.info(
-                            "ai_call_ok",
-                            purpose=purpose,
-                            model=model,
-                            attempts=attempt,
-                            response_format=meta.used_response_format,
-                            response_id=meta.response_id,
-                            input_tokens=meta.input_tokens,
-                            output_tokens=meta.output_tokens,
-                            total_tokens=meta.total_tokens,
-                        )
-                    except Exception:
-                        pass
-                    return out, AiMeta(**(meta.__dict__ | {"attempts": attempt}))
-
+    loop = _AttemptLoop(
+        purpose=purpose,
+        kind="text",
+        messages=_normalize_messages(messages, max_prompt_chars),
+        max_tokens=_clamp_max_tokens(max_tokens),
+        attempts=int(retries) + 1,
+    )
+    for a in loop:
+        out: str | None = None
+        try:
+            # Prefer Responses API for GPT-5 family (supports reasoning/verbosity).
+            if _is_gpt5_family(a.model):
+                t = loop.tuning(a)
+                kw: dict[str, Any] = {
+                    "model": a.model,
+                    "purpose": purpose,
+                    "messages": a.messages,
+                    "max_tokens": a.max_tokens,
+                    "temperature": temperature,
+                    "reasoning_effort": t.reasoning_effort,
+                    "verbosity": t.verbosity,
+                }
+                if _supports_responses_api(client):
+                    out, meta = _send("responses", _responses_create_text, client=client, **kw)
+                else:
+                    out, meta = _send("responses", _responses_http_create_text, timeout_s=timeout_s, **kw)
+            else:
                 # Fallback: Chat Completions (older models / streaming UX parity).
-                try:
-                    completion = client.chat.completions.create(
-                        model=model,
-                        messages=attempt_messages,
-                        max_completion_tokens=mt,
-                        temperature=temperature,
-                    )
-                except Exception as e:
-                    if _should_retry_with_legacy_max_tokens(e):
-                        completion = client.chat.completions.create(
-                            model=model,
-                            messages=attempt_messages,
-                            max_tokens=mt,
-                            temperature=temperature,
-                        )
-                    else:
-                        raise
-
-                out = (completion.choices[0].message.content or "").strip()
+                completion = _chat_completion(
+                    client, {"model": a.model, "messages": a.messages, "temperature": temperature}, a.max_tokens
+                )
+                out = _chat_content(completion)
                 if not out:
                     raise AiParseError("empty_model_response")
+                meta = _chat_meta(completion, purpose=purpose, model=a.model, used_response_format="chat_text")
+            text = out
+            return text, loop.succeeded(
+                a, meta, tracker=token_budget_tracker, check=lambda: _run_validator(validate, text)
+            )
+        except Exception as e:
+            if loop.failed(a, e, event="ai_text_failed", output=out):
+                time.sleep(loop.backoff_s(a))
+    raise loop.exhausted()
 
-                # Extract token usage from Chat Completions API
-                usage_obj = getattr(completion, "usage", None)
-                input_tokens = None
-                output_tokens = None
-                total_tokens = None
-
-                if usage_obj:
-                    input_tokens = getattr(usage_obj, "prompt_tokens", None)
-                    output_tokens = getattr(usage_obj, "completion_tokens", None)
-                    total_tokens = getattr(usage_obj, "total_tokens", None)
-                    # Calculate total if not provided
-                    if total_tokens is None and input_tokens is not None and output_tokens is not None:
-                        total_tokens = input_tokens + output_tokens
-
-                # Record token usage to budget tracker if provided
-                if token_budget_tracker and (input_tokens is not None or output_tokens is not None):
-                    try:
-                        token_budget_tracker.record_llm_call(
-                            input_tokens=input_tokens,
-                            output_tokens=output_tokens,
-                        )
-                        # Check if budget exhausted
-                        if token_budget_tracker.is_budget_exhausted():
-                            log.warning("token_budget_exhausted", purpose=purpose, model=model)
-                    except Exception as e:
-                        log.warning("token_budget_record_failed", error=str(e))
-
-                msg = _run_validator(validate, out)
-                if msg:
-                    raise AiParseError(f"validation_failed: {msg}")
-                _circuit_record_success()
-                try:
-                    log.info(
-                        "ai_call_ok",
-                        purpose=purpose,
-                        model=model,
-                        attempts=attempt,
-                        response_format="chat_text",
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        total_tokens=total_tokens,
-                    )
-                except Exception:
-                    pass
-                return out, AiMeta(
+
+def _call_json(
+    *,
+    purpose: str,
+    response_model: type[T],
+    messages: list[dict[str, str]],
+    max_tokens: int = 1200,
+    temperature: float = 0.2,
+    retries: int = 3,
+    allow_json_extract: bool = True,
+    validate_parsed: Callable[[T], str | None] | None = None,
+    fallback: Callable[[], T] | None = None,
+    timeout_s: int = 60,
+    max_prompt_chars: int = 220_000,
+    token_budget_tracker: Any | None = None,  # TokenBudgetTracker
+) -> tuple[T, AiMeta]:
+    if not settings.openai_api_key:
+        raise AiNotConfigured("OPENAI_API_KEY not configured")
+    client = _client(timeout_s=timeout_s)
+    modes = _json_modes(response_model, temperature)
+    loop = _AttemptLoop(
+        purpose=purpose,
+        kind="json",
+        messages=_normalize_messages(messages, max_prompt_chars),
+        max_tokens=_clamp_max_tokens(max_tokens),
+        attempts=int(retries),
+    )
+    for a in loop:
+        # Prefer Responses API for GPT-5 family.
+        if _is_gpt5_family(a.model) and _supports_responses_api(client):
+            try:
+                t = loop.tuning(a)
+                parsed, meta = _send(
+                    "responses",
+                    _responses_create_json,
+                    client=client,
+                    model=a.model,
                     purpose=purpose,
-                    model=model,
-                    attempts=attempt,
-                    used_response_format="chat_text",
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                    total_tokens=total_tokens,
+                    messages=a.messages,
+                    max_tokens=a.max_tokens,
+                    temperature=temperature,
+                    reasoning_effort=t.reasoning_effort,
+                    verbosity=t.verbosity,
+                    response_model=response_model,
                 )
+                check = _parsed_check(validate_parsed, parsed)
+                return parsed, loop.succeeded(a, meta, tracker=token_budget_tracker, check=check)
             except Exception as e:
-                last_err = e
-                prev_err = e
-                prev_output = locals().get("out") if isinstance(locals().get("out"), str) else prev_output
-                _circuit_record_failure(e)
-                if _is_model_access_error(e, model=model):
-                    log.warning(
-                        "ai_model_unavailable",
-                        purpose=purpose,
-                        model=model,
-                        error=str(e),
-                    )
-                    # Try next fallback model immediately (no retries).
-                    break
-                log.warning(
-                    "ai_text_failed",
-                    purpose=purpose,
-                    model=model,
-                    attempt=attempt,
-                    error=str(e),
-                    status_code=_status_code(e),
-                )
-                time.sleep(
-                    min(2.5, 0.3 * (2 ** (attempt - 1)) + random.random() * 0.15)
+                # Structured outputs may be unsupported for the model: fall through to Chat Completions.
+                loop.fell_back(a, e)
+
+        for response_format, temp in modes:
+            used_rf = response_format.get("type") if isinstance(response_format, dict) else None
+            content = ""
+            try:
+                kwargs_base: dict[str, Any] = {"model": a.model, "messages": a.messages, "temperature": temp}
+                if response_format is not None:
+                    kwargs_base["response_format"] = response_format
+                completion = _chat_completion(client, kwargs_base, a.max_tokens)
+                content = _chat_content(completion)
+                parsed = _parse_json_output(content, response_model, extract=used_rf is None and allow_json_extract)
+                meta = _chat_meta(
+                    completion, purpose=purpose, model=a.model, used_response_format=f"chat_{used_rf or 'none'}"
                 )
+                check = _parsed_check(validate_parsed, parsed)
+                return parsed, loop.succeeded(a, meta, tracker=token_budget_tracker, check=check)
+            except Exception as e:
+                preview = content[:240]
+                if not loop.failed(a, e, event="ai_json_failed", response_format=used_rf, content_preview=preview):
+                    break
+                # Try the next mode without sleeping.
+        if not loop.next_model:
+            # Sleep before the next attempt round (same model).
+            time.sleep(loop.backoff_s(a))
 
-    # If it looks like a model access issue, surface a config-style error.
-    if last_err and _is_model_access_error(last_err, model=str(settings.openai_model_for(purpose) or "")):
-        raise AiNotConfigured(
-            f"Configured OpenAI model is not available for this project (purpose '{purpose}'). "
-            f"Check OPENAI_MODEL / OPENAI_MODEL_* overrides."
+    if fallback is not None:
+        return fallback(), _fallback_meta(purpose, retries)
+    raise loop.exhausted()
+
+
+def _response_key(
+    *,
+    kind: str,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    max_prompt_chars: int,
+    schema: dict[str, Any] | None = None,
+    extra: dict[str, Any] | None = None,
+) -> str:
+    """Response-cache / single-flight key for a deterministic call."""
+    from app.ai.response_cache import cache_key
+
+    t = tuning_for(purpose=purpose, kind=kind, attempt=1)  # type: ignore[arg-type]
+    params = {
+        "max_tokens": int(min(int(max_tokens), int(settings.openai_max_output_tokens_cap or max_tokens))),
+        "temperature": float(temperature),
+        "reasoning_effort": t.reasoning_effort,
+        "verbosity": t.verbosity,
+        **(extra or {}),
+    }
+    return cache_key(
+        kind=kind,
+        purpose=purpose,
+        models=_model_chain(purpose),
+        messages=_normalize_messages(messages, max_prompt_chars),
+        schema=schema,
+        params=params,
+    )
+
+
+def _response_cache_for(purpose: str) -> tuple[Any, float]:
+    """(cache, ttl) for `purpose`; cache is None when caching is off or the purpose has no TTL."""
+    from app.ai.response_cache import get_ai_cache, ttl_for
+
+    cache = get_ai_cache()
+    ttl = ttl_for(purpose)
+    return (cache, ttl) if cache is not None and ttl > 0 else (None, 0.0)
+
+
+def _coalesce(
+    key: str,
+    run: Callable[[], tuple[Any, AiMeta]],
+    *,
+    accept: Callable[[Any], bool],
+    peek: Callable[[], tuple[Any, AiMeta] | None] | None,
+) -> tuple[Any, AiMeta, bool]:
+    """Share one upstream call between concurrent identical callers (see single_flight.py)."""
+    from app.ai.single_flight import get_single_flight
+
+    flights = get_single_flight()
+    if flights is None:
+        out, meta = run()
+        return out, meta, False
+    (out, meta), shared = flights.do(
+        key,
+        run,
+        accept=lambda r: accept(r[0]),
+        peek=peek,
+        # A leader that failed its own validation says nothing about ours.
+        rerun_on=(AiParseError,),
+    )
+    return out, (AiMeta(**(meta.__dict__ | {"coalesced": True})) if shared else meta), shared
+
+
+def _cached_meta(purpose: str, entry: Any) -> AiMeta:
+    return AiMeta(
+        purpose=purpose,
+        model=entry.model,
+        attempts=0,
+        used_response_format="cache",
+        input_tokens=entry.input_tokens,
+        output_tokens=entry.output_tokens,
+        total_tokens=(entry.input_tokens or 0) + (entry.output_tokens or 0)
+        if entry.input_tokens is not None or entry.output_tokens is not None
+        else None,
+        cached=True,
+    )
+
+
+def call_text(
+    *,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int = 1200,
+    temperature: float = 0.4,
+    validate: Validator | list[Validator] | None = None,
+    retries: int = 2,
+    timeout_s: int = 60,
+    max_prompt_chars: int = 220_000,
+    token_budget_tracker: Any | None = None,  # TokenBudgetTracker
+    cache: bool = False,
+) -> tuple[str, AiMeta]:
+    """Call OpenAI for free text.
+
+    With `cache=True` (deterministic prompts only), an identical earlier call
+    for a purpose listed in AI_CACHE_TTLS is answered from the response cache,
+    and identical concurrent calls share one upstream request; `validate`
+    still runs on a cached or shared text.
+    """
+
+    def _run() -> tuple[str, AiMeta]:
+        return _call_text(
+            purpose=purpose,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            validate=validate,
+            retries=retries,
+            timeout_s=timeout_s,
+            max_prompt_chars=max_prompt_chars,
+            token_budget_tracker=token_budget_tracker,
         )
-    raise AiUpstreamError(str(last_err) if last_err else "ai_text_failed")
+
+    if not settings.openai_api_key:
+        raise AiNotConfigured("OPENAI_API_KEY not configured")
+    if not cache:
+        return _run()
+
+    key = _response_key(
+        kind="text",
+        purpose=purpose,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        max_prompt_chars=max_prompt_chars,
+    )
+    rc, ttl = _response_cache_for(purpose)
+
+    def _accept(v: Any) -> bool:
+        return isinstance(v, str) and _run_validator(validate, v) is None
+
+    if rc is not None:
+        entry = rc.get(key, purpose, accept=_accept)
+        if entry is not None:
+            return entry.value, _cached_meta(purpose, entry)
+
+    def _run_and_store() -> tuple[str, AiMeta]:
+        out, meta = _run()
+        if rc is not None:
+            rc.put(
+                key,
+                purpose,
+                value=out,
+                model=meta.model,
+                response_format=meta.used_response_format,
+                input_tokens=meta.input_tokens,
+                output_tokens=meta.output_tokens,
+                ttl_s=ttl,
+            )
+        return out, meta
+
+    def _peek() -> tuple[str, AiMeta] | None:
+        entry = rc.peek(key)
+        if entry is None or not _accept(entry.value):
+            return None
+        return entry.value, _cached_meta(purpose, entry)
+
+    out, meta, _shared = _coalesce(
+        key,
+        _run_and_store,
+        accept=_accept,
+        peek=_peek if rc is not None and rc.shared else None,
+    )
+    return out, meta
 
 
 def call_json(
@@ -828,6 +1222,7 @@ def call_json(
     timeout_s: int = 60,
     max_prompt_chars: int = 220_000,
     token_budget_tracker: Any | None = None,  # TokenBudgetTracker
+    cache: bool = False,
 ) -> tuple[T, AiMeta]:
     """Call OpenAI and parse into a Pydantic model.
 
@@ -837,224 +1232,101 @@ def call_json(
     - Then best-effort extraction of first {...} block
 
     If fallback is provided, returns it on failure instead of raising.
+
+    With `cache=True` (deterministic prompts only), an identical earlier call
+    for a purpose listed in AI_CACHE_TTLS is answered from the response cache,
+    and identical concurrent calls share one upstream request. Cached or shared
+    values are re-checked with `validate_parsed`; fallback results are never
+    cached or shared.
     """
 
+    def _run() -> tuple[T, AiMeta]:
+        return _call_json(
+            purpose=purpose,
+            response_model=response_model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            retries=retries,
+            allow_json_extract=allow_json_extract,
+            validate_parsed=validate_parsed,
+            fallback=fallback,
+            timeout_s=timeout_s,
+            max_prompt_chars=max_prompt_chars,
+            token_budget_tracker=token_budget_tracker,
+        )
+
     if not settings.openai_api_key:
         raise AiNotConfigured("OPENAI_API_KEY not configured")
-    _circuit_check()
-    max_tokens = int(min(int(max_tokens), int(settings.openai_max_output_tokens_cap or max_tokens)))
-    client = _client(timeout_s=timeout_s)
-    messages = _normalize_messages(messages, max_prompt_chars)
+    if not cache:
+        return _run()
 
-    schema = response_model.model_json_schema()
-    schema = _normalize_openai_strict_json_schema(schema)
-    # OpenAI structured output format wrapper.
-    rf_json_schema: dict[str, Any] = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": response_model.__name__,
-            "schema": schema,
-            "strict": True,
-        },
-    }
-    rf_json_object: dict[str, Any] = {"type": "json_object"}
-
-    last_err: Exception | None = None
-    last_preview: str | None = None
-
-    # (response_format, temperature)
-    modes: list[tuple[dict[str, Any] | None, float]] = [
-        (rf_json_schema, 0.0),
-        (rf_json_object, 0.0),
-        (None, temperature),
-    ]
-
-    for model in _models_to_try(purpose):
-        prev_err: Exception | None = None
-        prev_output: str | None = None
-        for attempt in range(1, max(1, int(retries)) + 1):
-            attempt_messages = list(messages)
-            if attempt >= 2 and _is_parse_failure(prev_err) and prev_err is not None:
-                attempt_messages.append(
-                    _retry_feedback_message(kind="json", purpose=purpose, prev_err=prev_err, last_output=None)
-                )
-            # Prefer Responses API for GPT-5 family.
-            if _is_gpt5_family(model) and _supports_responses_api(client):
-                try:
-                    t = tuning_for(purpose=purpose, kind="json", attempt=attempt, prev_err=prev_err)
-                    # If we failed to parse/validate previously, allow a bit more room.
-                    mt = max_tokens
-                    if isinstance(prev_err, AiParseError) and attempt >= 2:
-                        mt = int(min(int(settings.openai_max_output_tokens_cap or mt), int(mt * 1.5)))
-                    parsed, meta = _responses_create_json(
-                        client=client,
-                        model=model,
-                        purpose=purpose,
-                        messages=attempt_messages,
-                        max_tokens=mt,
-                        temperature=temperature,
-                        reasoning_effort=t.reasoning_effort,
-                        verbosity=t.verbosity,
-                        response_model=response_model,
-                    )
-                    if validate_parsed is not None:
-                        msg = validate_parsed(parsed)
-                        if msg:
-                            raise AiParseError(f"validation_failed: {msg}")
-                    _circuit_record_success()
-                    try:
-                        log.info(
-                            "ai_call_ok",
-                            purpose=purpose,
-                            model=model,
-                            attempts=attempt,
-                            response_format=meta.used_response_format,
-                            response_id=meta.response_id,
-                        )
-                    except Exception:
-                        pass
-                    return parsed, AiMeta(**(meta.__dict__ | {"attempts": attempt}))
-                except Exception as e:
-                    # If Responses structured outputs aren't supported for the chosen model,
-                    # fall through to the Chat Completions path (which we know works for many models).
-                    last_err = e
-                    prev_err = e
-                    last_preview = None
-                    prev_output = None
-                    log.warning(
-                        "ai_json_responses_failed",
-                        purpose=purpose,
-                        model=model,
-                        attempt=attempt,
-                        error=str(e),
-                        status_code=_status_code(e),
-                    )
-                    # Continue with chat.completions modes below for this attempt.
-
-            model_hard_failed = False
-            for response_format, temp in modes:
-                used_rf = (
-                    response_format.get("type")
-                    if isinstance(response_format, dict)
-                    else None
-                )
-                try:
-                    mt = max_tokens
-                    if isinstance(prev_err, AiParseError) and attempt >= 2:
-                        mt = int(min(int(settings.openai_max_output_tokens_cap or mt), int(mt * 1.5)))
-                    kwargs_base: dict[str, Any] = {
-                        "model": model,
-                        "messages": attempt_messages,
-                        "temperature": temp,
-                    }
-                    if response_format is not None:
-                        kwargs_base["response_format"] = response_format
-
-                    try:
-                        completion = client.chat.completions.create(
-                            **(kwargs_base | {"max_completion_tokens": mt})
-                        )
-                    except Exception as e:
-                        if _should_retry_with_legacy_max_tokens(e):
-                            completion = client.chat.completions.create(
-                                **(kwargs_base | {"max_tokens": mt})
-                            )
-                        else:
-                            raise
-
-                    content = (completion.choices[0].message.content or "").strip()
-                    if not content:
-                        raise AiParseError("empty_model_response")
-
-                    raw_json = content
-                    if used_rf is None and allow_json_extract:
-                        extracted = _extract_first_json_object(content)
-                        if extracted:
-                            raw_json = extracted
-
-                    try:
-                        data = json.loads(raw_json)
-                    except Exception as e:
-                        raise AiParseError(f"json_decode_error: {e}")
-
-                    try:
-                        parsed = response_model.model_validate(data)
-                    except Exception as e:
-                        raise AiParseError(f"schema_validation_error: {e}")
-
-                    if validate_parsed is not None:
-                        msg = validate_parsed(parsed)
-                        if msg:
-                            raise AiParseError(f"validation_failed: {msg}")
-
-                    _circuit_record_success()
-                    try:
-                        log.info(
-                            "ai_call_ok",
-                            purpose=purpose,
-                            model=model,
-                            attempts=attempt,
-                            response_format=f"chat_{used_rf or 'none'}",
-                        )
-                    except Exception:
-                        pass
-                    return parsed, AiMeta(
-                        purpose=purpose,
-                        model=model,
-                        attempts=attempt,
-                        used_response_format=f"chat_{used_rf or 'none'}",
-                    )
-                except Exception as e:
-                    last_err = e
-                    prev_err = e
-                    _circuit_record_failure(e)
-                    last_preview = (locals().get("content") or "")[:240]
-                    prev_output = str(locals().get("content") or "") if isinstance(locals().get("content"), str) else prev_output
-                    if _is_model_access_error(e, model=model):
-                        log.warning(
-                            "ai_model_unavailable",
-                            purpose=purpose,
-                            model=model,
-                            error=str(e),
-                        )
-                        model_hard_failed = True
-                        break
-                    log.warning(
-                        "ai_json_failed",
-                        purpose=purpose,
-                        model=model,
-                        attempt=attempt,
-                        response_format=used_rf,
-                        error=str(e),
-                        content_preview=last_preview,
-                        status_code=_status_code(e),
-                    )
-                    # try next mode without sleeping
-                    continue
+    key = _response_key(
+        kind="json",
+        purpose=purpose,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        max_prompt_chars=max_prompt_chars,
+        schema=_normalize_openai_strict_json_schema(response_model.model_json_schema()),
+        extra={"model_name": response_model.__name__, "allow_json_extract": bool(allow_json_extract)},
+    )
+    rc, ttl = _response_cache_for(purpose)
 
-            if model_hard_failed:
-                # Try next fallback model immediately.
-                break
+    def _accept_parsed(p: Any) -> bool:
+        return isinstance(p, response_model) and not (validate_parsed(p) if validate_parsed else None)
 
-            # Sleep before next attempt round (same model)
-            time.sleep(min(3.0, 0.4 * (2 ** (attempt - 1)) + random.random() * 0.2))
+    def _accept(v: Any) -> bool:
+        try:
+            return _accept_parsed(response_model.model_validate(v))
+        except Exception:
+            return False
+
+    if rc is not None:
+        entry = rc.get(key, purpose, accept=_accept)
+        if entry is not None:
+            return response_model.model_validate(entry.value), _cached_meta(purpose, entry)
+
+    def _run_and_store() -> tuple[T, AiMeta]:
+        parsed, meta = _run()
+        if meta.used_response_format is None:
+            # Fallback: this caller's own default, not a model answer to share.
+            raise _FallbackUsed(parsed, meta)
+        if rc is not None:
+            rc.put(
+                key,
+                purpose,
+                value=parsed.model_dump(mode="json"),
+                model=meta.model,
+                response_format=meta.used_response_format,
+                input_tokens=meta.input_tokens,
+                output_tokens=meta.output_tokens,
+                ttl_s=ttl,
+            )
+        return parsed, meta
 
-    if fallback is not None:
-        # Use the primary model for meta; even if it failed, this is just telemetry.
-        primary = str(settings.openai_model_for(purpose) or "").strip() or "unknown"
-        return fallback(), AiMeta(
-            purpose=purpose,
-            model=primary,
-            attempts=max(1, int(retries)),
-            used_response_format=None,
-        )
+    def _peek() -> tuple[T, AiMeta] | None:
+        entry = rc.peek(key)
+        if entry is None or not _accept(entry.value):
+            return None
+        return response_model.model_validate(entry.value), _cached_meta(purpose, entry)
 
-    if last_err and _is_model_access_error(last_err, model=str(settings.openai_model_for(purpose) or "")):
-        raise AiNotConfigured(
-            f"Configured OpenAI model is not available for this project (purpose '{purpose}'). "
-            f"Check OPENAI_MODEL / OPENAI_MODEL_* overrides."
+    try:
+        parsed, meta, shared = _coalesce(
+            key,
+            _run_and_store,
+            accept=_accept_parsed,
+            peek=_peek if rc is not None and rc.shared else None,
         )
-    raise AiUpstreamError(str(last_err) if last_err else "ai_json_failed")
+    except _FallbackUsed as fb:
+        if fb.parsed is not None and fb.leader_thread == threading.get_ident():
+            return fb.parsed, fb.meta
+        # The shared call failed: fall back like a failed call of our own.
+        if fallback is not None:
+            return fallback(), fb.meta
+        raise AiUpstreamError("ai_json_failed") from fb
+    # Callers may mutate the model they get back.
+    return (parsed.model_copy(deep=True) if shared else parsed), meta
 
 
 def stream_text(
@@ -1078,18 +1350,26 @@ def stream_text(
     """
     if not settings.openai_api_key:
         raise AiNotConfigured("OPENAI_API_KEY not configured")
-    _circuit_check()
     max_tokens = int(min(int(max_tokens), int(settings.openai_max_output_tokens_cap or max_tokens)))
     client = _client(timeout_s=timeout_s)
     messages = _normalize_messages(messages, max_prompt_chars)
 
+    from app.ai.circuit_breaker import get_circuit_breakers
+
     last_err: Exception | None = None
     for model in _models_to_try(purpose):
+        # Streams skip the concurrency limit (they hold a connection for the whole answer)
+        # but still pass the model's circuit breaker.
+        breaker = get_circuit_breakers().get(model, "chat")
+        if not breaker.allow():
+            last_err = AiCircuitOpen("ai_temporarily_unavailable")
+            continue
+        model_messages, fit = _fit_prompt(messages, model=model, max_tokens=max_tokens)
         try:
             try:
                 stream = client.chat.completions.create(
                     model=model,
-                    messages=messages,
+                    messages=model_messages,
                     max_completion_tokens=max_tokens,
                     temperature=temperature,
                     stream=True,
@@ -1098,23 +1378,24 @@ def stream_text(
                 if _should_retry_with_legacy_max_tokens(e):
                     stream = client.chat.completions.create(
                         model=model,
-                        messages=messages,
+                        messages=model_messages,
                         max_tokens=max_tokens,
                         temperature=temperature,
                         stream=True,
                     )
                 else:
                     raise
-            _circuit_record_success()
+            breaker.record_success()
             return stream, AiMeta(
                 purpose=purpose,
                 model=model,
                 attempts=1,
                 used_response_format="stream",
+                **_fit_fields(fit),
             )
         except Exception as e:
             last_err = e
-            _circuit_record_failure(e)
+            breaker.record_failure(e)
             if _is_model_access_error(e, model=model):
                 log.warning(
                     "ai_model_unavailable",
@@ -1125,6 +1406,8 @@ def stream_text(
                 continue
             raise AiUpstreamError(str(e) or "ai_stream_failed")
 
+    if isinstance(last_err, AiCircuitOpen):
+        raise last_err
     raise AiNotConfigured(
         f"Configured OpenAI model is not available for this project (purpose '{purpose}'). "
         f"Check OPENAI_MODEL / OPENAI_MODEL_* overrides."
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+"""
+Process-wide adaptive concurrency limit for upstream model requests.
+
+Every OpenAI request (sync or async path, any model) holds a slot while it is
+in flight and reports how it ended:
+
+- The limit starts at `max_limit`, so the limiter is transparent until the
+  upstream pushes back.
+- A 429 or timeout cuts the limit multiplicatively. Failures reported within
+  `cooldown_s` of a cut belong to the same burst and don't cut again.
+- Each second of successful traffic adds `increase_per_s` until the limit is
+  back at `max_limit`.
+
+Callers beyond the limit queue (FIFO by wakeup) for at most `queue_timeout_s`
+and then fail with `AiQueueTimeout`, which routes map to 503 like an open
+circuit. Unlike retries and the circuit breaker this acts before requests are
+sent, so bursts from bulk imports or multi-section generation stay under the
+rate limit instead of overshooting and retrying in lockstep.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from app.observability.logging import get_logger
+
+log = get_logger("ai_concurrency")
+
+OK = "ok"
+THROTTLED = "throttled"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+
+def classify_outcome(exc: BaseException | None) -> str:
+    """Map an upstream exception to a limiter signal (parse/validation failures are successes)."""
+    if exc is None:
+        return OK
+    name = exc.__class__.__name__
+    if name in ("AiParseError", "AiQueueTimeout"):
+        return OK
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    msg = str(exc).lower()
+    if status == 429 or "rate limit" in msg or "rate_limit" in msg or "429" in msg.split(":", 1)[0]:
+        return THROTTLED
+    if "timeout" in name.lower() or "timed out" in msg:
+        return TIMEOUT
+    return ERROR
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase_per_s: float = 1.0,
+        decrease_factor: float = 0.5,
+        cooldown_s: float = 2.0,
+        queue_timeout_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.increase_per_s = max(0.0, float(increase_per_s))
+        self.decrease_factor = min(0.95, max(0.05, float(decrease_factor)))
+        self.cooldown_s = max(0.0, float(cooldown_s))
+        self.queue_timeout_s = max(0.0, float(queue_timeout_s))
+        self._clock = clock
+        self._cond = threading.Condition()
+
+        self.limit = float(self.max_limit)
+        self.inflight = 0
+        self.waiting = 0
+        self._last_decrease = float("-inf")
+        self._last_increase = clock()
+
+        self.requests = 0
+        self.successes = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.decreases = 0
+        self.queue_timeouts = 0
+        self.delayed = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+        self.peak_inflight = 0
+
+    # --- internals (lock held) ---
+
+    def _permitted(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def _take(self) -> None:
+        self.inflight += 1
+        self.requests += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+
+    def _record_wait(self, waited: float) -> None:
+        self.delayed += 1
+        self.wait_total_s += waited
+        self.wait_max_s = max(self.wait_max_s, waited)
+
+    # --- public API ---
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.inflight < self._permitted():
+                self._take()
+                return True
+            return False
+
+    def acquire(self, timeout_s: float | None = None) -> float:
+        """Block until a slot is free; returns the time waited. Raises AiQueueTimeout."""
+        from app.ai.client import AiQueueTimeout
+
+        budget = self.queue_timeout_s if timeout_s is None else max(0.0, float(timeout_s))
+        with self._cond:
+            if self.inflight < self._permitted():
+                self._take()
+                return 0.0
+            t0 = time.monotonic()
+            deadline = t0 + budget
+            self.waiting += 1
+            try:
+                while self.inflight >= self._permitted():
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        self.queue_timeouts += 1
+                        raise AiQueueTimeout("ai_temporarily_unavailable")
+                    self._cond.wait(left)
+            finally:
+                self.waiting -= 1
+            waited = time.monotonic() - t0
+            self._take()
+            self._record_wait(waited)
+            return waited
+
+    def release(self, outcome: str = OK) -> None:
+        cut_to: float | None = None
+        with self._cond:
+            self.inflight = max(0, self.inflight - 1)
+            if outcome == OK:
+                self.successes += 1
+                now = self._clock()
+                dt = min(1.0, max(0.0, now - self._last_increase))
+                self._last_increase = now
+                if self.limit < self.max_limit:
+                    self.limit = min(float(self.max_limit), self.limit + self.increase_per_s * dt)
+            elif outcome in (THROTTLED, TIMEOUT):
+                if outcome == THROTTLED:
+                    self.throttles += 1
+                else:
+                    self.timeouts += 1
+                now = self._clock()
+                if now - self._last_decrease >= self.cooldown_s:
+                    # Cut from what was actually in flight when the upstream pushed back.
+                    base = min(self.limit, float(self.inflight + 1))
+                    self.limit = max(float(self.min_limit), base * self.decrease_factor)
+                    self._last_decrease = now
+                    self._last_increase = now
+                    self.decreases += 1
+                    cut_to = self.limit
+            else:
+                self.errors += 1
+            self._cond.notify_all()
+        if cut_to is not None:
+            log.warning("ai_concurrency_decreased", limit=round(cut_to, 2), outcome=outcome)
+
+    @contextmanager
+    def slot(self, timeout_s: float | None = None) -> Iterator[None]:
+        self.acquire(timeout_s)
+        try:
+            yield
+        except BaseException as e:
+            self.release(classify_outcome(e))
+            raise
+        self.release(OK)
+
+    @asynccontextmanager
+    async def aslot(self, timeout_s: float | None = None) -> AsyncIterator[None]:
+        """Async variant: polls for a slot so waiting doesn't hold a thread."""
+        from app.ai.client import AiQueueTimeout
+
+        if not self.try_acquire():
+            budget = self.queue_timeout_s if timeout_s is None else max(0.0, float(timeout_s))
+            t0 = time.monotonic()
+            delay = 0.005
+            with self._cond:
+                self.waiting += 1
+            try:
+                while not self.try_acquire():
+                    if time.monotonic() - t0 >= budget:
+                        with self._cond:
+                            self.queue_timeouts += 1
+                        raise AiQueueTimeout("ai_temporarily_unavailable")
+                    await asyncio.sleep(delay)
+                    delay = min(0.1, delay * 2)
+            finally:
+                with self._cond:
+                    self.waiting -= 1
+            with self._cond:
+                self._record_wait(time.monotonic() - t0)
+        try:
+            yield
+        except BaseException as e:
+            self.release(classify_outcome(e))
+            raise
+        self.release(OK)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "enabled": True,
+                "limit": self._permitted(),
+                "limitRaw": round(self.limit, 2),
+                "maxLimit": self.max_limit,
+                "inflight": self.inflight,
+                "peakInflight": self.peak_inflight,
+                "waiting": self.waiting,
+                "requests": self.requests,
+                "successes": self.successes,
+                "throttles": self.throttles,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "decreases": self.decreases,
+                "queueTimeouts": self.queue_timeouts,
+                "delayed": self.delayed,
+                "avgQueueWaitMs": round(1000 * self.wait_total_s / self.delayed, 2) if self.delayed else 0.0,
+                "maxQueueWaitMs": round(1000 * self.wait_max_s, 2),
+            }
+
+
+_LOCK = threading.Lock()
+_LIMITER: AdaptiveConcurrencyLimiter | None = None
+_LIMITER_SET = False
+
+
+def get_ai_limiter() -> AdaptiveConcurrencyLimiter | None:
+    """Process singleton from settings; None when `AI_ADAPTIVE_CONCURRENCY` is off."""
+    global _LIMITER, _LIMITER_SET
+    if _LIMITER_SET:
+        return _LIMITER
+    with _LOCK:
+        if not _LIMITER_SET:
+            from app.settings import settings
+
+            _LIMITER = (
+                AdaptiveConcurrencyLimiter(
+                    min_limit=settings.ai_concurrency_min,
+                    max_limit=settings.ai_concurrency_max,
+                    increase_per_s=settings.ai_concurrency_increase_per_s,
+                    queue_timeout_s=settings.ai_queue_timeout_s,
+                )
+                if settings.ai_adaptive_concurrency
+                else None
+            )
+            _LIMITER_SET = True
+    return _LIMITER
+
+
+def set_ai_limiter(limiter: AdaptiveConcurrencyLimiter | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _LIMITER, _LIMITER_SET
+    with _LOCK:
+        _LIMITER = limiter
+        _LIMITER_SET = limiter is not None
+
+
+def ai_limiter_stats() -> dict[str, Any]:
+    lim = get_ai_limiter()
+    return lim.stats() if lim is not None else {"enabled": False}
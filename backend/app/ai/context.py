@@ -10,6 +10,41 @@ def clip_text(text: str, *, max_chars: int) -> str:
     return s if len(s) <= max_chars else s[:max_chars]
 
 
+def _prompt_budget(
+    *, purpose: str, max_output_tokens: int, reserve_tokens: int, max_tokens: int | None
+) -> tuple[str, int]:
+    from app.ai.tokens import input_budget
+    from app.settings import settings
+
+    model = settings.openai_model_for(purpose)
+    budget = input_budget(model, max_output_tokens=max_output_tokens) - max(0, int(reserve_tokens))
+    if max_tokens is not None:
+        budget = min(budget, int(max_tokens))
+    return model, max(0, budget)
+
+
+def clip_text_to_tokens(
+    text: str,
+    *,
+    purpose: str,
+    max_output_tokens: int,
+    reserve_tokens: int = 0,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Clip `text` to the prompt budget of the purpose's model (see `app/ai/tokens.py`):
+    its context window minus `max_output_tokens`, `reserve_tokens` for the rest of the
+    prompt, and `max_tokens` if given. The client refits per model, e.g. for a
+    smaller fallback model.
+    """
+    from app.ai.tokens import truncate_to_tokens
+
+    model, budget = _prompt_budget(
+        purpose=purpose, max_output_tokens=max_output_tokens, reserve_tokens=reserve_tokens, max_tokens=max_tokens
+    )
+    return truncate_to_tokens(str(text or ""), budget, model=model)
+
+
 def normalize_ws(text: str, *, max_chars: int) -> str:
     s = re.sub(r"\s+", " ", str(text or "")).strip()
     return clip_text(s, max_chars=max_chars)
@@ -24,7 +59,7 @@ def split_paragraphs(text: str, *, max_paragraphs: int = 4000) -> list[str]:
     return parts
 
 
-def top_k_paragraphs_by_keyword(
+def top_k_paragraphs(
     *,
     text: str,
     query: str,
@@ -32,39 +67,65 @@ def top_k_paragraphs_by_keyword(
     max_chars_each: int = 1200,
 ) -> list[str]:
     """
-    Very lightweight relevance selector:
-    - score paragraphs by how many query tokens they contain (case-insensitive substring)
-    - return top K paragraphs, preserving original order (to keep context coherent)
-
-    This is not semantic search; it’s a fast deterministic heuristic that reduces prompt size.
+    The `k` paragraphs of `text` that best match `query` (BM25 over the text's
+    paragraph index, see `app/infrastructure/search/rfp_paragraphs.py`), in
+    document order to keep the context coherent.
     """
-    q = normalize_ws(query, max_chars=4000).lower()
-    toks = [t for t in re.split(r"[^a-z0-9]+", q) if len(t) >= 3]
-    if not toks:
-        return []
+    from app.infrastructure.search.rfp_paragraphs import get_paragraph_index
 
-    paras = split_paragraphs(text)
-    scored: list[tuple[int, int]] = []
-    for idx, p in enumerate(paras):
-        low = p.lower()
-        score = 0
-        for t in toks[:16]:
-            if t in low:
-                score += 1
-        if score:
-            scored.append((score, idx))
-
-    if not scored:
+    src = str(text or "").strip()
+    if not src or not str(query or "").strip():
         return []
-
-    scored.sort(key=lambda x: (-x[0], x[1]))
-    top = sorted([idx for _s, idx in scored[: max(1, int(k))]])
+    index = get_paragraph_index(src)
     out: list[str] = []
-    for idx in top:
-        out.append(clip_text(paras[idx], max_chars=max_chars_each))
+    for pid in sorted(pid for pid, _score in index.top_k(query, k=max(1, int(k)))):
+        s, e = index.span(pid)
+        out.append(clip_text(src[s:e], max_chars=max_chars_each))
     return out
 
 
+def select_rfp_text(
+    raw_text: str,
+    *,
+    query: str | None,
+    purpose: str,
+    max_output_tokens: int,
+    reserve_tokens: int = 0,
+    max_tokens: int | None = None,
+    max_paragraphs: int = 48,
+) -> str:
+    """
+    RFP text for a prompt about `query`, within the same token budget as `clip_text_to_tokens`.
+
+    Text that fits is sent whole. Otherwise the best-matching paragraphs are packed
+    greedily by score until the budget is full, then emitted in document order.
+    The paragraph index is only loaded in that case. Without a query or a match,
+    this falls back to a head clip.
+    """
+    from app.ai.tokens import count_tokens, truncate_to_tokens
+    from app.infrastructure.search.rfp_paragraphs import get_paragraph_index
+
+    text = str(raw_text or "").strip()
+    model, budget = _prompt_budget(
+        purpose=purpose, max_output_tokens=max_output_tokens, reserve_tokens=reserve_tokens, max_tokens=max_tokens
+    )
+    if not text or count_tokens(text, model=model) <= budget:
+        return text
+    if query and query.strip():
+        index = get_paragraph_index(text)
+        picked: list[int] = []
+        used = 0
+        for pid, _score in index.top_k(query, k=max_paragraphs):
+            s, e = index.span(pid)
+            cost = count_tokens(text[s:e], model=model) + 1  # + blank-line separator
+            if used + cost <= budget:
+                picked.append(pid)
+                used += cost
+        if picked:
+            return "\n\n".join(text[s:e] for s, e in (index.span(pid) for pid in sorted(picked)))
+    return truncate_to_tokens(text, budget, model=model)
+
+
 def build_rfp_prompt_context(
     *,
     raw_text: str,
@@ -80,7 +141,7 @@ def build_rfp_prompt_context(
         return ""
 
     if query:
-        picked = top_k_paragraphs_by_keyword(text=text, query=query, k=12, max_chars_each=1200)
+        picked = top_k_paragraphs(text=text, query=query, k=12, max_chars_each=1200)
         if picked:
             body = "\n\n".join(picked)
             return clip_text(
@@ -93,4 +154,3 @@ def build_rfp_prompt_context(
         f"SOURCE_NAME: {str(source_name or '').strip()}\n\nRFP_TEXT:\n{clip_text(text, max_chars=max_chars)}",
         max_chars=max_chars,
     )
-
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+"""
+Hedged requests for interactive AI purposes (async client only).
+
+An eligible call waits for its primary request for the purpose's recent p95
+latency. If the primary hasn't answered by then, a second request is sent to
+the next model in the fallback chain. The first successful answer wins and the
+other request is cancelled. A rare very slow upstream response then costs the
+user about p95 instead of the full timeout and its retries.
+
+Hedges are budgeted. Each eligible call earns `max_fraction` of a hedge and
+each hedge spends one, so hedges never exceed that fraction of calls, even
+during an incident when every call is slow. Nothing is hedged until a purpose
+has `min_samples` latencies to take a p95 from.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.observability.logging import get_logger
+
+log = get_logger("ai_hedging")
+
+T = TypeVar("T")
+
+
+def _p95(samples: list[float]) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(0.95 * len(s)))]
+
+
+class Hedger:
+    def __init__(
+        self,
+        *,
+        purposes: set[str] | frozenset[str],
+        max_fraction: float = 0.1,
+        min_delay_s: float = 1.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.purposes = frozenset(p.strip().lower() for p in purposes if p and p.strip())
+        self.max_fraction = min(1.0, max(0.0, float(max_fraction)))
+        self.min_delay_s = max(0.0, float(min_delay_s))
+        self.min_samples = max(1, int(min_samples))
+        self._window = max(self.min_samples, int(window))
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._credit = 0.0
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _st(self, purpose: str) -> dict[str, int]:
+        st = self._stats.get(purpose)
+        if st is None:
+            st = {"calls": 0, "hedged": 0, "hedgeWins": 0, "skippedBudget": 0}
+            self._stats[purpose] = st
+        return st
+
+    def enabled_for(self, purpose: str) -> bool:
+        return (purpose or "").strip().lower() in self.purposes and self.max_fraction > 0
+
+    def record_latency(self, purpose: str, seconds: float) -> None:
+        with self._lock:
+            q = self._latencies.get(purpose)
+            if q is None:
+                q = deque(maxlen=self._window)
+                self._latencies[purpose] = q
+            q.append(float(seconds))
+
+    def delay_for(self, purpose: str) -> float | None:
+        """Hedge delay (recent p95, at least `min_delay_s`); None until there are enough samples."""
+        with self._lock:
+            q = self._latencies.get(purpose)
+            if q is None or len(q) < self.min_samples:
+                return None
+            return max(self.min_delay_s, _p95(list(q)))
+
+    def admit(self, purpose: str) -> None:
+        """Count an eligible call; it earns `max_fraction` of a hedge (capped at a small burst)."""
+        with self._lock:
+            self._st(purpose)["calls"] += 1
+            self._credit = min(max(1.0, 10 * self.max_fraction), self._credit + self.max_fraction)
+
+    def try_spend(self, purpose: str) -> bool:
+        with self._lock:
+            st = self._st(purpose)
+            if self._credit < 1.0:
+                st["skippedBudget"] += 1
+                return False
+            self._credit -= 1.0
+            st["hedged"] += 1
+            return True
+
+    def record_hedge_win(self, purpose: str) -> None:
+        with self._lock:
+            self._st(purpose)["hedgeWins"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            per: dict[str, Any] = {}
+            for purpose in sorted(set(self._stats) | set(self._latencies)):
+                q = self._latencies.get(purpose)
+                p95 = _p95(list(q)) if q else None
+                per[purpose] = dict(self._stats.get(purpose) or {}) | {
+                    "samples": len(q) if q else 0,
+                    "p95Ms": round(1000 * p95, 1) if p95 is not None else None,
+                }
+            return {
+                "enabled": bool(self.purposes) and self.max_fraction > 0,
+                "purposes": sorted(self.purposes),
+                "maxFraction": self.max_fraction,
+                "credit": round(self._credit, 2),
+                "byPurpose": per,
+            }
+
+
+async def run_hedged(
+    primary: Callable[[], Awaitable[T]],
+    hedge: Callable[[], Awaitable[T]],
+    *,
+    delay_s: float,
+    allow_hedge: Callable[[], bool],
+) -> tuple[T, bool]:
+    """
+    Await `primary`; if it is still running after `delay_s` and `allow_hedge()`, start
+    `hedge` too. Returns (first successful result, won_by_hedge) and cancels the other.
+    If both fail, the primary's error is raised.
+    """
+    p: asyncio.Future[T] = asyncio.ensure_future(primary())
+    try:
+        done: set[asyncio.Future[T]]
+        done, _ = await asyncio.wait({p}, timeout=delay_s)
+        if done or not allow_hedge():
+            return await p, False
+        h: asyncio.Future[T] = asyncio.ensure_future(hedge())
+        pending: set[asyncio.Future[T]] = {p, h}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    if not fut.cancelled() and fut.exception() is None:
+                        return fut.result(), fut is h
+            # Both failed: surface the primary's error.
+            return p.result(), False
+        finally:
+            if not h.done():
+                h.cancel()
+    finally:
+        if not p.done():
+            p.cancel()
+
+
+_LOCK = threading.Lock()
+_HEDGER: Hedger | None = None
+
+
+def get_hedger() -> Hedger:
+    """Process singleton configured from settings."""
+    global _HEDGER
+    if _HEDGER is not None:
+        return _HEDGER
+    with _LOCK:
+        if _HEDGER is None:
+            from app.settings import settings
+
+            _HEDGER = Hedger(
+                purposes={p for p in str(settings.ai_hedge_purposes or "").split(",")},
+                max_fraction=settings.ai_hedge_max_fraction,
+                min_delay_s=settings.ai_hedge_min_delay_s,
+            )
+    return _HEDGER
+
+
+def set_hedger(hedger: Hedger | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _HEDGER
+    with _LOCK:
+        _HEDGER = hedger
+
+
+def hedge_stats() -> dict[str, Any]:
+    return get_hedger().stats()
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+"""
+Content-addressed cache for deterministic AI calls (`call_text` / `call_json`
+with `cache=True`).
+
+The key is a SHA-256 over everything that shapes the answer: call kind,
+purpose, model chain, normalized messages, response schema and sampling
+parameters (max tokens, temperature, reasoning effort, verbosity). Only
+purposes with a TTL in `AI_CACHE_TTLS` are cached, so a call site opting in
+has no effect until its purpose is configured.
+
+Tiers (`AI_CACHE_BACKEND`):
+- `memory`: per-process LRU (`AI_CACHE_MAX_ITEMS` entries)
+- `ddb`: memory in front of the main table (`AICACHE#<key>` items with an epoch
+  `expiresAt`), shared by every instance; values above 64 KB go to the blob
+  store when attribute offloading is on
+- `off`: disabled
+
+Hits, misses, stores and the tokens a hit saved are counted per purpose.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.observability.logging import get_logger
+
+log = get_logger("ai_cache")
+
+_DDB_INLINE_MAX = 64 * 1024
+_DDB_ITEM_MAX = 350 * 1024
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    value: Any  # text, or the parsed model as JSON-compatible data
+    model: str
+    response_format: str | None
+    input_tokens: int | None
+    output_tokens: int | None
+    expires_at: float
+
+
+def cache_key(
+    *,
+    kind: str,
+    purpose: str,
+    models: list[str],
+    messages: list[dict[str, str]],
+    schema: dict[str, Any] | None,
+    params: dict[str, Any],
+) -> str:
+    payload = {
+        "v": 1,
+        "kind": kind,
+        "purpose": purpose,
+        "models": models,
+        "messages": messages,
+        "schema": schema,
+        "params": params,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def ttl_for(purpose: str) -> float:
+    """Seconds to keep `purpose` responses (0 = not cached), from `AI_CACHE_TTLS`."""
+    from app.settings import settings
+
+    p = str(purpose or "").strip()
+    for part in str(settings.ai_cache_ttls or "").split(","):
+        name, _, n = part.partition("=")
+        if name.strip() == p:
+            try:
+                return max(0.0, float(n))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+class _PurposeStats:
+    __slots__ = ("hits", "memory_hits", "ddb_hits", "misses", "stores", "rejected", "saved_in", "saved_out")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.memory_hits = 0
+        self.ddb_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+        self.saved_in = 0
+        self.saved_out = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memoryHits": self.memory_hits,
+            "ddbHits": self.ddb_hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 4) if total else None,
+            "stores": self.stores,
+            "rejected": self.rejected,
+            "savedInputTokens": self.saved_in,
+            "savedOutputTokens": self.saved_out,
+        }
+
+
+class AiResponseCache:
+    def __init__(
+        self,
+        *,
+        max_items: int = 512,
+        table: Callable[[], Any] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_items = max(1, int(max_items))
+        self._table = table  # second tier (main table factory), or None
+        self._clock = clock
+        self._mem: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: dict[str, _PurposeStats] = {}
+        self.ddb_errors = 0
+
+    def _ps(self, purpose: str) -> _PurposeStats:
+        s = self._stats.get(purpose)
+        if s is None:
+            s = self._stats[purpose] = _PurposeStats()
+        return s
+
+    # --- tiers ---
+
+    def _ddb_get(self, key: str) -> CachedResponse | None:
+        if self._table is None:
+            return None
+        from app.db.dynamodb.offload import hydrate_attributes
+
+        try:
+            item = self._table().get_item(key={"pk": f"AICACHE#{key}", "sk": "RESPONSE"})
+            if not item or float(item.get("expiresAt") or 0) <= self._clock():
+                return None
+            item = hydrate_attributes(item, ["value"]) or {}
+            return CachedResponse(
+                value=json.loads(str(item.get("value") or "null")),
+                model=str(item.get("model") or ""),
+                response_format=item.get("responseFormat") or None,
+                input_tokens=int(item["inputTokens"]) if item.get("inputTokens") is not None else None,
+                output_tokens=int(item["outputTokens"]) if item.get("outputTokens") is not None else None,
+                expires_at=float(item.get("expiresAt") or 0),
+            )
+        except Exception as e:
+            with self._lock:
+                self.ddb_errors += 1
+            log.warning("ai_cache_ddb_get_failed", error=str(e))
+            return None
+
+    def _ddb_put(self, key: str, purpose: str, entry: CachedResponse) -> None:
+        if self._table is None:
+            return
+        from app.db.dynamodb.offload import offload_attributes
+
+        try:
+            value = json.dumps(entry.value, ensure_ascii=False, separators=(",", ":"))
+            item: dict[str, Any] = {
+                "pk": f"AICACHE#{key}",
+                "sk": "RESPONSE",
+                "entityType": "AiResponseCache",
+                "purpose": purpose,
+                "value": value,
+                "model": entry.model,
+                "responseFormat": entry.response_format,
+                "expiresAt": int(entry.expires_at),
+            }
+            if entry.input_tokens is not None:
+                item["inputTokens"] = int(entry.input_tokens)
+            if entry.output_tokens is not None:
+                item["outputTokens"] = int(entry.output_tokens)
+            item = offload_attributes(item, ["value"], thresholds={"value": _DDB_INLINE_MAX})
+            if isinstance(item.get("value"), str) and len(item["value"]) > _DDB_ITEM_MAX:
+                return  # too large for an item and no blob store configured
+            self._table().put_item(item=item)
+        except Exception as e:
+            with self._lock:
+                self.ddb_errors += 1
+            log.warning("ai_cache_ddb_put_failed", error=str(e))
+
+    # --- public API ---
+
+    def get(self, key: str, purpose: str, *, accept: Callable[[Any], bool] | None = None) -> CachedResponse | None:
+        """
+        Cached response for `key`, or None. `accept(value)` re-checks a hit against
+        the caller's validation; a rejected entry is dropped and counted as a miss.
+        """
+        now = self._clock()
+        tier = "memory"
+        with self._lock:
+            e = self._mem.get(key)
+            if e is not None and e.expires_at <= now:
+                del self._mem[key]
+                e = None
+        if e is None:
+            tier = "ddb"
+            e = self._ddb_get(key)
+
+        ok = True
+        if e is not None and accept is not None:
+            try:
+                ok = bool(accept(e.value))
+            except Exception:
+                ok = False
+        with self._lock:
+            ps = self._ps(purpose)
+            if e is None or not ok:
+                ps.misses += 1
+                if e is not None:
+                    ps.rejected += 1
+                    self._mem.pop(key, None)
+                return None
+            ps.hits += 1
+            if tier == "memory":
+                ps.memory_hits += 1
+            else:
+                ps.ddb_hits += 1
+            ps.saved_in += e.input_tokens or 0
+            ps.saved_out += e.output_tokens or 0
+            self._remember(key, e)
+        return e
+
+    @property
+    def shared(self) -> bool:
+        """True when entries are visible to other processes (DynamoDB tier)."""
+        return self._table is not None
+
+    def peek(self, key: str) -> CachedResponse | None:
+        """Shared-tier read without touching stats (single-flight followers polling for a result)."""
+        e = self._ddb_get(key)
+        if e is not None:
+            with self._lock:
+                self._remember(key, e)
+        return e
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def put(
+        self,
+        key: str,
+        purpose: str,
+        *,
+        value: Any,
+        model: str,
+        response_format: str | None,
+        input_tokens: int | None,
+        output_tokens: int | None,
+        ttl_s: float,
+    ) -> None:
+        entry = CachedResponse(
+            value=value,
+            model=model,
+            response_format=response_format,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            expires_at=self._clock() + float(ttl_s),
+        )
+        with self._lock:
+            self._ps(purpose).stores += 1
+            self._remember(key, entry)
+        self._ddb_put(key, purpose, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            by_purpose = {p: s.as_dict() for p, s in sorted(self._stats.items())}
+            return {
+                "enabled": True,
+                "backend": "ddb" if self._table is not None else "memory",
+                "size": len(self._mem),
+                "maxItems": self.max_items,
+                "ddbErrors": self.ddb_errors,
+                "hits": sum(s["hits"] for s in by_purpose.values()),
+                "misses": sum(s["misses"] for s in by_purpose.values()),
+                "savedInputTokens": sum(s["savedInputTokens"] for s in by_purpose.values()),
+                "savedOutputTokens": sum(s["savedOutputTokens"] for s in by_purpose.values()),
+                "byPurpose": by_purpose,
+            }
+
+
+_LOCK = threading.Lock()
+_CACHE: AiResponseCache | None = None
+_CACHE_SET = False
+
+
+def get_ai_cache() -> AiResponseCache | None:
+    """Process singleton from settings; None when `AI_CACHE_BACKEND=off`."""
+    global _CACHE, _CACHE_SET
+    if _CACHE_SET:
+        return _CACHE
+    with _LOCK:
+        if not _CACHE_SET:
+            from app.settings import settings
+
+            backend = str(settings.ai_cache_backend or "off").strip().lower()
+            if backend in ("memory", "ddb"):
+                table = None
+                if backend == "ddb":
+                    from app.db.dynamodb.table import get_main_table
+
+                    table = get_main_table
+                _CACHE = AiResponseCache(max_items=settings.ai_cache_max_items, table=table)
+            else:
+                _CACHE = None
+            _CACHE_SET = True
+    return _CACHE
+
+
+def set_ai_cache(cache: AiResponseCache | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _CACHE, _CACHE_SET
+    with _LOCK:
+        _CACHE = cache
+        _CACHE_SET = cache is not None
+
+
+def ai_cache_stats() -> dict[str, Any]:
+    cache = get_ai_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+"""
+Request coalescing for identical AI calls (`cache=True` callers).
+
+Concurrent calls with the same response-cache key share one upstream request:
+the first caller (leader) runs it and every other thread waiting on the same
+key receives its result. `AI_SINGLE_FLIGHT`:
+- `local`: coalesce across the threadpool of this process (default)
+- `ddb`: additionally take a short lease item (`AILEASE#<key>`) in the main
+  table; a process that finds the lease held polls the shared response cache
+  (`AI_CACHE_BACKEND=ddb`) for the leader's result instead of calling upstream
+- `off`: disabled
+
+Waiting is bounded: a follower whose leader takes longer than the lease (or
+whose result fails the follower's own validation) runs the call itself.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, TypeVar
+
+from app.observability.logging import get_logger
+
+log = get_logger("ai_single_flight")
+
+R = TypeVar("R")
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        *,
+        lease_table: Callable[[], Any] | None = None,
+        lease_s: float = 120.0,
+        poll_s: float = 0.25,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._lease_table = lease_table
+        self.lease_s = max(1.0, float(lease_s))
+        self.poll_s = max(0.01, float(poll_s))
+        self._clock = clock
+        self._sleep = sleep
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._inflight: dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.remote_coalesced = 0
+        self.lease_waits = 0
+        self.lease_timeouts = 0
+        self.lease_errors = 0
+        self.follower_reruns = 0
+
+    # --- cross-process lease ---
+
+    def _table(self) -> Any:
+        lease_table = self._lease_table
+        if lease_table is None:
+            raise RuntimeError("single-flight lease table is not configured")
+        return lease_table()
+
+    def _acquire(self, key: str) -> bool:
+        """True when this process holds the lease (or leasing is unavailable)."""
+        now = int(self._clock())
+        try:
+            self._table().put_item(
+                item={
+                    "pk": f"AILEASE#{key}",
+                    "sk": "LEASE",
+                    "entityType": "AiCallLease",
+                    "leaseOwner": self._owner,
+                    "leaseUntil": now + int(self.lease_s),
+                    "expiresAt": now + int(self.lease_s),
+                },
+                condition_expression="attribute_not_exists(pk) OR leaseUntil < :now",
+                expression_attribute_values={":now": now},
+            )
+            return True
+        except Exception as e:
+            from app.db.dynamodb.errors import DdbConflict
+
+            if isinstance(e, DdbConflict):
+                return False
+            with self._lock:
+                self.lease_errors += 1
+            log.warning("ai_lease_acquire_failed", error=str(e))
+            return True
+
+    def _release(self, key: str) -> None:
+        try:
+            self._table().delete_item(
+                key={"pk": f"AILEASE#{key}", "sk": "LEASE"},
+                condition_expression="leaseOwner = :o",
+                expression_attribute_values={":o": self._owner},
+            )
+        except Exception:
+            pass  # taken over after expiry, or transient: the lease times out anyway
+
+    def _wait_remote(self, key: str, peek: Callable[[], R | None]) -> tuple[R | None, bool]:
+        """
+        Another process holds the lease: poll `peek` for its result.
+        Returns (result, False) when found, (None, holds_lease) otherwise.
+        """
+        with self._lock:
+            self.lease_waits += 1
+        deadline = self._clock() + self.lease_s
+        while True:
+            got = peek()
+            if got is not None:
+                with self._lock:
+                    self.remote_coalesced += 1
+                return got, False
+            if self._clock() >= deadline:
+                with self._lock:
+                    self.lease_timeouts += 1
+                return None, False
+            self._sleep(self.poll_s)
+            if self._acquire(key):
+                # Leader finished without a usable result (or died): run it here.
+                return None, True
+
+    # --- public API ---
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], R],
+        *,
+        accept: Callable[[R], bool] | None = None,
+        peek: Callable[[], R | None] | None = None,
+        rerun_on: tuple[type[BaseException], ...] = (),
+    ) -> tuple[R, bool]:
+        """
+        Run `fn` once per key across concurrent callers. Returns (result, shared):
+        `shared` is True when the result came from another caller's request.
+
+        - `accept(result)`: followers re-check the leader's result; on False they run `fn` themselves
+        - `peek()`: reads a result published by another process (lease mode only)
+        - `rerun_on`: leader errors followers retry on their own instead of re-raising
+        """
+        with self._lock:
+            found = self._inflight.get(key)
+            if found is None:
+                flight = self._inflight[key] = _Flight()
+                self.leaders += 1
+            else:
+                flight = found
+                flight.followers += 1
+        leader = found is None
+
+        if not leader:
+            finished = flight.done.wait(self.lease_s)
+            if finished and flight.error is None and (accept is None or accept(flight.result)):
+                with self._lock:
+                    self.coalesced += 1
+                return flight.result, True
+            if finished and flight.error is not None and not isinstance(flight.error, rerun_on):
+                raise flight.error
+            with self._lock:
+                self.follower_reruns += 1
+            return fn(), False
+
+        leased = False
+        try:
+            if self._lease_table is not None and peek is not None:
+                leased = self._acquire(key)
+                if not leased:
+                    got, leased = self._wait_remote(key, peek)
+                    if got is not None:
+                        flight.result = got
+                        return got, True
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            if leased:
+                self._release(key)
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "mode": "ddb" if self._lease_table is not None else "local",
+                "inflight": len(self._inflight),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "remoteCoalesced": self.remote_coalesced,
+                "followerReruns": self.follower_reruns,
+                "leaseWaits": self.lease_waits,
+                "leaseTimeouts": self.lease_timeouts,
+                "leaseErrors": self.lease_errors,
+            }
+
+
+_LOCK = threading.Lock()
+_FLIGHTS: SingleFlight | None = None
+_FLIGHTS_SET = False
+
+
+def get_single_flight() -> SingleFlight | None:
+    """Process singleton from settings; None when `AI_SINGLE_FLIGHT=off`."""
+    global _FLIGHTS, _FLIGHTS_SET
+    if _FLIGHTS_SET:
+        return _FLIGHTS
+    with _LOCK:
+        if not _FLIGHTS_SET:
+            from app.settings import settings
+
+            mode = str(settings.ai_single_flight or "off").strip().lower()
+            if mode in ("local", "ddb"):
+                table = None
+                if mode == "ddb":
+                    from app.db.dynamodb.table import get_main_table
+
+                    table = get_main_table
+                _FLIGHTS = SingleFlight(lease_table=table, lease_s=settings.ai_single_flight_lease_s)
+            else:
+                _FLIGHTS = None
+            _FLIGHTS_SET = True
+    return _FLIGHTS
+
+
+def set_single_flight(flights: SingleFlight | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _FLIGHTS, _FLIGHTS_SET
+    with _LOCK:
+        _FLIGHTS = flights
+        _FLIGHTS_SET = flights is not None
+
+
+def single_flight_stats() -> dict[str, Any]:
+    flights = get_single_flight()
+    return flights.stats() if flights is not None else {"enabled": False}
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+"""
+Token counting and prompt budgeting per model.
+
+Prompts are sized in the model's own tokens (`tiktoken`, one cached encoding per
+model) against its context window minus the output reserve. Character limits
+are only a coarse guard now. If an encoding can't be loaded (for example no
+network to fetch the BPE file and no TIKTOKEN_CACHE_DIR), counts fall back to a
+conservative estimate of one token per 3 characters. The estimate overstates
+tokens for normal prose, so a fitted prompt still fits. `PromptFit.exact`
+records which method was used.
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.observability.logging import get_logger
+
+log = get_logger("ai_tokens")
+
+_EST_CHARS_PER_TOKEN = 3
+# Chat framing per message (role, separators) and for the reply primer.
+_MESSAGE_OVERHEAD_TOKENS = 4
+_REPLY_OVERHEAD_TOKENS = 3
+# Headroom for retry feedback messages and count drift between APIs.
+_SAFETY_TOKENS = 1024
+
+# Usable context (input + output) by model prefix, longest prefix first. GPT-5
+# models accept 272k input tokens, so that is used as their window.
+_CONTEXT_WINDOWS: tuple[tuple[str, int], ...] = (
+    ("gpt-4.1", 1_047_576),
+    ("gpt-4o", 128_000),
+    ("gpt-4-turbo", 128_000),
+    ("gpt-5", 272_000),
+    ("gpt-3.5", 16_385),
+    ("o1", 200_000),
+    ("o3", 200_000),
+    ("o4", 200_000),
+)
+_DEFAULT_CONTEXT_WINDOW = 128_000
+
+
+def _encoding_name(model: str) -> str:
+    m = (model or "").strip().lower()
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_name_for_model(m)
+    except Exception:
+        pass
+    if m.startswith(("gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4")):
+        return "o200k_base"
+    return "cl100k_base"
+
+
+@lru_cache(maxsize=8)
+def _load_encoding(name: str) -> Any | None:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # Cached: don't retry the download on every call.
+        log.warning("tiktoken_encoding_unavailable", encoding=name, error=str(e)[:200])
+        return None
+
+
+def encoding_for(model: str) -> Any | None:
+    """The model's tiktoken encoding (cached), or None to fall back to estimates."""
+    return _load_encoding(_encoding_name(model))
+
+
+def count_tokens(text: str, *, model: str) -> int:
+    s = str(text or "")
+    enc = encoding_for(model)
+    if enc is None:
+        return math.ceil(len(s) / _EST_CHARS_PER_TOKEN)
+    return len(enc.encode_ordinary(s))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, *, model: str) -> str:
+    """Longest prefix of `text` that is at most `max_tokens` tokens."""
+    s = str(text or "")
+    n = max(0, int(max_tokens))
+    enc = encoding_for(model)
+    if enc is None:
+        return s[: n * _EST_CHARS_PER_TOKEN]
+    toks = enc.encode_ordinary(s)
+    return s if len(toks) <= n else enc.decode(toks[:n])
+
+
+def _parse_windows(raw: str) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for part in str(raw or "").split(","):
+        name, _, n = part.partition("=")
+        try:
+            if name.strip() and n.strip():
+                out[name.strip().lower()] = max(1, int(n))
+        except ValueError:
+            continue
+    return out
+
+
+def context_window(model: str) -> int:
+    """Context window in tokens; `AI_CONTEXT_WINDOWS` ("model=N,...,default=N") overrides the table."""
+    from app.settings import settings
+
+    m = (model or "").strip().lower()
+    overrides = _parse_windows(settings.ai_context_windows)
+    if m in overrides:
+        return overrides[m]
+    for prefix, n in _CONTEXT_WINDOWS:
+        if m.startswith(prefix):
+            return n
+    return overrides.get("default", _DEFAULT_CONTEXT_WINDOW)
+
+
+def input_budget(model: str, *, max_output_tokens: int) -> int:
+    """Prompt tokens available to `model` after reserving output and safety headroom."""
+    return max(256, context_window(model) - max(0, int(max_output_tokens)) - _SAFETY_TOKENS)
+
+
+@dataclass(frozen=True)
+class PromptFit:
+    prompt_tokens: int  # measured after fitting
+    truncated_tokens: int  # tokens cut to fit (0 = sent whole)
+    budget: int
+    exact: bool  # tiktoken count vs estimate
+
+
+def count_message_tokens(messages: list[dict[str, str]], *, model: str) -> int:
+    return _REPLY_OVERHEAD_TOKENS + sum(
+        _MESSAGE_OVERHEAD_TOKENS + count_tokens(str(m.get("content") or ""), model=model) for m in messages or []
+    )
+
+
+def fit_messages(
+    messages: list[dict[str, str]], *, model: str, max_output_tokens: int
+) -> tuple[list[dict[str, str]], PromptFit]:
+    """
+    Fit `messages` into `model`'s input budget. Over budget, the longest message (the
+    document in practice; callers put it last in the prompt) loses its tail.
+    """
+    budget = input_budget(model, max_output_tokens=max_output_tokens)
+    exact = encoding_for(model) is not None
+    counts = [count_tokens(str(m.get("content") or ""), model=model) for m in messages or []]
+    total = _REPLY_OVERHEAD_TOKENS + sum(c + _MESSAGE_OVERHEAD_TOKENS for c in counts)
+    if total <= budget or not counts:
+        return list(messages or []), PromptFit(prompt_tokens=total, truncated_tokens=0, budget=budget, exact=exact)
+
+    i = max(range(len(counts)), key=lambda j: counts[j])
+    keep = max(0, counts[i] - (total - budget))
+    out = [dict(m) for m in messages]
+    out[i]["content"] = truncate_to_tokens(str(out[i].get("content") or ""), keep, model=model)
+    kept = count_tokens(out[i]["content"], model=model)
+    fitted = total - counts[i] + kept
+    log.info(
+        "ai_prompt_truncated",
+        model=model,
+        prompt_tokens=total,
+        budget=budget,
+        truncated_tokens=total - fitted,
+        exact=exact,
+    )
+    return out, PromptFit(prompt_tokens=fitted, truncated_tokens=total - fitted, budget=budget, exact=exact)
@@ -4,6 +4,7 @@ from typing import Callable, TypeVar
 
 from pydantic import BaseModel
 
+from app.ai.async_client import acall_json, acall_text
 from app.ai.client import AiMeta, call_json, call_text
 from app.ai.verification import (
     Validator,
@@ -64,6 +65,21 @@ def text_validators_for(*, purpose: str) -> list[Validator]:
     return out
 
 
+def _text_validators(
+    purpose: str,
+    validate: Validator | list[Validator] | None,
+    validate_extra: Validator | list[Validator] | None,
+) -> list[Validator] | None:
+    base = text_validators_for(purpose=purpose)
+
+    extras: list[Validator] = []
+    if validate is not None:
+        extras.extend(validate if isinstance(validate, list) else [validate])
+    if validate_extra is not None:
+        extras.extend(validate_extra if isinstance(validate_extra, list) else [validate_extra])
+    return (base + extras) if (base or extras) else None
+
+
 def call_text_verified(
     *,
     purpose: str,
@@ -75,24 +91,18 @@ def call_text_verified(
     retries: int = 2,
     timeout_s: int = 60,
     max_prompt_chars: int = 220_000,
+    cache: bool = False,
 ) -> tuple[str, AiMeta]:
-    base = text_validators_for(purpose=purpose)
-
-    extras: list[Validator] = []
-    if validate is not None:
-        extras.extend(validate if isinstance(validate, list) else [validate])
-    if validate_extra is not None:
-        extras.extend(validate_extra if isinstance(validate_extra, list) else [validate_extra])
-
     return call_text(
         purpose=purpose,
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
-        validate=(base + extras) if (base or extras) else None,
+        validate=_text_validators(purpose, validate, validate_extra),
         retries=retries,
         timeout_s=timeout_s,
         max_prompt_chars=max_prompt_chars,
+        cache=cache,
     )
 
 
@@ -109,6 +119,7 @@ def call_json_verified(
     fallback: Callable[[], T] | None = None,
     timeout_s: int = 60,
     max_prompt_chars: int = 220_000,
+    cache: bool = False,
 ) -> tuple[T, AiMeta]:
     return call_json(
         purpose=purpose,
@@ -122,5 +133,62 @@ def call_json_verified(
         fallback=fallback,
         timeout_s=timeout_s,
         max_prompt_chars=max_prompt_chars,
+        cache=cache,
     )
 
+
+async def acall_text_verified(
+    *,
+    purpose: str,
+    messages: list[dict[str, str]],
+    max_tokens: int = 1200,
+    temperature: float = 0.4,
+    validate: Validator | list[Validator] | None = None,
+    validate_extra: Validator | list[Validator] | None = None,
+    retries: int = 2,
+    timeout_s: int = 60,
+    max_prompt_chars: int = 220_000,
+    cache: bool = False,
+) -> tuple[str, AiMeta]:
+    return await acall_text(
+        purpose=purpose,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        validate=_text_validators(purpose, validate, validate_extra),
+        retries=retries,
+        timeout_s=timeout_s,
+        max_prompt_chars=max_prompt_chars,
+        cache=cache,
+    )
+
+
+async def acall_json_verified(
+    *,
+    purpose: str,
+    response_model: type[T],
+    messages: list[dict[str, str]],
+    max_tokens: int = 1200,
+    temperature: float = 0.2,
+    retries: int = 3,
+    allow_json_extract: bool = True,
+    validate_parsed: ParsedValidator[T] | None = None,
+    fallback: Callable[[], T] | None = None,
+    timeout_s: int = 60,
+    max_prompt_chars: int = 220_000,
+    cache: bool = False,
+) -> tuple[T, AiMeta]:
+    return await acall_json(
+        purpose=purpose,
+        response_model=response_model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        retries=retries,
+        allow_json_extract=allow_json_extract,
+        validate_parsed=validate_parsed,
+        fallback=fallback,
+        timeout_s=timeout_s,
+        max_prompt_chars=max_prompt_chars,
+        cache=cache,
+    )
@@ -10,10 +10,18 @@ from app.settings import settings
 
 @lru_cache(maxsize=1)
 def botocore_config() -> Config:
-    # Keep botocore retries enabled (adaptive is best-effort); we still do an app-layer
-    # retry for a narrow set of known-safe transient failures.
+    if settings.ddb_adaptive_throttle:
+        # Throttles must surface immediately so the shared controller in
+        # throttle.py can pace every thread. botocore has no throttle-only switch,
+        # so ddb_call owns all retries: throttles, 5xx responses and transport
+        # errors (connection resets, read timeouts), each with jittered backoff.
+        retries = {"total_max_attempts": 1, "mode": "standard"}
+    else:
+        # Keep botocore retries enabled (adaptive is best-effort); we still do an app-layer
+        # retry for a narrow set of known-safe transient failures.
+        retries = {"max_attempts": 10, "mode": "adaptive"}
     return Config(
-        retries={"max_attempts": 10, "mode": "adaptive"},
+        retries=retries,
         connect_timeout=2,
         read_timeout=10,
     )
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+"""
+AttributeValue codec for the low-level client fast path (`DDB_TABLE_BACKEND=client`).
+
+Compared with the boto3 resource layer (TypeSerializer/TypeDeserializer run by
+the resource's transformation hooks on every request/response):
+
+- numbers come back as native `int` / `float` instead of `Decimal`, so
+  repositories get API-ready values once, at the table boundary;
+- floats are accepted on write (no JSON round-trip into Decimals first);
+- the common shapes (S, N, BOOL, NULL, M, L) are decoded by a tight recursive
+  function rather than per-value method dispatch; rarer types (binary, sets)
+  fall back to shared, cached TypeSerializer/TypeDeserializer instances.
+"""
+
+import math
+from typing import Any
+
+from boto3.dynamodb.types import DYNAMODB_CONTEXT, TypeDeserializer, TypeSerializer
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _number(s: str) -> int | float:
+    # DynamoDB returns numbers normalized ("1.50" -> "1.5", "2.0" -> "2").
+    if "." in s or "e" in s or "E" in s:
+        return float(s)
+    return int(s)
+
+
+def from_attribute_value(av: dict[str, Any]) -> Any:
+    ((t, v),) = av.items()
+    if t == "S":
+        return v
+    if t == "M":
+        return {k: from_attribute_value(x) for k, x in v.items()}
+    if t == "N":
+        return _number(v)
+    if t == "L":
+        return [from_attribute_value(x) for x in v]
+    if t == "BOOL":
+        return v
+    if t == "NULL":
+        return None
+    if t == "NS":
+        return {_number(x) for x in v}
+    return _deserializer.deserialize(av)
+
+
+def _float_string(f: float) -> str:
+    if math.isnan(f) or math.isinf(f):
+        raise TypeError("Infinity and NaN not supported")
+    return str(DYNAMODB_CONTEXT.create_decimal(repr(f)))
+
+
+def to_attribute_value(v: Any) -> dict[str, Any]:
+    if isinstance(v, str):
+        return {"S": v}
+    if isinstance(v, bool):
+        return {"BOOL": v}
+    if v is None:
+        return {"NULL": True}
+    if isinstance(v, int):
+        return {"N": str(v)}
+    if isinstance(v, float):
+        return {"N": _float_string(v)}
+    if isinstance(v, dict):
+        return {"M": {k: to_attribute_value(x) for k, x in v.items()}}
+    if isinstance(v, (list, tuple)):
+        return {"L": [to_attribute_value(x) for x in v]}
+    # Decimal, binary, sets: boto3's rules (and errors).
+    return _serializer.serialize(v)
+
+
+def serialize_item(item: dict[str, Any]) -> dict[str, Any]:
+    return {k: to_attribute_value(v) for k, v in item.items()}
+
+
+def deserialize_item(item: dict[str, Any]) -> dict[str, Any]:
+    return {k: from_attribute_value(v) for k, v in item.items()}
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+"""
+Per-operation DynamoDB instrumentation for `ddb_call`.
+
+For each call (all of its retries):
+- an OpenTelemetry span and metrics (duration histogram, items, response bytes,
+  consumed capacity) when OTEL is enabled;
+- a `ddb_slow_operation` warning above `DDB_SLOW_OP_MS`;
+- aggregation into the current request's `DdbRequestStats` (a context variable
+  set by the access log middleware), so each access log line carries the
+  request's DynamoDB round-trips, per-operation counts and capacity. Many calls
+  of one operation on a single request is the usual N+1 signature.
+
+Consumed capacity is requested on every operation per `DDB_CONSUMED_CAPACITY`
+(TOTAL by default; NONE turns it off).
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+from app.observability.logging import get_logger
+
+log = get_logger("ddb")
+
+T = TypeVar("T")
+
+READ_OPERATIONS = frozenset({"GetItem", "Query", "Scan", "BatchGetItem", "TransactGetItems"})
+
+
+class DdbRequestStats:
+    """DynamoDB work done on behalf of one request (shared by its worker threads)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts = 0
+        self.throttles = 0
+        self.errors = 0
+        self.duration_ms = 0.0
+        self.items = 0
+        self.response_bytes = 0
+        self.rcu = 0.0
+        self.wcu = 0.0
+        self.by_operation: dict[str, int] = {}
+
+    def add(
+        self,
+        *,
+        operation: str,
+        index_name: str | None,
+        duration_ms: float,
+        attempts: int,
+        throttles: int,
+        failed: bool,
+        items: int,
+        response_bytes: int,
+        capacity: float,
+    ) -> None:
+        name = f"{operation}#{index_name}" if index_name else operation
+        with self._lock:
+            self.calls += 1
+            self.attempts += attempts
+            self.throttles += throttles
+            self.errors += int(failed)
+            self.duration_ms += duration_ms
+            self.items += items
+            self.response_bytes += response_bytes
+            if operation in READ_OPERATIONS:
+                self.rcu += capacity
+            else:
+                self.wcu += capacity
+            self.by_operation[name] = self.by_operation.get(name, 0) + 1
+
+    def log_fields(self) -> dict[str, Any]:
+        with self._lock:
+            if not self.calls:
+                return {"ddb_calls": 0}
+            return {
+                "ddb_calls": self.calls,
+                "ddb_retries": self.attempts - self.calls,
+                "ddb_throttles": self.throttles,
+                "ddb_errors": self.errors,
+                "ddb_ms": round(self.duration_ms, 2),
+                "ddb_items": self.items,
+                "ddb_bytes": self.response_bytes,
+                "ddb_rcu": round(self.rcu, 2),
+                "ddb_wcu": round(self.wcu, 2),
+                "ddb_ops": dict(self.by_operation),
+            }
+
+
+_request_stats: contextvars.ContextVar[DdbRequestStats | None] = contextvars.ContextVar(
+    "ddb_request_stats", default=None
+)
+
+
+def begin_request_stats() -> tuple[DdbRequestStats, contextvars.Token]:
+    stats = DdbRequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request_stats(token: contextvars.Token) -> None:
+    _request_stats.reset(token)
+
+
+def current_request_stats() -> DdbRequestStats | None:
+    return _request_stats.get()
+
+
+def in_current_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap `fn` to run in (a copy of) the caller's context, for work handed to a
+    thread pool: calls made there still count toward the current request.
+    """
+    ctx = contextvars.copy_context()
+
+    def _run(*args: Any, **kwargs: Any) -> T:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return _run
+
+
+def consumed_capacity_mode() -> str | None:
+    from app.settings import settings
+
+    mode = str(settings.ddb_consumed_capacity or "NONE").strip().upper()
+    return mode if mode in ("TOTAL", "INDEXES") else None
+
+
+# --- OpenTelemetry (optional) ---
+
+_OTEL_LOCK = threading.Lock()
+_OTEL: tuple[Any, dict[str, Any]] | None = None
+_OTEL_READY = False
+
+
+def _otel() -> tuple[Any, dict[str, Any]] | None:
+    global _OTEL, _OTEL_READY
+    if _OTEL_READY:
+        return _OTEL
+    with _OTEL_LOCK:
+        if not _OTEL_READY:
+            _OTEL = None
+            try:
+                from app.settings import settings
+
+                if settings.otel_enabled:
+                    from opentelemetry import metrics, trace
+
+                    meter = metrics.get_meter("app.db.dynamodb")
+                    _OTEL = (
+                        trace.get_tracer("app.db.dynamodb"),
+                        {
+                            "duration": meter.create_histogram(
+                                "db.client.operation.duration", unit="ms", description="DynamoDB call latency"
+                            ),
+                            "items": meter.create_counter("db.dynamodb.items", description="Items returned"),
+                            "bytes": meter.create_counter(
+                                "db.dynamodb.response_bytes", unit="By", description="Response payload bytes"
+                            ),
+                            "capacity": meter.create_counter(
+                                "db.dynamodb.consumed_capacity", description="Consumed capacity units"
+                            ),
+                        },
+                    )
+            except Exception:
+                log.warning("ddb_otel_unavailable")
+                _OTEL = None
+            _OTEL_READY = True
+    return _OTEL
+
+
+def reset_otel() -> None:
+    """Re-resolve the tracer/meter on next use (tests, late OTEL configuration)."""
+    global _OTEL_READY
+    with _OTEL_LOCK:
+        _OTEL_READY = False
+
+
+# --- response inspection ---
+
+
+def _capacity(cc: Any) -> float:
+    if isinstance(cc, dict):
+        return float(cc.get("CapacityUnits") or 0)
+    if isinstance(cc, list):
+        return sum(_capacity(c) for c in cc)
+    return 0.0
+
+
+def response_figures(resp: Any) -> tuple[int, int, float]:
+    """(items, response bytes, consumed capacity units) of a raw DynamoDB response."""
+    if not isinstance(resp, dict):
+        return 0, 0, 0.0
+    if "Items" in resp:
+        items = len(resp.get("Items") or [])
+    elif "Responses" in resp and isinstance(resp.get("Responses"), dict):
+        items = sum(len(v or []) for v in resp["Responses"].values())
+    else:
+        items = int(bool(resp.get("Item") or resp.get("Attributes")))
+    try:
+        size = int(((resp.get("ResponseMetadata") or {}).get("HTTPHeaders") or {}).get("content-length") or 0)
+    except (TypeError, ValueError):
+        size = 0
+    return items, size, _capacity(resp.get("ConsumedCapacity"))
+
+
+class CallRecord:
+    __slots__ = ("attempts", "throttles", "response", "failed")
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.throttles = 0
+        self.response: Any = None
+        self.failed = False
+
+
+@contextmanager
+def instrument_call(operation: str, *, table_name: str | None, index_name: str | None) -> Iterator[CallRecord]:
+    """Wrap one `ddb_call` (including retries); the caller fills in the record."""
+    rec = CallRecord()
+    otel = _otel()
+    with ExitStack() as stack:
+        span = (
+            stack.enter_context(otel[0].start_as_current_span(f"DynamoDB.{operation}", record_exception=False))
+            if otel is not None
+            else None
+        )
+        start = time.perf_counter()
+        try:
+            yield rec
+        except BaseException:
+            rec.failed = True
+            raise
+        finally:
+            dur_ms = (time.perf_counter() - start) * 1000.0
+            items, size, capacity = response_figures(rec.response)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.add(
+                    operation=operation,
+                    index_name=index_name,
+                    duration_ms=dur_ms,
+                    attempts=rec.attempts,
+                    throttles=rec.throttles,
+                    failed=rec.failed,
+                    items=items,
+                    response_bytes=size,
+                    capacity=capacity,
+                )
+            if otel is not None:
+                attrs = {"db.system": "dynamodb", "db.operation": operation, "aws.dynamodb.table_names": table_name or ""}
+                if index_name:
+                    attrs["aws.dynamodb.index_name"] = index_name
+                if span is not None:
+                    span.set_attributes(
+                        {
+                            **attrs,
+                            "aws.dynamodb.item_count": items,
+                            "aws.dynamodb.consumed_capacity": capacity,
+                            "aws.dynamodb.attempts": rec.attempts,
+                            "db.response.bytes": size,
+                            "error": rec.failed,
+                        }
+                    )
+                inst = otel[1]
+                inst["duration"].record(dur_ms, attrs)
+                inst["items"].add(items, attrs)
+                inst["bytes"].add(size, attrs)
+                inst["capacity"].add(capacity, attrs)
+            _maybe_log_slow(operation, table_name, index_name, dur_ms, rec, items, size, capacity)
+
+
+def _maybe_log_slow(
+    operation: str,
+    table_name: str | None,
+    index_name: str | None,
+    dur_ms: float,
+    rec: CallRecord,
+    items: int,
+    size: int,
+    capacity: float,
+) -> None:
+    from app.settings import settings
+
+    threshold = float(settings.ddb_slow_op_ms or 0)
+    if threshold <= 0 or dur_ms < threshold:
+        return
+    log.warning(
+        "ddb_slow_operation",
+        operation=operation,
+        table=table_name,
+        index=index_name,
+        duration_ms=round(dur_ms, 2),
+        attempts=rec.attempts,
+        throttles=rec.throttles,
+        items=items,
+        response_bytes=size,
+        consumed_capacity=capacity,
+        failed=rec.failed,
+    )
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+"""
+Per-process read-through cache for hot profile items (RFPs, proposals,
+companies, team members, templates, user profiles).
+
+Enabled with `DDB_ITEM_CACHE_MAX_ITEMS` > 0; entries expire after
+`DDB_ITEM_CACHE_TTL_SECONDS`, which bounds staleness against writes made by
+other processes. Writes made through the repositories update or invalidate the
+entry directly, so a process always reads its own writes:
+
+- `remember(item)` after a put / ALL_NEW update (never replaces a cached copy
+  with an older `updatedAt`)
+- `invalidate(key)` when the new state isn't known (deletes, partial writes)
+
+A read that misses and races a local write can't resurrect the old value: the
+fill is dropped when the key was written after the read started, and is never
+allowed to replace a newer `updatedAt`.
+
+Cached items are deep-copied in and out, so callers may mutate what they get.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from app.observability.logging import get_logger
+
+log = get_logger("ddb_item_cache")
+
+CacheKey = tuple[str, str]
+
+
+class _Entry:
+    __slots__ = ("item", "version", "expires_at", "seq")
+
+    def __init__(self, item: dict[str, Any] | None, version: str, expires_at: float, seq: int):
+        self.item = item  # None = tombstone (written, state unknown)
+        self.version = version
+        self.expires_at = expires_at
+        self.seq = seq
+
+
+def _key(key: dict[str, Any]) -> CacheKey:
+    return (str(key.get("pk") or ""), str(key.get("sk") or ""))
+
+
+def _version(item: dict[str, Any] | None) -> str:
+    return str((item or {}).get("updatedAt") or "")
+
+
+class ItemCache:
+    def __init__(self, *, max_items: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_items = max(1, int(max_items))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._clock = clock
+        self._data: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_fills = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    # --- internals (call with the lock held) ---
+
+    def _bump(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _store(self, k: CacheKey, entry: _Entry) -> None:
+        self._data[k] = entry
+        self._data.move_to_end(k)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    # --- public API ---
+
+    def get_item(self, key: dict[str, Any], load: Callable[[], dict[str, Any] | None]) -> dict[str, Any] | None:
+        """Cached item for `key`, calling `load()` (a DynamoDB GetItem) on a miss."""
+        k = _key(key)
+        now = self._clock()
+        with self._lock:
+            e = self._data.get(k)
+            if e is not None and e.item is not None and e.expires_at > now:
+                self._data.move_to_end(k)
+                self.hits += 1
+                return copy.deepcopy(e.item)
+            self.misses += 1
+            started = self._seq
+
+        item = load()
+
+        with self._lock:
+            e = self._data.get(k)
+            if e is not None and (e.seq > started or _version(item) < e.version):
+                # Written locally while we were reading (or we read an older copy): keep the newer state.
+                self.stale_fills += 1
+                return copy.deepcopy(e.item) if e.item is not None and e.expires_at > self._clock() else item
+            if item is not None:
+                self._store(k, _Entry(copy.deepcopy(item), _version(item), self._clock() + self.ttl_seconds, e.seq if e else 0))
+        return item
+
+    def remember(self, item: dict[str, Any] | None) -> None:
+        """Record the full item just written by this process."""
+        if not item or "pk" not in item or "sk" not in item:
+            return
+        k = _key(item)
+        v = _version(item)
+        with self._lock:
+            e = self._data.get(k)
+            seq = self._bump()
+            if e is not None and e.item is not None and v < e.version:
+                e.seq = seq
+                return
+            self._store(k, _Entry(copy.deepcopy(item), v, self._clock() + self.ttl_seconds, seq))
+
+    def invalidate(self, key: dict[str, Any]) -> None:
+        """Forget `key` after a write whose resulting state isn't known here."""
+        k = _key(key)
+        with self._lock:
+            self.invalidations += 1
+            e = self._data.get(k)
+            self._store(k, _Entry(None, e.version if e else "", self._clock() + self.ttl_seconds, self._bump()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bump()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": True,
+                "size": sum(1 for e in self._data.values() if e.item is not None),
+                "maxItems": self.max_items,
+                "ttlSeconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else None,
+                "staleFills": self.stale_fills,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+_LOCK = threading.Lock()
+_CACHE: ItemCache | None = None
+_CACHE_SET = False
+
+
+def get_item_cache() -> ItemCache | None:
+    """Process singleton from settings; None when the cache is disabled."""
+    global _CACHE, _CACHE_SET
+    if _CACHE_SET:
+        return _CACHE
+    with _LOCK:
+        if not _CACHE_SET:
+            from app.settings import settings
+
+            n = int(settings.ddb_item_cache_max_items or 0)
+            _CACHE = ItemCache(max_items=n, ttl_seconds=settings.ddb_item_cache_ttl_seconds) if n > 0 else None
+            _CACHE_SET = True
+    return _CACHE
+
+
+def set_item_cache(cache: ItemCache | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _CACHE, _CACHE_SET
+    with _LOCK:
+        _CACHE = cache
+        _CACHE_SET = cache is not None
+
+
+def cached_get_item(table: Any, key: dict[str, Any]) -> dict[str, Any] | None:
+    """`table.get_item(key=...)` through the item cache (plain read when disabled)."""
+    cache = get_item_cache()
+    if cache is None:
+        return table.get_item(key=key)
+    return cache.get_item(key, lambda: table.get_item(key=key))
+
+
+def remember_item(item: dict[str, Any] | None) -> None:
+    cache = get_item_cache()
+    if cache is not None:
+        cache.remember(item)
+
+
+def invalidate_item(key: dict[str, Any]) -> None:
+    cache = get_item_cache()
+    if cache is not None:
+        cache.invalidate(key)
+
+
+def item_cache_stats() -> dict[str, Any]:
+    cache = get_item_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
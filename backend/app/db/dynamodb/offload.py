@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+"""
+Out-of-line storage for oversized item attributes.
+
+Attributes listed in `DDB_OFFLOAD_ATTRIBUTES` (RFP `rawText` / `_analysis`,
+proposal `sections`, attachment `textContent`) whose serialized size exceeds
+their threshold are written as gzipped JSON blobs addressed by SHA-256, and the
+item keeps a small pointer map instead:
+
+    {"__blob": "<sha256>", "bytes": <json size>, "codec": "json.gz"}
+
+Repositories call `offload_attributes` before writes and `hydrate_attributes`
+/ `hydrate_many` for the fields a caller actually needs; anything that isn't
+hydrated costs only the pointer's few bytes in reads and query pages.
+
+Blobs are immutable, so fetched content is kept in a bounded in-process LRU.
+They are never deleted (identical content is shared between items).
+
+Backends: `S3BlobStore` (assets bucket) in production, `MemoryBlobStore` for
+tests and single-process dev. `DDB_OFFLOAD_BACKEND=off` (default) stops new
+writes from being offloaded; pointers written earlier still hydrate from S3.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Iterable
+
+from app.observability.logging import get_logger
+
+log = get_logger("ddb_offload")
+
+POINTER_KEY = "__blob"
+CODEC = "json.gz"
+
+
+class BlobStore(ABC):
+    @abstractmethod
+    def put(self, digest: str, data: bytes) -> None: ...
+
+    @abstractmethod
+    def get(self, digest: str) -> bytes | None: ...
+
+
+class MemoryBlobStore(BlobStore):
+    def __init__(self) -> None:
+        self.blobs: dict[str, bytes] = {}
+        self.gets = 0
+        self._lock = threading.Lock()
+
+    def put(self, digest: str, data: bytes) -> None:
+        with self._lock:
+            self.blobs[digest] = bytes(data)
+
+    def get(self, digest: str) -> bytes | None:
+        with self._lock:
+            self.gets += 1
+            return self.blobs.get(digest)
+
+
+class S3BlobStore(BlobStore):
+    def put(self, digest: str, data: bytes) -> None:
+        from app.infrastructure.storage.s3_assets import make_ddb_blob_key, put_object_bytes
+
+        put_object_bytes(key=make_ddb_blob_key(sha256=digest), data=data, content_type="application/gzip")
+
+    def get(self, digest: str) -> bytes | None:
+        from app.infrastructure.storage.s3_assets import get_object_bytes_with_etag, make_ddb_blob_key
+
+        got = get_object_bytes_with_etag(key=make_ddb_blob_key(sha256=digest), max_bytes=64 * 1024 * 1024)
+        return got[0] if got else None
+
+
+class _LruBytes:
+    """Digest -> uncompressed JSON bytes, bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> bytes | None:
+        with self._lock:
+            v = self._data.get(digest)
+            if v is not None:
+                self._data.move_to_end(digest)
+            return v
+
+    def put(self, digest: str, raw: bytes) -> None:
+        if len(raw) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(digest, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[digest] = raw
+            self._size += len(raw)
+            while self._size > self.max_bytes and self._data:
+                _, ev = self._data.popitem(last=False)
+                self._size -= len(ev)
+
+
+_LOCK = threading.Lock()
+_STORE: BlobStore | None = None
+_STORE_SET = False
+_CACHE: _LruBytes | None = None
+_POOL: ThreadPoolExecutor | None = None
+
+
+def _settings() -> Any:
+    from app.settings import settings
+
+    return settings
+
+
+def get_blob_store() -> BlobStore | None:
+    """Process singleton from `DDB_OFFLOAD_BACKEND`; None when offloading is off."""
+    global _STORE, _STORE_SET
+    if _STORE_SET:
+        return _STORE
+    with _LOCK:
+        if not _STORE_SET:
+            backend = str(_settings().ddb_offload_backend or "off").strip().lower()
+            _STORE = S3BlobStore() if backend == "s3" else MemoryBlobStore() if backend == "memory" else None
+            _STORE_SET = True
+    return _STORE
+
+
+def set_blob_store(store: BlobStore | None) -> None:
+    """Replace the process singleton (tests, scripts). Also clears the blob cache."""
+    global _STORE, _STORE_SET, _CACHE
+    with _LOCK:
+        _STORE = store
+        _STORE_SET = store is not None
+        _CACHE = None
+
+
+def _cache() -> _LruBytes:
+    global _CACHE
+    if _CACHE is None:
+        with _LOCK:
+            if _CACHE is None:
+                _CACHE = _LruBytes(int(_settings().ddb_offload_cache_mb or 0) * 1024 * 1024)
+    return _CACHE
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ddb-blob")
+    return _POOL
+
+
+def offload_thresholds() -> dict[str, int]:
+    """Attribute -> size (bytes of serialized JSON) above which it is stored out of line."""
+    out: dict[str, int] = {}
+    for part in str(_settings().ddb_offload_attributes or "").split(","):
+        name, _, n = part.partition("=")
+        try:
+            if name.strip() and n.strip():
+                out[name.strip()] = max(0, int(n))
+        except ValueError:
+            continue
+    return out
+
+
+def is_pointer(v: Any) -> bool:
+    return isinstance(v, dict) and isinstance(v.get(POINTER_KEY), str)
+
+
+def _json_default(o: Any) -> Any:
+    if isinstance(o, Decimal):
+        return int(o) if o == o.to_integral_value() else float(o)
+    if isinstance(o, (set, frozenset)):
+        return sorted(o)
+    raise TypeError(f"Not JSON serializable: {type(o).__name__}")
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(raw: bytes) -> Any:
+    # Decimal for floats so hydrated values can be written back through boto3.
+    return json.loads(raw.decode("utf-8"), parse_float=Decimal)
+
+
+def offload_attributes(
+    item: dict[str, Any], fields: Iterable[str], *, thresholds: dict[str, int] | None = None
+) -> dict[str, Any]:
+    """
+    Copy of `item` with those of `fields` that are configured and oversized
+    replaced by blob pointers (blobs are uploaded first, so a pointer never
+    references a missing blob). Works for full items and for update patches
+    alike. No-op when offloading is off.
+    """
+    store = get_blob_store()
+    if store is None or not isinstance(item, dict):
+        return item
+    configured = thresholds if thresholds is not None else offload_thresholds()
+    limits = {f: configured[f] for f in fields if f in configured}
+    out = item
+    for attr, limit in limits.items():
+        v = item.get(attr)
+        if v is None or is_pointer(v):
+            continue
+        raw = _encode(v)
+        if len(raw) <= limit:
+            continue
+        digest = hashlib.sha256(raw).hexdigest()
+        if _cache().get(digest) is None:
+            store.put(digest, gzip.compress(raw, compresslevel=6))
+            _cache().put(digest, raw)
+        if out is item:
+            out = dict(item)
+        out[attr] = {POINTER_KEY: digest, "bytes": len(raw), "codec": CODEC}
+    return out
+
+
+def _load(digest: str) -> Any:
+    raw = _cache().get(digest)
+    if raw is None:
+        blob = (get_blob_store() or S3BlobStore()).get(digest)
+        if blob is None:
+            raise LookupError(f"blob {digest} not found")
+        raw = gzip.decompress(blob)
+        _cache().put(digest, raw)
+    return _decode(raw)
+
+
+def _pointer_fields(item: dict[str, Any], fields: Iterable[str] | None) -> list[str]:
+    names = item.keys() if fields is None else [f for f in fields if f in item]
+    return [f for f in names if is_pointer(item.get(f))]
+
+
+def _load_or_none(digest: str, field: str) -> Any:
+    try:
+        return _load(digest)
+    except Exception as e:
+        log.warning("ddb_blob_load_failed", field=field, digest=digest, error=str(e) or type(e).__name__)
+        return None
+
+
+def _substitute(item: dict[str, Any], todo: list[str], values: dict[str, Any]) -> dict[str, Any]:
+    out = dict(item)
+    for f in todo:
+        out[f] = values[out[f][POINTER_KEY]]
+    return out
+
+
+def hydrate_attributes(item: dict[str, Any] | None, fields: Iterable[str] | None = None) -> dict[str, Any] | None:
+    """
+    Copy of `item` with the requested pointer fields (all by default) replaced by
+    their content. A blob that can't be loaded becomes None (logged), so a
+    storage hiccup degrades one field rather than failing the read.
+    """
+    if not item:
+        return item
+    todo = _pointer_fields(item, fields)
+    if not todo:
+        return item
+    values = {item[f][POINTER_KEY]: _load_or_none(item[f][POINTER_KEY], f) for f in todo}
+    return _substitute(item, todo, values)
+
+
+def hydrate_many(items: list[dict[str, Any]], fields: Iterable[str] | None = None) -> list[dict[str, Any]]:
+    """`hydrate_attributes` for a page of items, loading each distinct blob once (in parallel)."""
+    wanted = list(fields) if fields is not None else None
+    todo = [(it, _pointer_fields(it, wanted)) if isinstance(it, dict) else (it, []) for it in items]
+    needed = {it[f][POINTER_KEY]: f for it, fs in todo for f in fs}
+    if not needed:
+        return items
+    if len(needed) == 1:
+        values = {d: _load_or_none(d, f) for d, f in needed.items()}
+    else:
+        values = dict(zip(needed, _pool().map(lambda kv: _load_or_none(*kv), needed.items())))
+    return [_substitute(it, fs, values) if fs else it for it, fs in todo]
@@ -15,6 +15,8 @@ from app.db.dynamodb.errors import (
     DdbUnavailable,
     DdbValidation,
 )
+from app.db.dynamodb.instrumentation import instrument_call
+from app.db.dynamodb.throttle import THROTTLE_CODES, get_throttle_controller
 
 T = TypeVar("T")
 
@@ -24,6 +26,8 @@ class RetryPolicy:
     max_attempts: int = 6
     base_delay_s: float = 0.05
     max_delay_s: float = 1.5
+    # Throttled attempts paced by the shared rate controller (botocore no longer retries them).
+    max_throttled_attempts: int = 12
 
 
 _RETRYABLE_CODES = {
@@ -36,6 +40,9 @@ _RETRYABLE_CODES = {
     "TransactionConflictException",
 }
 
+# Transient HTTP statuses botocore's standard mode retries regardless of error code.
+_RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
 # Transaction-specific retryable cancellation reasons / codes.
 _TRANSACTION_RETRYABLE_CODES = {
     "TransactionConflictException",
@@ -64,12 +71,23 @@ def _err_code_from_client_error(e: ClientError) -> str | None:
         return None
 
 
+def _is_throttle(e: Exception) -> bool:
+    return isinstance(e, ClientError) and (_err_code_from_client_error(e) or "") in THROTTLE_CODES
+
+
 def _is_retryable_client_error(e: ClientError) -> bool:
     code = _err_code_from_client_error(e) or ""
 
     if code in _RETRYABLE_CODES:
         return True
 
+    try:
+        status = int((e.response or {}).get("ResponseMetadata", {}).get("HTTPStatusCode") or 0)
+    except Exception:
+        status = 0
+    if status in _RETRYABLE_STATUS_CODES:
+        return True
+
     # TransactWriteItems may raise TransactionCanceledException with structured reasons.
     if code == "TransactionCanceledException":
         try:
@@ -178,37 +196,68 @@ def ddb_call(
     *,
     table_name: str | None = None,
     key: dict[str, Any] | None = None,
+    index_name: str | None = None,
     retry_policy: RetryPolicy | None = None,
 ) -> T:
+    """
+    Run one DynamoDB request with error mapping and app-layer retries.
+
+    Every attempt first takes a slot from the process-wide adaptive rate
+    controller (see `throttle.py`), and throttling errors lower that shared
+    rate, so during a throttling burst new requests and retries from all threads
+    are spread at the permitted rate rather than retrying in lockstep. Retries
+    still add jittered exponential backoff, which gives the rate time to settle.
+
+    The call as a whole (all attempts) is instrumented (see `instrumentation.py`);
+    when `fn` returns the raw response its items, size and consumed capacity are
+    recorded too.
+    """
     policy = retry_policy or RetryPolicy()
+    controller = get_throttle_controller()
+    max_attempts = max(1, int(policy.max_attempts))
+    max_throttled = max(max_attempts, int(policy.max_throttled_attempts))
 
     last_exc: Exception | None = None
-    for attempt in range(1, max(1, int(policy.max_attempts)) + 1):
-        try:
-            return fn()
-        except Exception as e:  # noqa: BLE001
-            mapped = _map_botocore_error(
-                operation=operation,
-                table_name=table_name,
-                key=key,
-                exc=e,
-            )
-            last_exc = mapped
-
-            # Never retry validation/conflict errors.
-            if not getattr(mapped, "retryable", False):
-                raise mapped
-
-            if attempt >= policy.max_attempts:
-                raise mapped
-
-            _sleep_backoff(policy, attempt)
+    attempt = 0
+    with instrument_call(operation, table_name=table_name, index_name=index_name) as rec:
+        while attempt < max_throttled:
+            attempt += 1
+            rec.attempts = attempt
+            if controller is not None:
+                controller.acquire()
+            try:
+                result = fn()
+            except Exception as e:  # noqa: BLE001
+                mapped = _map_botocore_error(
+                    operation=operation,
+                    table_name=table_name,
+                    key=key,
+                    exc=e,
+                )
+                last_exc = mapped
+                throttled = _is_throttle(e)
+                if throttled:
+                    rec.throttles += 1
+                paced = controller is not None and throttled
+                if controller is not None and paced:
+                    controller.on_throttle()
+
+                # Never retry validation/conflict errors.
+                if not getattr(mapped, "retryable", False):
+                    raise mapped
+
+                if attempt >= (max_throttled if paced else max_attempts):
+                    raise mapped
+
+                _sleep_backoff(policy, attempt)
+                continue
+
+            if controller is not None:
+                controller.on_success()
+            rec.response = result
+            return result
 
     # Defensive fallback.
     if isinstance(last_exc, DdbError):
         raise last_exc
     raise DdbInternal(message="DynamoDB request failed", operation=operation, table_name=table_name, key=key)
-
-
-
-
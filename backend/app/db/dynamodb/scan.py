@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+"""
+Parallel segmented Scan for backfills and maintenance jobs.
+
+`DynamoTable.parallel_scan` splits the table into `total_segments` Scan segments
+and walks them on a worker pool, handing each page to the caller's
+`process(items)` (called concurrently from several threads):
+
+- Rate limiting: `max_rcu_per_s` caps the combined read rate of all workers,
+  using the ConsumedCapacity reported for each page (estimated from the
+  response size when capacity reporting is off). Throttling errors are still
+  paced by the shared controller in `throttle.py`.
+- Checkpoints: with a `ScanCheckpoint`, each segment's LastEvaluatedKey is
+  saved after its page has been processed, so an interrupted run resumes where
+  every segment stopped instead of starting over. Pages are processed at least
+  once: `process` must be idempotent.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from boto3.dynamodb.conditions import Key
+
+from app.db.dynamodb.instrumentation import in_current_context
+from app.observability.logging import get_logger
+
+log = get_logger("ddb_scan")
+
+CHECKPOINT_PK_PREFIX = "SCANCKPT#"
+MAX_SEGMENTS = 1000
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class RcuRateLimiter:
+    """Shared read-capacity budget: callers charge what a page cost and wait off any debt."""
+
+    def __init__(
+        self,
+        rcu_per_s: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = max(0.1, float(rcu_per_s))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.rate  # one second of burst
+        self._last = clock()
+        self.waited_s = 0.0
+
+    def charge(self, units: float) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= max(0.0, float(units))
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited_s += wait
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class ScanCheckpoint:
+    """
+    Per-segment progress of a named scan, stored as items in a DynamoDB table
+    (pk `SCANCKPT#<name>`, one sk per segment). `parallel_scan` skips these
+    items when they show up in the scan itself.
+    """
+
+    def __init__(self, table: Any, name: str):
+        n = str(name or "").strip()
+        if not n:
+            raise ValueError("checkpoint name is required")
+        self.table = table
+        self.name = n
+
+    @property
+    def pk(self) -> str:
+        return f"{CHECKPOINT_PK_PREFIX}{self.name}"
+
+    def load(self, total_segments: int) -> dict[int, dict[str, Any]]:
+        states: dict[int, dict[str, Any]] = {}
+        for it in self.table.query_iter(key_condition_expression=Key("pk").eq(self.pk), scan_index_forward=True):
+            if int(it.get("totalSegments") or 0) != int(total_segments):
+                raise ValueError(
+                    f"scan checkpoint {self.name!r} was written with totalSegments={it.get('totalSegments')}; "
+                    f"resume with the same segment count or clear it"
+                )
+            states[int(it["segment"])] = it
+        return states
+
+    def save(
+        self,
+        segment: int,
+        total_segments: int,
+        *,
+        last_key: dict[str, Any] | None,
+        scanned: int,
+        matched: int,
+    ) -> None:
+        item: dict[str, Any] = {
+            "pk": self.pk,
+            "sk": f"SEGMENT#{int(segment):05d}",
+            "entityType": "ScanCheckpoint",
+            "name": self.name,
+            "segment": int(segment),
+            "totalSegments": int(total_segments),
+            "done": last_key is None,
+            "scanned": int(scanned),
+            "matched": int(matched),
+            "updatedAt": _now_iso(),
+        }
+        if last_key is not None:
+            item["lastKey"] = last_key
+        self.table.put_item(item=item)
+
+    def clear(self) -> int:
+        n = 0
+        for it in list(self.table.query_iter(key_condition_expression=Key("pk").eq(self.pk))):
+            self.table.delete_item(key={"pk": it["pk"], "sk": it["sk"]})
+            n += 1
+        return n
+
+
+class _Totals:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.scanned = 0
+        self.matched = 0
+        self.rcu = 0.0
+        self.resumed = 0
+        self.skipped = 0
+
+
+def run_parallel_scan(
+    table: Any,
+    process: Callable[[list[dict[str, Any]]], None],
+    *,
+    total_segments: int,
+    max_workers: int | None,
+    filter_expression: Any | None,
+    projection: list[str] | None,
+    page_size: int,
+    max_rcu_per_s: float | None,
+    checkpoint: ScanCheckpoint | None,
+) -> dict[str, Any]:
+    segs = max(1, min(MAX_SEGMENTS, int(total_segments or 1)))
+    workers = max(1, min(segs, int(max_workers or min(segs, 16))))
+    states = checkpoint.load(segs) if checkpoint is not None else {}
+    limiter = RcuRateLimiter(max_rcu_per_s) if max_rcu_per_s else None
+    stop = threading.Event()
+    totals = _Totals()
+    t0 = time.perf_counter()
+
+    def _segment(seg: int) -> None:
+        st = states.get(seg) or {}
+        if st.get("done"):
+            with totals.lock:
+                totals.skipped += 1
+            return
+        lek = st.get("lastKey") or None
+        scanned = int(st.get("scanned") or 0)
+        matched = int(st.get("matched") or 0)
+        if lek is not None:
+            with totals.lock:
+                totals.resumed += 1
+        while not stop.is_set():
+            page = table.scan_page_raw(
+                segment=seg,
+                total_segments=segs,
+                filter_expression=filter_expression,
+                projection=projection,
+                limit=page_size,
+                exclusive_start_key=lek,
+            )
+            if limiter is not None:
+                limiter.charge(page.consumed_capacity)
+            items = [it for it in page.items if not str(it.get("pk") or "").startswith(CHECKPOINT_PK_PREFIX)]
+            if items:
+                process(items)
+            lek = page.last_evaluated_key
+            scanned += page.scanned_count
+            matched += len(items)
+            with totals.lock:
+                totals.pages += 1
+                totals.scanned += page.scanned_count
+                totals.matched += len(items)
+                totals.rcu += page.consumed_capacity
+            if checkpoint is not None:
+                checkpoint.save(seg, segs, last_key=lek, scanned=scanned, matched=matched)
+            if lek is None:
+                return
+
+    error: BaseException | None = None
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ddb-scan") as pool:
+        futures = [pool.submit(in_current_context(_segment), s) for s in range(segs)]
+        try:
+            for f in as_completed(futures):
+                exc = f.exception()
+                if exc is not None and error is None:
+                    error = exc
+                    stop.set()
+        except BaseException:
+            # Ctrl-C: let in-flight pages finish (and checkpoint) before exiting.
+            stop.set()
+            raise
+
+    out = {
+        "segments": segs,
+        "workers": workers,
+        "pages": totals.pages,
+        "scanned": totals.scanned,
+        "matched": totals.matched,
+        "consumedRcu": round(totals.rcu, 2),
+        "resumedSegments": totals.resumed,
+        "skippedSegments": totals.skipped,
+        "rateLimitWaitS": round(limiter.waited_s, 3) if limiter is not None else 0.0,
+        "elapsedS": round(time.perf_counter() - t0, 3),
+        "checkpoint": checkpoint.name if checkpoint is not None else None,
+    }
+    if error is not None:
+        log.warning("ddb_parallel_scan_failed", **out, error=str(error))
+        raise error
+    log.info("ddb_parallel_scan_done", table=getattr(table, "table_name", None), **out)
+    return out
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+"""
+Write-sharded GSI partitions (type indexes such as TYPE#RFP, TYPE#AGENT_EVENT,
+OUTBOX#PENDING).
+
+A base partition key can be spread over N partitions via `DDB_GSI_SHARDS`
+(e.g. "TYPE#AGENT_EVENT=8,SCRAPEDRFP_SOURCE#*=4"). Items are assigned by a stable
+hash of their table key, so an item never moves between shards on update. Shard
+0 is the unsuffixed base key, which means existing items stay readable as soon
+as sharding is enabled; `reshard` rebalances them (and rescues items after the
+shard count is lowered).
+
+Reads scatter one Query per shard in parallel and k-way merge the results on the
+sort key. Cursors track each shard exactly, so pages are in global sort order and
+never skip or repeat items, including with filter expressions.
+"""
+
+import heapq
+import itertools
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator
+
+from boto3.dynamodb.conditions import Key
+
+from app.db.dynamodb.errors import DdbConflict
+from app.db.dynamodb.instrumentation import in_current_context
+from app.db.dynamodb.pagination import decode_next_token, encode_next_token
+from app.db.dynamodb.table import Page
+from app.observability.logging import get_logger
+
+log = get_logger("ddb_sharding")
+
+MAX_SHARDS = 64
+
+_CONFIG_LOCK = threading.Lock()
+_CONFIG: tuple[str, dict[str, int]] | None = None
+_POOL: ThreadPoolExecutor | None = None
+
+
+def _parse_shards(raw: str) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for part in str(raw or "").split(","):
+        name, _, n = part.rpartition("=")
+        try:
+            if name.strip() and n.strip():
+                out[name.strip()] = max(1, min(MAX_SHARDS, int(n)))
+        except ValueError:
+            continue
+    return out
+
+
+def _config() -> dict[str, int]:
+    global _CONFIG
+    from app.settings import settings
+
+    raw = str(settings.ddb_gsi_shards or "")
+    cfg = _CONFIG
+    if cfg is None or cfg[0] != raw:
+        with _CONFIG_LOCK:
+            cfg = (raw, _parse_shards(raw))
+            _CONFIG = cfg
+    return cfg[1]
+
+
+def shard_count(base_pk: str) -> int:
+    """Configured shards for a base partition key ("PREFIX#*" entries match by prefix)."""
+    cfg = _config()
+    if not cfg:
+        return 1
+    if base_pk in cfg:
+        return cfg[base_pk]
+    for name, n in cfg.items():
+        if name.endswith("*") and base_pk.startswith(name[:-1]):
+            return n
+    return 1
+
+
+def _shard_name(base_pk: str, i: int) -> str:
+    return base_pk if i == 0 else f"{base_pk}#SHARD#{i}"
+
+
+def shard_pk(base_pk: str, key: dict[str, Any]) -> str:
+    """GSI partition key for the item with table key `key` ({"pk", "sk"})."""
+    n = shard_count(base_pk)
+    if n <= 1:
+        return base_pk
+    h = zlib.crc32(f"{key.get('pk')}|{key.get('sk')}".encode("utf-8"))
+    return _shard_name(base_pk, h % n)
+
+
+def shard_pks(base_pk: str, *, count: int | None = None) -> list[str]:
+    n = count if count is not None else shard_count(base_pk)
+    return [_shard_name(base_pk, i) for i in range(max(1, n))]
+
+
+class _Desc:
+    __slots__ = ("v",)
+
+    def __init__(self, v: tuple[str, str, str]):
+        self.v = v
+
+    def __lt__(self, other: "_Desc") -> bool:
+        return other.v < self.v
+
+
+class _Shard:
+    __slots__ = ("pk", "start", "next", "has_more", "buf", "pos")
+
+    def __init__(self, pk: str, start: dict[str, Any]):
+        self.pk = pk
+        self.start = start  # cursor the current buffer was read from ({} = beginning)
+        self.next: dict[str, Any] | None = start
+        self.has_more = True
+        self.buf: list[dict[str, Any]] = []
+        self.pos = 0
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _CONFIG_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ddb-shard")
+    return _POOL
+
+
+def _cursor_state(lek: dict[str, Any] | None, base_pk: str) -> dict[str, dict[str, Any]]:
+    if not lek:
+        return {pk: {} for pk in shard_pks(base_pk)}
+    state = lek.get("_sh")
+    if isinstance(state, dict):
+        return {str(k): (v if isinstance(v, dict) else {}) for k, v in state.items()}
+    # Cursor from before sharding was enabled: it points into the base (shard 0) partition.
+    out: dict[str, dict[str, Any]] = {pk: {} for pk in shard_pks(base_pk)}
+    out[base_pk] = lek
+    return out
+
+
+def query_sharded_page(
+    table: Any,
+    *,
+    base_pk: str,
+    sk_condition: Any | None = None,
+    index_name: str = "GSI1",
+    pk_attr: str = "gsi1pk",
+    sk_attr: str = "gsi1sk",
+    limit: int = 50,
+    scan_index_forward: bool = False,
+    filter_expression: Any | None = None,
+    next_token: str | None = None,
+    max_queries: int | None = None,
+) -> Page:
+    """
+    One page across every shard of `base_pk`, in sort-key order.
+
+    With a single shard this is a plain `table.query_page` (same cursors). A page
+    can come back short with a nextToken when `max_queries` is hit (heavily
+    filtered reads); callers already treat nextToken as the only end signal.
+    """
+    lim = max(1, min(500, int(limit or 50)))
+
+    def _cond(pk: str) -> Any:
+        cond = Key(pk_attr).eq(pk)
+        return cond & sk_condition if sk_condition is not None else cond
+
+    lek = decode_next_token(next_token) if next_token else None
+    if shard_count(base_pk) <= 1 and "_sh" not in (lek or {}):
+        items, out_lek = table.query_page_raw(
+            index_name=index_name,
+            key_condition_expression=_cond(base_pk),
+            scan_index_forward=scan_index_forward,
+            filter_expression=filter_expression,
+            limit=lim,
+            exclusive_start_key=lek,
+        )
+        return Page(items=items, next_token=encode_next_token(out_lek))
+
+    shards = [_Shard(pk, start) for pk, start in _cursor_state(lek, base_pk).items()]
+    budget = max_queries if max_queries is not None else 4 * max(1, len(shards))
+
+    def _sort_key(it: dict[str, Any]) -> Any:
+        v = (str(it.get(sk_attr) or ""), str(it.get("pk") or ""), str(it.get("sk") or ""))
+        return v if scan_index_forward else _Desc(v)
+
+    def _fetch(s: _Shard, want: int) -> None:
+        items, lek = table.query_page_raw(
+            index_name=index_name,
+            key_condition_expression=_cond(s.pk),
+            scan_index_forward=scan_index_forward,
+            filter_expression=filter_expression,
+            limit=want,
+            exclusive_start_key=s.next or None,
+        )
+        s.start = s.next or {}
+        s.buf = items
+        s.pos = 0
+        s.next = lek
+        s.has_more = lek is not None
+
+    out: list[dict[str, Any]] = []
+    heap: list[tuple[Any, int]] = []
+    queries = 0
+    while len(out) < lim:
+        # A shard with an empty buffer may still hold the smallest item: refill before merging.
+        need = [s for s in shards if s.pos >= len(s.buf) and s.has_more]
+        if need:
+            if queries + len(need) > budget:
+                break
+            want = lim - len(out)
+            if len(need) == 1:
+                _fetch(need[0], want)
+            else:
+                list(_pool().map(in_current_context(lambda s: _fetch(s, want)), need))
+            queries += len(need)
+            for s in need:
+                if s.buf:
+                    heapq.heappush(heap, (_sort_key(s.buf[0]), shards.index(s)))
+            continue
+        if not heap:
+            break
+        _, i = heapq.heappop(heap)
+        s = shards[i]
+        out.append(s.buf[s.pos])
+        s.pos += 1
+        if s.pos < len(s.buf):
+            heapq.heappush(heap, (_sort_key(s.buf[s.pos]), i))
+
+    state: dict[str, dict[str, Any]] = {}
+    for s in shards:
+        if s.pos < len(s.buf):
+            if s.pos == 0:
+                state[s.pk] = s.start
+            else:
+                state[s.pk] = _item_key(s.buf[s.pos - 1], pk_attr, sk_attr)
+        elif s.has_more:
+            state[s.pk] = s.next or {}
+    return Page(items=out, next_token=encode_next_token({"_sh": state}) if state else None)
+
+
+def _item_key(it: dict[str, Any], pk_attr: str, sk_attr: str) -> dict[str, Any]:
+    return {k: it[k] for k in ("pk", "sk", pk_attr, sk_attr) if k in it}
+
+
+def iter_sharded(
+    table: Any,
+    *,
+    base_pk: str,
+    sk_condition: Any | None = None,
+    index_name: str = "GSI1",
+    pk_attr: str = "gsi1pk",
+    sk_attr: str = "gsi1sk",
+    scan_index_forward: bool = False,
+    filter_expression: Any | None = None,
+    page_size: int = 200,
+    max_items: int | None = None,
+    prefetch: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """
+    Every item across the shards of `base_pk` in sort-key order, read lazily
+    with `DynamoTable.query_iter` per shard (no cursor encryption). Pair with
+    `cursor_after` when the position must be handed back to a client.
+    """
+    def _iter(pk: str, limit: int | None) -> Iterator[dict[str, Any]]:
+        cond = Key(pk_attr).eq(pk)
+        return table.query_iter(
+            index_name=index_name,
+            key_condition_expression=cond & sk_condition if sk_condition is not None else cond,
+            scan_index_forward=scan_index_forward,
+            filter_expression=filter_expression,
+            page_size=page_size,
+            max_items=limit,
+            prefetch=prefetch,
+        )
+
+    pks = shard_pks(base_pk)
+    if len(pks) == 1:
+        yield from _iter(base_pk, max_items)
+        return
+    merged = heapq.merge(
+        *(_iter(pk, max_items) for pk in pks),
+        key=lambda it: (str(it.get(sk_attr) or ""), str(it.get("pk") or ""), str(it.get("sk") or "")),
+        reverse=not scan_index_forward,
+    )
+    yield from (merged if max_items is None else itertools.islice(merged, max(0, int(max_items))))
+
+
+def cursor_after(
+    base_pk: str, consumed: Iterable[dict[str, Any]], *, pk_attr: str = "gsi1pk", sk_attr: str = "gsi1sk"
+) -> str | None:
+    """
+    `query_sharded_page` cursor positioned after `consumed`: every item read so
+    far from the start of a listing, in order (e.g. from `iter_sharded`).
+    """
+    last: dict[str, dict[str, Any]] = {}
+    for it in consumed:
+        last[str(it.get(pk_attr) or base_pk)] = it
+    if not last:
+        return None
+    pks = shard_pks(base_pk)
+    if len(pks) == 1 and set(last) == {base_pk}:
+        return encode_next_token(_item_key(last[base_pk], pk_attr, sk_attr))
+    state: dict[str, dict[str, Any]] = {pk: {} for pk in pks}
+    for pk, it in last.items():
+        state[pk] = _item_key(it, pk_attr, sk_attr)
+    return encode_next_token({"_sh": state})
+
+
+def reshard(
+    table: Any,
+    *,
+    base_pk: str,
+    scan_shards: int = MAX_SHARDS,
+    index_name: str = "GSI1",
+    pk_attr: str = "gsi1pk",
+    page_size: int = 200,
+) -> dict[str, int]:
+    """
+    Move every item indexed under `base_pk` (any shard up to `scan_shards`) to the
+    shard its key hashes to under the current configuration. Idempotent; items
+    updated concurrently are skipped (their writer already used the current shard).
+    """
+    scanned = moved = skipped = 0
+    for src in shard_pks(base_pk, count=max(1, min(MAX_SHARDS, int(scan_shards)))):
+        for it in table.query_iter(
+            index_name=index_name,
+            key_condition_expression=Key(pk_attr).eq(src),
+            scan_index_forward=True,
+            page_size=page_size,
+        ):
+            scanned += 1
+            key = {"pk": it["pk"], "sk": it["sk"]}
+            dst = shard_pk(base_pk, key)
+            if dst == src:
+                continue
+            try:
+                table.update_item(
+                    key=key,
+                    update_expression="SET #g = :dst",
+                    expression_attribute_names={"#g": pk_attr},
+                    expression_attribute_values={":dst": dst, ":src": src},
+                    condition_expression="#g = :src",
+                    return_values="NONE",
+                )
+                moved += 1
+            except DdbConflict:
+                skipped += 1
+    log.info("gsi_reshard_done", base_pk=base_pk, scanned=scanned, moved=moved, skipped=skipped)
+    return {"scanned": scanned, "moved": moved, "skipped": skipped}
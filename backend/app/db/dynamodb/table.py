@@ -1,17 +1,38 @@
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
-from boto3.dynamodb.types import TypeSerializer
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 
+from app.db.dynamodb import codec
 from app.db.dynamodb.client import dynamodb_client, table_resource
 from app.db.dynamodb.errors import DdbInternal, DdbNotFound
+from app.db.dynamodb.instrumentation import consumed_capacity_mode, in_current_context, response_figures
 from app.db.dynamodb.pagination import decode_next_token, encode_next_token
 from app.db.dynamodb.retry import RetryPolicy, ddb_call
+from app.db.dynamodb.scan import ScanCheckpoint, run_parallel_scan
+from app.db.dynamodb.throttle import get_throttle_controller
 
 
 _serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+_PREFETCH_LOCK = threading.Lock()
+_PREFETCH_POOL: ThreadPoolExecutor | None = None
+
+
+def _prefetch_pool() -> ThreadPoolExecutor:
+    global _PREFETCH_POOL
+    if _PREFETCH_POOL is None:
+        with _PREFETCH_LOCK:
+            if _PREFETCH_POOL is None:
+                _PREFETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ddb-prefetch")
+    return _PREFETCH_POOL
 
 
 def _serialize_item(item: dict[str, Any]) -> dict[str, Any]:
@@ -19,26 +40,108 @@ def _serialize_item(item: dict[str, Any]) -> dict[str, Any]:
     return {k: _serializer.serialize(v) for k, v in item.items()}
 
 
+def _deserialize_item(item: dict[str, Any]) -> dict[str, Any]:
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
+
+
+def _with_capacity(kwargs: dict[str, Any]) -> dict[str, Any]:
+    # Ask for ConsumedCapacity so the instrumentation can attribute RCU/WCU per request.
+    mode = consumed_capacity_mode()
+    if mode:
+        kwargs["ReturnConsumedCapacity"] = mode
+    return kwargs
+
+
+def _build_expressions(kwargs: dict[str, Any]) -> dict[str, Any]:
+    # What the resource layer does for Key()/Attr() conditions, for the low-level client.
+    builder = ConditionExpressionBuilder()
+    names: dict[str, str] = dict(kwargs.get("ExpressionAttributeNames") or {})
+    values: dict[str, Any] = dict(kwargs.get("ExpressionAttributeValues") or {})
+    for field, is_key in (("KeyConditionExpression", True), ("FilterExpression", False)):
+        cond = kwargs.get(field)
+        if isinstance(cond, ConditionBase):
+            built = builder.build_expression(cond, is_key_condition=is_key)
+            kwargs[field] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+    if names:
+        kwargs["ExpressionAttributeNames"] = names
+    if values:
+        kwargs["ExpressionAttributeValues"] = values
+    return kwargs
+
+
 @dataclass(slots=True)
 class Page:
     items: list[dict[str, Any]]
     next_token: str | None
 
 
+@dataclass(slots=True)
+class ScanPage:
+    items: list[dict[str, Any]]
+    last_evaluated_key: dict[str, Any] | None
+    scanned_count: int
+    consumed_capacity: float
+
+
 class DynamoTable:
+    """
+    Thin wrapper over one table. Two backends with the same Python-side API:
+
+    - `resource` (default): boto3 resource layer; numbers come back as Decimal.
+    - `client` (`DDB_TABLE_BACKEND=client`): low-level client with the cached
+      codec in `codec.py`; numbers come back as int/float and floats may be
+      written directly. Cheaper to decode for large items and list endpoints.
+    """
+
+    _fast = False
+
     def __init__(self, *, table_name: str):
+        from app.settings import settings
+
         self.table_name = str(table_name)
         self._table = table_resource(self.table_name)
         self._client = dynamodb_client()
+        self._fast = str(settings.ddb_table_backend or "").strip().lower() == "client"
+
+    # --- fast path (low-level client) helpers ---
+
+    def _ser(self, item: dict[str, Any]) -> dict[str, Any]:
+        return codec.serialize_item(item) if self._fast else _serialize_item(item)
+
+    def _deser(self, item: dict[str, Any]) -> dict[str, Any]:
+        return codec.deserialize_item(item) if self._fast else _deserialize_item(item)
+
+    def _client_request(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Resource-layer request kwargs -> low-level client shape."""
+        out = {"TableName": self.table_name, **kwargs}
+        for field in ("Key", "Item", "ExpressionAttributeValues", "ExclusiveStartKey"):
+            if out.get(field) is not None:
+                out[field] = codec.serialize_item(out[field])
+        return out
+
+    def _client_response(self, resp: dict[str, Any]) -> dict[str, Any]:
+        """Low-level client response -> resource-layer shape (Python values)."""
+        out = dict(resp)
+        for field in ("Item", "Attributes", "LastEvaluatedKey"):
+            if out.get(field) is not None:
+                out[field] = codec.deserialize_item(out[field])
+        if out.get("Items") is not None:
+            out["Items"] = [codec.deserialize_item(it) for it in out["Items"]]
+        return out
 
     # --- basic operations ---
 
     def get_item(self, *, key: dict[str, Any]) -> dict[str, Any] | None:
         def _op():
-            resp = self._table.get_item(Key=key)
-            return resp.get("Item")
+            kwargs = _with_capacity({"Key": key})
+            if self._fast:
+                return self._client.get_item(**self._client_request(kwargs))
+            return self._table.get_item(**kwargs)
 
-        return ddb_call("GetItem", _op, table_name=self.table_name, key=key)
+        resp = ddb_call("GetItem", _op, table_name=self.table_name, key=key)
+        return self._client_response(resp).get("Item") if self._fast else resp.get("Item")
 
     def get_required(self, *, key: dict[str, Any], message: str = "Item not found") -> dict[str, Any]:
         item = self.get_item(key=key)
@@ -62,7 +165,9 @@ class DynamoTable:
                 kwargs["ExpressionAttributeNames"] = expression_attribute_names
             if expression_attribute_values:
                 kwargs["ExpressionAttributeValues"] = expression_attribute_values
-            return self._table.put_item(**kwargs)
+            if self._fast:
+                return self._client_response(self._client.put_item(**self._client_request(_with_capacity(kwargs))))
+            return self._table.put_item(**_with_capacity(kwargs))
 
         return ddb_call("PutItem", _op, table_name=self.table_name)
 
@@ -82,7 +187,9 @@ class DynamoTable:
                 kwargs["ExpressionAttributeNames"] = expression_attribute_names
             if expression_attribute_values:
                 kwargs["ExpressionAttributeValues"] = expression_attribute_values
-            return self._table.delete_item(**kwargs)
+            if self._fast:
+                return self._client_response(self._client.delete_item(**self._client_request(_with_capacity(kwargs))))
+            return self._table.delete_item(**_with_capacity(kwargs))
 
         return ddb_call("DeleteItem", _op, table_name=self.table_name, key=key)
 
@@ -107,10 +214,59 @@ class DynamoTable:
                 kwargs["ExpressionAttributeNames"] = expression_attribute_names
             if condition_expression:
                 kwargs["ConditionExpression"] = condition_expression
-            resp = self._table.update_item(**kwargs)
-            return resp.get("Attributes")
-
-        return ddb_call("UpdateItem", _op, table_name=self.table_name, key=key)
+            if self._fast:
+                return self._client.update_item(**self._client_request(_with_capacity(kwargs)))
+            return self._table.update_item(**_with_capacity(kwargs))
+
+        resp = ddb_call("UpdateItem", _op, table_name=self.table_name, key=key)
+        return self._client_response(resp).get("Attributes") if self._fast else resp.get("Attributes")
+
+    def batch_get_items(self, *, keys: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Fetch many items by key (BatchGetItem, 100 keys per call).
+
+        Unprocessed keys are retried with backoff. Missing items are omitted and
+        results are NOT in request order; callers should index by key.
+        """
+        out: list[dict[str, Any]] = []
+        uniq: list[dict[str, Any]] = []
+        seen: set[tuple[tuple[str, str], ...]] = set()
+        for k in keys:
+            sig = tuple(sorted((str(a), str(b)) for a, b in k.items()))
+            if sig not in seen:
+                seen.add(sig)
+                uniq.append(k)
+
+        for i in range(0, len(uniq), 100):
+            pending = [_serialize_item(k) for k in uniq[i : i + 100]]
+            attempt = 0
+            while pending:
+
+                def _op(req_keys: list[dict[str, Any]] = pending):
+                    return self._client.batch_get_item(
+                        **_with_capacity({"RequestItems": {self.table_name: {"Keys": req_keys}}})
+                    )
+
+                resp = ddb_call("BatchGetItem", _op, table_name=self.table_name)
+                for raw in (resp.get("Responses") or {}).get(self.table_name) or []:
+                    out.append(self._deser(raw))
+                pending = ((resp.get("UnprocessedKeys") or {}).get(self.table_name) or {}).get("Keys") or []
+                if pending:
+                    attempt += 1
+                    if attempt > 8:
+                        raise DdbInternal(
+                            message="BatchGetItem left unprocessed keys",
+                            operation="BatchGetItem",
+                            table_name=self.table_name,
+                        )
+                    # Unprocessed keys mean the read was throttled: slow the shared rate
+                    # (the next ddb_call waits for a slot) or back off when it is off.
+                    controller = get_throttle_controller()
+                    if controller is not None:
+                        controller.on_throttle()
+                    else:
+                        time.sleep(min(1.0, 0.05 * (2**attempt)))
+        return out
 
     # --- query/pagination ---
 
@@ -124,8 +280,31 @@ class DynamoTable:
         filter_expression: Any | None = None,
         next_token: str | None = None,
     ) -> Page:
+        items, out_lek = self.query_page_raw(
+            key_condition_expression=key_condition_expression,
+            index_name=index_name,
+            limit=limit,
+            scan_index_forward=scan_index_forward,
+            filter_expression=filter_expression,
+            exclusive_start_key=decode_next_token(next_token) if next_token else None,
+        )
+        return Page(items=items, next_token=encode_next_token(out_lek))
+
+    def query_page_raw(
+        self,
+        *,
+        key_condition_expression: Any,
+        index_name: str | None = None,
+        limit: int = 50,
+        scan_index_forward: bool = False,
+        filter_expression: Any | None = None,
+        exclusive_start_key: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], dict[str, Any] | None]:
+        """
+        One Query page as (items, LastEvaluatedKey). For in-process paging only:
+        anything handed to clients must go through `query_page`'s opaque cursor.
+        """
         lim = max(1, min(500, int(limit or 50)))
-        lek = decode_next_token(next_token) if next_token else None
 
         def _op():
             kwargs: dict[str, Any] = {
@@ -138,14 +317,156 @@ class DynamoTable:
             if filter_expression is not None:
                 kwargs["FilterExpression"] = filter_expression
             # Important: only pass ExclusiveStartKey when present.
-            if isinstance(lek, dict) and lek:
-                kwargs["ExclusiveStartKey"] = lek
-            return self._table.query(**kwargs)
+            if isinstance(exclusive_start_key, dict) and exclusive_start_key:
+                kwargs["ExclusiveStartKey"] = exclusive_start_key
+            if self._fast:
+                return self._client.query(**self._client_request(_build_expressions(_with_capacity(kwargs))))
+            return self._table.query(**_with_capacity(kwargs))
+
+        resp = ddb_call("Query", _op, table_name=self.table_name, index_name=index_name)
+        if self._fast:
+            resp = self._client_response(resp)
+        return list(resp.get("Items") or []), resp.get("LastEvaluatedKey") or None
+
+    def query_iter(
+        self,
+        *,
+        key_condition_expression: Any,
+        index_name: str | None = None,
+        scan_index_forward: bool = False,
+        filter_expression: Any | None = None,
+        page_size: int = 200,
+        max_items: int | None = None,
+        prefetch: bool = False,
+        exclusive_start_key: dict[str, Any] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield matching items across pages, following LastEvaluatedKey internally.
+
+        - `max_items` stops after that many items; each Query asks only for what is
+          still needed, so a bounded read never fetches a page it will not use.
+        - `prefetch=True` requests the next page on a background thread while the
+          caller works through the current one.
+
+        Closing the generator early abandons any prefetched page.
+        """
+        remaining = None if max_items is None else max(0, int(max_items))
+        if remaining == 0:
+            return
+        size = max(1, min(500, int(page_size or 200)))
+
+        def _fetch(lek: dict[str, Any] | None, want: int) -> tuple[list[dict[str, Any]], dict[str, Any] | None]:
+            return self.query_page_raw(
+                key_condition_expression=key_condition_expression,
+                index_name=index_name,
+                limit=want,
+                scan_index_forward=scan_index_forward,
+                filter_expression=filter_expression,
+                exclusive_start_key=lek,
+            )
+
+        pending: Future | None = None
+        try:
+            items, lek = _fetch(exclusive_start_key, size if remaining is None else min(size, remaining))
+            while True:
+                if prefetch and lek:
+                    left = None if remaining is None else remaining - len(items)
+                    if left is None or left > 0:
+                        pending = _prefetch_pool().submit(in_current_context(_fetch), lek, size if left is None else min(size, left))
+                for it in items:
+                    yield it
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining <= 0:
+                            return
+                if not lek:
+                    return
+                if pending is not None:
+                    items, lek = pending.result()
+                    pending = None
+                else:
+                    items, lek = _fetch(lek, size if remaining is None else min(size, remaining))
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    # --- scan (maintenance only) ---
+
+    def scan_page_raw(
+        self,
+        *,
+        segment: int | None = None,
+        total_segments: int | None = None,
+        filter_expression: Any | None = None,
+        projection: Iterable[str] | None = None,
+        limit: int = 500,
+        exclusive_start_key: dict[str, Any] | None = None,
+    ) -> ScanPage:
+        """
+        One Scan page (optionally one segment of a parallel scan). `projection`
+        always includes pk/sk so callers can write back to what they read.
+        """
+        lim = max(1, min(1000, int(limit or 500)))
 
-        resp = ddb_call("Query", _op, table_name=self.table_name)
-        items = resp.get("Items") or []
-        out_lek = resp.get("LastEvaluatedKey")
-        return Page(items=items, next_token=encode_next_token(out_lek))
+        def _op():
+            kwargs: dict[str, Any] = {"Limit": lim}
+            if total_segments and int(total_segments) > 1:
+                kwargs["Segment"] = int(segment or 0)
+                kwargs["TotalSegments"] = int(total_segments)
+            if filter_expression is not None:
+                kwargs["FilterExpression"] = filter_expression
+            if projection:
+                names = list(dict.fromkeys(["pk", "sk", *projection]))
+                kwargs["ProjectionExpression"] = ", ".join(f"#p{i}" for i in range(len(names)))
+                kwargs["ExpressionAttributeNames"] = {f"#p{i}": n for i, n in enumerate(names)}
+            if isinstance(exclusive_start_key, dict) and exclusive_start_key:
+                kwargs["ExclusiveStartKey"] = exclusive_start_key
+            if self._fast:
+                return self._client.scan(**self._client_request(_build_expressions(_with_capacity(kwargs))))
+            return self._table.scan(**_with_capacity(kwargs))
+
+        resp = ddb_call("Scan", _op, table_name=self.table_name)
+        if self._fast:
+            resp = self._client_response(resp)
+        _, size, capacity = response_figures(resp)
+        if not resp.get("ConsumedCapacity"):
+            # Capacity reporting off: eventually consistent reads cost 0.5 RCU per 4 KB.
+            capacity = size / 8192.0
+        return ScanPage(
+            items=list(resp.get("Items") or []),
+            last_evaluated_key=resp.get("LastEvaluatedKey") or None,
+            scanned_count=int(resp.get("ScannedCount") or 0),
+            consumed_capacity=float(capacity),
+        )
+
+    def parallel_scan(
+        self,
+        process: Callable[[list[dict[str, Any]]], None],
+        *,
+        total_segments: int = 8,
+        max_workers: int | None = None,
+        filter_expression: Any | None = None,
+        projection: Iterable[str] | None = None,
+        page_size: int = 500,
+        max_rcu_per_s: float | None = None,
+        checkpoint: ScanCheckpoint | None = None,
+    ) -> dict[str, Any]:
+        """
+        Walk the whole table with a segmented parallel Scan, calling
+        `process(items)` per page from worker threads (see `scan.py`). Returns
+        run totals; re-raises the first error after in-flight pages finish.
+        """
+        return run_parallel_scan(
+            self,
+            process,
+            total_segments=total_segments,
+            max_workers=max_workers,
+            filter_expression=filter_expression,
+            projection=list(projection) if projection else None,
+            page_size=page_size,
+            max_rcu_per_s=max_rcu_per_s,
+            checkpoint=checkpoint,
+        )
 
     # --- transactions ---
 
@@ -170,7 +491,7 @@ class DynamoTable:
             return {"ok": True}
 
         def _op():
-            return self._client.transact_write_items(TransactItems=items)
+            return self._client.transact_write_items(**_with_capacity({"TransactItems": items}))
 
         # transaction conflicts are mapped retryable by retry layer.
         return ddb_call(
@@ -192,14 +513,14 @@ class DynamoTable:
     ) -> dict[str, Any]:
         out: dict[str, Any] = {
             "TableName": self.table_name,
-            "Item": _serialize_item(item),
+            "Item": self._ser(item),
         }
         if condition_expression:
             out["ConditionExpression"] = condition_expression
         if expression_attribute_names:
             out["ExpressionAttributeNames"] = expression_attribute_names
         if expression_attribute_values:
-            out["ExpressionAttributeValues"] = _serialize_item(expression_attribute_values)
+            out["ExpressionAttributeValues"] = self._ser(expression_attribute_values)
         return out
 
     def tx_delete(
@@ -212,14 +533,14 @@ class DynamoTable:
     ) -> dict[str, Any]:
         out: dict[str, Any] = {
             "TableName": self.table_name,
-            "Key": _serialize_item(key),
+            "Key": self._ser(key),
         }
         if condition_expression:
             out["ConditionExpression"] = condition_expression
         if expression_attribute_names:
             out["ExpressionAttributeNames"] = expression_attribute_names
         if expression_attribute_values:
-            out["ExpressionAttributeValues"] = _serialize_item(expression_attribute_values)
+            out["ExpressionAttributeValues"] = self._ser(expression_attribute_values)
         return out
 
     def tx_update(
@@ -233,9 +554,9 @@ class DynamoTable:
     ) -> dict[str, Any]:
         out: dict[str, Any] = {
             "TableName": self.table_name,
-            "Key": _serialize_item(key),
+            "Key": self._ser(key),
             "UpdateExpression": update_expression,
-            "ExpressionAttributeValues": _serialize_item(expression_attribute_values),
+            "ExpressionAttributeValues": self._ser(expression_attribute_values),
         }
         if expression_attribute_names:
             out["ExpressionAttributeNames"] = expression_attribute_names
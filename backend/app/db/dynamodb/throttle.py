@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+"""
+Process-wide adaptive rate control for DynamoDB calls.
+
+Every `ddb_call` (any thread) takes a slot from one shared controller before
+sending a request and reports the outcome:
+
+- Until the first throttle the controller is transparent (no limiting).
+- A throttling error cuts the permitted rate multiplicatively (from the measured
+  send rate the first time). Throttles reported within `cooldown_s` of a cut
+  belong to the same burst and don't cut again, so N threads failing together
+  count once.
+- Each second of throttle-free traffic adds `increase_per_s` to the rate; once it
+  is back at `max_rate`, limiting switches off again.
+
+While limiting, each waiting caller reserves its own future slot (token bucket
+that may go into debt), so retries are spread at the permitted rate instead of
+firing in lockstep after identical sleeps.
+"""
+
+import threading
+import time
+from typing import Any, Callable
+
+from app.observability.logging import get_logger
+
+log = get_logger("ddb_throttle")
+
+THROTTLE_CODES = frozenset(
+    {
+        "ProvisionedThroughputExceededException",
+        "ThrottlingException",
+        "RequestLimitExceeded",
+    }
+)
+
+
+class AdaptiveRateController:
+    def __init__(
+        self,
+        *,
+        min_rate: float = 5.0,
+        max_rate: float = 2000.0,
+        increase_per_s: float = 25.0,
+        decrease_factor: float = 0.5,
+        cooldown_s: float = 1.0,
+        max_wait_s: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.min_rate = max(0.1, float(min_rate))
+        self.max_rate = max(self.min_rate, float(max_rate))
+        self.increase_per_s = max(0.0, float(increase_per_s))
+        self.decrease_factor = min(0.95, max(0.05, float(decrease_factor)))
+        self.cooldown_s = max(0.0, float(cooldown_s))
+        self.max_wait_s = max(0.0, float(max_wait_s))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        now = clock()
+        self.limiting = False
+        self.rate = self.max_rate
+        self._tokens = 0.0
+        self._last_refill = now
+        self._last_decrease = float("-inf")
+        self._last_increase = now
+        # Send-rate measurement (smoothed over ~0.5s windows).
+        self._window_start = now
+        self._window_count = 0
+        self._measured = 0.0
+
+        self.requests = 0
+        self.throttles = 0
+        self.decreases = 0
+        self.waiting = 0
+        self.delayed = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    # --- internals (lock held) ---
+
+    def _measure(self, now: float) -> None:
+        self._window_count += 1
+        dt = now - self._window_start
+        if dt >= 0.5:
+            inst = self._window_count / dt
+            self._measured = inst if self._measured == 0.0 else 0.7 * self._measured + 0.3 * inst
+            self._window_start = now
+            self._window_count = 0
+
+    def _refill(self, now: float) -> None:
+        dt = max(0.0, now - self._last_refill)
+        self._last_refill = now
+        # Burst capacity of one second at the current rate.
+        self._tokens = min(max(1.0, self.rate), self._tokens + dt * self.rate)
+
+    # --- public API ---
+
+    def acquire(self) -> float:
+        """Block until this caller may send; returns the time waited (seconds)."""
+        with self._lock:
+            now = self._clock()
+            self.requests += 1
+            self._measure(now)
+            if not self.limiting:
+                return 0.0
+            self._refill(now)
+            self._tokens -= 1.0
+            if self._tokens >= 0.0:
+                return 0.0
+            wait = min(self.max_wait_s, -self._tokens / self.rate)
+            self.waiting += 1
+        try:
+            self._sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+                self.delayed += 1
+                self.wait_total_s += wait
+                self.wait_max_s = max(self.wait_max_s, wait)
+        return wait
+
+    def on_success(self) -> None:
+        with self._lock:
+            if not self.limiting:
+                return
+            now = self._clock()
+            dt = min(1.0, max(0.0, now - self._last_increase))
+            self._last_increase = now
+            self.rate = min(self.max_rate, self.rate + self.increase_per_s * dt)
+            if self.rate >= self.max_rate:
+                self.limiting = False
+                self._tokens = 0.0
+                log.info("ddb_throttle_recovered", rate=self.rate)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self.throttles += 1
+            if self.limiting and now - self._last_decrease < self.cooldown_s:
+                return
+            base = self.rate if self.limiting else min(self.max_rate, self._measured or self.rate)
+            self.rate = max(self.min_rate, base * self.decrease_factor)
+            if not self.limiting:
+                self._tokens = 0.0
+                self._last_refill = now
+            self.limiting = True
+            self._last_decrease = now
+            self._last_increase = now
+            self.decreases += 1
+            rate = self.rate
+        log.warning("ddb_throttle_rate_decreased", rate=round(rate, 2))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "limiting": self.limiting,
+                "permittedRate": round(self.rate, 2) if self.limiting else None,
+                "measuredRate": round(self._measured, 2),
+                "requests": self.requests,
+                "throttles": self.throttles,
+                "decreases": self.decreases,
+                "waiting": self.waiting,
+                "delayed": self.delayed,
+                "avgQueueWaitMs": round(1000 * self.wait_total_s / self.delayed, 2) if self.delayed else 0.0,
+                "maxQueueWaitMs": round(1000 * self.wait_max_s, 2),
+            }
+
+
+_LOCK = threading.Lock()
+_CONTROLLER: AdaptiveRateController | None = None
+_CONTROLLER_SET = False
+
+
+def get_throttle_controller() -> AdaptiveRateController | None:
+    """Process singleton from settings; None when adaptive throttling is disabled."""
+    global _CONTROLLER, _CONTROLLER_SET
+    if _CONTROLLER_SET:
+        return _CONTROLLER
+    with _LOCK:
+        if not _CONTROLLER_SET:
+            from app.settings import settings
+
+            _CONTROLLER = (
+                AdaptiveRateController(
+                    min_rate=settings.ddb_throttle_min_rate,
+                    max_rate=settings.ddb_throttle_max_rate,
+                    increase_per_s=settings.ddb_throttle_increase_per_s,
+                )
+                if settings.ddb_adaptive_throttle
+                else None
+            )
+            _CONTROLLER_SET = True
+    return _CONTROLLER
+
+
+def set_throttle_controller(controller: AdaptiveRateController | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _CONTROLLER, _CONTROLLER_SET
+    with _LOCK:
+        _CONTROLLER = controller
+        _CONTROLLER_SET = controller is not None
+
+
+def throttle_stats() -> dict[str, Any]:
+    c = get_throttle_controller()
+    return c.stats() if c is not None else {"enabled": False}
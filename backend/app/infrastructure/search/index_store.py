@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+"""
+Persistence backends for the search index.
+
+Documents are hashed into a fixed number of shards. Each backend exposes a
+cheap per-shard version so processes can detect changes and reload only the
+shards that moved:
+
+- `MemoryIndexStore`: process-local, for tests and single-instance dev.
+- `S3IndexStore`: one gzipped JSON object per shard in the assets bucket,
+  updated read-modify-write with `IfMatch` on the ETag (the ETag is the version).
+- `DynamoIndexStore`: one compressed item per document under
+  `SEARCHIDX#<shard>` in the main table plus a `HEAD` item whose counter is
+  bumped (ADD) on every write.
+
+Writes return `(prev_version, new_version)` so the caller can tell whether its
+loaded copy of the shard is still current after its own write.
+"""
+
+import gzip
+import json
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Iterable
+
+from app.infrastructure.search.text_index import IndexedDoc
+
+Versions = dict[int, str]
+WriteResult = tuple[str | None, str | None]
+
+
+def shard_for(doc_id: str, shard_count: int) -> int:
+    return zlib.crc32(str(doc_id).encode("utf-8")) % max(1, int(shard_count))
+
+
+def _group_by_shard(docs: Iterable[IndexedDoc], shard_count: int) -> dict[int, list[IndexedDoc]]:
+    out: dict[int, list[IndexedDoc]] = {i: [] for i in range(shard_count)}
+    for d in docs:
+        out[shard_for(d.doc_id, shard_count)].append(d)
+    return out
+
+
+class IndexStore(ABC):
+    shard_count: int
+
+    @abstractmethod
+    def shard_versions(self) -> Versions: ...
+
+    @abstractmethod
+    def load_shard(self, shard: int) -> tuple[list[IndexedDoc], str | None]: ...
+
+    @abstractmethod
+    def put(self, doc: IndexedDoc) -> WriteResult: ...
+
+    @abstractmethod
+    def delete(self, doc_id: str) -> WriteResult: ...
+
+    @abstractmethod
+    def replace_all(self, docs: Iterable[IndexedDoc]) -> None:
+        """Bulk rebuild: afterwards the store holds exactly `docs` and `is_built()` is True."""
+
+    @abstractmethod
+    def is_built(self) -> bool:
+        """False until a full rebuild has completed (incremental writes alone don't count)."""
+
+
+class MemoryIndexStore(IndexStore):
+    def __init__(self, *, shard_count: int = 16):
+        self.shard_count = max(1, int(shard_count))
+        self._shards: dict[int, dict[str, dict[str, Any]]] = {i: {} for i in range(self.shard_count)}
+        self._versions: dict[int, int] = {i: 0 for i in range(self.shard_count)}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def shard_versions(self) -> Versions:
+        with self._lock:
+            return {i: str(v) for i, v in self._versions.items()}
+
+    def load_shard(self, shard: int) -> tuple[list[IndexedDoc], str | None]:
+        with self._lock:
+            docs = [IndexedDoc.from_dict(d) for d in self._shards[shard].values()]
+            return docs, str(self._versions[shard])
+
+    def _bump(self, shard: int) -> WriteResult:
+        prev = self._versions[shard]
+        self._versions[shard] = prev + 1
+        return str(prev), str(prev + 1)
+
+    def put(self, doc: IndexedDoc) -> WriteResult:
+        shard = shard_for(doc.doc_id, self.shard_count)
+        with self._lock:
+            self._shards[shard][doc.doc_id] = doc.to_dict()
+            return self._bump(shard)
+
+    def delete(self, doc_id: str) -> WriteResult:
+        shard = shard_for(doc_id, self.shard_count)
+        with self._lock:
+            self._shards[shard].pop(doc_id, None)
+            return self._bump(shard)
+
+    def replace_all(self, docs: Iterable[IndexedDoc]) -> None:
+        grouped = _group_by_shard(docs, self.shard_count)
+        with self._lock:
+            for shard, items in grouped.items():
+                self._shards[shard] = {d.doc_id: d.to_dict() for d in items}
+                self._bump(shard)
+            self._built = True
+
+    def is_built(self) -> bool:
+        return self._built
+
+
+def _is_precondition_failure(e: Exception) -> bool:
+    resp = getattr(e, "response", None)
+    code = str(((resp or {}).get("Error") or {}).get("Code") or "") if isinstance(resp, dict) else ""
+    return code in ("PreconditionFailed", "ConditionalRequestConflict", "412", "409")
+
+
+class S3IndexStore(IndexStore):
+    def __init__(self, *, shard_count: int = 32, prefix: str = "search-index/v1/", max_attempts: int = 8):
+        self.shard_count = max(1, int(shard_count))
+        self.prefix = prefix if prefix.endswith("/") else prefix + "/"
+        self.max_attempts = max(1, int(max_attempts))
+
+    def _key(self, shard: int) -> str:
+        return f"{self.prefix}shard-{int(shard):04d}.json.gz"
+
+    @staticmethod
+    def _encode(docs: dict[str, dict[str, Any]]) -> bytes:
+        raw = json.dumps({"v": 1, "docs": docs}, separators=(",", ":"), ensure_ascii=False)
+        return gzip.compress(raw.encode("utf-8"), compresslevel=6)
+
+    @staticmethod
+    def _decode(data: bytes) -> dict[str, dict[str, Any]]:
+        if not data:
+            return {}
+        obj = json.loads(gzip.decompress(data).decode("utf-8"))
+        docs = obj.get("docs") if isinstance(obj, dict) else None
+        return docs if isinstance(docs, dict) else {}
+
+    def _read(self, shard: int) -> tuple[dict[str, dict[str, Any]], str | None]:
+        from app.infrastructure.storage.s3_assets import get_object_bytes_with_etag
+
+        got = get_object_bytes_with_etag(key=self._key(shard), max_bytes=512 * 1024 * 1024)
+        if got is None:
+            return {}, None
+        data, etag = got
+        return self._decode(data), etag
+
+    def shard_versions(self) -> Versions:
+        from app.infrastructure.storage.s3_assets import list_object_etags
+
+        etags = list_object_etags(prefix=self.prefix)
+        out: Versions = {}
+        for shard in range(self.shard_count):
+            tag = etags.get(self._key(shard))
+            if tag:
+                out[shard] = tag
+        return out
+
+    def load_shard(self, shard: int) -> tuple[list[IndexedDoc], str | None]:
+        docs, etag = self._read(shard)
+        return [IndexedDoc.from_dict(d) for d in docs.values()], etag
+
+    def _mutate(self, shard: int, fn: Any) -> WriteResult:
+        from app.infrastructure.storage.s3_assets import put_object_bytes
+
+        for attempt in range(self.max_attempts):
+            docs, etag = self._read(shard)
+            fn(docs)
+            try:
+                resp = put_object_bytes(
+                    key=self._key(shard),
+                    data=self._encode(docs),
+                    content_type="application/gzip",
+                    if_match=etag,
+                    if_none_match=None if etag else "*",
+                )
+            except Exception as e:
+                if not _is_precondition_failure(e) or attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(min(1.0, 0.05 * (2**attempt)))
+                continue
+            return etag, str(resp.get("ETag") or "") or None
+        raise RuntimeError("unreachable")
+
+    def put(self, doc: IndexedDoc) -> WriteResult:
+        d = doc.to_dict()
+        return self._mutate(shard_for(doc.doc_id, self.shard_count), lambda docs: docs.__setitem__(doc.doc_id, d))
+
+    def delete(self, doc_id: str) -> WriteResult:
+        return self._mutate(shard_for(doc_id, self.shard_count), lambda docs: docs.pop(doc_id, None))
+
+    def replace_all(self, docs: Iterable[IndexedDoc]) -> None:
+        from app.infrastructure.storage.s3_assets import put_object_bytes
+
+        for shard, items in _group_by_shard(docs, self.shard_count).items():
+            put_object_bytes(
+                key=self._key(shard),
+                data=self._encode({d.doc_id: d.to_dict() for d in items}),
+                content_type="application/gzip",
+            )
+        put_object_bytes(key=f"{self.prefix}_built", data=b"1", content_type="text/plain")
+
+    def is_built(self) -> bool:
+        from app.infrastructure.storage.s3_assets import get_object_bytes_with_etag
+
+        return get_object_bytes_with_etag(key=f"{self.prefix}_built", max_bytes=1024) is not None
+
+
+class DynamoIndexStore(IndexStore):
+    def __init__(self, *, shard_count: int = 32, table: Any | None = None):
+        self.shard_count = max(1, int(shard_count))
+        self._table = table
+
+    @property
+    def table(self) -> Any:
+        if self._table is None:
+            from app.db.dynamodb.table import get_main_table
+
+            self._table = get_main_table()
+        return self._table
+
+    @staticmethod
+    def _pk(shard: int) -> str:
+        return f"SEARCHIDX#{int(shard):04d}"
+
+    @staticmethod
+    def _encode(doc: IndexedDoc) -> bytes:
+        return zlib.compress(json.dumps(doc.to_dict(), separators=(",", ":")).encode("utf-8"), 6)
+
+    @staticmethod
+    def _decode(raw: Any) -> IndexedDoc:
+        data = bytes(getattr(raw, "value", raw) or b"")
+        return IndexedDoc.from_dict(json.loads(zlib.decompress(data).decode("utf-8")))
+
+    def shard_versions(self) -> Versions:
+        keys = [{"pk": self._pk(s), "sk": "HEAD"} for s in range(self.shard_count)]
+        out: Versions = {}
+        for it in self.table.batch_get_items(keys=keys):
+            pk = str(it.get("pk") or "")
+            try:
+                shard = int(pk.split("#", 1)[1])
+            except Exception:
+                continue
+            out[shard] = str(int(it.get("version") or 0))
+        return out
+
+    def _query_docs(self, shard: int) -> list[dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+
+        return list(
+            self.table.query_iter(
+                key_condition_expression=Key("pk").eq(self._pk(shard)) & Key("sk").begins_with("DOC#"),
+                scan_index_forward=True,
+                page_size=500,
+                prefetch=True,
+            )
+        )
+
+    def load_shard(self, shard: int) -> tuple[list[IndexedDoc], str | None]:
+        # Read the version first: a write racing this load bumps it again, so the
+        # next refresh reloads instead of trusting a half-seen shard.
+        head = self.table.get_item(key={"pk": self._pk(shard), "sk": "HEAD"})
+        version = str(int(head.get("version") or 0)) if head else None
+        return [self._decode(it.get("d")) for it in self._query_docs(shard) if it.get("d") is not None], version
+
+    def _bump(self, shard: int) -> WriteResult:
+        upd = self.table.update_item(
+            key={"pk": self._pk(shard), "sk": "HEAD"},
+            update_expression="ADD #v :one SET updatedAt = :u",
+            expression_attribute_names={"#v": "version"},
+            expression_attribute_values={":one": 1, ":u": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())},
+            return_values="UPDATED_NEW",
+        )
+        new = int((upd or {}).get("version") or 0)
+        return str(new - 1) if new > 1 else None, str(new)
+
+    def put(self, doc: IndexedDoc) -> WriteResult:
+        shard = shard_for(doc.doc_id, self.shard_count)
+        self.table.put_item(
+            item={
+                "pk": self._pk(shard),
+                "sk": f"DOC#{doc.doc_id}",
+                "entityType": "SearchIndexDoc",
+                "d": self._encode(doc),
+            }
+        )
+        return self._bump(shard)
+
+    def delete(self, doc_id: str) -> WriteResult:
+        shard = shard_for(doc_id, self.shard_count)
+        self.table.delete_item(key={"pk": self._pk(shard), "sk": f"DOC#{doc_id}"})
+        return self._bump(shard)
+
+    def replace_all(self, docs: Iterable[IndexedDoc]) -> None:
+        for shard, items in _group_by_shard(docs, self.shard_count).items():
+            keep = {d.doc_id for d in items}
+            for d in items:
+                self.table.put_item(
+                    item={
+                        "pk": self._pk(shard),
+                        "sk": f"DOC#{d.doc_id}",
+                        "entityType": "SearchIndexDoc",
+                        "d": self._encode(d),
+                    }
+                )
+            for it in self._query_docs(shard):
+                sk = str(it.get("sk") or "")
+                if sk.startswith("DOC#") and sk[4:] not in keep:
+                    self.table.delete_item(key={"pk": self._pk(shard), "sk": sk})
+            self._bump(shard)
+        self.table.put_item(item={"pk": "SEARCHIDX#META", "sk": "BUILT", "entityType": "SearchIndexMeta"})
+
+    def is_built(self) -> bool:
+        return self.table.get_item(key={"pk": "SEARCHIDX#META", "sk": "BUILT"}) is not None
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+"""
+BM25 index over the paragraphs of one document (an RFP's rawText).
+
+Pure data structure: no I/O. Paragraphs are stored as character offsets into
+the source text, so the index never duplicates the text itself. Term
+frequencies live in compact unsigned-int arrays:
+
+- `offsets`: start, end pairs
+- `lengths`: term count per paragraph
+- per-term postings: interleaved paragraph id, tf
+
+A query only touches the postings of its own terms. Each paragraph's BM25
+length norm is precomputed once per index, so a top-k query costs a few
+array passes no matter how long the document is.
+
+`to_bytes` / `from_bytes` give the gzipped form that `rfp_paragraphs`
+persists next to the document.
+"""
+
+import base64
+import gzip
+import heapq
+import json
+import re
+import sys
+from array import array
+from collections import Counter
+from typing import Any
+
+from app.infrastructure.search.text_index import Bm25Params, bm25_idf, tokenize
+
+FORMAT_VERSION = 1
+
+# Same paragraph boundaries as `app.ai.context.split_paragraphs` (blank lines).
+_PARA_SEP_RE = re.compile(r"\n\s*\n")
+
+
+def _u32(values: Any = ()) -> array:
+    return array("I", values)
+
+
+def _pack(a: array) -> str:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return base64.b64encode(a.tobytes()).decode("ascii")
+
+
+def _unpack(s: str) -> array:
+    a = _u32()
+    a.frombytes(base64.b64decode(s))
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+
+def paragraph_spans(text: str, *, max_paragraphs: int = 4000) -> list[tuple[int, int]]:
+    """(start, end) of each non-blank paragraph, whitespace-trimmed, in document order."""
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    n = len(text)
+    while pos <= n and len(spans) < max_paragraphs:
+        m = _PARA_SEP_RE.search(text, pos)
+        end = m.start() if m else n
+        s, e = pos, end
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if e > s:
+            spans.append((s, e))
+        if not m:
+            break
+        pos = m.end()
+    return spans
+
+
+class ParagraphIndex:
+    def __init__(
+        self,
+        *,
+        offsets: array,
+        lengths: array,
+        postings: dict[str, array],
+        params: Bm25Params | None = None,
+    ):
+        self.offsets = offsets
+        self.lengths = lengths
+        self.postings = postings
+        self.params = params or Bm25Params()
+        n = len(lengths)
+        avgdl = (sum(lengths) / n) if n else 1.0
+        k1, b = self.params.k1, self.params.b
+        c0 = k1 * (1.0 - b)
+        c1 = k1 * b / (avgdl or 1.0)
+        # Per-paragraph BM25 denominator term: k1 * (1 - b + b * len / avgdl).
+        self._norm = [c0 + c1 * ln for ln in lengths]
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    @classmethod
+    def build(cls, text: str, *, max_paragraphs: int = 4000, params: Bm25Params | None = None) -> "ParagraphIndex":
+        src = str(text or "")
+        offsets = _u32()
+        lengths = _u32()
+        acc: dict[str, array] = {}
+        for pid, (s, e) in enumerate(paragraph_spans(src, max_paragraphs=max_paragraphs)):
+            tf = Counter(tokenize(src[s:e]))
+            offsets.extend((s, e))
+            lengths.append(sum(tf.values()))
+            for term, c in tf.items():
+                plist = acc.get(term)
+                if plist is None:
+                    plist = acc[term] = _u32()
+                plist.extend((pid, c))
+        return cls(offsets=offsets, lengths=lengths, postings=acc, params=params)
+
+    def span(self, pid: int) -> tuple[int, int]:
+        return self.offsets[2 * pid], self.offsets[2 * pid + 1]
+
+    def top_k(self, query: str, k: int = 12) -> list[tuple[int, float]]:
+        """Best `k` paragraphs for `query` by BM25 as (paragraph id, score), best first."""
+        n = len(self.lengths)
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        if n == 0 or not terms or k <= 0:
+            return []
+        k1p1 = self.params.k1 + 1.0
+        norm = self._norm
+        scores: dict[int, float] = {}
+        get = scores.get
+        for term in terms:
+            plist = self.postings[term]
+            pids = plist[0::2]
+            tfs = plist[1::2]
+            w = bm25_idf(n, len(pids)) * k1p1
+            for pid, tf in zip(pids, tfs):
+                scores[pid] = get(pid, 0.0) + w * tf / (tf + norm[pid])
+        # Ties go to the earlier paragraph.
+        return heapq.nsmallest(int(k), scores.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    # --- persistence ---
+
+    def to_bytes(self) -> bytes:
+        payload = {
+            "v": FORMAT_VERSION,
+            "o": _pack(self.offsets),
+            "l": _pack(self.lengths),
+            "t": {term: _pack(plist) for term, plist in self.postings.items()},
+        }
+        return gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, *, params: Bm25Params | None = None) -> "ParagraphIndex | None":
+        """None for payloads of another format version."""
+        payload = json.loads(gzip.decompress(data).decode("utf-8"))
+        if not isinstance(payload, dict) or payload.get("v") != FORMAT_VERSION:
+            return None
+        return cls(
+            offsets=_unpack(payload["o"]),
+            lengths=_unpack(payload["l"]),
+            postings={str(t): _unpack(p) for t, p in (payload.get("t") or {}).items()},
+            params=params,
+        )
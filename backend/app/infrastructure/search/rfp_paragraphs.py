@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+"""
+Per-RFP paragraph indexes for prompt context retrieval.
+
+Each index is keyed by the SHA-256 of the RFP's rawText, so an edited
+rawText gets a fresh index and a stale one can never be used. Intake builds
+the index of a long rawText (over `RFP_PARAGRAPH_INDEX_MIN_TOKENS`) and stores
+it in the assets bucket (`ensure_paragraph_index`). Prompt builders then ask
+for an index only when the text doesn't fit their budget (`get_paragraph_index`),
+in this order:
+
+1. the process LRU
+2. the stored copy
+3. a build from the text, which is then stored
+
+Shorter texts are indexed on the fly, without the LRU or the store: the build
+is cheap and such texts rarely need retrieval at all. Storage is best-effort.
+A failed read or write only costs a rebuild.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any
+
+from cachetools import LRUCache
+
+from app.infrastructure.search.paragraph_index import ParagraphIndex
+from app.observability.logging import get_logger
+
+log = get_logger("rfp_paragraphs")
+
+_MAX_STORED_BYTES = 32 * 1024 * 1024
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(str(text or "").encode("utf-8")).hexdigest()
+
+
+class ParagraphIndexCache:
+    def __init__(self, *, max_entries: int = 64, store: bool = True):
+        self._lru: LRUCache[str, ParagraphIndex] = LRUCache(maxsize=max(1, int(max_entries)))
+        self._store = bool(store)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "storeHits": 0, "builds": 0, "storeWrites": 0, "storeErrors": 0}
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _store_enabled(self) -> bool:
+        from app.settings import settings
+
+        return self._store and bool((settings.assets_bucket_name or "").strip())
+
+    def _load(self, sha: str) -> ParagraphIndex | None:
+        if not self._store_enabled():
+            return None
+        from app.infrastructure.storage.s3_assets import get_object_bytes, make_rfp_paragraph_index_key_for_hash
+
+        try:
+            raw = get_object_bytes(key=make_rfp_paragraph_index_key_for_hash(sha256=sha), max_bytes=_MAX_STORED_BYTES)
+            return ParagraphIndex.from_bytes(raw) if raw else None
+        except Exception:
+            # Missing (never stored) or unreadable: rebuild.
+            return None
+
+    def _save(self, sha: str, index: ParagraphIndex) -> None:
+        if not self._store_enabled():
+            return
+        from app.infrastructure.storage.s3_assets import make_rfp_paragraph_index_key_for_hash, put_object_bytes
+
+        try:
+            put_object_bytes(
+                key=make_rfp_paragraph_index_key_for_hash(sha256=sha),
+                data=index.to_bytes(),
+                content_type="application/gzip",
+            )
+            self._bump("storeWrites")
+        except Exception as e:
+            self._bump("storeErrors")
+            log.warning("rfp_paragraph_index_put_failed", sha256=sha, error=str(e))
+
+    def _build(self, sha: str, text: str) -> ParagraphIndex:
+        t0 = time.perf_counter()
+        index = ParagraphIndex.build(text)
+        self._bump("builds")
+        log.info(
+            "rfp_paragraph_index_built",
+            sha256=sha,
+            paragraphs=len(index),
+            terms=len(index.postings),
+            ms=int((time.perf_counter() - t0) * 1000),
+        )
+        return index
+
+    def get(self, text: str) -> ParagraphIndex:
+        """Index for `text`: process cache, then the stored copy, then a fresh build (stored best-effort)."""
+        sha = text_sha256(text)
+        with self._lock:
+            index = self._lru.get(sha)
+        if index is not None:
+            self._bump("hits")
+            return index
+        index = self._load(sha)
+        if index is not None:
+            self._bump("storeHits")
+        else:
+            index = self._build(sha, text)
+            self._save(sha, index)
+        with self._lock:
+            self._lru[sha] = index
+        return index
+
+    def ensure(self, text: str) -> None:
+        """Build and store the index for `text` unless it is already cached (intake)."""
+        sha = text_sha256(text)
+        with self._lock:
+            if sha in self._lru:
+                return
+        index = self._build(sha, text)
+        self._save(sha, index)
+        with self._lock:
+            self._lru[sha] = index
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return dict(self._stats) | {
+                "entries": len(self._lru),
+                "maxEntries": int(self._lru.maxsize),
+                "store": self._store_enabled(),
+            }
+
+
+_LOCK = threading.Lock()
+_CACHE: ParagraphIndexCache | None = None
+
+
+def get_paragraph_index_cache() -> ParagraphIndexCache:
+    """Process singleton configured from settings."""
+    global _CACHE
+    if _CACHE is not None:
+        return _CACHE
+    with _LOCK:
+        if _CACHE is None:
+            from app.settings import settings
+
+            _CACHE = ParagraphIndexCache(
+                max_entries=settings.rfp_paragraph_index_cache_size,
+                store=settings.rfp_paragraph_index_store,
+            )
+    return _CACHE
+
+
+def set_paragraph_index_cache(cache: ParagraphIndexCache | None) -> None:
+    """Replace the process singleton (tests). `None` re-reads settings on next use."""
+    global _CACHE
+    with _LOCK:
+        _CACHE = cache
+
+
+def is_long_text(text: str) -> bool:
+    """True when `text` is over `RFP_PARAGRAPH_INDEX_MIN_TOKENS`, i.e. worth a shared, stored index."""
+    from app.ai.tokens import count_tokens
+    from app.settings import settings
+
+    min_tokens = int(settings.rfp_paragraph_index_min_tokens or 0)
+    # A token is at least one character: shorter strings need no count.
+    if len(text) <= min_tokens:
+        return False
+    return count_tokens(text, model=settings.openai_model_for("rfp_section_summary")) > min_tokens
+
+
+def get_paragraph_index(text: str) -> ParagraphIndex:
+    if not is_long_text(text):
+        return ParagraphIndex.build(text)
+    return get_paragraph_index_cache().get(text)
+
+
+def ensure_paragraph_index(text: str) -> None:
+    """Best-effort: intake must never fail on indexing. Only long texts are built and stored."""
+    try:
+        if is_long_text(text):
+            get_paragraph_index_cache().ensure(text)
+    except Exception as e:
+        log.warning("rfp_paragraph_index_failed", error=str(e))
+
+
+def paragraph_index_stats() -> dict[str, Any]:
+    return get_paragraph_index_cache().stats()
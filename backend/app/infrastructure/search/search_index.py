@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+"""
+Process-wide full-text search over RFPs and proposals.
+
+Repositories call `index_rfp` / `index_proposal` / `remove_document` after
+writes (best-effort: indexing failures never fail the write). Queries are
+served from an in-memory `InvertedIndex` that is loaded from the configured
+store and refreshed per shard when another process changes it.
+"""
+
+import threading
+import time
+from typing import Any, Iterable
+
+from app.db.dynamodb.offload import hydrate_attributes
+from app.infrastructure.search.index_store import (
+    DynamoIndexStore,
+    IndexStore,
+    MemoryIndexStore,
+    S3IndexStore,
+    shard_for,
+)
+from app.infrastructure.search.text_index import IndexedDoc, InvertedIndex, build_doc
+from app.observability.logging import get_logger
+
+log = get_logger("search_index")
+
+KINDS = ("rfp", "proposal")
+
+# Unique terms kept per document; bounds shard size for text-heavy RFPs.
+MAX_TERMS_PER_DOC = 1500
+
+
+def rfp_doc_id(rfp_id: str) -> str:
+    return f"rfp:{rfp_id}"
+
+
+def proposal_doc_id(proposal_id: str) -> str:
+    return f"proposal:{proposal_id}"
+
+
+def _as_text(v: Any, *, limit: int = 20_000) -> str:
+    # Flatten strings / lists / dicts (e.g. keyRequirements, section bodies) into text.
+    parts: list[str] = []
+    size = 0
+
+    def _walk(x: Any) -> None:
+        nonlocal size
+        if size >= limit:
+            return
+        if isinstance(x, str):
+            parts.append(x)
+            size += len(x)
+        elif isinstance(x, dict):
+            for y in x.values():
+                _walk(y)
+        elif isinstance(x, (list, tuple)):
+            for y in x:
+                _walk(y)
+
+    _walk(v)
+    return "\n".join(parts)[:limit]
+
+
+def build_rfp_doc(item: dict[str, Any], *, max_text_chars: int = 100_000) -> IndexedDoc | None:
+    rid = str(item.get("rfpId") or item.get("_id") or "").strip()
+    if not rid:
+        return None
+    item = hydrate_attributes(item, ("rawText",)) or item
+    return build_doc(
+        doc_id=rfp_doc_id(rid),
+        kind="rfp",
+        fields=[
+            (item.get("title"), 4),
+            (item.get("clientName"), 3),
+            (item.get("projectType"), 2),
+            (_as_text(item.get("keyRequirements")), 2),
+            (str(item.get("rawText") or "")[: max(0, int(max_text_chars))], 1),
+        ],
+        meta={
+            "rfpId": rid,
+            "title": item.get("title"),
+            "clientName": item.get("clientName"),
+            "projectType": item.get("projectType"),
+            "submissionDeadline": item.get("submissionDeadline"),
+        },
+        updated_at=item.get("updatedAt"),
+        max_terms=MAX_TERMS_PER_DOC,
+    )
+
+
+def build_proposal_doc(item: dict[str, Any], *, max_text_chars: int = 100_000) -> IndexedDoc | None:
+    pid = str(item.get("proposalId") or item.get("_id") or "").strip()
+    if not pid:
+        return None
+    item = hydrate_attributes(item, ("sections",)) or item
+    raw_sections = item.get("sections")
+    sections: dict[str, Any] = raw_sections if isinstance(raw_sections, dict) else {}
+    return build_doc(
+        doc_id=proposal_doc_id(pid),
+        kind="proposal",
+        fields=[
+            (item.get("title"), 4),
+            (" ".join(str(k) for k in sections.keys()), 2),
+            (_as_text(sections, limit=max(0, int(max_text_chars))), 1),
+        ],
+        meta={
+            "proposalId": pid,
+            "rfpId": item.get("rfpId"),
+            "title": item.get("title"),
+            "status": item.get("status"),
+        },
+        updated_at=item.get("updatedAt"),
+        max_terms=MAX_TERMS_PER_DOC,
+    )
+
+
+class SearchIndex:
+    """
+    In-memory index backed by an `IndexStore`.
+
+    The first query loads every shard; afterwards shard versions are polled at
+    most every `refresh_interval_s` and only changed shards are reloaded. Local
+    writes update the in-memory copy immediately.
+    """
+
+    def __init__(
+        self,
+        store: IndexStore,
+        *,
+        refresh_interval_s: float = 30.0,
+        bootstrap: Any | None = None,
+    ):
+        self.store = store
+        self.refresh_interval_s = max(0.0, float(refresh_interval_s))
+        # Called with this index on first load if the store was never fully built (backfill).
+        self._bootstrap = bootstrap
+        self.index = InvertedIndex()
+        self._versions: dict[int, str | None] = {}
+        self._shard_docs: dict[int, set[str]] = {}
+        self._loaded = False
+        # Sticky once True: a full rebuild has completed, so the index is authoritative.
+        self._built = False
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    # --- loading / refresh ---
+
+    def _load_shard_locked(self, shard: int) -> None:
+        docs, version = self.store.load_shard(shard)
+        for doc_id in self._shard_docs.get(shard, set()):
+            self.index.remove(doc_id)
+        for d in docs:
+            self.index.upsert(d)
+        self._shard_docs[shard] = {d.doc_id for d in docs}
+        self._versions[shard] = version
+
+    def ensure_fresh(self, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if self._loaded and not force and now - self._last_refresh < self.refresh_interval_s:
+            return
+        with self._lock:
+            if self._loaded and not force and time.monotonic() - self._last_refresh < self.refresh_interval_s:
+                return
+            t0 = time.perf_counter()
+            if not self._loaded:
+                for shard in range(self.store.shard_count):
+                    self._load_shard_locked(shard)
+                self._loaded = True
+                reloaded = self.store.shard_count
+            else:
+                versions = self.store.shard_versions()
+                changed = [s for s in range(self.store.shard_count) if versions.get(s) != self._versions.get(s)]
+                for shard in changed:
+                    self._load_shard_locked(shard)
+                reloaded = len(changed)
+            if not self._built:
+                self._built = self.store.is_built()
+            self._last_refresh = time.monotonic()
+            if reloaded:
+                log.info(
+                    "search_index_refreshed",
+                    shards=reloaded,
+                    docs=len(self.index),
+                    ms=int((time.perf_counter() - t0) * 1000),
+                )
+        if self._bootstrap is not None:
+            boot, self._bootstrap = self._bootstrap, None
+            if not self._built:
+                boot(self)
+
+    @property
+    def built(self) -> bool:
+        """Whether the store has had a full rebuild (as of the last refresh)."""
+        self.ensure_fresh()
+        return self._built
+
+    # --- writes ---
+
+    def _after_write(self, shard: int, prev: str | None, new: str | None) -> None:
+        # Only advance our version if nobody else wrote the shard in between;
+        # otherwise leave it stale so the next refresh reloads the shard.
+        if self._versions.get(shard) == prev:
+            self._versions[shard] = new
+
+    def upsert(self, doc: IndexedDoc) -> None:
+        prev, new = self.store.put(doc)
+        with self._lock:
+            if not self._loaded:
+                return
+            shard = shard_for(doc.doc_id, self.store.shard_count)
+            self.index.upsert(doc)
+            self._shard_docs.setdefault(shard, set()).add(doc.doc_id)
+            self._after_write(shard, prev, new)
+
+    def remove(self, doc_id: str) -> None:
+        prev, new = self.store.delete(doc_id)
+        with self._lock:
+            if not self._loaded:
+                return
+            shard = shard_for(doc_id, self.store.shard_count)
+            self.index.remove(doc_id)
+            self._shard_docs.get(shard, set()).discard(doc_id)
+            self._after_write(shard, prev, new)
+
+    def replace_all(self, docs: Iterable[IndexedDoc]) -> int:
+        items = list(docs)
+        self.store.replace_all(items)
+        self.ensure_fresh(force=True)
+        return len(items)
+
+    # --- queries ---
+
+    def search(
+        self,
+        query: str,
+        *,
+        kinds: Iterable[str] | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        self.ensure_fresh()
+        lim = max(1, min(100, int(limit or 20)))
+        off = max(0, int(offset or 0))
+        total, hits = self.index.search(query, kinds=kinds, limit=lim, offset=off)
+        return {
+            "query": query,
+            "total": total,
+            "limit": lim,
+            "offset": off,
+            "hits": [{"kind": h.kind, "score": h.score, **h.meta} for h in hits],
+        }
+
+
+def _iter_type_items(type_name: str) -> Iterable[dict[str, Any]]:
+    from app.db.dynamodb.sharding import iter_sharded
+    from app.db.dynamodb.table import get_main_table
+
+    yield from iter_sharded(get_main_table(), base_pk=f"TYPE#{type_name}", scan_index_forward=False, page_size=200, prefetch=True)
+
+
+def _max_text_chars() -> int:
+    from app.settings import settings
+
+    return int(settings.search_index_max_text_chars or 0)
+
+
+def rebuild_index(index: SearchIndex | None = None) -> int:
+    """Rebuild the whole index from the RFP and proposal GSI1 type indexes."""
+    idx = index or get_search_index()
+    if idx is None:
+        return 0
+    max_chars = _max_text_chars()
+    docs: list[IndexedDoc] = []
+    for it in _iter_type_items("RFP"):
+        d = build_rfp_doc(it, max_text_chars=max_chars)
+        if d:
+            docs.append(d)
+    for it in _iter_type_items("PROPOSAL"):
+        d = build_proposal_doc(it, max_text_chars=max_chars)
+        if d:
+            docs.append(d)
+    n = idx.replace_all(docs)
+    log.info("search_index_rebuilt", docs=n)
+    return n
+
+
+def _bootstrap(index: SearchIndex) -> None:
+    try:
+        rebuild_index(index)
+    except Exception as e:
+        log.warning("search_index_bootstrap_failed", error=str(e) or type(e).__name__)
+
+
+_INDEX: SearchIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def _make_store(backend: str, shards: int) -> IndexStore:
+    if backend == "s3":
+        return S3IndexStore(shard_count=shards)
+    if backend == "dynamodb":
+        return DynamoIndexStore(shard_count=shards)
+    return MemoryIndexStore(shard_count=shards)
+
+
+def get_search_index() -> SearchIndex | None:
+    """Process singleton; None when `SEARCH_INDEX_BACKEND=off`."""
+    global _INDEX
+    if _INDEX is not None:
+        return _INDEX
+    from app.settings import settings
+
+    backend = str(settings.search_index_backend or "dynamodb").strip().lower()
+    if backend == "off":
+        return None
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = SearchIndex(
+                _make_store(backend, int(settings.search_index_shards or 16)),
+                refresh_interval_s=float(settings.search_index_refresh_seconds),
+                bootstrap=_bootstrap if settings.search_index_bootstrap else None,
+            )
+        return _INDEX
+
+
+def set_search_index(index: SearchIndex | None) -> None:
+    """Replace the process singleton (tests, scripts)."""
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = index
+
+
+def _safe_write(op: str, fn: Any) -> None:
+    try:
+        idx = get_search_index()
+        if idx is not None:
+            fn(idx)
+    except Exception as e:
+        log.warning("search_index_write_failed", op=op, error=str(e) or type(e).__name__)
+
+
+def _upsert_built(build: Any, item: dict[str, Any]) -> Any:
+    # Build inside the `_safe_write` closure: a malformed item must not fail the repository write.
+    def _write(idx: SearchIndex) -> None:
+        doc = build(item, max_text_chars=_max_text_chars())
+        if doc:
+            idx.upsert(doc)
+
+    return _write
+
+
+def index_rfp(item: dict[str, Any] | None) -> None:
+    if not isinstance(item, dict):
+        return
+    _safe_write("index_rfp", _upsert_built(build_rfp_doc, item))
+
+
+def index_proposal(item: dict[str, Any] | None) -> None:
+    if not isinstance(item, dict):
+        return
+    _safe_write("index_proposal", _upsert_built(build_proposal_doc, item))
+
+
+def remove_document(doc_id: str) -> None:
+    _safe_write("remove", lambda idx: idx.remove(doc_id))
+
+
+def search(
+    query: str,
+    *,
+    kinds: Iterable[str] | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> dict[str, Any] | None:
+    """
+    Ranked search; None when the index is disabled or has never been fully
+    built (callers fall back to listing).
+    """
+    idx = get_search_index()
+    if idx is None or not idx.built:
+        return None
+    return idx.search(query, kinds=kinds, limit=limit, offset=offset)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+"""
+In-memory inverted index with BM25 ranking.
+
+Pure data structure: no I/O. Persistence lives in `index_store`, and the
+process-wide index (incremental updates, store refresh) in `search_index`.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "has",
+        "in",
+        "is",
+        "it",
+        "its",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "this",
+        "to",
+        "was",
+        "were",
+        "will",
+        "with",
+    }
+)
+
+
+def _normalize_term(t: str) -> str:
+    # Minimal plural folding so "services"/"service" and "proposals"/"proposal" match.
+    if len(t) > 4 and t.endswith("ies"):
+        return t[:-3] + "y"
+    if len(t) > 3 and t.endswith("s") and not t.endswith(("ss", "us", "is")):
+        return t[:-1]
+    return t
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords/1-char tokens, fold plurals."""
+    out: list[str] = []
+    for t in _TOKEN_RE.findall(str(text or "").lower()):
+        if len(t) < 2 or t in STOPWORDS:
+            continue
+        out.append(_normalize_term(t))
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class Bm25Params:
+    k1: float = 1.2
+    b: float = 0.75
+
+
+def bm25_idf(n_docs: int, df: int) -> float:
+    # BM25+ style idf that never goes negative for very common terms.
+    return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+@dataclass(slots=True)
+class IndexedDoc:
+    doc_id: str
+    kind: str
+    length: int
+    terms: dict[str, int]
+    meta: dict[str, Any] = field(default_factory=dict)
+    updated_at: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.doc_id,
+            "k": self.kind,
+            "l": self.length,
+            "t": self.terms,
+            "m": self.meta,
+            "u": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "IndexedDoc":
+        return cls(
+            doc_id=str(raw.get("id") or ""),
+            kind=str(raw.get("k") or ""),
+            length=int(raw.get("l") or 0),
+            terms={str(k): int(v) for k, v in (raw.get("t") or {}).items()},
+            meta=dict(raw.get("m") or {}),
+            updated_at=raw.get("u"),
+        )
+
+
+def build_doc(
+    *,
+    doc_id: str,
+    kind: str,
+    fields: Iterable[tuple[str | None, int]],
+    meta: dict[str, Any] | None = None,
+    updated_at: str | None = None,
+    max_terms: int = 2000,
+) -> IndexedDoc:
+    """
+    Build an index entry from `(text, weight)` pairs.
+
+    Weights boost fields by counting each occurrence `weight` times (a title hit
+    counts more than a body hit). Only the `max_terms` most frequent unique terms
+    are kept so one huge document can't bloat the postings.
+    """
+    tf: Counter[str] = Counter()
+    for text, weight in fields:
+        w = max(1, int(weight or 1))
+        for t in tokenize(text):
+            tf[t] += w
+    if len(tf) > max_terms:
+        tf = Counter(dict(tf.most_common(max_terms)))
+    return IndexedDoc(
+        doc_id=str(doc_id),
+        kind=str(kind),
+        length=sum(tf.values()),
+        terms=dict(tf),
+        meta=dict(meta or {}),
+        updated_at=updated_at,
+    )
+
+
+@dataclass(slots=True)
+class SearchHit:
+    doc_id: str
+    kind: str
+    score: float
+    meta: dict[str, Any]
+
+
+class InvertedIndex:
+    """
+    Thread-safe inverted index: term -> {doc_id: tf}.
+
+    Upserts replace the previous postings of the doc, so callers can re-index on
+    every update without tracking what changed.
+    """
+
+    def __init__(self, params: Bm25Params | None = None):
+        self.params = params or Bm25Params()
+        self._docs: dict[str, IndexedDoc] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._docs
+
+    def get(self, doc_id: str) -> IndexedDoc | None:
+        return self._docs.get(doc_id)
+
+    def upsert(self, doc: IndexedDoc) -> None:
+        with self._lock:
+            self._remove_locked(doc.doc_id)
+            self._docs[doc.doc_id] = doc
+            self._total_len += doc.length
+            for term, tf in doc.terms.items():
+                self._postings.setdefault(term, {})[doc.doc_id] = tf
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        old = self._docs.pop(doc_id, None)
+        if old is None:
+            return False
+        self._total_len -= old.length
+        for term in old.terms:
+            plist = self._postings.get(term)
+            if plist is None:
+                continue
+            plist.pop(doc_id, None)
+            if not plist:
+                del self._postings[term]
+        return True
+
+    def search(
+        self,
+        query: str,
+        *,
+        kinds: Iterable[str] | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[int, list[SearchHit]]:
+        """
+        Rank documents matching any query term by BM25.
+
+        Returns `(total_matches, hits[offset:offset+limit])`.
+        """
+        q_terms = list(dict.fromkeys(tokenize(query)))
+        lim = max(0, int(limit))
+        off = max(0, int(offset))
+        if not q_terms:
+            return 0, []
+        want = set(kinds) if kinds else None
+        k1 = self.params.k1
+        b = self.params.b
+
+        with self._lock:
+            n = len(self._docs)
+            if n == 0:
+                return 0, []
+            avgdl = (self._total_len / n) or 1.0
+            docs = self._docs
+            scores: dict[str, float] = {}
+            # Hoisted BM25 length normalization: k1 * (1 - b + b * len / avgdl) = c0 + c1 * len.
+            c0 = k1 * (1.0 - b)
+            c1 = k1 * b / avgdl
+            for term in q_terms:
+                plist = self._postings.get(term)
+                if not plist:
+                    continue
+                w = bm25_idf(n, len(plist)) * (k1 + 1.0)
+                get = scores.get
+                for doc_id, tf in plist.items():
+                    doc = docs[doc_id]
+                    if want is not None and doc.kind not in want:
+                        continue
+                    scores[doc_id] = get(doc_id, 0.0) + w * tf / (tf + c0 + c1 * doc.length)
+
+            total = len(scores)
+            # Ties broken by doc_id so pagination is stable across requests.
+            top = heapq.nsmallest(off + lim, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+            return total, [
+                SearchHit(doc_id=d, kind=self._docs[d].kind, score=round(s, 6), meta=self._docs[d].meta)
+                for d, s in top[off:]
+            ]
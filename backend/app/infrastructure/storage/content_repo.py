@@ -6,6 +6,7 @@ from typing import Any
 
 from boto3.dynamodb.conditions import Key
 
+from app.db.dynamodb.item_cache import cached_get_item, remember_item
 from app.db.dynamodb.table import get_main_table
 
 
@@ -43,20 +44,20 @@ def company_key(company_id: str) -> dict[str, str]:
 
 
 def get_company_by_company_id(company_id: str) -> dict[str, Any] | None:
-    item = get_main_table().get_item(key=company_key(company_id))
+    item = cached_get_item(get_main_table(), company_key(company_id))
     return _normalize(item, id_field="companyId")
 
 
 def list_companies(limit: int = 200) -> list[dict[str, Any]]:
-    pg = get_main_table().query_page(
+    items = get_main_table().query_iter(
         index_name="GSI1",
         key_condition_expression=Key("gsi1pk").eq(type_pk("COMPANY")),
         scan_index_forward=False,
-        limit=max(1, min(200, int(limit or 200))),
-        next_token=None,
+        page_size=500,
+        max_items=max(1, min(200, int(limit or 200))),
     )
     out: list[dict[str, Any]] = []
-    for it in pg.items or []:
+    for it in items:
         norm = _normalize(it, id_field="companyId")
         if norm:
             out.append(norm)
@@ -72,12 +73,13 @@ def upsert_company(company: dict[str, Any]) -> dict[str, Any]:
         "entityType": "Company",
         "companyId": company_id,
         "createdAt": created_at,
-        "updatedAt": now,
         **company,
+        "updatedAt": now,
         "gsi1pk": type_pk("COMPANY"),
         "gsi1sk": f"{now}#{company_id}",
     }
     get_main_table().put_item(item=item)
+    remember_item(item)
     return _normalize(item, id_field="companyId") or {}
 
 
@@ -88,20 +90,20 @@ def team_member_key(member_id: str) -> dict[str, str]:
 
 
 def get_team_member_by_id(member_id: str) -> dict[str, Any] | None:
-    item = get_main_table().get_item(key=team_member_key(member_id))
+    item = cached_get_item(get_main_table(), team_member_key(member_id))
     return _normalize(item, id_field="memberId")
 
 
 def list_team_members(limit: int = 200) -> list[dict[str, Any]]:
-    pg = get_main_table().query_page(
+    items = get_main_table().query_iter(
         index_name="GSI1",
         key_condition_expression=Key("gsi1pk").eq(type_pk("TEAM_MEMBER")),
         scan_index_forward=False,
-        limit=max(1, min(500, int(limit or 200))),
-        next_token=None,
+        page_size=500,
+        max_items=max(1, min(500, int(limit or 200))),
     )
     out: list[dict[str, Any]] = []
-    for it in pg.items or []:
+    for it in items:
         norm = _normalize(it, id_field="memberId")
         if norm:
             out.append(norm)
@@ -124,12 +126,13 @@ def upsert_team_member(member: dict[str, Any]) -> dict[str, Any]:
         "entityType": "TeamMember",
         "memberId": member_id,
         "createdAt": created_at,
-        "updatedAt": now,
         **member,
+        "updatedAt": now,
         "gsi1pk": type_pk("TEAM_MEMBER"),
         "gsi1sk": f"{now}#{member_id}",
     }
     get_main_table().put_item(item=item)
+    remember_item(item)
     return _normalize(item, id_field="memberId") or {}
 
 
@@ -140,15 +143,15 @@ def past_project_key(project_id: str) -> dict[str, str]:
 
 
 def list_past_projects(limit: int = 200) -> list[dict[str, Any]]:
-    pg = get_main_table().query_page(
+    items = get_main_table().query_iter(
         index_name="GSI1",
         key_condition_expression=Key("gsi1pk").eq(type_pk("PAST_PROJECT")),
         scan_index_forward=False,
-        limit=max(1, min(500, int(limit or 200))),
-        next_token=None,
+        page_size=500,
+        max_items=max(1, min(500, int(limit or 200))),
     )
     out: list[dict[str, Any]] = []
-    for it in pg.items or []:
+    for it in items:
         norm = _normalize(it, id_field="projectId")
         if norm:
             out.append(norm)
@@ -185,15 +188,15 @@ def project_reference_key(reference_id: str) -> dict[str, str]:
 
 
 def list_project_references(limit: int = 200) -> list[dict[str, Any]]:
-    pg = get_main_table().query_page(
+    items = get_main_table().query_iter(
         index_name="GSI1",
         key_condition_expression=Key("gsi1pk").eq(type_pk("PROJECT_REFERENCE")),
         scan_index_forward=False,
-        limit=max(1, min(500, int(limit or 200))),
-        next_token=None,
+        page_size=500,
+        max_items=max(1, min(500, int(limit or 200))),
     )
     out: list[dict[str, Any]] = []
-    for it in pg.items or []:
+    for it in items:
         norm = _normalize(it, id_field="referenceId")
         if norm:
             out.append(norm)
@@ -60,6 +60,36 @@ def make_rfp_upload_key_for_hash(*, sha256: str) -> str:
     return f"rfp/uploads/sha256/{s}.pdf"
 
 
+def make_pdf_text_cache_key_for_hash(*, sha256: str) -> str:
+    """
+    Deterministic key for cached extracted text of a PDF, keyed by the PDF's SHA-256.
+    """
+    s = str(sha256 or "").strip().lower()
+    if not re.fullmatch(r"[a-f0-9]{64}", s):
+        raise ValueError("Invalid sha256")
+    return f"rfp/text-cache/sha256/{s}.json"
+
+
+def make_rfp_paragraph_index_key_for_hash(*, sha256: str) -> str:
+    """
+    Deterministic key for an RFP's paragraph index, keyed by the SHA-256 of its rawText.
+    """
+    s = str(sha256 or "").strip().lower()
+    if not re.fullmatch(r"[a-f0-9]{64}", s):
+        raise ValueError("Invalid sha256")
+    return f"rfp/paragraph-index/sha256/{s}.json.gz"
+
+
+def make_ddb_blob_key(*, sha256: str) -> str:
+    """
+    Content-addressed key for a DynamoDB attribute stored out of line (gzipped JSON).
+    """
+    s = str(sha256 or "").strip().lower()
+    if not re.fullmatch(r"[a-f0-9]{64}", s):
+        raise ValueError("Invalid sha256")
+    return f"ddb-blobs/sha256/{s[:2]}/{s}.json.gz"
+
+
 @lru_cache(maxsize=1)
 def _s3_client():
     return boto3.client("s3", region_name=settings.aws_region)
@@ -121,14 +151,28 @@ def head_object(*, key: str) -> dict[str, Any]:
     return _s3_client().head_object(Bucket=bucket, Key=str(key))
 
 
-def put_object_bytes(*, key: str, data: bytes, content_type: str | None = None) -> dict[str, Any]:
+def put_object_bytes(
+    *,
+    key: str,
+    data: bytes,
+    content_type: str | None = None,
+    if_match: str | None = None,
+    if_none_match: str | None = None,
+) -> dict[str, Any]:
     """
     Upload bytes to S3 (assets bucket).
+
+    `if_match` (an ETag) / `if_none_match` ("*") make the write conditional; S3
+    rejects a lost race with a PreconditionFailed / ConditionalRequestConflict error.
     """
     bucket = get_assets_bucket_name()
     kwargs: dict[str, Any] = {"Bucket": bucket, "Key": str(key), "Body": data or b""}
     if content_type:
         kwargs["ContentType"] = str(content_type)
+    if if_match:
+        kwargs["IfMatch"] = str(if_match)
+    if if_none_match:
+        kwargs["IfNoneMatch"] = str(if_none_match)
     return _s3_client().put_object(**kwargs)
 
 
@@ -152,6 +196,44 @@ def get_object_bytes(*, key: str, max_bytes: int = 60 * 1024 * 1024) -> bytes:
     return data or b""
 
 
+def get_object_bytes_with_etag(*, key: str, max_bytes: int = 60 * 1024 * 1024) -> tuple[bytes, str] | None:
+    """
+    Download an object and its ETag in a single GET (None if the key doesn't exist).
+    """
+    bucket = get_assets_bucket_name()
+    try:
+        resp = _s3_client().get_object(Bucket=bucket, Key=str(key))
+    except _s3_client().exceptions.NoSuchKey:
+        return None
+    size = int(resp.get("ContentLength") or 0)
+    body = resp.get("Body")
+    if size > int(max_bytes):
+        if body:
+            body.close()
+        raise RuntimeError(f"Object too large ({size} bytes), max is {int(max_bytes)} bytes")
+    data = body.read() if body else b""
+    return data or b"", str(resp.get("ETag") or "")
+
+
+def list_object_etags(*, prefix: str) -> dict[str, str]:
+    """
+    Map every key under `prefix` to its ETag (follows pagination).
+    """
+    bucket = get_assets_bucket_name()
+    out: dict[str, str] = {}
+    kwargs: dict[str, Any] = {"Bucket": bucket, "Prefix": str(prefix)}
+    while True:
+        resp = _s3_client().list_objects_v2(**kwargs)
+        for it in resp.get("Contents") or []:
+            k = str(it.get("Key") or "")
+            if k:
+                out[k] = str(it.get("ETag") or "")
+        token = resp.get("NextContinuationToken")
+        if not resp.get("IsTruncated") or not token:
+            return out
+        kwargs["ContinuationToken"] = token
+
+
 def list_objects(
     *,
     prefix: str | None = None,
@@ -46,7 +46,9 @@ from app.routers.contracting import router as contracting_router
 from app.routers.contract_templates import router as contract_templates_router
 from app.routers.client_portal import router as client_portal_router
 from app.routers.agents import router as agents_router
+from app.routers.search import router as search_router
 from app.settings import settings
+from app.workers.job_engine import start_embedded_job_engine, stop_job_engine
 
 
 def create_app() -> FastAPI:
@@ -128,8 +130,13 @@ def create_app() -> FastAPI:
     app.include_router(contract_templates_router, prefix="/api")
     app.include_router(client_portal_router, prefix="/api")
     app.include_router(agents_router, prefix="/api/agents")
+    app.include_router(search_router, prefix="/api/search")
     # NOTE: opportunities/admin APIs intentionally removed from public surface during pruning.
 
+    # Embedded job engine: dispatch queued jobs from startup, not only after this process submits one.
+    app.add_event_handler("startup", start_embedded_job_engine)
+    app.add_event_handler("shutdown", stop_job_engine)
+
     # Instrument after routers/middleware are attached.
     instrument_app(app)
 
@@ -5,12 +5,14 @@ import time
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.db.dynamodb.instrumentation import begin_request_stats, end_request_stats
 from app.observability.logging import get_logger
 
 
 class AccessLogMiddleware(BaseHTTPMiddleware):
     """
-    Structured access logs (JSON) for every request.
+    Structured access logs (JSON) for every request, including the DynamoDB
+    round-trips and consumed capacity made on its behalf (`ddb_*` fields).
     """
 
     def __init__(self, app, *, exclude_paths: set[str] | None = None):
@@ -27,6 +29,7 @@ class AccessLogMiddleware(BaseHTTPMiddleware):
         method = request.method.upper()
         client = getattr(request, "client", None)
         client_host = getattr(client, "host", None) if client else None
+        ddb_stats, ddb_token = begin_request_stats()
 
         try:
             response = await call_next(request)
@@ -41,6 +44,7 @@ class AccessLogMiddleware(BaseHTTPMiddleware):
                 duration_ms=round(dur_ms, 2),
                 client_ip=client_host,
                 user_sub=str(user_sub) if user_sub else None,
+                **ddb_stats.log_fields(),
             )
             return response
         except Exception:
@@ -54,10 +58,8 @@ class AccessLogMiddleware(BaseHTTPMiddleware):
                 duration_ms=round(dur_ms, 2),
                 client_ip=client_host,
                 user_sub=str(user_sub) if user_sub else None,
+                **ddb_stats.log_fields(),
             )
             raise
-
-
-
-
-
+        finally:
+            end_request_stats(ddb_token)
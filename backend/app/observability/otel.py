@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import os
+from typing import TYPE_CHECKING, Any
 
 from fastapi import FastAPI
 
 from app.settings import Settings
 from app.observability.logging import get_logger
 
+if TYPE_CHECKING:
+    from opentelemetry.sdk.resources import Resource
+
 
 def _truthy(v: str | None) -> bool:
     return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
@@ -66,6 +70,34 @@ def configure_otel(settings: Settings) -> None:
         log.info("otel_configured", exporter="console")
 
     trace.set_tracer_provider(provider)
+    _configure_metrics(resource, endpoint, log)
+
+
+def _configure_metrics(resource: Resource, endpoint: str, log: Any) -> None:
+    """MeterProvider for app metrics (e.g. DynamoDB call latency/capacity); same exporter choice as traces."""
+    try:
+        from opentelemetry import metrics
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import (
+            ConsoleMetricExporter,
+            MetricExporter,
+            PeriodicExportingMetricReader,
+        )
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    except Exception:
+        log.warning("otel_metrics_disabled_missing_deps")
+        return
+
+    exporter: MetricExporter
+    if endpoint:
+        base = endpoint.rstrip("/")
+        if base.endswith("/v1/traces"):
+            base = base[: -len("/v1/traces")]
+        exporter = OTLPMetricExporter(endpoint=f"{base}/v1/metrics")
+    else:
+        exporter = ConsoleMetricExporter()
+    reader = PeriodicExportingMetricReader(exporter, export_interval_millis=60_000)
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[reader]))
 
 
 def instrument_app(app: FastAPI) -> None:
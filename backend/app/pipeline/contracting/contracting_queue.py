@@ -1,28 +1,65 @@
 from __future__ import annotations
 
 import json
-from functools import lru_cache
+from typing import Any
 
-import boto3
+from app.observability.logging import get_logger
+from app.workers.job_engine import PRIORITY_NORMAL, JobEngine, submit_job
 
-from app.settings import settings
+log = get_logger("contracting_queue")
 
 
-@lru_cache(maxsize=1)
-def _sqs():
-    return boto3.client("sqs", region_name=settings.aws_region)
+def _engine_job(job_id: str) -> tuple[dict[str, Any], dict[str, Any]]:
+    from app.workers.job_handlers import CONTRACTING_JOB_TYPE
+
+    jid = str(job_id or "").strip()
+    if not jid:
+        raise ValueError("job_id is required")
+    return {"jobId": jid}, {"priority": PRIORITY_NORMAL, "job_id": f"{CONTRACTING_JOB_TYPE}:{jid}"}
 
 
 def enqueue_contracting_job(*, job_id: str) -> None:
     """
-    Enqueue a contracting job id onto SQS for worker processing.
+    Enqueue a contracting job id on the job engine for the contracting worker.
     """
-    qurl = str(getattr(settings, "contracting_jobs_queue_url", "") or "").strip()
-    if not qurl:
-        raise RuntimeError("CONTRACTING_JOBS_QUEUE_URL is not set")
-    jid = str(job_id or "").strip()
-    if not jid:
-        raise ValueError("job_id is required")
-    body = json.dumps({"jobId": jid}, separators=(",", ":"))
-    _sqs().send_message(QueueUrl=qurl, MessageBody=body)
+    from app.workers.job_handlers import CONTRACTING_JOB_TYPE
+
+    payload, kwargs = _engine_job(job_id)
+    submit_job(CONTRACTING_JOB_TYPE, payload, **kwargs)
+
+
+def drain_legacy_queue(engine: JobEngine, *, queue_url: str, sqs: Any, wait_seconds: int = 10) -> int:
+    """
+    Move one batch of messages from the pre-engine SQS queue onto `engine`.
+
+    Each message's job id is enqueued (idempotent: the engine job id is derived
+    from it) and the message is deleted only after that succeeds, so a failure
+    leaves it for redelivery. Returns the number of messages received.
+    """
+    from app.workers.job_handlers import CONTRACTING_JOB_TYPE
 
+    resp = sqs.receive_message(
+        QueueUrl=queue_url,
+        MaxNumberOfMessages=10,
+        WaitTimeSeconds=max(0, min(20, int(wait_seconds))),
+    )
+    msgs = resp.get("Messages") or []
+    for m in msgs:
+        receipt = m.get("ReceiptHandle")
+        body = str(m.get("Body") or "")
+        try:
+            data = json.loads(body) if body else {}
+        except Exception:
+            data = {}
+        job_id = str((data if isinstance(data, dict) else {}).get("jobId") or "").strip()
+        if job_id:
+            try:
+                payload, kwargs = _engine_job(job_id)
+                engine.enqueue(CONTRACTING_JOB_TYPE, payload, **kwargs)
+            except Exception:
+                log.exception("contracting_legacy_requeue_failed", jobId=job_id)
+                continue
+            log.info("contracting_legacy_job_requeued", jobId=job_id)
+        if receipt:
+            sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=receipt)
+    return len(msgs)
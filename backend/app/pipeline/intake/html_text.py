@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+"""
+Incremental HTML -> text extraction for URL intake.
+
+Built on the stdlib `HTMLParser` so it can be fed decoded chunks straight off
+the network: no full-document buffering and no backtracking regexes. Script,
+style and navigation boilerplate are dropped, block elements become line
+breaks, and tables keep their row/cell structure (`a | b | c` per row).
+"""
+
+import re
+from html.parser import HTMLParser
+
+# Content inside these elements is never emitted.
+_SKIP_TAGS = frozenset(
+    {
+        "script",
+        "style",
+        "noscript",
+        "template",
+        "svg",
+        "canvas",
+        "iframe",
+        "object",
+        "head",
+        "nav",
+        "footer",
+        "aside",
+    }
+)
+
+# Elements allowed inside <head>. Any other start tag implies the head has ended,
+# so an unclosed <head> doesn't swallow the whole page.
+_HEAD_TAGS = frozenset({"head", "title", "meta", "link", "base", "style", "script", "noscript", "template"})
+
+# Void elements never get an end tag; don't track them on the skip stack.
+_VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+)
+
+_BLOCK_TAGS = frozenset(
+    {
+        "address",
+        "article",
+        "blockquote",
+        "caption",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "fieldset",
+        "figcaption",
+        "figure",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "hr",
+        "li",
+        "main",
+        "ol",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "tbody",
+        "thead",
+        "tfoot",
+        "ul",
+    }
+)
+
+# role= values that mark boilerplate regions even on generic elements.
+_SKIP_ROLES = frozenset({"navigation", "banner", "contentinfo", "search", "menu", "menubar"})
+
+# Longest unparsed remainder (e.g. an unterminated tag or comment) carried between
+# feeds. HTMLParser rescans this buffer on every feed and, at close(), walks it
+# tag-by-tag, which is quadratic; anything this long is junk, so drop it.
+_MAX_PENDING_CHARS = 64 * 1024
+_MAX_TAIL_CHARS = 4 * 1024
+
+_WS_RE = re.compile(r"[ \t\r\n\f\v\u00a0]+")
+
+
+class HtmlTextExtractor(HTMLParser):
+    """
+    Feed HTML chunks with `feed()`; read the result with `text()`.
+
+    Once `max_chars` characters have been emitted `done` becomes True and further
+    input is ignored, so callers can stop downloading.
+    """
+
+    def __init__(self, *, max_chars: int | None = None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = int(max_chars) if max_chars else None
+        self._parts: list[str] = []
+        self._chars = 0
+        # Stack of open skipped tags (so nested <div> inside <nav> doesn't end skipping early).
+        self._skip_stack: list[str] = []
+        self._pending_break = ""
+        self._row_cells = 0
+        self._line_has_text = False
+        self.done = False
+
+    @property
+    def char_count(self) -> int:
+        return self._chars
+
+    def feed(self, data: str) -> None:
+        if self.done:
+            return
+        super().feed(data)
+        if len(self.rawdata) > _MAX_PENDING_CHARS:
+            self.rawdata = ""
+
+    def close(self) -> None:
+        if len(self.rawdata) > _MAX_TAIL_CHARS:
+            self.rawdata = ""
+        super().close()
+
+    # --- emit helpers ---
+
+    def _emit(self, s: str) -> None:
+        if self.done or not s:
+            return
+        if self.max_chars is not None:
+            room = self.max_chars - self._chars
+            if room <= 0:
+                self.done = True
+                return
+            if len(s) > room:
+                s = s[:room]
+        self._parts.append(s)
+        self._chars += len(s)
+        if self.max_chars is not None and self._chars >= self.max_chars:
+            self.done = True
+
+    def _break(self, kind: str = "\n") -> None:
+        # Coalesce consecutive breaks; a paragraph break ("\n\n") wins over a line break.
+        if not self._parts:
+            return
+        if kind == "\n\n" or not self._pending_break:
+            self._pending_break = kind
+        self._line_has_text = False
+
+    # --- HTMLParser hooks ---
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.done:
+            return
+        t = tag.lower()
+        role = ""
+        hidden = False
+        for k, v in attrs:
+            if k == "role" and v:
+                role = v.strip().lower()
+            elif k == "hidden" or (k == "aria-hidden" and (v or "").strip().lower() == "true"):
+                hidden = True
+        if "head" in self._skip_stack and t not in _HEAD_TAGS:
+            del self._skip_stack[self._skip_stack.index("head") :]
+        if t not in _VOID_TAGS and (self._skip_stack or t in _SKIP_TAGS or role in _SKIP_ROLES or hidden):
+            self._skip_stack.append(t)
+            return
+        if self._skip_stack:
+            return
+        if t == "br":
+            self._break("\n")
+        elif t == "tr":
+            self._break("\n")
+            self._row_cells = 0
+        elif t in ("td", "th"):
+            if self._row_cells:
+                self._pending_break = ""
+                self._emit(" | ")
+            self._row_cells += 1
+        elif t in ("p", "h1", "h2", "h3", "h4", "h5", "h6", "table", "section", "article"):
+            self._break("\n\n")
+        elif t == "li":
+            self._break("\n")
+            self._flush_break()
+            self._emit("- ")
+        elif t in _BLOCK_TAGS:
+            self._break("\n")
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        # <br/>, <hr/>, etc.: never push onto the skip stack.
+        if self.done or self._skip_stack:
+            return
+        t = tag.lower()
+        if t in ("br", "hr"):
+            self._break("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done:
+            return
+        t = tag.lower()
+        if self._skip_stack:
+            # Pop back to the matching open tag (tolerates unclosed children).
+            if t in self._skip_stack:
+                while self._skip_stack:
+                    if self._skip_stack.pop() == t:
+                        break
+            return
+        if t in ("td", "th"):
+            return
+        if t == "tr":
+            self._break("\n")
+        elif t in ("p", "h1", "h2", "h3", "h4", "h5", "h6", "table", "section", "article"):
+            self._break("\n\n")
+        elif t in _BLOCK_TAGS:
+            self._break("\n")
+
+    def _flush_break(self) -> None:
+        if self._pending_break and self._parts:
+            self._emit(self._pending_break)
+        self._pending_break = ""
+
+    def _at_line_start_or_space(self) -> bool:
+        return not self._parts or self._parts[-1].endswith((" ", "\n"))
+
+    def handle_data(self, data: str) -> None:
+        if self.done or self._skip_stack or not data:
+            return
+        s = _WS_RE.sub(" ", data)
+        if not s.strip():
+            # Whitespace between inline elements still separates words.
+            if self._line_has_text and not self._pending_break and not self._at_line_start_or_space():
+                self._emit(" ")
+            return
+        self._flush_break()
+        if self._at_line_start_or_space():
+            s = s.lstrip()
+        self._emit(s)
+        self._line_has_text = True
+
+    # --- results ---
+
+    def text(self) -> str:
+        out = "".join(self._parts)
+        # Trim trailing spaces on each line, cap blank-line runs.
+        out = re.sub(r"[ \t]+\n", "\n", out)
+        out = re.sub(r"\n{3,}", "\n\n", out)
+        return out.strip()
+
+
+def html_to_text(html: str, *, max_chars: int | None = None, chunk_chars: int = 64 * 1024) -> str:
+    """Convenience wrapper for already-downloaded HTML (fed in chunks, stops at budget)."""
+    p = HtmlTextExtractor(max_chars=max_chars)
+    s = str(html or "")
+    for i in range(0, len(s), max(1, int(chunk_chars))):
+        p.feed(s[i : i + chunk_chars])
+        if p.done:
+            break
+    if not p.done:
+        p.close()
+    return p.text()
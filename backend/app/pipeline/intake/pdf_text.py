@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+"""
+Per-page PDF text extraction.
+
+pypdf is pure Python and CPU-bound (it holds the GIL), so threads don't help.
+Large documents are split into contiguous page ranges and extracted across a
+process pool; ranges are consumed in page order so we can stop as soon as the
+caller's character budget is satisfied.
+
+Keep this module import-light: pool workers import it in a fresh interpreter.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pypdf import PdfReader
+
+# Below this many pages the pool's IPC cost outweighs the parallel speedup.
+PARALLEL_MIN_PAGES = 24
+# Pages per unit of work submitted to the pool.
+PAGES_PER_BATCH = 8
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS: int = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _default_workers() -> int:
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != max_workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=True)
+            # spawn: the API process runs threads; forking it is not safe.
+            _POOL = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _POOL_WORKERS = max_workers
+        return _POOL
+
+
+def _reset_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+def extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> list[str]:
+    """
+    Extract pages [start, stop) and return one string per page (empty on failure).
+
+    Runs inside pool workers, so it must stay a top-level picklable function.
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    out: list[str] = []
+    for i in range(start, min(stop, len(reader.pages))):
+        try:
+            out.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            out.append("")
+    return out
+
+
+def _join(parts: list[str]) -> str:
+    return "\n".join([p for p in parts if p]).strip()
+
+
+def _extract_serial(reader: PdfReader, *, max_chars: int | None) -> tuple[str, bool]:
+    parts: list[str] = []
+    total = 0
+    n = len(reader.pages)
+    for i, page in enumerate(reader.pages):
+        try:
+            txt = page.extract_text() or ""
+        except Exception:
+            continue
+        if txt:
+            parts.append(txt)
+            total += len(txt) + 1
+        if max_chars is not None and total >= max_chars and i + 1 < n:
+            return _join(parts), False
+    return _join(parts), True
+
+
+def _extract_parallel(
+    pdf_bytes: bytes, *, page_count: int, max_chars: int | None, max_workers: int
+) -> tuple[str, bool]:
+    pool = _get_pool(max_workers)
+    ranges = [(s, min(page_count, s + PAGES_PER_BATCH)) for s in range(0, page_count, PAGES_PER_BATCH)]
+
+    parts: list[str] = []
+    total = 0
+    inflight: list[Future[list[str]]] = []
+    next_idx = 0
+    # Keep a bounded window of batches in flight (in page order) so an early stop
+    # wastes at most ~one window of work.
+    window = max(1, max_workers * 2)
+    try:
+        while next_idx < len(ranges) or inflight:
+            while next_idx < len(ranges) and len(inflight) < window:
+                s, e = ranges[next_idx]
+                inflight.append(pool.submit(extract_page_range, pdf_bytes, s, e))
+                next_idx += 1
+            fut = inflight.pop(0)
+            for txt in fut.result():
+                if txt:
+                    parts.append(txt)
+                    total += len(txt) + 1
+            if max_chars is not None and total >= max_chars and (inflight or next_idx < len(ranges)):
+                return _join(parts), False
+        return _join(parts), True
+    finally:
+        for f in inflight:
+            f.cancel()
+
+
+def extract_pdf_text(
+    pdf_bytes: bytes,
+    *,
+    max_chars: int | None = None,
+    max_workers: int | None = None,
+) -> tuple[str, bool]:
+    """
+    Extract text from a PDF, stopping once `max_chars` characters are collected.
+
+    Returns (text, complete). `complete` is False when extraction stopped early
+    because the budget was reached (the text is still a page-ordered prefix).
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(reader.pages)
+    workers = int(max_workers or 0) or _default_workers()
+    if page_count < PARALLEL_MIN_PAGES or workers <= 1:
+        return _extract_serial(reader, max_chars=max_chars)
+    try:
+        return _extract_parallel(pdf_bytes, page_count=page_count, max_chars=max_chars, max_workers=workers)
+    except BrokenProcessPool:
+        # A worker died (OOM, killed); drop the pool and finish in-process.
+        _reset_pool()
+        return _extract_serial(reader, max_chars=max_chars)
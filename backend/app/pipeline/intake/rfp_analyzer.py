@@ -1,68 +1,331 @@
 from __future__ import annotations
 
-import io
+import codecs
+import hashlib
+import json
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
 
 import httpx
-from pypdf import PdfReader
 
 from app.ai.client import AiError, AiNotConfigured
-from app.ai.context import clip_text
+from app.ai.context import clip_text_to_tokens
 from app.ai.schemas import RfpDatesAI, RfpListsAI, RfpMetaAI, RfpAnalysisAI
+from app.ai.tokens import count_tokens
 from app.ai.verified_calls import call_json_verified
+from app.infrastructure.search.rfp_paragraphs import ensure_paragraph_index
+from app.infrastructure.storage.s3_assets import (
+    get_object_bytes,
+    make_pdf_text_cache_key_for_hash,
+    put_object_bytes,
+)
 from app.observability.logging import get_logger
+from app.pipeline.intake.html_text import HtmlTextExtractor
+from app.pipeline.intake.pdf_text import extract_pdf_text
+from app.pipeline.intake.rfp_chunked import chunk_text, merge_chunk_results
+from app.pipeline.intake.rfp_context import select_bucket_contexts
 from app.settings import settings
 
 log = get_logger("rfp_analyzer")
 
 
-def _extract_pdf_text(pdf_bytes: bytes) -> str:
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    parts: list[str] = []
-    for page in reader.pages:
-        try:
-            parts.append(page.extract_text() or "")
-        except Exception:
-            continue
-    return "\n".join([p for p in parts if p]).strip()
+# Stored rawText is clipped to this many characters; extraction can stop here.
+ANALYSIS_MAX_CHARS = 200_000
+# Largest analysis answer (legacy single call) and the instruction text around RFP_TEXT.
+_ANALYSIS_OUTPUT_TOKENS = 3000
+_ANALYSIS_INSTRUCTION_TOKENS = 1024
 
+_PDF_TEXT_CACHE_VERSION = 1
+
+
+def clip_for_analysis_prompt(raw_text: str) -> str:
+    """RFP text sized in tokens to the analysis model's context (output and instructions reserved)."""
+    return clip_text_to_tokens(
+        raw_text,
+        purpose="rfp_analysis",
+        max_output_tokens=_ANALYSIS_OUTPUT_TOKENS,
+        reserve_tokens=_ANALYSIS_INSTRUCTION_TOKENS,
+    )
 
-def _extract_text_from_url(url: str) -> tuple[str, str]:
-    # returns (content_type, text)
-    with httpx.Client(follow_redirects=True, timeout=30) as client:
-        r = client.get(url)
-        r.raise_for_status()
-        ct = (r.headers.get("content-type") or "").split(";")[0].strip().lower()
-        data = r.content
 
-    if ct == "application/pdf" or url.lower().endswith(".pdf"):
-        return ct or "application/pdf", _extract_pdf_text(data)
+def _long_document(raw_text: str) -> bool:
+    """True when `RFP_ANALYSIS_CHUNKING` puts `raw_text` in long-document (map-reduce) mode."""
+    mode = str(settings.rfp_analysis_chunking or "auto").strip().lower()
+    if mode == "off":
+        return False
+    if mode == "always":
+        return True
+    model = settings.openai_model_for("rfp_analysis")
+    return count_tokens(raw_text, model=model) > int(settings.rfp_analysis_chunk_threshold_tokens)
 
-    # crude HTML -> text fallback
+
+def _chunks(text: str) -> list[str]:
+    return chunk_text(
+        text,
+        model=settings.openai_model_for("rfp_analysis"),
+        chunk_tokens=settings.rfp_analysis_chunk_tokens,
+        overlap_tokens=settings.rfp_analysis_chunk_overlap_tokens,
+    )
+
+
+def _analysis_chunks(raw_text: str) -> list[str] | None:
+    """Chunks for map-reduce analysis, or None to analyze the text in one piece."""
+    if not _long_document(raw_text):
+        return None
+    chunks = _chunks(raw_text)
+    return chunks if len(chunks) > 1 else None
+
+
+@dataclass(frozen=True)
+class _Bucket:
+    purpose: str
+    model_cls: type
+    build: Callable[..., str]  # (text, part=(i, n) | None) -> prompt
+    kind: str  # rfp_context bucket
+    max_tokens: int  # whole-text call
+    chunk_max_tokens: int  # per-chunk call
+
+
+def _analyze_buckets(
+    raw_text: str,
+    *,
+    text_clip: str,
+    buckets: tuple[_Bucket, ...],
+    call: Callable[[str, type, str, int], tuple[Any, Any]],
+) -> tuple[dict[str, Any], dict[str, Any] | None, list[dict[str, Any]]]:
+    """
+    Run the extraction buckets in parallel and merge their answers.
+
+    Each bucket gets the passages its local pre-pass selected (rfp_context.py). In
+    long-document mode (rfp_chunked.py), selected passages over the bucket's budget are
+    chunked rather than cut to it. If the pre-pass finds nothing, the bucket gets the
+    full text instead: the clipped text in one call, or every chunk in long-document
+    mode. A failed call only loses that chunk's answer for that bucket.
+
+    Returns (merged fields, chunk summary for `_analysis` or None, per-purpose call stats).
+    """
+    model = settings.openai_model_for("rfp_analysis")
+    contexts = select_bucket_contexts(raw_text, model=model) if settings.rfp_analysis_targeted_context else {}
+    chunks: list[str] | None = None
+    long_doc: bool | None = None
+    jobs: list[tuple[str, int, type, str, int]] = []  # purpose, chunk, schema, prompt, max_tokens
+    per_purpose: dict[str, dict[str, Any]] = {}
+    for b in buckets:
+        ctx = contexts.get(b.kind)
+        st: dict[str, Any] = {
+            "purpose": b.purpose,
+            "context": "targeted" if ctx else "full",
+            "failed": 0,
+            "attempts": 0,
+        }
+        parts: list[str] = []
+        if ctx is not None:
+            st["contextTokens"] = ctx.tokens
+            if ctx.dropped:
+                if long_doc is None:
+                    long_doc = _long_document(raw_text)
+                if long_doc:
+                    parts = _chunks(ctx.selected)
+                    st["contextTokens"] = count_tokens(ctx.selected, model=model)
+                else:
+                    st["droppedParagraphs"] = ctx.dropped
+            if len(parts) <= 1:
+                parts = []
+                jobs.append((b.purpose, 0, b.model_cls, b.build(ctx.text), b.max_tokens))
+        else:
+            if chunks is None:
+                chunks = _analysis_chunks(raw_text) or []
+            parts = chunks
+            if not parts:
+                jobs.append((b.purpose, 0, b.model_cls, b.build(text_clip), b.max_tokens))
+        if parts:
+            st["chunks"] = len(parts)
+            jobs.extend(
+                (b.purpose, i, b.model_cls, b.build(c, (i + 1, len(parts))), b.chunk_max_tokens)
+                for i, c in enumerate(parts)
+            )
+        st["calls"] = sum(1 for j in jobs if j[0] == b.purpose)
+        per_purpose[b.purpose] = st
+
+    # Threads because the OpenAI client is sync; the AI concurrency limit still applies.
+    results: dict[str, dict[int, dict[str, Any]]] = {b.purpose: {} for b in buckets}
+    t0 = time.perf_counter()
+    workers = max(1, min(len(jobs), int(settings.rfp_analysis_chunk_concurrency or 1)))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        fut_map = {
+            ex.submit(call, purpose, model_cls, prompt, max_tokens): (purpose, i)
+            for (purpose, i, model_cls, prompt, max_tokens) in jobs
+        }
+        for fut in as_completed(fut_map):
+            purpose, i = fut_map[fut]
+            st = per_purpose[purpose]
+            try:
+                parsed, meta = fut.result()
+            except Exception as e:
+                # Best-effort: a failed call only loses its own answer.
+                st["failed"] += 1
+                st["error"] = str(e)[:200]
+                continue
+            results[purpose][i] = parsed.model_dump()
+            st["attempts"] += int(meta.attempts or 0)
+            st["model"] = meta.model
+            st["responseFormat"] = meta.used_response_format
+
+    # Buckets extract disjoint fields, so one merge over all answers (each bucket's in
+    # document order) only reconciles chunks of the same bucket.
+    merged, conflicts = merge_chunk_results([r for b in buckets for _, r in sorted(results[b.purpose].items())])
+    log.info(
+        "rfp_bucket_analysis",
+        calls=len(jobs),
+        failed=sum(st["failed"] for st in per_purpose.values()),
+        contexts={p: st.get("contextTokens", st["context"]) for p, st in per_purpose.items()},
+        chunks={p: st["chunks"] for p, st in per_purpose.items() if "chunks" in st},
+        conflicts=sorted(conflicts),
+        ms=int((time.perf_counter() - t0) * 1000),
+    )
+    summary = None
+    chunked = [st for st in per_purpose.values() if "chunks" in st]
+    if chunked:
+        summary = {
+            "chunks": max(st["chunks"] for st in chunked),
+            "purposes": [st["purpose"] for st in chunked],
+            "conflicts": {k: v[:5] for k, v in conflicts.items()},
+        }
+    return merged, summary, list(per_purpose.values())
+
+
+def _pdf_text_cache_enabled() -> bool:
+    return bool(settings.pdf_text_cache_enabled) and bool((settings.assets_bucket_name or "").strip())
+
+
+def _pdf_text_cache_get(sha: str, *, max_chars: int | None) -> str | None:
+    """
+    Best-effort read of cached extracted text.
+
+    A partial (budget-stopped) entry is only usable if it covers the requested budget.
+    """
+    if not _pdf_text_cache_enabled():
+        return None
     try:
-        html = data.decode("utf-8", errors="ignore")
+        raw = get_object_bytes(key=make_pdf_text_cache_key_for_hash(sha256=sha), max_bytes=16 * 1024 * 1024)
+        payload = json.loads(raw.decode("utf-8")) if raw else None
     except Exception:
-        html = str(data)
-
-    # drop tags quickly
-    text = (
-        html.replace("<br>", "\n")
-        .replace("<br/>", "\n")
-        .replace("<br />", "\n")
-        .replace("</p>", "\n")
+        return None
+    if not isinstance(payload, dict) or payload.get("v") != _PDF_TEXT_CACHE_VERSION:
+        return None
+    text = payload.get("text")
+    if not isinstance(text, str):
+        return None
+    if payload.get("complete") or (max_chars is not None and len(text) >= max_chars):
+        return text
+    return None
+
+
+def _pdf_text_cache_put(sha: str, *, text: str, complete: bool) -> None:
+    if not _pdf_text_cache_enabled():
+        return
+    try:
+        body = json.dumps(
+            {"v": _PDF_TEXT_CACHE_VERSION, "complete": bool(complete), "text": text},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        put_object_bytes(
+            key=make_pdf_text_cache_key_for_hash(sha256=sha),
+            data=body,
+            content_type="application/json",
+        )
+    except Exception as e:
+        log.warning("pdf_text_cache_put_failed", sha256=sha, error=str(e))
+
+
+def _extract_pdf_text(pdf_bytes: bytes, *, max_chars: int | None = ANALYSIS_MAX_CHARS) -> str:
+    """
+    Extract PDF text (page order), stopping once `max_chars` is reached.
+
+    Results are cached in S3 by the PDF's SHA-256 so re-analysis skips extraction.
+    """
+    sha = hashlib.sha256(pdf_bytes).hexdigest()
+    cached = _pdf_text_cache_get(sha, max_chars=max_chars)
+    if cached is not None:
+        return cached
+
+    t0 = time.perf_counter()
+    text, complete = extract_pdf_text(
+        pdf_bytes,
+        max_chars=max_chars,
+        max_workers=int(settings.pdf_extract_max_workers or 0) or None,
+    )
+    log.info(
+        "pdf_text_extracted",
+        sha256=sha,
+        chars=len(text),
+        complete=complete,
+        ms=int((time.perf_counter() - t0) * 1000),
+    )
+    _pdf_text_cache_put(sha, text=text, complete=complete)
+    return text
+
+
+@lru_cache(maxsize=1)
+def _http_client() -> httpx.Client:
+    # Shared (thread-safe) client so concurrent URL analyses reuse pooled connections.
+    return httpx.Client(
+        follow_redirects=True,
+        timeout=30,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
     )
-    # remove remaining tags
-    import re
 
-    text = re.sub(r"<script[\s\S]*?</script>", " ", text, flags=re.IGNORECASE)
-    text = re.sub(r"<style[\s\S]*?</style>", " ", text, flags=re.IGNORECASE)
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
 
-    return ct or "text/html", text
+def _extract_text_from_url(url: str, *, max_chars: int | None = ANALYSIS_MAX_CHARS) -> tuple[str, str]:
+    """
+    Download a URL and extract text, returning (content_type, text).
+
+    The body is streamed: HTML is parsed incrementally and reading stops once the
+    character budget is satisfied; nothing beyond URL_FETCH_MAX_BYTES is read.
+    """
+    max_bytes = max(1, int(settings.url_fetch_max_bytes or 0))
+    with _http_client().stream("GET", url) as r:
+        r.raise_for_status()
+        ct = (r.headers.get("content-type") or "").split(";")[0].strip().lower()
+
+        if ct == "application/pdf" or url.lower().endswith(".pdf"):
+            # PDFs can't be parsed from a prefix; enforce the cap and read it whole.
+            declared = int(r.headers.get("content-length") or 0)
+            if declared > max_bytes:
+                raise RuntimeError(f"Response too large ({declared} bytes), max is {max_bytes} bytes")
+            buf = bytearray()
+            for chunk in r.iter_bytes():
+                buf.extend(chunk)
+                if len(buf) > max_bytes:
+                    raise RuntimeError(f"Response too large (> {max_bytes} bytes)")
+            return ct or "application/pdf", _extract_pdf_text(bytes(buf), max_chars=max_chars)
+
+        try:
+            decoder = codecs.getincrementaldecoder(r.charset_encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parser = HtmlTextExtractor(max_chars=max_chars)
+        read = 0
+        truncated = False
+        for chunk in r.iter_bytes():
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                break
+            if read >= max_bytes:
+                truncated = True
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+
+    if truncated:
+        log.warning("url_fetch_truncated", url=url, max_bytes=max_bytes)
+    return ct or "text/html", parser.text()
 
 
 def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
@@ -86,6 +349,9 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
     if len(raw_text) < 80:
         raise RuntimeError("No extractable text found")
 
+    # Paragraph index for prompt retrieval over the stored rawText (best-effort).
+    ensure_paragraph_index(raw_text[:ANALYSIS_MAX_CHARS].strip())
+
     def _normalize_analysis(
         *,
         data: dict[str, Any] | None,
@@ -93,6 +359,7 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
         model: str | None,
         ai_error: str | None = None,
         analysis_fields: list[dict[str, Any]] | None = None,
+        chunked: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         """
         Ensure a stable schema regardless of model output.
@@ -120,7 +387,7 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
             return out
 
         # Always prefer extracted raw_text over any model-provided rawText.
-        d["rawText"] = raw_text[:200000]
+        d["rawText"] = raw_text[:ANALYSIS_MAX_CHARS]
 
         # Required-ish fields (keep conservative defaults).
         d["title"] = _s(d.get("title") or source_name, max_len=300) or "RFP"
@@ -151,6 +418,8 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
         if analysis_fields:
             # Keep this compact; it's primarily for debugging and observability.
             d["_analysis"]["fields"] = analysis_fields[:20]
+        if chunked:
+            d["_analysis"]["chunked"] = chunked
         if ai_error:
             d["_analysis"]["aiError"] = str(ai_error)
         return d
@@ -246,11 +515,20 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
     # - schema adherence
     # - latency (parallel calls)
     # - resilience (a single field-group failure doesn't nuke everything)
-    text_clip = clip_text(raw_text, max_chars=200000)
+    text_clip = clip_for_analysis_prompt(raw_text)
 
-    def _prompt_meta() -> str:
+    def _part_note(part: tuple[int, int] | None) -> str:
+        if not part:
+            return ""
+        return (
+            f"This is part {part[0]} of {part[1]} of a long RFP. Use only this part; "
+            "leave a field empty (or 'Not available', or []) if this part doesn't state it.\n"
+        )
+
+    def _prompt_meta(text: str, part: tuple[int, int] | None = None) -> str:
         return (
             "Extract basic RFP metadata from the text.\n"
+            f"{_part_note(part)}"
             "Take time to reason step-by-step and cross-check the text, then output ONLY the JSON.\n"
             "Return JSON ONLY (no markdown):\n"
             "{"
@@ -262,12 +540,13 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
             '"contactInformation": string'
             "}\n\n"
             f"SOURCE_NAME: {source_name}\n\n"
-            f"RFP_TEXT:\n{text_clip}"
+            f"RFP_TEXT:\n{text}"
         )
 
-    def _prompt_dates() -> str:
+    def _prompt_dates(text: str, part: tuple[int, int] | None = None) -> str:
         return (
             "Extract the key RFP dates.\n"
+            f"{_part_note(part)}"
             "Use 'Not available' if unknown. Prefer MM/DD/YYYY when possible.\n"
             "Take time to reason step-by-step and cross-check the text, then output ONLY the JSON.\n"
             "Return JSON ONLY:\n"
@@ -278,12 +557,13 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
             '"bidRegistrationDate": string, '
             '"projectDeadline": string'
             "}\n\n"
-            f"RFP_TEXT:\n{text_clip}"
+            f"RFP_TEXT:\n{text}"
         )
 
-    def _prompt_lists() -> str:
+    def _prompt_lists(text: str, part: tuple[int, int] | None = None) -> str:
         return (
             "Extract lists from the RFP.\n"
+            f"{_part_note(part)}"
             "Take time to reason step-by-step and cross-check the text, then output ONLY the JSON.\n"
             "Return JSON ONLY:\n"
             "{"
@@ -293,7 +573,7 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
             '"timeline": string[], '
             '"clarificationQuestions": string[]'
             "}\n\n"
-            f"RFP_TEXT:\n{text_clip}"
+            f"RFP_TEXT:\n{text}"
         )
 
     def _prompt_legacy_full() -> str:
@@ -339,42 +619,20 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
             )
             return parsed, meta
 
-        parts: dict[str, Any] = {}
-        fields_meta: list[dict[str, Any]] = []
-
-        # Run the three groups in parallel. Use threads because OpenAI client is sync.
-        jobs = [
-            ("rfp_analysis_meta", RfpMetaAI, _prompt_meta(), 800),
-            ("rfp_analysis_dates", RfpDatesAI, _prompt_dates(), 600),
-            ("rfp_analysis_lists", RfpListsAI, _prompt_lists(), 1400),
-        ]
-
-        with ThreadPoolExecutor(max_workers=min(6, max(1, len(jobs)))) as ex:
-            fut_map = {
-                ex.submit(_call, purpose, model_cls, prmpt, mt): (purpose, model_cls)
-                for (purpose, model_cls, prmpt, mt) in jobs
-            }
-            for fut in as_completed(fut_map):
-                purpose, _model_cls = fut_map[fut]
-                try:
-                    parsed, meta = fut.result()
-                    parts.update(parsed.model_dump())
-                    fields_meta.append(
-                        {
-                            "purpose": meta.purpose,
-                            "model": meta.model,
-                            "attempts": meta.attempts,
-                            "responseFormat": meta.used_response_format,
-                        }
-                    )
-                except Exception as e:
-                    # Best-effort: if a single bucket fails, continue.
-                    fields_meta.append(
-                        {"purpose": purpose, "error": str(e)[:200]}
-                    )
+        parts, chunked, fields_meta = _analyze_buckets(
+            raw_text,
+            text_clip=text_clip,
+            call=_call,
+            buckets=(
+                _Bucket("rfp_analysis_meta", RfpMetaAI, _prompt_meta, "meta", 800, 500),
+                _Bucket("rfp_analysis_dates", RfpDatesAI, _prompt_dates, "dates", 600, 400),
+                _Bucket("rfp_analysis_lists", RfpListsAI, _prompt_lists, "lists", 1400, 1000),
+            ),
+        )
+        answered = {st["purpose"] for st in fields_meta if st["failed"] < st["calls"]}
 
         # If *everything* failed, fall back to the legacy single-call strategy before heuristics.
-        if not any(k in parts for k in ("title", "clientName", "keyRequirements")):
+        if not answered & {"rfp_analysis_meta", "rfp_analysis_lists"}:
             parsed_full, meta_full = call_json_verified(
                 purpose="rfp_analysis",
                 response_model=RfpAnalysisAI,
@@ -385,6 +643,7 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
                 fallback=None,
             )
             parts = parsed_full.model_dump()
+            chunked = None
             fields_meta.append(
                 {
                     "purpose": meta_full.purpose,
@@ -403,6 +662,7 @@ def analyze_rfp(source: Any, source_name: str) -> dict[str, Any]:
             used_ai=True,
             model=model,
             analysis_fields=fields_meta,
+            chunked=chunked,
         )
     except AiNotConfigured:
         return _fallback_analysis(ai_error="OPENAI_API_KEY not configured")
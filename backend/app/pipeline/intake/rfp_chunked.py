@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+"""
+Map-reduce helpers for analyzing long RFPs.
+
+`chunk_text` splits the text into chunks of a bounded number of tokens.
+Splits fall on paragraph boundaries, and neighbouring chunks share about
+`overlap_tokens` of trailing paragraphs, so a fact spanning a boundary is
+whole in at least one chunk. Each chunk gets the meta, date and list prompts
+separately. `merge_chunk_results` then combines the per-chunk answers
+deterministically (it is pure, so it is tested without a model):
+
+- scalar fields: the value most chunks agree on (compared case-, spacing-
+  and punctuation-insensitively). Ties go to the earliest chunk. Empty and
+  "Not available" answers don't vote.
+- list fields: union in document order, with duplicates dropped. Overlap
+  between chunks repeats items.
+
+Scalar fields where chunks disagreed are returned as conflicts, for the
+analysis record.
+"""
+
+import re
+from typing import Any
+
+from app.ai.tokens import count_tokens, truncate_to_tokens
+from app.infrastructure.search.paragraph_index import paragraph_spans
+
+META_FIELDS = ("title", "clientName", "projectType", "budgetRange", "location", "contactInformation")
+DATE_FIELDS = ("submissionDeadline", "questionsDeadline", "bidMeetingDate", "bidRegistrationDate", "projectDeadline")
+LIST_FIELDS = ("keyRequirements", "deliverables", "criticalInformation", "timeline", "clarificationQuestions")
+
+_MISSING = {"", "not available", "not specified", "n a", "na", "none", "unknown", "tbd"}
+
+
+def _clean(v: Any) -> str:
+    return re.sub(r"\s+", " ", str(v or "")).strip()
+
+
+def _key(v: str) -> str:
+    return re.sub(r"[^a-z0-9$%]+", " ", v.casefold()).strip()
+
+
+def _split_oversized(para: str, *, model: str, chunk_tokens: int) -> list[tuple[str, int]]:
+    out: list[tuple[str, int]] = []
+    rest = para
+    while rest:
+        piece = truncate_to_tokens(rest, chunk_tokens, model=model) or rest[: chunk_tokens * 3]
+        out.append((piece, count_tokens(piece, model=model)))
+        rest = rest[len(piece) :].lstrip()
+    return out
+
+
+def chunk_text(text: str, *, model: str, chunk_tokens: int, overlap_tokens: int) -> list[str]:
+    """Paragraph-aligned chunks of at most `chunk_tokens` tokens (in `model`'s encoding)."""
+    src = str(text or "").strip()
+    limit = max(64, int(chunk_tokens))
+    overlap = max(0, min(int(overlap_tokens), limit // 2))
+    units: list[tuple[str, int]] = []
+    for s, e in paragraph_spans(src, max_paragraphs=1_000_000):
+        para = src[s:e]
+        n = count_tokens(para, model=model)
+        units.extend([(para, n)] if n <= limit else _split_oversized(para, model=model, chunk_tokens=limit))
+
+    chunks: list[str] = []
+    cur: list[tuple[str, int]] = []
+    used = 0  # tokens in `cur`, counting one per paragraph separator
+    for piece, n in units:
+        if cur and used + n + 1 > limit:
+            chunks.append("\n\n".join(p for p, _ in cur))
+            carry: list[tuple[str, int]] = []
+            kept = 0
+            for p, m in reversed(cur):
+                if kept + m + 1 > overlap or kept + m + 1 + n + 1 > limit:
+                    break
+                carry.insert(0, (p, m))
+                kept += m + 1
+            cur, used = carry, kept
+        cur.append((piece, n))
+        used += n + 1
+    if cur:
+        chunks.append("\n\n".join(p for p, _ in cur))
+    return chunks
+
+
+def _vote(values: list[str]) -> tuple[str | None, list[str]]:
+    """(winning value, distinct values) for one scalar field; values are in chunk order."""
+    tally: dict[str, list[Any]] = {}  # key -> [count, first position, value]
+    for pos, v in enumerate(values):
+        k = _key(v)
+        if k in _MISSING:
+            continue
+        if k in tally:
+            tally[k][0] += 1
+        else:
+            tally[k] = [1, pos, v]
+    if not tally:
+        return None, []
+    ranked = sorted(tally.values(), key=lambda t: (-t[0], t[1]))
+    return ranked[0][2], [t[2] for t in sorted(tally.values(), key=lambda t: t[1])]
+
+
+def merge_chunk_results(results: list[dict[str, Any]]) -> tuple[dict[str, Any], dict[str, list[str]]]:
+    """
+    Merge per-chunk extractions (in document order) into one analysis.
+
+    Returns (merged fields, conflicts). Fields with no value in any chunk are left
+    out so the caller's defaults apply. `conflicts` maps each scalar field the chunks
+    disagreed on to its distinct values in first-seen order.
+    """
+    merged: dict[str, Any] = {}
+    conflicts: dict[str, list[str]] = {}
+    for field in META_FIELDS + DATE_FIELDS:
+        winner, distinct = _vote([_clean(r.get(field)) for r in results if isinstance(r.get(field), str)])
+        if winner is not None:
+            merged[field] = winner
+        if len(distinct) > 1:
+            conflicts[field] = distinct
+    for field in LIST_FIELDS:
+        seen: set[str] = set()
+        items: list[str] = []
+        for r in results:
+            xs = r.get(field)
+            for x in xs if isinstance(xs, list) else []:
+                v = _clean(x)
+                k = _key(v)
+                if k in _MISSING or k in seen:
+                    continue
+                seen.add(k)
+                items.append(v)
+        if items:
+            merged[field] = items
+    return merged, conflicts
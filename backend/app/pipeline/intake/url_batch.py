@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+from urllib.parse import urlparse
+
+
+@dataclass(slots=True)
+class UrlOutcome:
+    index: int
+    url: str
+    result: Any | None
+    error: Exception | None
+    queued_ms: int
+    elapsed_ms: int
+
+
+def url_host(url: str) -> str:
+    try:
+        return (urlparse(str(url or "")).hostname or "").lower()
+    except Exception:
+        return ""
+
+
+def run_urls_concurrently(
+    urls: list[str],
+    fn: Callable[[str], Any],
+    *,
+    max_concurrency: int = 4,
+    per_host_concurrency: int = 2,
+) -> Iterator[UrlOutcome]:
+    """
+    Run `fn(url)` for each URL on a thread pool and yield outcomes as they complete.
+
+    - At most `max_concurrency` calls run at once.
+    - At most `per_host_concurrency` calls run against the same host at once.
+      URLs for a saturated host wait in order without holding a pool thread,
+      so one slow host can't starve the others.
+    """
+    total = max(1, int(max_concurrency or 1))
+    per_host = max(1, int(per_host_concurrency or 1))
+
+    t0 = time.perf_counter()
+    pending: list[tuple[int, str, str]] = [(i, u, url_host(u)) for i, u in enumerate(urls)]
+    running_by_host: dict[str, int] = {}
+    inflight: dict[Future[Any], tuple[int, str, str, float]] = {}
+
+    def _timed(u: str) -> tuple[Any, float]:
+        return fn(u), time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=min(total, max(1, len(urls)))) as ex:
+        while pending or inflight:
+            # Dispatch everything that fits in the global + per-host limits.
+            i = 0
+            while i < len(pending) and len(inflight) < total:
+                idx, url, host = pending[i]
+                if running_by_host.get(host, 0) >= per_host:
+                    i += 1
+                    continue
+                pending.pop(i)
+                running_by_host[host] = running_by_host.get(host, 0) + 1
+                inflight[ex.submit(_timed, url)] = (idx, url, host, time.perf_counter())
+
+            done, _ = wait(list(inflight.keys()), return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx, url, host, started = inflight.pop(fut)
+                running_by_host[host] = max(0, running_by_host.get(host, 0) - 1)
+                result: Any | None = None
+                error: Exception | None = None
+                finished = time.perf_counter()
+                try:
+                    result, finished = fut.result()
+                except Exception as e:  # noqa: BLE001
+                    error = e
+                yield UrlOutcome(
+                    index=idx,
+                    url=url,
+                    result=result,
+                    error=error,
+                    queued_ms=int((started - t0) * 1000),
+                    elapsed_ms=int((finished - started) * 1000),
+                )
@@ -48,6 +48,7 @@ def generate_section_titles(rfp: dict[str, Any]) -> list[str]:
             temperature=0.2,
             retries=2,
             validate_parsed=_validate,
+            cache=True,
         )
         out = [str(t).strip() for t in (parsed.titles or []) if str(t).strip()]
         return out[:30] if out else _fallback()
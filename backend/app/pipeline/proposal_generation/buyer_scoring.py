@@ -155,6 +155,7 @@ def enrich_buyer_profile_with_ai(
             validate_parsed=_validate,
             # If AI fails, just leave profile un-enriched.
             fallback=None,
+            cache=True,
         )
         person = dict(person)
         person["ai"] = parsed.model_dump()
@@ -290,6 +290,8 @@ def _generate_with_openai(
         validate_parsed=_validate,
         # If AI fails, let caller fall back to deterministic statement.
         fallback=None,
+        # Same company/projects/references payload -> same statement.
+        cache=True,
     )
 
     statement = str(parsed.statementMarkdown or "").strip()
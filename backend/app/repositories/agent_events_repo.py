@@ -2,12 +2,20 @@ from __future__ import annotations
 
 import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from boto3.dynamodb.conditions import Key
 
+from app.db.dynamodb.sharding import iter_sharded, query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
+from app.observability.logging import get_logger
+
+log = get_logger("agent_events_repo")
+
+# Upper bounds (ms) of the duration histogram buckets; anything slower lands in "inf".
+DURATION_BUCKETS_MS: tuple[int, ...] = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+_ERROR_STATUSES = {"failed", "error", "errored", "timeout"}
 
 
 def _now_iso() -> str:
@@ -64,14 +72,15 @@ def append_event(
     now = _now_iso()
     eid = "e_" + uuid.uuid4().hex[:18]
 
+    key = event_key(rfp_id=rid, event_id=eid, created_at=now)
     item: dict[str, Any] = {
-        **event_key(rfp_id=rid, event_id=eid, created_at=now),
+        **key,
         "entityType": "AgentEvent",
         "rfpId": rid,
         "eventId": eid,
         "createdAt": now,
         # Global time index for reporting (GSI1)
-        "gsi1pk": "TYPE#AGENT_EVENT",
+        "gsi1pk": shard_pk("TYPE#AGENT_EVENT", key),
         "gsi1sk": f"{now}#{eid}",
         "tsEpochMs": int(time.time() * 1000),
         "type": str(type or "").strip() or "event",
@@ -87,9 +96,235 @@ def append_event(
     }
     item = {k: v for k, v in item.items() if v is not None}
     get_main_table().put_item(item=item, condition_expression="attribute_not_exists(pk) AND attribute_not_exists(sk)")
+    _add_to_rollups(item)
     return normalize_event(item) or {}
 
 
+# --- Rollups ---
+#
+# Every appended event is also counted into one hourly and one daily rollup item
+# (pk AGENTMETRICS#HOUR#<yyyy-mm-ddThh> / AGENTMETRICS#DAY#<yyyy-mm-dd>, sk ROLLUP).
+# Counters are flat top-level attributes keyed by dimension, where a dimension is
+# the event type or "<type>|<tool>":
+#   n#<dim>            events
+#   ok#<dim>           payload.success is True
+#   err#<dim>          failed / errored events
+#   s#<dim>#<status>   events by payload status
+#   dur#<dim>, durn#<dim>, h#<dim>#<le>   duration sum, samples, histogram
+#   steps#<dim>, stepsn#<dim>             steps sum, samples
+# Updates are a single UpdateItem with ADD, so concurrent appends never lose counts.
+
+
+def _hour_bucket_key(hour: str) -> dict[str, str]:
+    return {"pk": f"AGENTMETRICS#HOUR#{hour}", "sk": "ROLLUP"}
+
+
+def _day_bucket_key(day: str) -> dict[str, str]:
+    return {"pk": f"AGENTMETRICS#DAY#{day}", "sk": "ROLLUP"}
+
+
+def _dim_part(v: Any) -> str:
+    return str(v or "").strip().replace("#", "_").replace("|", "_")[:64]
+
+
+def _event_status(payload: dict[str, Any]) -> str | None:
+    st = payload.get("status")
+    if isinstance(st, str) and st.strip():
+        return _dim_part(st.lower())[:32]
+    if payload.get("success") is True:
+        return "succeeded"
+    if payload.get("success") is False or payload.get("error"):
+        return "failed"
+    return None
+
+
+def _duration_bucket(ms: int) -> str:
+    for le in DURATION_BUCKETS_MS:
+        if ms <= le:
+            return str(le)
+    return "inf"
+
+
+def rollup_increments(event: dict[str, Any]) -> dict[str, int]:
+    """Counter deltas one event contributes to its hour/day rollups."""
+    etype = _dim_part(event.get("type")) or "event"
+    tool = _dim_part(event.get("tool"))
+    dims = [etype] + ([f"{etype}|{tool}"] if tool else [])
+    payload: dict[str, Any] = event.get("payload") or {}
+    status = _event_status(payload)
+    failed = payload.get("success") is False or bool(payload.get("error")) or status in _ERROR_STATUSES
+    dur = payload.get("durationMs")
+    dur_ms = max(0, int(dur)) if isinstance(dur, (int, float)) and not isinstance(dur, bool) else None
+    steps = payload.get("steps")
+    steps_n = steps if isinstance(steps, int) and not isinstance(steps, bool) else None
+
+    out: dict[str, int] = {}
+    for d in dims:
+        out[f"n#{d}"] = 1
+        if payload.get("success") is True:
+            out[f"ok#{d}"] = 1
+        if failed:
+            out[f"err#{d}"] = 1
+        if status:
+            out[f"s#{d}#{status}"] = 1
+        if dur_ms is not None:
+            out[f"dur#{d}"] = dur_ms
+            out[f"durn#{d}"] = 1
+            out[f"h#{d}#{_duration_bucket(dur_ms)}"] = 1
+        if steps_n is not None:
+            out[f"steps#{d}"] = steps_n
+            out[f"stepsn#{d}"] = 1
+    return out
+
+
+def _add_to_rollups(event: dict[str, Any]) -> None:
+    """
+    Best-effort: a failed rollup update is logged, never surfaced to the caller
+    (the event itself is already stored).
+    """
+    created = str(event.get("createdAt") or "")
+    incs = rollup_increments(event)
+    if len(created) < 13 or not incs:
+        return
+    names: dict[str, str] = {"#et": "entityType", "#b": "bucket", "#u": "updatedAt"}
+    values: dict[str, Any] = {":et": "AgentEventRollup", ":u": created}
+    adds: list[str] = []
+    for i, (attr, delta) in enumerate(sorted(incs.items())):
+        names[f"#a{i}"] = attr
+        values[f":v{i}"] = int(delta)
+        adds.append(f"#a{i} :v{i}")
+    t = get_main_table()
+    for key, bucket in ((_hour_bucket_key(created[:13]), created[:13]), (_day_bucket_key(created[:10]), created[:10])):
+        try:
+            t.update_item(
+                key=key,
+                update_expression="SET #et = :et, #b = :b, #u = :u ADD " + ", ".join(adds),
+                expression_attribute_names=names,
+                expression_attribute_values={**values, ":b": bucket},
+                return_values="NONE",
+            )
+        except Exception as e:
+            log.warning("agent_event_rollup_update_failed", bucket=bucket, error=str(e) or type(e).__name__)
+
+
+def _floor_hour(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _rollup_keys_for_window(start: datetime, end: datetime) -> list[dict[str, str]]:
+    """
+    Hour buckets covering [start, end], with whole UTC days inside the window
+    collapsed into their day bucket. Granularity is one hour: the first bucket
+    includes events from the start of its hour.
+    """
+    h = _floor_hour(start)
+    last = _floor_hour(end)
+    keys: list[dict[str, str]] = []
+    while h <= last:
+        if h.hour == 0 and h + timedelta(hours=23) <= last:
+            keys.append(_day_bucket_key(h.strftime("%Y-%m-%d")))
+            h += timedelta(days=1)
+            continue
+        keys.append(_hour_bucket_key(h.strftime("%Y-%m-%dT%H")))
+        h += timedelta(hours=1)
+    return keys
+
+
+def get_rollup_counters(*, start: datetime, end: datetime | None = None) -> dict[str, int]:
+    """Sum the rollup counters for a time window (at most ~55 items for a week)."""
+    keys = _rollup_keys_for_window(start, end or datetime.now(timezone.utc))
+    out: dict[str, int] = {}
+    for it in get_main_table().batch_get_items(keys=keys):
+        for k, v in it.items():
+            if k in ("pk", "sk", "entityType", "bucket", "updatedAt") or isinstance(v, (str, bool)):
+                continue
+            try:
+                out[k] = out.get(k, 0) + int(v)
+            except (TypeError, ValueError):
+                continue
+    return out
+
+
+def summarize_rollup(counters: dict[str, int], *, dim: str) -> dict[str, Any]:
+    """Counts, status/error breakdown and duration histogram for one dimension."""
+    n = int(counters.get(f"n#{dim}", 0))
+    durn = int(counters.get(f"durn#{dim}", 0))
+    stepsn = int(counters.get(f"stepsn#{dim}", 0))
+    status_prefix = f"s#{dim}#"
+    return {
+        "count": n,
+        "succeeded": int(counters.get(f"ok#{dim}", 0)),
+        "errors": int(counters.get(f"err#{dim}", 0)),
+        "statuses": {k[len(status_prefix) :]: v for k, v in counters.items() if k.startswith(status_prefix)},
+        "avgDurationMs": int(counters.get(f"dur#{dim}", 0) / durn) if durn else 0,
+        "avgSteps": int(counters.get(f"steps#{dim}", 0) / stepsn) if stepsn else 0,
+        "durationHistogram": {
+            le: int(counters.get(f"h#{dim}#{le}", 0)) for le in [*map(str, DURATION_BUCKETS_MS), "inf"]
+        },
+    }
+
+
+def rollup_event_types(counters: dict[str, int]) -> list[str]:
+    return sorted(k[2:] for k in counters if k.startswith("n#") and "|" not in k)
+
+
+def rebuild_rollups(*, since_iso: str, page_size: int = 500) -> dict[str, int]:
+    """
+    Recompute rollups from raw events for every completed hour/day from the start
+    of since_iso's UTC day up to the current hour, overwriting those items.
+
+    Idempotent (past buckets no longer receive appends), so it can be re-run to
+    seed rollups for events written before rollups existed. The current hour and
+    day are left to live updates.
+    """
+    since = datetime.fromisoformat(str(since_iso).strip().replace("Z", "+00:00"))
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    start = _floor_hour(since).replace(hour=0)
+    cur_hour = _floor_hour(datetime.now(timezone.utc))
+    cur_day = cur_hour.replace(hour=0)
+    lo = start.isoformat().replace("+00:00", "Z")
+    hi = cur_hour.isoformat().replace("+00:00", "Z")
+
+    t = get_main_table()
+    hours: dict[str, dict[str, int]] = {}
+    days: dict[str, dict[str, int]] = {}
+    events = 0
+    for it in iter_sharded(
+        t,
+        base_pk="TYPE#AGENT_EVENT",
+        sk_condition=Key("gsi1sk").between(f"{lo}#", f"{hi}#"),
+        scan_index_forward=True,
+        page_size=page_size,
+        prefetch=True,
+    ):
+        created = str(it.get("createdAt") or "")
+        if len(created) < 13 or created >= hi:
+            continue
+        events += 1
+        incs = rollup_increments(it)
+        for bucket, acc in ((created[:13], hours), (created[:10], days)):
+            dst = acc.setdefault(bucket, {})
+            for k, v in incs.items():
+                dst[k] = dst.get(k, 0) + v
+
+    now = _now_iso()
+    written_h = written_d = 0
+    h = start
+    while h < cur_hour:
+        b = h.strftime("%Y-%m-%dT%H")
+        t.put_item(item={**_hour_bucket_key(b), "entityType": "AgentEventRollup", "bucket": b, "updatedAt": now, **hours.get(b, {})})
+        written_h += 1
+        h += timedelta(hours=1)
+    d = start
+    while d < cur_day:
+        b = d.strftime("%Y-%m-%d")
+        t.put_item(item={**_day_bucket_key(b), "entityType": "AgentEventRollup", "bucket": b, "updatedAt": now, **days.get(b, {})})
+        written_d += 1
+        d += timedelta(days=1)
+    return {"events": events, "hours": written_h, "days": written_d}
+
+
 def list_recent_events_global(*, since_iso: str, limit: int = 200) -> list[dict[str, Any]]:
     """
     Query AgentEvents across all opportunities using GSI1 time index.
@@ -100,9 +335,10 @@ def list_recent_events_global(*, since_iso: str, limit: int = 200) -> list[dict[
         return []
     # Lexicographic ordering matches ISO timestamps.
     hi = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z") + "#~"
-    pg = get_main_table().query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq("TYPE#AGENT_EVENT") & Key("gsi1sk").between(f"{since}#", hi),
+    pg = query_sharded_page(
+        get_main_table(),
+        base_pk="TYPE#AGENT_EVENT",
+        sk_condition=Key("gsi1sk").between(f"{since}#", hi),
         scan_index_forward=True,
         limit=max(1, min(500, int(limit or 200))),
         next_token=None,
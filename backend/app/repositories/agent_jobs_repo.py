@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Literal
+from decimal import Decimal
+from typing import Any, Callable, Literal
 
 from boto3.dynamodb.conditions import Key
 
 from app.db.dynamodb.errors import DdbConflict
 from app.db.dynamodb.table import get_main_table
+from app.observability.logging import get_logger
+
+log = get_logger("agent_jobs_repo")
 
 
 JobStatus = Literal["queued", "running", "checkpointed", "completed", "failed", "cancelled"]
@@ -92,6 +96,7 @@ def create_job(
             payload=payload,
             requested_by_user_sub=requested_by_user_sub,
         )
+    _sync_indexes(item)
     return normalize_job(item) or {}
 
 
@@ -158,6 +163,7 @@ def try_mark_running(*, job_id: str, from_checkpoint: bool = False) -> dict[str,
             condition_expression="#s = :q",
             return_values="ALL_NEW",
         )
+    _sync_indexes(updated)
     return normalize_job(updated) if updated else None
 
 
@@ -178,6 +184,7 @@ def mark_checkpointed(*, job_id: str, checkpoint_id: str | None = None) -> dict[
         },
         return_values="ALL_NEW",
     )
+    _sync_indexes(updated)
     return normalize_job(updated)
 
 
@@ -191,6 +198,7 @@ def complete_job(*, job_id: str, result: dict[str, Any] | None = None) -> dict[s
         expression_attribute_values={":s": "completed", ":f": now, ":u": now, ":r": result if isinstance(result, dict) else {}},
         return_values="ALL_NEW",
     )
+    _sync_indexes(updated)
     return normalize_job(updated)
 
 
@@ -205,6 +213,7 @@ def fail_job(*, job_id: str, error: str) -> dict[str, Any] | None:
         expression_attribute_values={":s": "failed", ":f": now, ":u": now, ":e": err},
         return_values="ALL_NEW",
     )
+    _sync_indexes(updated)
     return normalize_job(updated)
 
 
@@ -222,6 +231,7 @@ def cancel_job(*, job_id: str) -> dict[str, Any] | None:
         condition_expression="#s IN (:q, :ch)",
         return_values="ALL_NEW",
     )
+    _sync_indexes(updated)
     return normalize_job(updated) if updated else None
 
 
@@ -278,6 +288,7 @@ def update_job(*, job_id: str, updates: dict[str, Any]) -> dict[str, Any] | None
         expression_attribute_values=expr_values,
         return_values="ALL_NEW",
     )
+    _sync_indexes(updated, previous=current)
     return normalize_job(updated) if updated else None
 
 
@@ -295,126 +306,288 @@ def delete_job(*, job_id: str) -> None:
             raise ValueError(f"Cannot delete job with status: {current_status}")
     
     get_main_table().delete_item(key=job_key(job_id=jid))
+    _delete_indexes(job_id=jid)
+
+
+# --- list indexes ---
+#
+# The job item's own GSI1 slot is the due-time queue (AGENTJOB_DUE). Listing uses
+# small keys-only "index items" in the job's partition, one per slice, each placing
+# the job in its own GSI1 partition:
+#
+#   sk=IDX#ALL                 gsi1pk=AGENTJOBS
+#   sk=IDX#STATUS              gsi1pk=AGENTJOBS#S#<status>
+#   sk=IDX#TYPE                gsi1pk=AGENTJOBS#T#<jobType>
+#   sk=IDX#TYPE_STATUS         gsi1pk=AGENTJOBS#T#<jobType>#S#<status>
+#   sk=IDX#SCOPE#<k>           gsi1pk=AGENTJOBS#C#<k>=<v>
+#   sk=IDX#SCOPE_STATUS#<k>    gsi1pk=AGENTJOBS#C#<k>=<v>#S#<status>
+#
+# All use gsi1sk=<createdAt>#<jobId>, so every list is one exact, newest-first
+# key-range query plus a BatchGetItem for exactly the page. Index items are
+# rewritten after each job write, conditioned on the job's updatedAt so a slower
+# older write can't clobber a newer one. Readers still re-check the predicate on
+# the loaded job, so a failed index sync can't return a wrong row.
+
+# Scope keys that are always indexed when present, in this order.
+INDEXED_SCOPE_KEYS = ("rfpId", "proposalId", "caseId", "companyId", "candidateId", "taskId")
+# Cap on additional scalar scope entries indexed per job (sorted by key).
+MAX_EXTRA_SCOPE_KEYS = 4
+# Index pages read per list call before returning a short page + nextToken.
+_MAX_INDEX_PAGES = 5
+
+_INDEX_PK = "AGENTJOBS"
+
+
+def _scope_value(v: Any) -> str | None:
+    if isinstance(v, bool) or not isinstance(v, (str, int, Decimal)):
+        return None
+    sv = str(v).strip()
+    return sv[:256] if sv else None
 
 
-def list_recent_jobs(*, limit: int = 50, status: str | None = None) -> list[dict[str, Any]]:
+def _scope_pairs(scope: Any) -> list[tuple[str, str]]:
+    """Indexable (key, value) scope entries: the known keys first, then a few extra scalar keys."""
+    if not isinstance(scope, dict):
+        return []
+    out: list[tuple[str, str]] = []
+    for k in INDEXED_SCOPE_KEYS:
+        sv = _scope_value(scope.get(k))
+        if sv is not None:
+            out.append((k, sv))
+    extra: list[tuple[str, str]] = []
+    for k in sorted((k for k in scope.keys() if k not in INDEXED_SCOPE_KEYS), key=str):
+        sv = _scope_value(scope[k])
+        if sv is not None:
+            extra.append((str(k)[:64], sv))
+    if len(extra) > MAX_EXTRA_SCOPE_KEYS:
+        log.warning(
+            "agent_job_scope_keys_not_indexed",
+            keys=[k for k, _ in extra[MAX_EXTRA_SCOPE_KEYS:]],
+            indexed=[k for k, _ in out + extra[:MAX_EXTRA_SCOPE_KEYS]],
+        )
+    return out + extra[:MAX_EXTRA_SCOPE_KEYS]
+
+
+def _status_of(job: dict[str, Any]) -> str:
+    return str(job.get("status") or "").strip().lower() or "unknown"
+
+
+def _index_partition(
+    *, status: str | None = None, job_type: str | None = None, scope_pair: tuple[str, str] | None = None
+) -> str:
+    pk = _INDEX_PK
+    if job_type:
+        pk += f"#T#{job_type}"
+    elif scope_pair:
+        pk += f"#C#{scope_pair[0]}={scope_pair[1]}"
+    if status:
+        pk += f"#S#{status}"
+    return pk
+
+
+def _index_items(job: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Index items for `job`, keyed by sk."""
+    jid = str(job.get("jobId") or "").strip()
+    if not jid:
+        return {}
+    status = _status_of(job)
+    jtype = str(job.get("jobType") or "").strip() or "unknown"
+    slots: dict[str, str] = {
+        "ALL": _index_partition(),
+        "STATUS": _index_partition(status=status),
+        "TYPE": _index_partition(job_type=jtype),
+        "TYPE_STATUS": _index_partition(job_type=jtype, status=status),
+    }
+    for pair in _scope_pairs(job.get("scope")):
+        slots[f"SCOPE#{pair[0]}"] = _index_partition(scope_pair=pair)
+        slots[f"SCOPE_STATUS#{pair[0]}"] = _index_partition(scope_pair=pair, status=status)
+    gsi1sk = f"{str(job.get('createdAt') or '').strip()}#{jid}"
+    updated = str(job.get("updatedAt") or job.get("createdAt") or "")
+    return {
+        f"IDX#{slot}": {
+            "pk": f"AGENTJOB#{jid}",
+            "sk": f"IDX#{slot}",
+            "entityType": "AgentJobIndex",
+            "jobId": jid,
+            "jobUpdatedAt": updated,
+            "gsi1pk": gpk,
+            "gsi1sk": gsi1sk,
+        }
+        for slot, gpk in slots.items()
+    }
+
+
+def _sync_indexes(job: dict[str, Any] | None, *, previous: dict[str, Any] | None = None) -> bool:
     """
-    List recent agent jobs, optionally filtered by status.
-    Uses GSI1 (AGENTJOB_DUE) to get jobs sorted by dueAt descending (most recent first).
+    Best-effort: (re)write the list-index items for `job`; drops slots that only
+    `previous` had (e.g. a removed scope key). Returns False if the write failed
+    or a newer version had already been indexed.
     """
+    if not job:
+        return False
+    items = _index_items(job)
+    if not items:
+        return False
+    t = get_main_table()
+    stale = [sk for sk in _index_items(previous or {}) if sk not in items]
+    jid = str(job.get("jobId") or "").strip()
+    updated = str(job.get("updatedAt") or job.get("createdAt") or "")
+    try:
+        t.transact_write(
+            puts=[
+                t.tx_put(
+                    item=it,
+                    condition_expression="attribute_not_exists(jobUpdatedAt) OR jobUpdatedAt <= :u",
+                    expression_attribute_values={":u": updated},
+                )
+                for it in items.values()
+            ],
+            deletes=[t.tx_delete(key={"pk": f"AGENTJOB#{jid}", "sk": sk}) for sk in stale],
+        )
+        return True
+    except Exception as e:
+        log.warning("agent_job_index_sync_failed", jobId=jid, error=str(e) or type(e).__name__)
+        return False
+
+
+def _delete_indexes(*, job_id: str) -> None:
+    t = get_main_table()
+    try:
+        pg = t.query_page(
+            key_condition_expression=Key("pk").eq(f"AGENTJOB#{job_id}") & Key("sk").begins_with("IDX#"),
+            scan_index_forward=True,
+            limit=100,
+            next_token=None,
+        )
+        for it in pg.items:
+            t.delete_item(key={"pk": it["pk"], "sk": it["sk"]})
+    except Exception as e:
+        log.warning("agent_job_index_delete_failed", jobId=job_id, error=str(e) or type(e).__name__)
+
+
+def _list_page(
+    *,
+    partition: str,
+    limit: int,
+    next_token: str | None,
+    match: Callable[[dict[str, Any]], bool],
+) -> dict[str, Any]:
     lim = max(1, min(100, int(limit or 50)))
-    status_filter = str(status or "").strip().lower() if status else None
-    
-    # Query GSI1 for all jobs (dueAt index), sorted descending for most recent
-    # We'll need to query with a high upper bound and filter in code
-    # This is not perfect but efficient for bounded queries
-    pg = get_main_table().query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq("AGENTJOB_DUE"),
-        scan_index_forward=False,  # Descending = most recent first
-        limit=min(lim * 3, 200),  # Query more than needed to account for filtering
-        next_token=None,
-    )
-    
+    t = get_main_table()
     out: list[dict[str, Any]] = []
-    for it in pg.items or []:
-        norm = normalize_job(it)
-        if not norm:
-            continue
-        if status_filter and str(norm.get("status") or "").strip().lower() != status_filter:
-            continue
-        out.append(norm)
-        if len(out) >= lim:
+    tok = next_token
+    for _ in range(_MAX_INDEX_PAGES):
+        pg = t.query_page(
+            index_name="GSI1",
+            key_condition_expression=Key("gsi1pk").eq(partition),
+            scan_index_forward=False,
+            limit=lim - len(out),
+            next_token=tok,
+        )
+        ids = [str(it.get("jobId") or "") for it in pg.items if it.get("jobId")]
+        if ids:
+            got = {str(j.get("jobId") or ""): j for j in t.batch_get_items(keys=[job_key(job_id=i) for i in ids])}
+            for jid in ids:
+                norm = normalize_job(got.get(jid))
+                if norm and match(norm):
+                    out.append(norm)
+        tok = pg.next_token
+        if not tok or len(out) >= lim:
             break
-    
-    return out
+    return {"data": out, "nextToken": tok}
 
 
-def list_jobs_by_scope(*, scope: dict[str, Any], limit: int = 50, status: str | None = None) -> list[dict[str, Any]]:
+def _status_matches(job: dict[str, Any], status: str | None) -> bool:
+    return not status or _status_of(job) == status
+
+
+def list_recent_jobs_page(
+    *, limit: int = 50, status: str | None = None, next_token: str | None = None
+) -> dict[str, Any]:
+    """Newest-first agent jobs (by createdAt), optionally one status. Returns {data, nextToken}."""
+    st = str(status or "").strip().lower() or None
+    return _list_page(
+        partition=_index_partition(status=st),
+        limit=limit,
+        next_token=next_token,
+        match=lambda j: _status_matches(j, st),
+    )
+
+
+def list_jobs_by_scope_page(
+    *, scope: dict[str, Any], limit: int = 50, status: str | None = None, next_token: str | None = None
+) -> dict[str, Any]:
     """
-    List jobs filtered by scope (e.g., scope.rfpId).
-    Uses GSI1 to get recent jobs, then filters by scope in code.
+    Newest-first jobs whose scope contains every entry of `scope` (e.g. {"rfpId": ...}).
+
+    Queries the index of the first indexable scope entry; any further entries are
+    checked on the loaded jobs.
     """
-    lim = max(1, min(100, int(limit or 50)))
-    status_filter = str(status or "").strip().lower() if status else None
-    scope_filter = scope if isinstance(scope, dict) else {}
-    
-    # Query GSI1 for all jobs, filter by scope
-    pg = get_main_table().query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq("AGENTJOB_DUE"),
-        scan_index_forward=False,
-        limit=min(lim * 5, 300),  # Query more to account for scope filtering
-        next_token=None,
+    st = str(status or "").strip().lower() or None
+    want = scope if isinstance(scope, dict) else {}
+    pairs = _scope_pairs(want)
+
+    def _match(j: dict[str, Any]) -> bool:
+        js = j.get("scope") or {}
+        return _status_matches(j, st) and all(js.get(k) == v for k, v in want.items())
+
+    partition = _index_partition(scope_pair=pairs[0], status=st) if pairs else _index_partition(status=st)
+    return _list_page(partition=partition, limit=limit, next_token=next_token, match=_match)
+
+
+def list_jobs_by_type_page(
+    *, job_type: str, limit: int = 50, status: str | None = None, next_token: str | None = None
+) -> dict[str, Any]:
+    """Newest-first jobs of one jobType, optionally one status. Returns {data, nextToken}."""
+    jt = str(job_type or "").strip()
+    if not jt:
+        return {"data": [], "nextToken": None}
+    st = str(status or "").strip().lower() or None
+    return _list_page(
+        partition=_index_partition(job_type=jt, status=st),
+        limit=limit,
+        next_token=next_token,
+        match=lambda j: str(j.get("jobType") or "").strip() == jt and _status_matches(j, st),
     )
-    
-    out: list[dict[str, Any]] = []
-    for it in pg.items or []:
-        norm = normalize_job(it)
-        if not norm:
-            continue
-        
-        # Filter by status
-        if status_filter and str(norm.get("status") or "").strip().lower() != status_filter:
-            continue
-        
-        # Filter by scope
-        job_scope = norm.get("scope")
-        job_scope_dict = job_scope if isinstance(job_scope, dict) else {}
-        scope_matches = True
-        for key, value in scope_filter.items():
-            if job_scope_dict.get(key) != value:
-                scope_matches = False
-                break
-        if not scope_matches:
-            continue
-        
-        out.append(norm)
-        if len(out) >= lim:
-            break
-    
-    return out
+
+
+def list_recent_jobs(*, limit: int = 50, status: str | None = None) -> list[dict[str, Any]]:
+    return list_recent_jobs_page(limit=limit, status=status)["data"]
+
+
+def list_jobs_by_scope(*, scope: dict[str, Any], limit: int = 50, status: str | None = None) -> list[dict[str, Any]]:
+    return list_jobs_by_scope_page(scope=scope, limit=limit, status=status)["data"]
 
 
 def list_jobs_by_type(*, job_type: str, limit: int = 50, status: str | None = None) -> list[dict[str, Any]]:
+    return list_jobs_by_type_page(job_type=job_type, limit=limit, status=status)["data"]
+
+
+def backfill_indexes(
+    *, page_size: int = 200, next_token: str | None = None, max_pages: int | None = None
+) -> dict[str, Any]:
     """
-    List jobs filtered by job type.
-    Uses GSI1 to get recent jobs, then filters by jobType in code.
+    Write list-index items for existing jobs (walks the AGENTJOB_DUE queue, which
+    holds every job). Idempotent; returns {"jobs", "failed", "nextToken"} so large
+    tables can be backfilled in resumable chunks.
     """
-    lim = max(1, min(100, int(limit or 50)))
-    status_filter = str(status or "").strip().lower() if status else None
-    type_filter = str(job_type or "").strip()
-    
-    if not type_filter:
-        return []
-    
-    # Query GSI1 for all jobs, filter by type
-    pg = get_main_table().query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq("AGENTJOB_DUE"),
-        scan_index_forward=False,
-        limit=min(lim * 5, 300),  # Query more to account for type filtering
-        next_token=None,
-    )
-    
-    out: list[dict[str, Any]] = []
-    for it in pg.items or []:
-        norm = normalize_job(it)
-        if not norm:
-            continue
-        
-        # Filter by status
-        if status_filter and str(norm.get("status") or "").strip().lower() != status_filter:
-            continue
-        
-        # Filter by job type
-        job_type_str = str(norm.get("jobType") or "").strip()
-        if job_type_str != type_filter:
-            continue
-        
-        out.append(norm)
-        if len(out) >= lim:
+    t = get_main_table()
+    tok = next_token
+    jobs = failed = pages = 0
+    while True:
+        pg = t.query_page(
+            index_name="GSI1",
+            key_condition_expression=Key("gsi1pk").eq("AGENTJOB_DUE"),
+            scan_index_forward=True,
+            limit=max(1, min(500, int(page_size or 200))),
+            next_token=tok,
+        )
+        for it in pg.items:
+            jobs += 1
+            if not _sync_indexes(it):
+                failed += 1
+        tok = pg.next_token
+        pages += 1
+        if not tok or (max_pages is not None and pages >= max_pages):
             break
-    
-    return out
-
+    return {"jobs": jobs, "failed": failed, "nextToken": tok}
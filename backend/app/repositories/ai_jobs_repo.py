@@ -4,8 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Literal
 
-from boto3.dynamodb.conditions import Key
-
+from app.db.dynamodb.sharding import query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
 
 AiJobStatus = Literal["queued", "running", "completed", "failed"]
@@ -28,7 +27,7 @@ def type_pk(t: str) -> str:
 
 
 def _job_type_item(job_id: str, created_at: str) -> dict[str, str]:
-    return {"gsi1pk": type_pk("AI_JOB"), "gsi1sk": f"{created_at}#{job_id}"}
+    return {"gsi1pk": shard_pk(type_pk("AI_JOB"), job_key(job_id)), "gsi1sk": f"{created_at}#{job_id}"}
 
 
 def normalize_job_for_api(item: dict[str, Any] | None) -> dict[str, Any] | None:
@@ -109,9 +108,9 @@ def update_job(*, job_id: str, updates_obj: dict[str, Any]) -> dict[str, Any] |
 
 def list_recent_jobs(*, limit: int = 50, next_token: str | None = None) -> dict[str, Any]:
     t = get_main_table()
-    page = t.query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq(type_pk("AI_JOB")),
+    page = query_sharded_page(
+        t,
+        base_pk=type_pk("AI_JOB"),
         scan_index_forward=False,
         limit=max(1, min(200, int(limit or 50))),
         next_token=next_token,
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterable
 
 from boto3.dynamodb.conditions import Key
 
+from app.db.dynamodb.offload import hydrate_attributes, hydrate_many, offload_attributes
 from app.db.dynamodb.table import get_main_table
 
+# Extracted text can be large; it may be stored out of line (see app.db.dynamodb.offload).
+ATTACHMENT_BLOB_FIELDS = ("textContent",)
+
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
@@ -46,40 +50,33 @@ def add_attachments(rfp_id: str, attachments: list[dict[str, Any]]) -> list[dict
             "uploadedAt": uploaded_at,
             **(a or {}),
         }
-        get_main_table().put_item(item=item)
+        get_main_table().put_item(item=offload_attributes(item, ATTACHMENT_BLOB_FIELDS))
         norm = normalize_attachment(item)
         if norm:
             created.append(norm)
     return created
 
 
-def list_attachments(rfp_id: str) -> list[dict[str, Any]]:
-    t = get_main_table()
-    items: list[dict[str, Any]] = []
-    tok: str | None = None
-    while True:
-        pg = t.query_page(
-            key_condition_expression=Key("pk").eq(f"RFP#{rfp_id}")
-            & Key("sk").begins_with("ATTACHMENT#"),
-            scan_index_forward=False,
-            limit=200,
-            next_token=tok,
-        )
-        items.extend(pg.items)
-        tok = pg.next_token
-        if not tok or not pg.items:
-            break
+def list_attachments(rfp_id: str, include_text: bool = True) -> list[dict[str, Any]]:
+    items = get_main_table().query_iter(
+        key_condition_expression=Key("pk").eq(f"RFP#{rfp_id}") & Key("sk").begins_with("ATTACHMENT#"),
+        scan_index_forward=False,
+        page_size=200,
+    )
+    rows: Iterable[dict[str, Any]] = hydrate_many(list(items), ATTACHMENT_BLOB_FIELDS) if include_text else items
 
     out: list[dict[str, Any]] = []
-    for it in items:
+    for it in rows:
         norm = normalize_attachment(it)
         if norm:
             out.append(norm)
     return out
 
 
-def get_attachment(rfp_id: str, attachment_id: str) -> dict[str, Any] | None:
+def get_attachment(rfp_id: str, attachment_id: str, include_text: bool = True) -> dict[str, Any] | None:
     item = get_main_table().get_item(key=attachment_key(rfp_id, attachment_id))
+    if include_text:
+        item = hydrate_attributes(item, ATTACHMENT_BLOB_FIELDS)
     return normalize_attachment(item)
 
 
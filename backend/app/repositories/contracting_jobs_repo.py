@@ -154,27 +154,34 @@ def create_job(
         return get_job(job_id) or {}
 
 
-def try_mark_running(*, job_id: str) -> dict[str, Any] | None:
+def try_mark_running(*, job_id: str, reclaim: bool = False) -> dict[str, Any] | None:
     """
     Conditional transition queued->running. Returns updated job or None if not eligible.
+
+    `reclaim=True` also accepts a job left `running` by an earlier attempt (the job
+    engine's lease guarantees a single executor, so a retry may take it over).
     """
     jid = str(job_id or "").strip()
     if not jid:
         raise ValueError("job_id is required")
     now = now_iso()
-    updated = get_main_table().update_item(
-        key=job_key(jid),
-        update_expression="SET #s = :r, startedAt = :st, updatedAt = :u, progress = :p",
-        expression_attribute_names={"#s": "status"},
-        expression_attribute_values={
-            ":r": "running",
-            ":st": now,
-            ":u": now,
-            ":p": {"pct": 5, "step": "running", "message": "Running"},
-        },
-        condition_expression="#s = :q",
-        return_values="ALL_NEW",
-    )
+    try:
+        updated = get_main_table().update_item(
+            key=job_key(jid),
+            update_expression="SET #s = :r, startedAt = :st, updatedAt = :u, progress = :p",
+            expression_attribute_names={"#s": "status"},
+            expression_attribute_values={
+                ":r": "running",
+                ":q": "queued",
+                ":st": now,
+                ":u": now,
+                ":p": {"pct": 5, "step": "running", "message": "Running"},
+            },
+            condition_expression="#s IN (:q, :r)" if reclaim else "#s = :q",
+            return_values="ALL_NEW",
+        )
+    except DdbConflict:
+        return None
     return normalize_job_for_api(updated) if updated else None
 
 
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from boto3.dynamodb.conditions import Key
+
+from app.db.dynamodb.errors import DdbConflict, DdbError
+from app.db.dynamodb.table import DynamoTable, get_main_table
+from app.workers.job_engine import PRIORITIES, JobBackend, iso_at
+
+# Key layout (main table):
+#   job:            pk=JOB#<jobId>            sk=JOB
+#   ready index:    gsi1pk=JOBQ#<type>#<prio>  gsi1sk=<runAt>#<jobId>       (while queued)
+#   lease index:    gsi1pk=JOBRUN#<type>       gsi1sk=<leaseExpiresAt>#<jobId> (while running)
+#   running count:  pk=JOBTYPE#<type>          sk=RUNNING, running=<n>
+# Terminal jobs drop gsi1pk/gsi1sk, so both indexes only hold live work and every
+# poll is an exact key-range query (no over-fetch + filter).
+
+
+def job_key(job_id: str) -> dict[str, str]:
+    return {"pk": f"JOB#{job_id}", "sk": "JOB"}
+
+
+def running_counter_key(job_type: str) -> dict[str, str]:
+    return {"pk": f"JOBTYPE#{job_type}", "sk": "RUNNING"}
+
+
+def ready_index(job_type: str, priority: int, run_at: str, job_id: str) -> dict[str, str]:
+    return {"gsi1pk": f"JOBQ#{job_type}#{int(priority)}", "gsi1sk": f"{run_at}#{job_id}"}
+
+
+def lease_index(job_type: str, lease_expires_at: str, job_id: str) -> dict[str, str]:
+    return {"gsi1pk": f"JOBRUN#{job_type}", "gsi1sk": f"{lease_expires_at}#{job_id}"}
+
+
+def _ddb_safe(v: Any) -> Any:
+    # The resource layer rejects floats; round-trip through JSON into Decimals.
+    return json.loads(json.dumps(v, default=str), parse_float=Decimal)
+
+
+def normalize_job(item: dict[str, Any] | None) -> dict[str, Any] | None:
+    if not item:
+        return None
+    out = dict(item)
+    for k in ("pk", "sk", "gsi1pk", "gsi1sk", "entityType"):
+        out.pop(k, None)
+    for k in ("priority", "attempts", "maxAttempts"):
+        if isinstance(out.get(k), Decimal):
+            out[k] = int(out[k])
+    return out
+
+
+def _condition_failures(e: Exception) -> list[bool]:
+    """Per-item ConditionalCheckFailed flags of a cancelled transaction ([] if not a cancellation)."""
+    cause = getattr(e, "cause", None) or e
+    resp = getattr(cause, "response", None)
+    if not isinstance(resp, dict):
+        return []
+    if ((resp.get("Error") or {}).get("Code") or "") != "TransactionCanceledException":
+        return []
+    return [((r or {}).get("Code") == "ConditionalCheckFailed") for r in resp.get("CancellationReasons") or []]
+
+
+class DynamoJobBackend(JobBackend):
+    def __init__(self, table: DynamoTable | None = None):
+        self._table = table
+
+    @property
+    def table(self) -> DynamoTable:
+        if self._table is None:
+            self._table = get_main_table()
+        return self._table
+
+    def enqueue(self, job: dict[str, Any]) -> dict[str, Any]:
+        jid = str(job["jobId"])
+        item = {
+            **job_key(jid),
+            "entityType": "Job",
+            **_ddb_safe(job),
+            **ready_index(job["jobType"], job["priority"], job["runAt"], jid),
+        }
+        try:
+            self.table.put_item(item=item, condition_expression="attribute_not_exists(pk)")
+        except DdbConflict:
+            return self.get(jid) or dict(job)
+        return dict(job)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        return normalize_job(self.table.get_item(key=job_key(job_id)))
+
+    def _query_index(self, pk: str, *, upto: str, limit: int) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
+        pg = self.table.query_page(
+            index_name="GSI1",
+            key_condition_expression=Key("gsi1pk").eq(pk) & Key("gsi1sk").lte(f"{upto}#~"),
+            scan_index_forward=True,
+            limit=limit,
+            next_token=None,
+        )
+        return [n for n in (normalize_job(it) for it in pg.items) if n]
+
+    def find_ready(self, job_type: str, *, now: float, limit: int) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        cutoff = iso_at(now)
+        for prio in PRIORITIES:
+            out.extend(self._query_index(f"JOBQ#{job_type}#{prio}", upto=cutoff, limit=limit - len(out)))
+            if len(out) >= limit:
+                break
+        # GSI reads are eventually consistent; claim() re-checks status.
+        return [j for j in out if j.get("status") == "queued"]
+
+    def find_expired(self, job_type: str, *, now: float, limit: int) -> list[dict[str, Any]]:
+        return [
+            j
+            for j in self._query_index(f"JOBRUN#{job_type}", upto=iso_at(now), limit=limit)
+            if j.get("status") == "running"
+        ]
+
+    def _counter_update(self, job_type: str, delta: int, *, max_running: int | None = None) -> dict[str, Any]:
+        t = self.table
+        if max_running is None:
+            return t.tx_update(
+                key=running_counter_key(job_type),
+                update_expression="ADD running :d",
+                expression_attribute_names=None,
+                expression_attribute_values={":d": int(delta)},
+            )
+        return t.tx_update(
+            key=running_counter_key(job_type),
+            update_expression="ADD running :d",
+            expression_attribute_names=None,
+            expression_attribute_values={":d": int(delta), ":max": int(max_running)},
+            condition_expression="attribute_not_exists(running) OR running < :max",
+        )
+
+    def claim(
+        self, job: dict[str, Any], *, owner: str, now: float, lease_until: float, max_running: int
+    ) -> tuple[dict[str, Any] | None, bool]:
+        t = self.table
+        jid = str(job["jobId"])
+        lease = iso_at(lease_until)
+        idx = lease_index(job["jobType"], lease, jid)
+        job_update = t.tx_update(
+            key=job_key(jid),
+            update_expression=(
+                "SET #s = :running, leaseOwner = :o, leaseExpiresAt = :l, heartbeatAt = :n, updatedAt = :n, "
+                "startedAt = if_not_exists(startedAt, :n), gsi1pk = :gpk, gsi1sk = :gsk ADD attempts :one"
+            ),
+            expression_attribute_names={"#s": "status"},
+            expression_attribute_values={
+                ":running": "running",
+                ":queued": "queued",
+                ":o": owner,
+                ":l": lease,
+                ":n": iso_at(now),
+                ":gpk": idx["gsi1pk"],
+                ":gsk": idx["gsi1sk"],
+                ":one": 1,
+            },
+            condition_expression="#s = :queued",
+        )
+        try:
+            t.transact_write(updates=[self._counter_update(job["jobType"], 1, max_running=max_running), job_update])
+        except DdbError as e:
+            failed = _condition_failures(e)
+            if not failed:
+                raise
+            return None, bool(failed[0])
+        claimed = dict(job)
+        claimed.update(
+            status="running",
+            leaseOwner=owner,
+            leaseExpiresAt=lease,
+            heartbeatAt=iso_at(now),
+            attempts=int(job.get("attempts") or 0) + 1,
+        )
+        claimed.setdefault("startedAt", iso_at(now))
+        return claimed, False
+
+    def heartbeat(
+        self, job_id: str, *, owner: str, now: float, lease_until: float, progress: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        cur = self.get(job_id)
+        if not cur:
+            return None
+        lease = iso_at(lease_until)
+        expr = "SET leaseExpiresAt = :l, heartbeatAt = :n, updatedAt = :n, gsi1sk = :gsk"
+        values: dict[str, Any] = {
+            ":l": lease,
+            ":n": iso_at(now),
+            ":gsk": lease_index(cur["jobType"], lease, job_id)["gsi1sk"],
+            ":running": "running",
+            ":o": owner,
+        }
+        if progress is not None:
+            expr += ", progress = :p"
+            values[":p"] = _ddb_safe(progress)
+        try:
+            updated = self.table.update_item(
+                key=job_key(job_id),
+                update_expression=expr,
+                expression_attribute_names={"#s": "status"},
+                expression_attribute_values=values,
+                condition_expression="#s = :running AND leaseOwner = :o",
+                return_values="ALL_NEW",
+            )
+        except DdbConflict:
+            return None
+        return normalize_job(updated)
+
+    def _release_update(
+        self,
+        job: dict[str, Any],
+        *,
+        now: float,
+        status: str,
+        result: dict[str, Any] | None,
+        error: str | None,
+        retry_at: float | None,
+        condition: str,
+        condition_values: dict[str, Any],
+    ) -> dict[str, Any]:
+        jid = str(job["jobId"])
+        sets = ["updatedAt = :n"]
+        values: dict[str, Any] = {":n": iso_at(now), **condition_values}
+        if error is not None:
+            sets.append("#e = :e")
+            values[":e"] = str(error)[:800]
+        if retry_at is not None:
+            run_at = iso_at(retry_at)
+            idx = ready_index(job["jobType"], int(job.get("priority") or 1), run_at, jid)
+            sets += ["#s = :queued", "runAt = :r", "gsi1pk = :gpk", "gsi1sk = :gsk"]
+            values.update({":queued": "queued", ":r": run_at, ":gpk": idx["gsi1pk"], ":gsk": idx["gsi1sk"]})
+            removes = ["leaseOwner", "leaseExpiresAt"]
+        else:
+            sets += ["#s = :final", "finishedAt = :n"]
+            values[":final"] = status
+            if result is not None:
+                sets.append("#res = :res")
+                values[":res"] = _ddb_safe(result)
+            removes = ["leaseOwner", "leaseExpiresAt", "gsi1pk", "gsi1sk"]
+        names = {"#s": "status"}
+        if error is not None:
+            names["#e"] = "error"
+        if result is not None and retry_at is None:
+            names["#res"] = "result"
+        return self.table.tx_update(
+            key=job_key(jid),
+            update_expression="SET " + ", ".join(sets) + " REMOVE " + ", ".join(removes),
+            expression_attribute_names=names,
+            expression_attribute_values=values,
+            condition_expression=condition,
+        )
+
+    def finish(
+        self,
+        job: dict[str, Any],
+        *,
+        owner: str,
+        now: float,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+        retry_at: float | None = None,
+    ) -> bool:
+        upd = self._release_update(
+            job,
+            now=now,
+            status=status,
+            result=result,
+            error=error,
+            retry_at=retry_at,
+            condition="#s = :running AND leaseOwner = :o",
+            condition_values={":running": "running", ":o": owner},
+        )
+        try:
+            self.table.transact_write(updates=[upd, self._counter_update(job["jobType"], -1)])
+        except DdbError as e:
+            if _condition_failures(e):
+                return False
+            raise
+        return True
+
+    def reap(self, job: dict[str, Any], *, now: float, retry_at: float | None) -> bool:
+        upd = self._release_update(
+            job,
+            now=now,
+            status="failed",
+            result=None,
+            error="lease_expired",
+            retry_at=retry_at,
+            condition="#s = :running AND leaseExpiresAt < :cut",
+            condition_values={":running": "running", ":cut": iso_at(now)},
+        )
+        try:
+            self.table.transact_write(updates=[upd, self._counter_update(job["jobType"], -1)])
+        except DdbError as e:
+            if _condition_failures(e):
+                return False
+            raise
+        return True
+
+    def request_cancel(self, job_id: str, *, now: float) -> dict[str, Any] | None:
+        n = iso_at(now)
+        try:
+            updated = self.table.update_item(
+                key=job_key(job_id),
+                update_expression="SET #s = :c, finishedAt = :n, updatedAt = :n REMOVE gsi1pk, gsi1sk",
+                expression_attribute_names={"#s": "status"},
+                expression_attribute_values={":c": "cancelled", ":n": n, ":q": "queued"},
+                condition_expression="#s = :q",
+                return_values="ALL_NEW",
+            )
+            return normalize_job(updated)
+        except DdbConflict:
+            pass
+        try:
+            updated = self.table.update_item(
+                key=job_key(job_id),
+                update_expression="SET cancelRequested = :t, updatedAt = :n",
+                expression_attribute_names={"#s": "status"},
+                expression_attribute_values={":t": True, ":n": n, ":r": "running"},
+                condition_expression="#s = :r",
+                return_values="ALL_NEW",
+            )
+            return normalize_job(updated)
+        except DdbConflict:
+            return self.get(job_id)
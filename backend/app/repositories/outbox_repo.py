@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import threading
 import time
 import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr
 
 from app.db.dynamodb.errors import DdbConflict
+from app.db.dynamodb.scan import ScanCheckpoint
+from app.db.dynamodb.sharding import query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
 
 
@@ -52,7 +55,7 @@ def enqueue_event(*, event_type: str, payload: dict[str, Any], dedupe_key: str |
         "updatedAt": now,
         "payload": payload if isinstance(payload, dict) else {},
         # GSI1: pending queue
-        "gsi1pk": "OUTBOX#PENDING",
+        "gsi1pk": shard_pk("OUTBOX#PENDING", outbox_key(eid)),
         "gsi1sk": f"{now}#{eid}",
     }
     try:
@@ -65,9 +68,9 @@ def enqueue_event(*, event_type: str, payload: dict[str, Any], dedupe_key: str |
 
 
 def list_pending(*, limit: int = 50, next_token: str | None = None) -> dict[str, Any]:
-    pg = get_main_table().query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq("OUTBOX#PENDING"),
+    pg = query_sharded_page(
+        get_main_table(),
+        base_pk="OUTBOX#PENDING",
         scan_index_forward=True,
         limit=max(1, min(200, int(limit or 50))),
         next_token=next_token,
@@ -151,7 +154,7 @@ def mark_retry(*, event_id: str, error: str) -> dict[str, Any] | None:
             ":e": str(error or "")[:800],
             ":n": next_at,
             ":u": now,
-            ":gpk": "OUTBOX#PENDING",
+            ":gpk": shard_pk("OUTBOX#PENDING", outbox_key(eid)),
             ":gsk": f"{now}#{eid}",
         },
         return_values="ALL_NEW",
@@ -159,3 +162,65 @@ def mark_retry(*, event_id: str, error: str) -> dict[str, Any] | None:
     return updated
 
 
+def purge_events(
+    *,
+    older_than_days: float = 30,
+    statuses: tuple[str, ...] = ("done",),
+    total_segments: int = 8,
+    max_workers: int | None = None,
+    max_rcu_per_s: float | None = None,
+    checkpoint_name: str | None = None,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """
+    Delete finished outbox events last updated before the cutoff.
+
+    Done/failed events drop their GSI1 keys, so only a table scan can find them.
+    Resumable with `checkpoint_name`; safe to re-run (deletes are conditional on
+    the status still matching). Dry runs ignore `checkpoint_name` so they never
+    advance the checkpoint of a real purge.
+    """
+    sts = [str(s).strip() for s in statuses if str(s or "").strip()]
+    if not sts:
+        raise ValueError("at least one status is required")
+    cutoff = (
+        datetime.fromtimestamp(time.time() - float(older_than_days) * 86400, tz=timezone.utc)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+    t = get_main_table()
+    counts = {"deleted": 0, "conflicts": 0}
+    lock = threading.Lock()
+
+    def _process(items: list[dict[str, Any]]) -> None:
+        for it in items:
+            if dry_run:
+                with lock:
+                    counts["deleted"] += 1
+                continue
+            try:
+                t.delete_item(
+                    key={"pk": it["pk"], "sk": it["sk"]},
+                    condition_expression="#s = :s",
+                    expression_attribute_names={"#s": "status"},
+                    expression_attribute_values={":s": it.get("status")},
+                )
+            except DdbConflict:
+                with lock:
+                    counts["conflicts"] += 1
+                continue
+            with lock:
+                counts["deleted"] += 1
+
+    res = t.parallel_scan(
+        _process,
+        total_segments=total_segments,
+        max_workers=max_workers,
+        filter_expression=Attr("entityType").eq("OutboxEvent")
+        & Attr("status").is_in(sts)
+        & Attr("updatedAt").lt(cutoff),
+        projection=["status"],
+        max_rcu_per_s=max_rcu_per_s,
+        checkpoint=ScanCheckpoint(t, checkpoint_name) if checkpoint_name and not dry_run else None,
+    )
+    return {**res, **counts, "cutoff": cutoff, "dryRun": bool(dry_run)}
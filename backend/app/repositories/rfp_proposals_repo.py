@@ -6,6 +6,9 @@ from typing import Any
 
 from boto3.dynamodb.conditions import Key
 
+from app.db.dynamodb.item_cache import cached_get_item, invalidate_item, remember_item
+from app.db.dynamodb.offload import hydrate_attributes, offload_attributes
+from app.db.dynamodb.sharding import cursor_after, iter_sharded, query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
 
 
@@ -26,7 +29,7 @@ def proposal_key(proposal_id: str) -> dict[str, str]:
 
 
 def proposal_type_item(proposal_id: str, updated_at: str) -> dict[str, str]:
-    return {"gsi1pk": type_pk("PROPOSAL"), "gsi1sk": f"{updated_at}#{proposal_id}"}
+    return {"gsi1pk": shard_pk(type_pk("PROPOSAL"), proposal_key(proposal_id)), "gsi1sk": f"{updated_at}#{proposal_id}"}
 
 
 def proposal_rfp_link_key(rfp_id: str, proposal_id: str) -> dict[str, str]:
@@ -45,6 +48,8 @@ def normalize_proposal_for_api(item: dict[str, Any] | None, include_sections: bo
 
     if not include_sections:
         out.pop("sections", None)
+    else:
+        out = hydrate_attributes(out, ("sections",)) or out
 
     return out
 
@@ -112,11 +117,12 @@ def create_proposal(
 
     # Transactional create: ensure both the proposal and the link item are created
     # atomically, and never overwrite an existing item.
+    stored = offload_attributes(item, ("sections",))
     t = get_main_table()
     t.transact_write(
         puts=[
             t.tx_put(
-                item=item,
+                item=stored,
                 condition_expression="attribute_not_exists(pk) AND attribute_not_exists(sk)",
             ),
             t.tx_put(
@@ -125,12 +131,18 @@ def create_proposal(
             ),
         ]
     )
+    remember_item(stored)
+
+    # Best-effort: never fails the write.
+    from app.infrastructure.search.search_index import index_proposal
+
+    index_proposal(item)
 
     return normalize_proposal_for_api(item, include_sections=True) or {}
 
 
 def get_proposal_by_id(proposal_id: str, include_sections: bool = True) -> dict[str, Any] | None:
-    item = get_main_table().get_item(key=proposal_key(proposal_id))
+    item = cached_get_item(get_main_table(), proposal_key(proposal_id))
     return normalize_proposal_for_api(item, include_sections=include_sections)
 
 
@@ -144,38 +156,31 @@ def list_proposals(page: int = 1, limit: int = 20, next_token: str | None = None
     lim = max(1, min(200, int(limit or 20)))
 
     t = get_main_table()
-    token = next_token
-
-    if not token and p > 1:
-        for _ in range(1, p):
-            pg = t.query_page(
-                index_name="GSI1",
-                key_condition_expression=Key("gsi1pk").eq(type_pk("PROPOSAL")),
-                scan_index_forward=False,
-                limit=lim,
-                next_token=token,
-            )
-            token = pg.next_token
-            if not token:
-                break
-
-    page_resp = t.query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq(type_pk("PROPOSAL")),
-        scan_index_forward=False,
-        limit=lim,
-        next_token=token,
-    )
+    if not next_token and p > 1:
+        # Back-compat: walk to the requested page in-process, then hand back a
+        # cursor positioned after it.
+        seen = list(iter_sharded(t, base_pk=type_pk("PROPOSAL"), scan_index_forward=False, page_size=500, max_items=p * lim + 1))
+        items = seen[(p - 1) * lim : p * lim]
+        token = cursor_after(type_pk("PROPOSAL"), seen[: p * lim]) if len(seen) > p * lim else None
+    else:
+        page_resp = query_sharded_page(
+            t,
+            base_pk=type_pk("PROPOSAL"),
+            scan_index_forward=False,
+            limit=lim,
+            next_token=next_token,
+        )
+        items, token = page_resp.items, page_resp.next_token
 
     data: list[dict[str, Any]] = []
-    for it in page_resp.items:
+    for it in items:
         norm = normalize_proposal_for_api(it, include_sections=False)
         if norm:
             data.append(norm)
 
     return {
         "data": data,
-        "nextToken": page_resp.next_token,
+        "nextToken": token,
         "pagination": {"page": p, "limit": lim},
     }
 
@@ -199,6 +204,7 @@ def update_proposal(proposal_id: str, updates_obj: dict[str, Any]) -> dict[str,
         "generationCompletedAt",
     }
     updates = {k: v for k, v in (updates_obj or {}).items() if k in allowed}
+    updates = offload_attributes(updates, ("sections",))
 
     now = now_iso()
     expr_parts: list[str] = []
@@ -224,6 +230,7 @@ def update_proposal(proposal_id: str, updates_obj: dict[str, Any]) -> dict[str,
         expression_attribute_values=expr_values,
         return_values="ALL_NEW",
     )
+    remember_item(updated)
 
     # best-effort update link item
     if updated and updated.get("rfpId"):
@@ -246,6 +253,12 @@ def update_proposal(proposal_id: str, updates_obj: dict[str, Any]) -> dict[str,
         except Exception:
             pass
 
+    updated = hydrate_attributes(updated, ("sections",))
+
+    from app.infrastructure.search.search_index import index_proposal
+
+    index_proposal(updated)
+
     return normalize_proposal_for_api(updated, include_sections=True)
 
 
@@ -258,6 +271,7 @@ def update_proposal_review(proposal_id: str, review_patch: dict[str, Any]) -> di
         expression_attribute_values={":r": review_patch, ":u": now, ":g": f"{now}#{proposal_id}"},
         return_values="ALL_NEW",
     )
+    remember_item(updated)
     if updated and updated.get("rfpId"):
         try:
             get_main_table().put_item(
@@ -284,29 +298,24 @@ def update_proposal_review(proposal_id: str, review_patch: dict[str, Any]) -> di
 def delete_proposal(proposal_id: str) -> None:
     existing = get_proposal_by_id(proposal_id, include_sections=False)
     get_main_table().delete_item(key=proposal_key(proposal_id))
+    invalidate_item(proposal_key(proposal_id))
     if existing and existing.get("rfpId"):
         try:
             get_main_table().delete_item(key=proposal_rfp_link_key(existing["rfpId"], proposal_id))
         except Exception:
             pass
 
+    from app.infrastructure.search.search_index import proposal_doc_id, remove_document
+
+    remove_document(proposal_doc_id(proposal_id))
+
 
 def list_proposals_by_rfp(rfp_id: str) -> list[dict[str, Any]]:
-    t = get_main_table()
-    items: list[dict[str, Any]] = []
-    tok: str | None = None
-    while True:
-        pg = t.query_page(
-            key_condition_expression=Key("pk").eq(f"RFP#{rfp_id}")
-            & Key("sk").begins_with("PROPOSAL#"),
-            scan_index_forward=False,
-            limit=200,
-            next_token=tok,
-        )
-        items.extend(pg.items)
-        tok = pg.next_token
-        if not tok or not pg.items:
-            break
+    items = get_main_table().query_iter(
+        key_condition_expression=Key("pk").eq(f"RFP#{rfp_id}") & Key("sk").begins_with("PROPOSAL#"),
+        scan_index_forward=False,
+        page_size=200,
+    )
 
     out: list[dict[str, Any]] = []
     for it in items:
@@ -12,6 +12,9 @@ def _ddb_key() -> Any:
     mod = importlib.import_module("boto3.dynamodb.conditions")
     return getattr(mod, "Key")
 
+from app.db.dynamodb.item_cache import cached_get_item, invalidate_item, remember_item
+from app.db.dynamodb.offload import hydrate_attributes, hydrate_many, offload_attributes
+from app.db.dynamodb.sharding import cursor_after, iter_sharded, query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
 from app.rfp_logic import check_disqualification, compute_date_sanity, compute_fit_score
 
@@ -32,15 +35,19 @@ def rfp_key(rfp_id: str) -> dict[str, str]:
     return {"pk": f"RFP#{rfp_id}", "sk": "PROFILE"}
 
 
+# Large attributes that may be stored out of line (see app.db.dynamodb.offload).
+RFP_BLOB_FIELDS = ("rawText", "_analysis")
+
+
 def _rfp_type_item(rfp_id: str, created_at: str) -> dict[str, str]:
-    return {"gsi1pk": type_pk("RFP"), "gsi1sk": f"{created_at}#{rfp_id}"}
+    return {"gsi1pk": shard_pk(type_pk("RFP"), rfp_key(rfp_id)), "gsi1sk": f"{created_at}#{rfp_id}"}
 
 
 def normalize_rfp_for_api(item: dict[str, Any] | None) -> dict[str, Any] | None:
     if not item:
         return None
 
-    obj = dict(item)
+    obj = dict(hydrate_attributes(item, RFP_BLOB_FIELDS) or item)
     obj["_id"] = item.get("rfpId")
 
     for k in ("pk", "sk", "gsi1pk", "gsi1sk", "entityType", "rfpId"):
@@ -79,9 +86,16 @@ def create_rfp_from_analysis(
         source_file_name=source_file_name,
         source_file_size=source_file_size,
     )
-    get_main_table().put_item(item=item, condition_expression="attribute_not_exists(pk)")
+    stored = offload_attributes(item, RFP_BLOB_FIELDS)
+    get_main_table().put_item(item=stored, condition_expression="attribute_not_exists(pk)")
+    remember_item(stored)
     result = normalize_rfp_for_api(item) or {}
 
+    # Best-effort: never fails the write.
+    from app.infrastructure.search.search_index import index_rfp
+
+    index_rfp(item)
+
     # Create/ensure Opportunity profile row (back-compat: opportunityId == rfpId)
     # Best-effort: do not fail RFP creation if this fails.
     try:
@@ -139,7 +153,7 @@ def build_rfp_item_from_analysis(
 
 
 def get_rfp_by_id(rfp_id: str) -> dict[str, Any] | None:
-    item = get_main_table().get_item(key=rfp_key(rfp_id))
+    item = cached_get_item(get_main_table(), rfp_key(rfp_id))
     return normalize_rfp_for_api(item)
 
 
@@ -154,40 +168,31 @@ def list_rfps(page: int = 1, limit: int = 20, next_token: str | None = None) ->
     lim = max(1, min(200, int(limit or 20)))
 
     t = get_main_table()
-    token = next_token
-
-    # Back-compat: if a caller requests a deeper \"page\" without providing a token,
-    # advance the cursor `page-1` times.
-    if not token and p > 1:
-        for _ in range(1, p):
-            pg = t.query_page(
-                index_name="GSI1",
-                key_condition_expression=_Key("gsi1pk").eq(type_pk("RFP")),
-                scan_index_forward=False,
-                limit=lim,
-                next_token=token,
-            )
-            token = pg.next_token
-            if not token:
-                break
-
-    page_resp = t.query_page(
-        index_name="GSI1",
-        key_condition_expression=_Key("gsi1pk").eq(type_pk("RFP")),
-        scan_index_forward=False,
-        limit=lim,
-        next_token=token,
-    )
+    if not next_token and p > 1:
+        # Back-compat: walk to the requested page in-process, then hand back a
+        # cursor positioned after it.
+        seen = list(iter_sharded(t, base_pk=type_pk("RFP"), scan_index_forward=False, page_size=500, max_items=p * lim + 1))
+        items = seen[(p - 1) * lim : p * lim]
+        token = cursor_after(type_pk("RFP"), seen[: p * lim]) if len(seen) > p * lim else None
+    else:
+        page_resp = query_sharded_page(
+            t,
+            base_pk=type_pk("RFP"),
+            scan_index_forward=False,
+            limit=lim,
+            next_token=next_token,
+        )
+        items, token = page_resp.items, page_resp.next_token
 
     data: list[dict[str, Any]] = []
-    for it in page_resp.items:
+    for it in hydrate_many(items, RFP_BLOB_FIELDS):
         norm = normalize_rfp_for_api(it)
         if norm:
             data.append(norm)
 
     return {
         "data": data,
-        "nextToken": page_resp.next_token,
+        "nextToken": token,
         # Keep a small pagination object for legacy callers. Totals are not computed
         # in cursor mode (would require extra scans/queries).
         "pagination": {"page": p, "limit": lim},
@@ -227,6 +232,7 @@ def update_rfp(rfp_id: str, updates_obj: dict[str, Any]) -> dict[str, Any] | Non
     }
 
     updates = {k: v for k, v in (updates_obj or {}).items() if k in allowed}
+    updates = offload_attributes(updates, RFP_BLOB_FIELDS)
 
     now = now_iso()
     expr_parts: list[str] = []
@@ -252,29 +258,31 @@ def update_rfp(rfp_id: str, updates_obj: dict[str, Any]) -> dict[str, Any] | Non
         return_values="ALL_NEW",
     )
 
+    remember_item(updated)
+    updated = hydrate_attributes(updated, RFP_BLOB_FIELDS)
+
+    from app.infrastructure.search.search_index import index_rfp
+
+    index_rfp(updated)
+
     return normalize_rfp_for_api(updated)
 
 
 def delete_rfp(rfp_id: str) -> None:
     get_main_table().delete_item(key=rfp_key(rfp_id))
+    invalidate_item(rfp_key(rfp_id))
+
+    from app.infrastructure.search.search_index import remove_document, rfp_doc_id
+
+    remove_document(rfp_doc_id(rfp_id))
 
 
 def list_rfp_proposal_summaries(rfp_id: str) -> list[dict[str, Any]]:
-    t = get_main_table()
-    items: list[dict[str, Any]] = []
-    tok: str | None = None
-    while True:
-        pg = t.query_page(
-            key_condition_expression=_Key("pk").eq(f"RFP#{rfp_id}")
-            & _Key("sk").begins_with("PROPOSAL#"),
-            scan_index_forward=False,
-            limit=200,
-            next_token=tok,
-        )
-        items.extend(pg.items)
-        tok = pg.next_token
-        if not tok or not pg.items:
-            break
+    items = get_main_table().query_iter(
+        key_condition_expression=_Key("pk").eq(f"RFP#{rfp_id}") & _Key("sk").begins_with("PROPOSAL#"),
+        scan_index_forward=False,
+        page_size=200,
+    )
 
     out: list[dict[str, Any]] = []
     for it in items:
@@ -5,9 +5,8 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from boto3.dynamodb.conditions import Key
-
 from app.db.dynamodb.errors import DdbConflict
+from app.db.dynamodb.sharding import query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
 from app.repositories import rfp_intake_queue_repo
 
@@ -26,7 +25,7 @@ def scraped_rfp_key(candidate_id: str) -> dict[str, str]:
 
 def _scraped_rfp_type_item(candidate_id: str, source: str, created_at: str) -> dict[str, str]:
     return {
-        "gsi1pk": f"SCRAPEDRFP_SOURCE#{source}",
+        "gsi1pk": shard_pk(f"SCRAPEDRFP_SOURCE#{source}", scraped_rfp_key(candidate_id)),
         "gsi1sk": f"{created_at}#{candidate_id}",
     }
 
@@ -196,9 +195,9 @@ def list_scraped_rfps(
 
     if source:
         # Use GSI1 to filter by source
-        page_resp = t.query_page(
-            index_name="GSI1",
-            key_condition_expression=Key("gsi1pk").eq(f"SCRAPEDRFP_SOURCE#{source}"),
+        page_resp = query_sharded_page(
+            t,
+            base_pk=f"SCRAPEDRFP_SOURCE#{source}",
             scan_index_forward=False,
             limit=lim,
             next_token=next_token,
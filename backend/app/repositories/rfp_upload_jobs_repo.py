@@ -4,8 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Literal
 
-from boto3.dynamodb.conditions import Key
-
+from app.db.dynamodb.sharding import query_sharded_page, shard_pk
 from app.db.dynamodb.table import get_main_table
 
 JobStatus = Literal["queued", "processing", "completed", "failed"]
@@ -28,7 +27,7 @@ def job_key(job_id: str) -> dict[str, str]:
 
 
 def _job_type_item(job_id: str, created_at: str) -> dict[str, str]:
-    return {"gsi1pk": type_pk("RFP_UPLOAD_JOB"), "gsi1sk": f"{created_at}#{job_id}"}
+    return {"gsi1pk": shard_pk(type_pk("RFP_UPLOAD_JOB"), job_key(job_id)), "gsi1sk": f"{created_at}#{job_id}"}
 
 
 def normalize_job_for_api(item: dict[str, Any] | None) -> dict[str, Any] | None:
@@ -122,9 +121,9 @@ def list_jobs_for_user(*, user_sub: str, limit: int = 50, next_token: str | None
     # Optional helper: list recent jobs (uses GSI1 global list then filters in app).
     # We keep it simple; this can be improved with a user-scoped GSI later.
     t = get_main_table()
-    page = t.query_page(
-        index_name="GSI1",
-        key_condition_expression=Key("gsi1pk").eq(type_pk("RFP_UPLOAD_JOB")),
+    page = query_sharded_page(
+        t,
+        base_pk=type_pk("RFP_UPLOAD_JOB"),
         scan_index_forward=False,
         limit=max(1, min(200, int(limit or 50))),
         next_token=next_token,
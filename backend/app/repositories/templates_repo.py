@@ -6,6 +6,7 @@ from typing import Any
 
 from boto3.dynamodb.conditions import Key
 
+from app.db.dynamodb.item_cache import cached_get_item, invalidate_item, remember_item
 from app.db.dynamodb.table import get_main_table
 
 
@@ -36,7 +37,7 @@ def normalize_template(item: dict[str, Any] | None) -> dict[str, Any] | None:
 
 
 def get_template_by_id(template_id: str) -> dict[str, Any] | None:
-    item = get_main_table().get_item(key=template_key(template_id))
+    item = cached_get_item(get_main_table(), template_key(template_id))
     return normalize_template(item)
 
 
@@ -81,6 +82,7 @@ def create_template(doc: dict[str, Any]) -> dict[str, Any]:
     }
 
     get_main_table().put_item(item=item, condition_expression="attribute_not_exists(pk)")
+    remember_item(item)
     return normalize_template(item) or {}
 
 
@@ -122,9 +124,11 @@ def update_template(template_id: str, patch: dict[str, Any]) -> dict[str, Any] |
         expression_attribute_values=expr_values,
         return_values="ALL_NEW",
     )
+    remember_item(updated)
 
     return normalize_template(updated)
 
 
 def delete_template(template_id: str) -> None:
     get_main_table().delete_item(key=template_key(template_id))
+    invalidate_item(template_key(template_id))
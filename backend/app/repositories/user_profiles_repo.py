@@ -6,6 +6,7 @@ from typing import Any
 
 from boto3.dynamodb.conditions import Key
 
+from app.db.dynamodb.item_cache import cached_get_item, remember_item
 from app.db.dynamodb.table import get_main_table
 from app.repositories.slack_identity_links_repo import upsert_slack_identity_link
 def _normalize_roles(roles: Any) -> list[str]:
@@ -58,7 +59,7 @@ def normalize_user_profile_for_api(item: dict[str, Any] | None) -> dict[str, Any
 
 
 def get_user_profile(*, user_sub: str) -> dict[str, Any] | None:
-    it = get_main_table().get_item(key=user_profile_key(user_sub=user_sub))
+    it = cached_get_item(get_main_table(), user_profile_key(user_sub=user_sub))
     return normalize_user_profile_for_api(it)
 
 
@@ -226,6 +227,7 @@ def upsert_user_profile(*, user_sub: str, email: str | None, updates: dict[str,
         item["roles"] = ["Member"]
 
     get_main_table().put_item(item=item)
+    remember_item(item)
     return normalize_user_profile_for_api(item) or {}
 
 
@@ -245,6 +247,7 @@ def mark_profile_complete(*, user_sub: str, onboarding_version: int = 1) -> dict
         },
         return_values="ALL_NEW",
     )
+    remember_item(updated)
     return normalize_user_profile_for_api(updated) or {}
 
 
@@ -5,17 +5,31 @@ from typing import Any
 
 from fastapi import APIRouter, Body, HTTPException, Request
 
+from app.ai.async_client import async_ai_stats
+from app.ai.circuit_breaker import circuit_stats
+from app.ai.concurrency import ai_limiter_stats
+from app.ai.hedging import hedge_stats
+from app.ai.response_cache import ai_cache_stats
+from app.ai.single_flight import single_flight_stats
+from app.db.dynamodb.item_cache import item_cache_stats
+from app.db.dynamodb.throttle import throttle_stats
+from app.infrastructure.search.rfp_paragraphs import paragraph_index_stats
 from app.repositories.agent_jobs_repo import (
     cancel_job,
     create_job,
     delete_job,
     get_job,
-    list_jobs_by_scope,
-    list_jobs_by_type,
-    list_recent_jobs,
+    list_jobs_by_scope_page,
+    list_jobs_by_type_page,
+    list_recent_jobs_page,
     update_job,
 )
-from app.repositories.agent_events_repo import list_recent_events_global
+from app.repositories.agent_events_repo import (
+    get_rollup_counters,
+    list_recent_events_global,
+    rollup_event_types,
+    summarize_rollup,
+)
 from app.observability.logging import get_logger
 
 log = get_logger("agents_router")
@@ -35,50 +49,32 @@ def _now_iso() -> str:
 
 def _get_agent_metrics_impl(*, since_iso: str, operation_type: str | None = None) -> dict[str, Any]:
     """
-    Minimal metrics aggregation based on stored agent events.
-
-    This intentionally avoids the larger domain/agents telemetry stack so we can delete that folder.
+    Agent completion metrics for the window, read from the hourly/daily event rollups
+    (a handful of items) rather than re-aggregating raw events.
     """
     try:
-        events = list_recent_events_global(since_iso=since_iso, limit=1000)
-        filtered: list[dict[str, Any]] = []
-        for e in events:
-            if not isinstance(e, dict):
-                continue
-            if str(e.get("type") or "").strip() != "agent_completion":
-                continue
-            if operation_type and str(e.get("tool") or "").strip() != str(operation_type):
-                continue
-            filtered.append(e)
-
-        if not filtered:
-            return {"count": 0, "avg_duration_ms": 0, "avg_steps": 0, "success_rate": 0.0}
-
-        durations: list[int] = []
-        steps_list: list[int] = []
-        successes = 0
-
-        for ev in filtered:
-            payload = ev.get("payload")
-            if not isinstance(payload, dict):
-                continue
-            dur = payload.get("durationMs")
-            if isinstance(dur, (int, float)):
-                durations.append(int(dur))
-            st = payload.get("steps")
-            if isinstance(st, int):
-                steps_list.append(st)
-            if payload.get("success") is True:
-                successes += 1
-
-        avg_duration = int(sum(durations) / len(durations)) if durations else 0
-        avg_steps = int(sum(steps_list) / len(steps_list)) if steps_list else 0
-        success_rate = successes / len(filtered) if filtered else 0.0
-        return {"count": len(filtered), "avg_duration_ms": avg_duration, "avg_steps": avg_steps, "success_rate": success_rate}
+        since = datetime.fromisoformat(since_iso.replace("Z", "+00:00"))
+        counters = get_rollup_counters(start=since)
+        dim = "agent_completion" + (f"|{str(operation_type).strip()}" if operation_type else "")
+        return _completion_metrics(summarize_rollup(counters, dim=dim))
     except Exception:
         return {"count": 0, "avg_duration_ms": 0, "avg_steps": 0, "success_rate": 0.0}
 
 
+def _completion_metrics(summary: dict[str, Any]) -> dict[str, Any]:
+    n = int(summary.get("count") or 0)
+    if not n:
+        return {"count": 0, "avg_duration_ms": 0, "avg_steps": 0, "success_rate": 0.0}
+    return {
+        "count": n,
+        "avg_duration_ms": summary["avgDurationMs"],
+        "avg_steps": summary["avgSteps"],
+        "success_rate": summary["succeeded"] / n,
+        "errors": summary["errors"],
+        "duration_histogram_ms": summary["durationHistogram"],
+    }
+
+
 def _build_agent_diagnostics_impl(*, hours: int = 24) -> dict[str, Any]:
     """
     Minimal diagnostics payload for the frontend.
@@ -88,7 +84,12 @@ def _build_agent_diagnostics_impl(*, hours: int = 24) -> dict[str, Any]:
     start = end - timedelta(hours=h)
     start_iso = start.isoformat().replace("+00:00", "Z")
 
-    metrics = _get_agent_metrics_impl(since_iso=start_iso)
+    try:
+        counters = get_rollup_counters(start=start, end=end)
+    except Exception:
+        counters = {}
+    by_type = {t: summarize_rollup(counters, dim=t) for t in rollup_event_types(counters)}
+    metrics = _completion_metrics(by_type.get("agent_completion") or {})
     events = list_recent_events_global(since_iso=start_iso, limit=200)
     activities: list[dict[str, Any]] = []
     for e in events:
@@ -108,6 +109,9 @@ def _build_agent_diagnostics_impl(*, hours: int = 24) -> dict[str, Any]:
         "ok": True,
         "window": {"start": start_iso, "end": end.isoformat().replace("+00:00", "Z"), "hours": h},
         "metrics": metrics,
+        "eventsByType": {
+            t: {"count": v["count"], "errors": v["errors"], "statuses": v["statuses"]} for t, v in by_type.items()
+        },
         "activities": activities[:200],
     }
 
@@ -165,6 +169,20 @@ def _get_infrastructure_info_impl() -> dict[str, Any]:
                 "type": "OpenSearch + DynamoDB",
                 "tableName": "northstar-agent-memory-{environment}",
             },
+            # Per-process counters (this API instance only).
+            "caches": {
+                "items": item_cache_stats(),
+                "ai": ai_cache_stats(),
+                "aiInflight": single_flight_stats(),
+                "rfpParagraphs": paragraph_index_stats(),
+            },
+            "ai": {
+                "async": async_ai_stats(),
+                "concurrency": ai_limiter_stats(),
+                "circuits": circuit_stats(),
+                "hedging": hedge_stats(),
+            },
+            "dynamodb": {"throttle": throttle_stats()},
         },
     }
 
@@ -176,9 +194,10 @@ def list_jobs(
     status: str | None = None,
     job_type: str | None = None,
     rfp_id: str | None = None,
+    nextToken: str | None = None,
 ) -> dict[str, Any]:
     """List agent jobs with optional filtering (no trailing slash)."""
-    return _list_jobs_impl(request, limit, status, job_type, rfp_id)
+    return _list_jobs_impl(request, limit, status, job_type, rfp_id, nextToken)
 
 
 @router.get("/jobs/")
@@ -188,9 +207,10 @@ def list_jobs_slash(
     status: str | None = None,
     job_type: str | None = None,
     rfp_id: str | None = None,
+    nextToken: str | None = None,
 ) -> dict[str, Any]:
     """List agent jobs with optional filtering (with trailing slash)."""
-    return _list_jobs_impl(request, limit, status, job_type, rfp_id)
+    return _list_jobs_impl(request, limit, status, job_type, rfp_id, nextToken)
 
 
 def _list_jobs_impl(
@@ -199,24 +219,27 @@ def _list_jobs_impl(
     status: str | None = None,
     job_type: str | None = None,
     rfp_id: str | None = None,
+    next_token: str | None = None,
 ) -> dict[str, Any]:
     """
-    List agent jobs with optional filtering.
+    List agent jobs with optional filtering, newest first.
     
     Args:
         limit: Maximum number of jobs to return (1-100)
         status: Filter by status (queued, running, checkpointed, completed, failed, cancelled)
         job_type: Filter by job type
         rfp_id: Filter by RFP ID in scope
+        next_token: Cursor from a previous page's `nextToken`
     """
     lim = max(1, min(100, int(limit or 50)))
     
     if rfp_id:
-        jobs = list_jobs_by_scope(scope={"rfpId": rfp_id}, limit=lim, status=status)
+        page = list_jobs_by_scope_page(scope={"rfpId": rfp_id}, limit=lim, status=status, next_token=next_token)
     elif job_type:
-        jobs = list_jobs_by_type(job_type=job_type, limit=lim, status=status)
+        page = list_jobs_by_type_page(job_type=job_type, limit=lim, status=status, next_token=next_token)
     else:
-        jobs = list_recent_jobs(limit=lim, status=status)
+        page = list_recent_jobs_page(limit=lim, status=status, next_token=next_token)
+    jobs = page["data"]
     
     # Count by status
     status_counts: dict[str, int] = {}
@@ -229,6 +252,7 @@ def _list_jobs_impl(
         "jobs": jobs,
         "count": len(jobs),
         "statusCounts": status_counts,
+        "nextToken": page["nextToken"],
     }
 
 
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
 from app.ai.client import AiNotConfigured, AiUpstreamError
-from app.ai.verified_calls import call_text_verified
+from app.ai.verified_calls import acall_text_verified
 from app.ai.user_context import load_user_profile_from_request, user_context_block
 from app.ai.schemas import (
     AiEditTextRequest,
@@ -19,7 +20,7 @@ log = get_logger("api.ai")
 
 
 @router.post("/edit-text")
-def edit_text(body: dict, request: Request):
+async def edit_text(body: dict, request: Request):
     try:
         req = AiEditTextRequest.model_validate(body or {})
     except ValidationError as e:
@@ -34,7 +35,9 @@ def edit_text(body: dict, request: Request):
 
     text_to_process = str(req.selectedText or req.text or "")
 
-    user_ctx = user_context_block(user_profile=load_user_profile_from_request(request))
+    # Profile lookup is a blocking table read; keep it off the event loop.
+    profile = await run_in_threadpool(load_user_profile_from_request, request)
+    user_ctx = user_context_block(user_profile=profile)
     system_prompt = (
         "You are an expert proposal writer and editor. Your PRIMARY GOAL is to "
         "FOLLOW THE USER'S INSTRUCTION EXACTLY and make changes that directly "
@@ -65,7 +68,7 @@ def edit_text(body: dict, request: Request):
     )
 
     try:
-        edited_text, _meta = call_text_verified(
+        edited_text, _meta = await acall_text_verified(
             purpose="text_edit",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -106,7 +109,7 @@ def edit_text(body: dict, request: Request):
 
 
 @router.post("/generate-content")
-def generate_content(body: dict, request: Request):
+async def generate_content(body: dict, request: Request):
     try:
         req = AiGenerateContentRequest.model_validate(body or {})
     except ValidationError as e:
@@ -119,7 +122,9 @@ def generate_content(body: dict, request: Request):
     context = req.context
     content_type = str(req.contentType or "general")
 
-    user_ctx = user_context_block(user_profile=load_user_profile_from_request(request))
+    # Profile lookup is a blocking table read; keep it off the event loop.
+    profile = await run_in_threadpool(load_user_profile_from_request, request)
+    user_ctx = user_context_block(user_profile=profile)
     system_prompt = (
         "You are an expert proposal writer and business content specialist. Your "
         "PRIMARY GOAL is to generate content that EXACTLY matches what the user is asking for.\n\n"
@@ -152,7 +157,7 @@ def generate_content(body: dict, request: Request):
     )
 
     try:
-        generated, _meta = call_text_verified(
+        generated, _meta = await acall_text_verified(
             purpose="generate_content",
             messages=[
                 {"role": "system", "content": system_prompt},
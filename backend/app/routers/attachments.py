@@ -207,7 +207,7 @@ def get_attachments(id: str):
         raise HTTPException(status_code=404, detail="RFP not found")
 
     try:
-        attachments = list_attachments(id)
+        attachments = list_attachments(id, include_text=False)
         return {
             "attachments": [
                 {
@@ -234,7 +234,7 @@ def download_attachment(id: str, attachmentId: str):
     if not rfp:
         raise HTTPException(status_code=404, detail="RFP not found")
 
-    attachment = get_attachment(id, attachmentId)
+    attachment = get_attachment(id, attachmentId, include_text=False)
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
@@ -255,7 +255,7 @@ def delete_one_attachment(id: str, attachmentId: str):
     if not rfp:
         raise HTTPException(status_code=404, detail="RFP not found")
 
-    attachment = get_attachment(id, attachmentId)
+    attachment = get_attachment(id, attachmentId, include_text=False)
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
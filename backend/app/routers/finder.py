@@ -3,14 +3,14 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, Body, File, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Body, File, HTTPException, Request, UploadFile
 
 from app.auth.cognito import VerifiedUser
 from app.repositories import finder_repo
-from app.pipeline.search.finder_worker import run_finder_job
 from app.infrastructure.browser.linkedin_playwright import LinkedInSessionError, validate_linkedin_session
 from app.repositories.rfp_rfps_repo import get_rfp_by_id, update_rfp
 from app.infrastructure.token_crypto import decrypt_string, encrypt_string
+from app.workers.job_engine import submit_job
 
 
 router = APIRouter(tags=["finder"])
@@ -90,7 +90,6 @@ async def upload_linkedin_storage_state(
 @router.post("/runs", status_code=201)
 def start_finder_run(
     request: Request,
-    background: BackgroundTasks,
     body: dict[str, Any] = Body(...),
 ):
     user = _user_from_request(request)
@@ -127,15 +126,18 @@ def start_finder_run(
         target_titles=target_titles,
     )
 
-    background.add_task(
-        run_finder_job,
-        run_id=run_id,
-        user_sub=user.sub,
-        rfp_id=rfp_id,
-        company_name=company_name,
-        company_linkedin_url=company_linkedin_url,
-        max_people=max_people,
-        target_titles=target_titles,
+    submit_job(
+        "finder_run",
+        {
+            "run_id": run_id,
+            "user_sub": user.sub,
+            "rfp_id": rfp_id,
+            "company_name": company_name,
+            "company_linkedin_url": company_linkedin_url,
+            "max_people": max_people,
+            "target_titles": target_titles,
+        },
+        job_id=f"finder_run:{run_id}",
     )
 
     return {"runId": run_id, "run": run_item}
@@ -5,7 +5,7 @@ import re
 from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
 from app.ai.client import AiError
@@ -36,6 +36,7 @@ from app.workflow import sync_for_rfp
 from app.pipeline.proposal_generation.team_member_profiles import pick_team_member_bio, pick_team_member_experience
 from app.pipeline.proposal_generation.templates_catalog import get_builtin_template, to_generator_template
 from app.observability.logging import get_logger
+from app.workers.job_engine import submit_job
 
 router = APIRouter(tags=["proposals"])
 log = get_logger("proposals")
@@ -365,8 +366,86 @@ def _render_docx(proposal: dict[str, Any], company: dict[str, Any] | None) -> by
     return buf.getvalue()
 
 
+def run_generate_proposal_job(
+    *,
+    proposal_id: str,
+    rfp_id: str,
+    company_id: str | None,
+    titles: list[str],
+    team_member_ids: list[str] | None = None,
+    reference_ids: list[str] | None = None,
+    user_ctx: str | None = None,
+) -> None:
+    """Job-engine handler body for `proposal_generate` (async `POST /api/proposals/generate`)."""
+    started = _now_iso()
+    try:
+        update_proposal(
+            proposal_id,
+            {
+                "generationStatus": "running",
+                "generationStartedAt": started,
+                "generationError": None,
+                "lastModifiedBy": "ai-generation",
+            },
+        )
+    except Exception:
+        pass
+
+    try:
+        r = get_rfp_by_id(str(rfp_id)) or {}
+
+        comp = None
+        if company_id:
+            comp = content_repo.get_company_by_company_id(str(company_id))
+        if not comp:
+            comps = content_repo.list_companies(limit=1)
+            comp = comps[0] if comps else None
+
+        next_sections: dict[str, Any] = {}
+        for t in titles:
+            nm = str(t or "").strip() or "Section"
+            next_sections[nm] = {
+                "content": _section_content_from_title(
+                    nm,
+                    r,
+                    comp,
+                    team_member_ids=team_member_ids,
+                    reference_ids=reference_ids,
+                    user_ctx=user_ctx or None,
+                ),
+                "type": "ai",
+                "lastModified": _now_iso(),
+            }
+
+        done = _now_iso()
+        update_proposal(
+            proposal_id,
+            {
+                "sections": next_sections,
+                "generationStatus": "complete",
+                "generationCompletedAt": done,
+                "generationError": None,
+                "lastModifiedBy": "ai-generation",
+            },
+        )
+    except Exception as e:
+        done = _now_iso()
+        try:
+            update_proposal(
+                proposal_id,
+                {
+                    "generationStatus": "error",
+                    "generationCompletedAt": done,
+                    "generationError": (str(e) or "generation_failed")[:800],
+                    "lastModifiedBy": "ai-generation",
+                },
+            )
+        except Exception:
+            pass
+
+
 @router.post("/generate", status_code=201)
-def generate(body: dict, background_tasks: BackgroundTasks, request: Request = None):  # type: ignore[assignment]
+def generate(body: dict, request: Request = None):  # type: ignore[assignment]
     rfp_id = (body or {}).get("rfpId")
     template_id = (body or {}).get("templateId")
     title = (body or {}).get("title")
@@ -454,74 +533,19 @@ def generate(body: dict, background_tasks: BackgroundTasks, request: Request = N
     if async_flag:
         proposal_id = str(proposal.get("_id") or "")
 
-        def _run_async_generation() -> None:
-            started = _now_iso()
-            try:
-                update_proposal(
-                    proposal_id,
-                    {
-                        "generationStatus": "running",
-                        "generationStartedAt": started,
-                        "generationError": None,
-                        "lastModifiedBy": "ai-generation",
-                    },
-                )
-            except Exception:
-                pass
-
-            try:
-                r = get_rfp_by_id(str(rfp_id)) or {}
-
-                comp = None
-                if company_id:
-                    comp = content_repo.get_company_by_company_id(str(company_id))
-                if not comp:
-                    comps = content_repo.list_companies(limit=1)
-                    comp = comps[0] if comps else None
-
-                next_sections: dict[str, Any] = {}
-                for t in titles:
-                    nm = str(t or "").strip() or "Section"
-                    next_sections[nm] = {
-                        "content": _section_content_from_title(
-                            nm,
-                            r,
-                            comp,
-                            team_member_ids=team_member_ids,
-                            reference_ids=reference_ids,
-                            user_ctx=user_ctx or None,
-                        ),
-                        "type": "ai",
-                        "lastModified": _now_iso(),
-                    }
-
-                done = _now_iso()
-                update_proposal(
-                    proposal_id,
-                    {
-                        "sections": next_sections,
-                        "generationStatus": "complete",
-                        "generationCompletedAt": done,
-                        "generationError": None,
-                        "lastModifiedBy": "ai-generation",
-                    },
-                )
-            except Exception as e:
-                done = _now_iso()
-                try:
-                    update_proposal(
-                        proposal_id,
-                        {
-                            "generationStatus": "error",
-                            "generationCompletedAt": done,
-                            "generationError": (str(e) or "generation_failed")[:800],
-                            "lastModifiedBy": "ai-generation",
-                        },
-                    )
-                except Exception:
-                    pass
-
-        background_tasks.add_task(_run_async_generation)
+        submit_job(
+            "proposal_generate",
+            {
+                "proposalId": proposal_id,
+                "rfpId": str(rfp_id),
+                "companyId": str(company_id) if company_id else None,
+                "titles": [str(t or "") for t in titles],
+                "teamMemberIds": list(team_member_ids or []),
+                "referenceIds": list(reference_ids or []),
+                "userCtx": user_ctx or None,
+            },
+            job_id=f"proposal_generate:{proposal_id}",
+        )
 
     try:
         pid = str(proposal.get("_id") or "").strip()
@@ -594,15 +618,103 @@ def generate_sections(id: str, request: Request):
     return {"message": "Sections generated successfully", "sections": next_sections, "proposal": updated}
 
 
+def _load_generation_company(proposal: dict[str, Any]) -> dict[str, Any] | None:
+    company = None
+    if proposal.get("companyId"):
+        company = content_repo.get_company_by_company_id(str(proposal.get("companyId")))
+    if not company:
+        comps = content_repo.list_companies(limit=1)
+        company = comps[0] if comps else None
+    return company
+
+
+def run_generate_sections_job(*, job_id: str, proposal_id: str, user_ctx: str | None = None) -> None:
+    """
+    Job-engine handler body for `proposal_generate_sections`.
+
+    Reloads proposal/RFP/company so a retry on another worker sees current data.
+    Status is mirrored onto the proposal and the ai job record; errors are
+    recorded there rather than raised (generation is not retried automatically).
+    """
+    id = proposal_id
+    try:
+        update_ai_job(job_id=job_id, updates_obj={"status": "running", "startedAt": _now_iso()})
+    except Exception:
+        pass
+    try:
+        update_proposal(
+            id,
+            {
+                "generationStatus": "running",
+                "generationError": None,
+                "lastModifiedBy": "ai-generation",
+            },
+        )
+    except Exception:
+        pass
+
+    try:
+        proposal = get_proposal_by_id(id, include_sections=True)
+        if not proposal:
+            raise ValueError("Proposal not found")
+        rfp = get_rfp_by_id(str(proposal.get("rfpId")))
+        if not rfp:
+            raise ValueError("RFP not found")
+        company = _load_generation_company(proposal)
+
+        sections = proposal.get("sections") or {}
+        next_sections: dict[str, Any] = {}
+        for name in sections.keys():
+            nm = str(name)
+            next_sections[nm] = {
+                "content": _section_content_from_title(nm, rfp, company, user_ctx=user_ctx or None),
+                "type": "ai",
+                "lastModified": _now_iso(),
+            }
+
+        done = _now_iso()
+        update_proposal(
+            id,
+            {
+                "sections": next_sections,
+                "generationStatus": "complete",
+                "generationCompletedAt": done,
+                "generationError": None,
+                "lastModifiedBy": "ai-generation",
+            },
+        )
+        try:
+            update_ai_job(job_id=job_id, updates_obj={"status": "completed", "finishedAt": done, "result": {"proposalId": str(id)}})
+        except Exception:
+            pass
+    except Exception as e:
+        done = _now_iso()
+        err = (str(e) or "generation_failed")[:800]
+        try:
+            update_proposal(
+                id,
+                {
+                    "generationStatus": "error",
+                    "generationCompletedAt": done,
+                    "generationError": err,
+                    "lastModifiedBy": "ai-generation",
+                },
+            )
+        except Exception:
+            pass
+        try:
+            update_ai_job(job_id=job_id, updates_obj={"status": "failed", "finishedAt": done, "error": err})
+        except Exception:
+            pass
+
+
 @router.post("/{id}/generate-sections/async")
-def generate_sections_async(id: str, background_tasks: BackgroundTasks, request: Request):
+def generate_sections_async(id: str, request: Request):
     """
-    Durable-ish async AI generation:
+    Durable async AI generation:
     - Creates a DynamoDB-backed job record (pollable).
-    - Runs generation in a background task and updates both proposal and job status.
-
-    Note: This is still executed within the FastAPI worker. For full durability across
-    deployments/scale events, migrate the worker to a queue (SQS/Lambda/ECS worker).
+    - Submits a `proposal_generate_sections` job to the job engine, which updates
+      both proposal and job status (and survives worker restarts via leases).
     """
     proposal = get_proposal_by_id(id, include_sections=True)
     if not proposal:
@@ -615,13 +727,6 @@ def generate_sections_async(id: str, background_tasks: BackgroundTasks, request:
     if not rfp:
         raise HTTPException(status_code=404, detail="RFP not found")
 
-    company = None
-    if proposal.get("companyId"):
-        company = content_repo.get_company_by_company_id(str(proposal.get("companyId")))
-    if not company:
-        comps = content_repo.list_companies(limit=1)
-        company = comps[0] if comps else None
-
     user = getattr(getattr(request, "state", None), "user", None)
     user_sub = getattr(user, "sub", None) if user else None
     user_ctx = user_context_block(user_profile=load_user_profile_from_request(request))
@@ -647,70 +752,11 @@ def generate_sections_async(id: str, background_tasks: BackgroundTasks, request:
     except Exception:
         pass
 
-    def _run() -> None:
-        try:
-            update_ai_job(job_id=job_id, updates_obj={"status": "running", "startedAt": _now_iso()})
-        except Exception:
-            pass
-        try:
-            update_proposal(
-                id,
-                {
-                    "generationStatus": "running",
-                    "generationError": None,
-                    "lastModifiedBy": "ai-generation",
-                },
-            )
-        except Exception:
-            pass
-
-        try:
-            sections = proposal.get("sections") or {}
-            next_sections: dict[str, Any] = {}
-            for name in sections.keys():
-                nm = str(name)
-                next_sections[nm] = {
-                    "content": _section_content_from_title(nm, rfp, company, user_ctx=user_ctx or None),
-                    "type": "ai",
-                    "lastModified": _now_iso(),
-                }
-
-            done = _now_iso()
-            update_proposal(
-                id,
-                {
-                    "sections": next_sections,
-                    "generationStatus": "complete",
-                    "generationCompletedAt": done,
-                    "generationError": None,
-                    "lastModifiedBy": "ai-generation",
-                },
-            )
-            try:
-                update_ai_job(job_id=job_id, updates_obj={"status": "completed", "finishedAt": done, "result": {"proposalId": str(id)}})
-            except Exception:
-                pass
-        except Exception as e:
-            done = _now_iso()
-            err = (str(e) or "generation_failed")[:800]
-            try:
-                update_proposal(
-                    id,
-                    {
-                        "generationStatus": "error",
-                        "generationCompletedAt": done,
-                        "generationError": err,
-                        "lastModifiedBy": "ai-generation",
-                    },
-                )
-            except Exception:
-                pass
-            try:
-                update_ai_job(job_id=job_id, updates_obj={"status": "failed", "finishedAt": done, "error": err})
-            except Exception:
-                pass
-
-    background_tasks.add_task(_run)
+    submit_job(
+        "proposal_generate_sections",
+        {"jobId": job_id, "proposalId": str(id), "userCtx": user_ctx or None},
+        job_id=f"proposal_generate_sections:{job_id}",
+    )
 
     updated = get_proposal_by_id(id, include_sections=True) or proposal
     return {"ok": True, "job": job, "proposal": updated}
@@ -4,11 +4,13 @@ from typing import Any, Iterator
 
 from fastapi import APIRouter, BackgroundTasks, Body, File, HTTPException, Request, UploadFile
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.db.dynamodb.errors import DdbConflict
 from app.db.dynamodb.table import get_main_table
 from app.pipeline.proposal_generation.ai_section_titles import generate_section_titles
-from app.pipeline.intake.rfp_analyzer import analyze_rfp
+from app.pipeline.intake.rfp_analyzer import analyze_rfp, clip_for_analysis_prompt
+from app.pipeline.intake.url_batch import run_urls_concurrently
 from app.pipeline.intake.opportunity_tracker_import import parse_opportunity_tracker_csv, row_to_rfp_and_tracker
 from app.repositories.rfp_rfps_repo import (
     create_rfp_from_analysis,
@@ -16,7 +18,9 @@ from app.repositories.rfp_rfps_repo import (
     get_rfp_by_id,
     list_rfp_proposal_summaries,
     list_rfps,
+    normalize_rfp_for_api,
     now_iso,
+    rfp_key,
     update_rfp,
 )
 from app.workflow import sync_for_rfp
@@ -57,14 +61,14 @@ from app.pipeline.search.rfp_scrapers.scraper_registry import (
     is_source_available,
     is_source_available_for_user,
 )
-from app.pipeline.search.rfp_scraper_job_runner import process_scraper_job
 from app.repositories.outbox_repo import enqueue_event
 from app.observability.logging import get_logger
+from app.workers.job_engine import submit_job
 from app.settings import settings
 from app.ai.client import AiNotConfigured, AiError, AiUpstreamError
-from app.ai.context import clip_text
+from app.ai.context import clip_text_to_tokens, select_rfp_text
 from app.ai.schemas import RfpDatesAI, RfpListsAI, RfpMetaAI
-from app.ai.verified_calls import call_json_verified, call_text_verified
+from app.ai.verified_calls import acall_text_verified, call_json_verified, call_text_verified
 
 import json
 import time
@@ -75,6 +79,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 router = APIRouter(tags=["rfp"])
 log = get_logger("rfp")
 
+# RFP text (in tokens) given to the summary prompts, roughly 120k characters of prose.
+_SUMMARY_TEXT_TOKENS = 30_000
+
 
 @router.post("/analyze-url", status_code=201)
 def analyze_url(body: dict):
@@ -101,26 +108,107 @@ def analyze_url(body: dict):
         )
 
 
-@router.post("/analyze-urls", status_code=201)
-def analyze_urls(body: dict):
+def _urls_from_body(body: dict) -> list[str]:
     urls_in = (body or {}).get("urls")
     urls = [str(u or "").strip() for u in (urls_in if isinstance(urls_in, list) else [])]
     urls = [u for u in urls if u]
     if not urls:
         raise HTTPException(status_code=400, detail="urls[] is required")
+    return urls
+
+
+def _analyze_and_save_url(url: str) -> dict[str, Any]:
+    t0 = time.perf_counter()
+    analysis = analyze_rfp(url, url)
+    t1 = time.perf_counter()
+    saved = create_rfp_from_analysis(
+        analysis=analysis, source_file_name=f"URL_{int(time.time()*1000)}", source_file_size=0
+    )
+    t2 = time.perf_counter()
+    return {"rfp": saved, "analyzeMs": int((t1 - t0) * 1000), "saveMs": int((t2 - t1) * 1000)}
+
+
+def _iter_url_results(urls: list[str]) -> Iterator[dict[str, Any]]:
+    """
+    Analyze URLs concurrently (global + per-host limits) and yield each result as it completes.
+    """
+    for o in run_urls_concurrently(
+        urls,
+        _analyze_and_save_url,
+        max_concurrency=settings.url_analysis_max_concurrency,
+        per_host_concurrency=settings.url_analysis_per_host_concurrency,
+    ):
+        timings: dict[str, Any] = {"queuedMs": o.queued_ms, "totalMs": o.elapsed_ms}
+        if o.error is not None:
+            log.warning("analyze_url_failed", url=o.url, error=str(o.error))
+            yield {
+                "index": o.index,
+                "url": o.url,
+                "ok": False,
+                "error": str(o.error) or "Failed to analyze URL",
+                "timings": timings,
+            }
+            continue
+        res = o.result or {}
+        timings["analyzeMs"] = res.get("analyzeMs")
+        timings["saveMs"] = res.get("saveMs")
+        yield {"index": o.index, "url": o.url, "ok": True, "rfp": res.get("rfp"), "timings": timings}
+
+
+@router.post("/analyze-urls", status_code=201)
+def analyze_urls(body: dict):
+    urls = _urls_from_body(body)
+    t0 = time.perf_counter()
+    results = sorted(_iter_url_results(urls), key=lambda r: int(r.get("index") or 0))
+    return {"results": results, "timings": {"totalMs": int((time.perf_counter() - t0) * 1000)}}
+
+
+@router.post("/analyze-urls/stream")
+def analyze_urls_stream(body: dict):
+    """
+    Same as /analyze-urls, but streams each URL's result over SSE as soon as it completes.
+
+    Events: hello -> result (one per URL, completion order) -> done
+    """
+    urls = _urls_from_body(body)
+
+    def sse(event: str, data: dict[str, Any]) -> bytes:
+        return (
+            f"event: {event}\n"
+            f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+        ).encode("utf-8")
 
-    results: list[dict[str, Any]] = []
-    for url in urls:
+    def gen() -> Iterator[bytes]:
+        t0 = time.perf_counter()
+        yield sse("hello", {"ok": True, "count": len(urls)})
+        ok = 0
         try:
-            analysis = analyze_rfp(url, url)
-            saved = create_rfp_from_analysis(
-                analysis=analysis, source_file_name=f"URL_{int(__import__('time').time()*1000)}", source_file_size=0
-            )
-            results.append({"url": url, "ok": True, "rfp": saved})
+            for r in _iter_url_results(urls):
+                ok += 1 if r.get("ok") else 0
+                yield sse("result", r)
         except Exception as e:
-            results.append({"url": url, "ok": False, "error": str(e) or "Failed to analyze URL"})
+            yield sse("error", {"ok": False, "error": str(e) or "analyze_urls_failed"})
+            return
+        yield sse(
+            "done",
+            {
+                "ok": True,
+                "count": len(urls),
+                "succeeded": ok,
+                "failed": len(urls) - ok,
+                "timings": {"totalMs": int((time.perf_counter() - t0) * 1000)},
+            },
+        )
 
-    return {"results": results}
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @router.post("/upload", status_code=201)
@@ -351,7 +439,7 @@ def presign_upload_slash(body: dict = Body(...)):
 
 
 @router.post("/upload/from-s3", status_code=201)
-def upload_from_s3(request: Request, background_tasks: BackgroundTasks, body: dict = Body(...)):
+def upload_from_s3(request: Request, body: dict = Body(...)):
     """
     Create an async analysis job for an uploaded S3 PDF.
     """
@@ -389,13 +477,13 @@ def upload_from_s3(request: Request, background_tasks: BackgroundTasks, body: di
         raise HTTPException(status_code=413, detail="File too large")
 
     job = create_job(user_sub=user_sub, s3_key=key, file_name=file_name, sha256=sha)
-    background_tasks.add_task(_process_rfp_upload_job, job["jobId"])
+    submit_job("rfp_upload", {"jobId": job["jobId"]}, job_id=f"rfp_upload:{job['jobId']}")
     return {"ok": True, "job": job}
 
 @router.post("/upload/from-s3/", status_code=201, include_in_schema=False)
-def upload_from_s3_slash(request: Request, background_tasks: BackgroundTasks, body: dict = Body(...)):
+def upload_from_s3_slash(request: Request, body: dict = Body(...)):
     # Accept trailing slash to avoid 307 redirect loops through the Next proxy.
-    return upload_from_s3(request=request, background_tasks=background_tasks, body=body)
+    return upload_from_s3(request=request, body=body)
 
 
 @router.get("/upload/jobs/{jobId}")
@@ -708,6 +796,30 @@ def get_all(request: Request, page: int = 1, limit: int = 20, nextToken: str | N
 
 @router.get("/search/{query}")
 def search(query: str):
+    """
+    Top-20 RFPs for a query (legacy shape: list of full RFP records).
+
+    Ranked by the full-text index; falls back to filtering the latest 200 RFPs
+    when the index is disabled.
+    """
+    try:
+        from app.infrastructure.search.search_index import search as search_index
+
+        ranked = search_index(query, kinds=["rfp"], limit=20)
+    except Exception as e:
+        log.warning("rfp_search_index_failed", error=str(e) or type(e).__name__)
+        ranked = None
+    if ranked is not None:
+        try:
+            ids = [str(h.get("rfpId")) for h in ranked.get("hits") or [] if h.get("rfpId")]
+            items = get_main_table().batch_get_items(keys=[rfp_key(i) for i in ids])
+            by_id = {str(it.get("rfpId")): it for it in items}
+            # Keep rank order; ids missing from the table are stale index entries.
+            return [normalize_rfp_for_api(by_id[i]) for i in ids if i in by_id]
+        except Exception as e:
+            log.exception("rfp_search_failed", source="index")
+            raise HTTPException(status_code=500, detail="Search failed") from e
+
     try:
         q = str(query or "").lower()
         resp = list_rfps(page=1, limit=200)
@@ -718,8 +830,9 @@ def search(query: str):
             if q in hay:
                 filtered.append(r)
         return filtered[:20]
-    except Exception:
-        raise HTTPException(status_code=500, detail="Search failed")
+    except Exception as e:
+        log.exception("rfp_search_failed", source="list")
+        raise HTTPException(status_code=500, detail="Search failed") from e
 
 
 @router.get("/{id}")
@@ -881,7 +994,7 @@ def ai_refresh_stream(id: str):
         )
 
     source_name = str(rfp.get("fileName") or rfp.get("title") or "rfp").strip()
-    text_clip = clip_text(raw_text, max_chars=200000)
+    text_clip = clip_for_analysis_prompt(raw_text)
 
     def sse(event: str, data: dict[str, Any]) -> bytes:
         return (
@@ -1091,7 +1204,9 @@ def ai_summary_stream(id: str):
         raise HTTPException(status_code=409, detail="RFP has no rawText")
 
     source_name = str(rfp.get("fileName") or rfp.get("title") or "rfp").strip()
-    text_clip = clip_text(raw_text, max_chars=120000)
+    text_clip = clip_text_to_tokens(
+        raw_text, purpose="generate_content", max_output_tokens=1200, max_tokens=_SUMMARY_TEXT_TOKENS
+    )
 
     def sse(event: str, data: dict[str, Any]) -> bytes:
         return (
@@ -1153,7 +1268,7 @@ def ai_summary_stream(id: str):
 
 
 @router.post("/{id}/ai-section-summary")
-def ai_section_summary(id: str, body: dict = Body(...)):
+async def ai_section_summary(id: str, body: dict = Body(...)):
     """
     Generate (and persist) a short, section-specific AI summary based on the stored rawText.
 
@@ -1162,7 +1277,7 @@ def ai_section_summary(id: str, body: dict = Body(...)):
       - topic: string (optional; defaults to sectionId)
       - force: boolean (optional; if true, regenerate even if cached)
     """
-    rfp = get_rfp_by_id(id)
+    rfp = await run_in_threadpool(get_rfp_by_id, id)
     if not rfp:
         raise HTTPException(status_code=404, detail="RFP not found")
 
@@ -1196,8 +1311,16 @@ def ai_section_summary(id: str, body: dict = Body(...)):
     if not raw_text:
         raise HTTPException(status_code=409, detail="RFP has no rawText")
 
-    # Keep prompt sizes bounded and deterministic.
-    text_clip = clip_text(raw_text, max_chars=120000)
+    # Keep prompt sizes bounded and deterministic: long RFPs send the paragraphs
+    # that best match the topic (the index may be loaded from S3, so off the loop).
+    text_clip = await run_in_threadpool(
+        select_rfp_text,
+        raw_text,
+        query=topic,
+        purpose="rfp_section_summary",
+        max_output_tokens=220,
+        max_tokens=_SUMMARY_TEXT_TOKENS,
+    )
     title = str(rfp.get("title") or "").strip()
     client = str(rfp.get("clientName") or "").strip()
     submission_deadline = str(rfp.get("submissionDeadline") or "").strip()
@@ -1229,7 +1352,7 @@ def ai_section_summary(id: str, body: dict = Body(...)):
     )
 
     try:
-        summary, meta = call_text_verified(
+        summary, meta = await acall_text_verified(
             purpose="rfp_section_summary",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1238,6 +1361,8 @@ def ai_section_summary(id: str, body: dict = Body(...)):
             max_tokens=220,
             temperature=0.2,
             retries=2,
+            # `force` asks for a fresh summary, not the cached AI response.
+            cache=not force,
         )
         summary = str(summary or "").strip()
         if not summary:
@@ -1253,7 +1378,7 @@ def ai_section_summary(id: str, body: dict = Body(...)):
             "purpose": meta.purpose,
         }
         try:
-            update_rfp(id, {"aiSectionSummaries": next_map})
+            await run_in_threadpool(update_rfp, id, {"aiSectionSummaries": next_map})
         except Exception:
             # Best-effort: don't fail the request if persistence errors.
             pass
@@ -1287,9 +1412,9 @@ def ai_section_summary(id: str, body: dict = Body(...)):
 
 
 @router.post("/{id}/ai-section-summary/", include_in_schema=False)
-def ai_section_summary_slash(id: str, body: dict = Body(...)):
+async def ai_section_summary_slash(id: str, body: dict = Body(...)):
     # Accept trailing slash to avoid 404s when clients normalize URLs.
-    return ai_section_summary(id=id, body=body)
+    return await ai_section_summary(id=id, body=body)
 
 
 @router.put("/{id}")
@@ -1672,7 +1797,7 @@ def list_scraper_sources_slash(request: Request, refresh: bool = False, debug: b
 
 
 @router.post("/scrapers/run", status_code=201)
-def run_scraper(request: Request, background_tasks: BackgroundTasks, body: dict = Body(...)):
+def run_scraper(request: Request, body: dict = Body(...)):
     """
     Trigger a scraper job for a given source.
     
@@ -1710,7 +1835,7 @@ def run_scraper(request: Request, background_tasks: BackgroundTasks, body: dict
         search_params = None
 
     job = create_scraper_job(source=source, search_params=search_params, user_sub=user_sub)
-    background_tasks.add_task(process_scraper_job, job["id"])
+    submit_job("rfp_scraper", {"jobId": job["id"]}, job_id=f"rfp_scraper:{job['id']}")
 
     return {"ok": True, "job": job}
 
@@ -1963,7 +2088,7 @@ def update_scraper_schedule(scheduleId: str, body: dict = Body(...)):
 
 
 @router.post("/scrapers/schedules/{scheduleId}/run", status_code=201)
-def run_scraper_schedule_now(scheduleId: str, background_tasks: BackgroundTasks):
+def run_scraper_schedule_now(scheduleId: str):
     sched = rfp_scraper_schedules_repo.get_schedule(schedule_id=scheduleId)
     if not sched:
         raise HTTPException(status_code=404, detail="Schedule not found")
@@ -1972,7 +2097,7 @@ def run_scraper_schedule_now(scheduleId: str, background_tasks: BackgroundTasks)
         raise HTTPException(status_code=400, detail=f"Scraper not available for source: {source}")
     search_params = sched.get("searchParams") if isinstance(sched.get("searchParams"), dict) else None
     job = create_scraper_job(source=source, search_params=search_params, user_sub=None)
-    background_tasks.add_task(process_scraper_job, job["id"])
+    submit_job("rfp_scraper", {"jobId": job["id"]}, job_id=f"rfp_scraper:{job['id']}")
     try:
         # Optionally bump nextRunAt forward since it was run manually.
         rfp_scraper_schedules_repo.mark_ran(schedule_id=scheduleId)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+
+from app.infrastructure.search.search_index import KINDS, search as search_index
+from app.observability.logging import get_logger
+
+router = APIRouter(tags=["search"])
+log = get_logger("search")
+
+
+@router.get("")
+@router.get("/", include_in_schema=False)
+def search(q: str = "", kind: str | None = None, limit: int = 20, offset: int = 0):
+    """
+    Ranked (BM25) full-text search over RFPs and proposals.
+
+    `kind` is an optional comma-separated filter (`rfp`, `proposal`).
+    Returns `{query, total, limit, offset, hits: [{kind, score, ...}]}`.
+    """
+    kinds = [k.strip().lower() for k in str(kind or "").split(",") if k.strip()]
+    bad = [k for k in kinds if k not in KINDS]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(bad)}")
+    try:
+        out = search_index(str(q or ""), kinds=kinds or None, limit=limit, offset=offset)
+    except Exception as e:
+        log.exception("search_failed", error=str(e) or type(e).__name__)
+        raise HTTPException(status_code=500, detail="Search failed") from e
+    if out is None:
+        raise HTTPException(status_code=503, detail="Search index is disabled or not built yet")
+    return out
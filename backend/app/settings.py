@@ -33,19 +33,110 @@ class Settings(BaseSettings):
         default=None, validation_alias="OPENSEARCH_ENDPOINT"
     )
 
-    # Contracting async jobs (SQS + worker)
-    contracting_jobs_queue_url: str | None = Field(
-        default=None, validation_alias="CONTRACTING_JOBS_QUEUE_URL"
-    )
+    # Contracting async jobs (job engine, executed by the contracting worker)
+    # Max attempts per contracting job before it is marked failed.
     contracting_jobs_max_receives: int = Field(
         default=6, validation_alias="CONTRACTING_JOBS_MAX_RECEIVES"
     )
+    # Legacy SQS queue from before the job engine. When set, the contracting worker drains it,
+    # re-submitting each job id to the engine. Remove once the queue is empty in every environment.
+    contracting_jobs_queue_url: str | None = Field(
+        default=None, validation_alias="CONTRACTING_JOBS_QUEUE_URL"
+    )
     contracting_jobs_poll_wait_seconds: int = Field(
         default=10, validation_alias="CONTRACTING_JOBS_POLL_WAIT_SECONDS"
     )
-    contracting_jobs_poll_max_messages: int = Field(
-        default=5, validation_alias="CONTRACTING_JOBS_POLL_MAX_MESSAGES"
+
+    # RFP intake: PDF text extraction
+    # 0 = auto (cpu_count - 1, capped). 1 disables the process pool.
+    pdf_extract_max_workers: int = Field(default=0, validation_alias="PDF_EXTRACT_MAX_WORKERS")
+    # Cache extracted PDF text in the assets bucket, keyed by the PDF's SHA-256.
+    pdf_text_cache_enabled: bool = Field(default=True, validation_alias="PDF_TEXT_CACHE_ENABLED")
+
+    # RFP analysis: map-reduce over token-sized chunks for long documents.
+    # auto (above the threshold) | always | off
+    rfp_analysis_chunking: str = Field(default="auto", validation_alias="RFP_ANALYSIS_CHUNKING")
+    rfp_analysis_chunk_threshold_tokens: int = Field(
+        default=24_000, validation_alias="RFP_ANALYSIS_CHUNK_THRESHOLD_TOKENS"
     )
+    rfp_analysis_chunk_tokens: int = Field(default=8_000, validation_alias="RFP_ANALYSIS_CHUNK_TOKENS")
+    rfp_analysis_chunk_overlap_tokens: int = Field(default=400, validation_alias="RFP_ANALYSIS_CHUNK_OVERLAP_TOKENS")
+    # Send each extraction bucket only the passages a local pre-pass selects for it
+    # (dates, metadata, lists); buckets with no match get the full text.
+    rfp_analysis_targeted_context: bool = Field(default=True, validation_alias="RFP_ANALYSIS_TARGETED_CONTEXT")
+    # Parallel bucket / chunk calls per analysis (the AI concurrency limit still applies).
+    rfp_analysis_chunk_concurrency: int = Field(default=8, validation_alias="RFP_ANALYSIS_CHUNK_CONCURRENCY")
+
+    # Per-RFP paragraph BM25 index for prompt context (keyed by rawText SHA-256).
+    rfp_paragraph_index_cache_size: int = Field(default=64, validation_alias="RFP_PARAGRAPH_INDEX_CACHE_SIZE")
+    # Store built indexes in the assets bucket so other processes load instead of rebuilding.
+    rfp_paragraph_index_store: bool = Field(default=True, validation_alias="RFP_PARAGRAPH_INDEX_STORE")
+    # Texts up to this many tokens fit the RFP summary prompts whole (rfp.py `_SUMMARY_TEXT_TOKENS`):
+    # they are indexed on the fly when needed, never cached or stored.
+    rfp_paragraph_index_min_tokens: int = Field(default=30_000, validation_alias="RFP_PARAGRAPH_INDEX_MIN_TOKENS")
+
+    # RFP intake: batch URL analysis (/api/rfp/analyze-urls)
+    url_analysis_max_concurrency: int = Field(default=4, validation_alias="URL_ANALYSIS_MAX_CONCURRENCY")
+    url_analysis_per_host_concurrency: int = Field(
+        default=2, validation_alias="URL_ANALYSIS_PER_HOST_CONCURRENCY"
+    )
+
+    # Hard cap on bytes read from a single intake URL (HTML is truncated; PDFs are rejected).
+    url_fetch_max_bytes: int = Field(default=25 * 1024 * 1024, validation_alias="URL_FETCH_MAX_BYTES")
+
+    # Full-text search index (RFPs + proposals)
+    # dynamodb | s3 | memory | off (off = legacy list-and-filter search; memory = per-process, tests only)
+    search_index_backend: str = Field(default="dynamodb", validation_alias="SEARCH_INDEX_BACKEND")
+    search_index_shards: int = Field(default=32, validation_alias="SEARCH_INDEX_SHARDS")
+    # How often a process checks shard versions for writes made by other processes.
+    search_index_refresh_seconds: float = Field(default=30.0, validation_alias="SEARCH_INDEX_REFRESH_SECONDS")
+    # Leading characters of rawText / proposal section text that get indexed.
+    search_index_max_text_chars: int = Field(default=100_000, validation_alias="SEARCH_INDEX_MAX_TEXT_CHARS")
+    # Backfill synchronously on the first search when the index was never fully built.
+    # Off by default: build shared indexes offline with scripts/rebuild_search_index.py.
+    search_index_bootstrap: bool = Field(default=False, validation_alias="SEARCH_INDEX_BOOTSTRAP")
+
+    # Job engine (app/workers/job_engine.py)
+    # dynamodb | local (in-process; tests and single-process dev only)
+    job_engine_backend: str = Field(default="dynamodb", validation_alias="JOB_ENGINE_BACKEND")
+    # API processes also execute jobs they submit (types with run_embedded=True).
+    job_engine_embedded: bool = Field(default=True, validation_alias="JOB_ENGINE_EMBEDDED")
+    # Comma-separated job types this process executes (empty = default set).
+    job_engine_types: str = Field(default="", validation_alias="JOB_ENGINE_TYPES")
+    job_engine_poll_seconds: float = Field(default=5.0, validation_alias="JOB_ENGINE_POLL_SECONDS")
+    # Per-type concurrency overrides, e.g. "rfp_upload=4,finder_run=1".
+    job_engine_concurrency: str = Field(default="", validation_alias="JOB_ENGINE_CONCURRENCY")
+
+    # Write-sharded GSI1 partitions, e.g. "TYPE#AGENT_EVENT=8,TYPE#RFP=4,SCRAPEDRFP_SOURCE#*=4".
+    # Supported: TYPE#RFP, TYPE#PROPOSAL, TYPE#AGENT_EVENT, TYPE#AI_JOB, TYPE#RFP_UPLOAD_JOB,
+    # OUTBOX#PENDING, SCRAPEDRFP_SOURCE#<source>. See app/db/dynamodb/sharding.py.
+    ddb_gsi_shards: str = Field(default="", validation_alias="DDB_GSI_SHARDS")
+
+    # Out-of-line storage for oversized item attributes (off|s3|memory).
+    # Thresholds are bytes of serialized JSON per attribute name.
+    ddb_offload_backend: str = Field(default="off", validation_alias="DDB_OFFLOAD_BACKEND")
+    ddb_offload_attributes: str = Field(
+        default="rawText=16384,_analysis=32768,sections=32768,textContent=16384",
+        validation_alias="DDB_OFFLOAD_ATTRIBUTES",
+    )
+    ddb_offload_cache_mb: int = Field(default=64, validation_alias="DDB_OFFLOAD_CACHE_MB")
+
+    # Per-process read-through cache for profile items (RFPs, proposals, companies,
+    # team members, templates, user profiles). 0 disables it.
+    ddb_item_cache_max_items: int = Field(default=0, validation_alias="DDB_ITEM_CACHE_MAX_ITEMS")
+    ddb_item_cache_ttl_seconds: float = Field(default=30.0, validation_alias="DDB_ITEM_CACHE_TTL_SECONDS")
+
+    # Process-wide AIMD rate control for DynamoDB calls (app/db/dynamodb/throttle.py).
+    # When enabled, botocore's own retries are turned off and ddb_call retries throttles.
+    ddb_adaptive_throttle: bool = Field(default=True, validation_alias="DDB_ADAPTIVE_THROTTLE")
+    ddb_throttle_min_rate: float = Field(default=5.0, validation_alias="DDB_THROTTLE_MIN_RATE")
+    ddb_throttle_max_rate: float = Field(default=2000.0, validation_alias="DDB_THROTTLE_MAX_RATE")
+    ddb_throttle_increase_per_s: float = Field(default=25.0, validation_alias="DDB_THROTTLE_INCREASE_PER_S")
+    # ReturnConsumedCapacity on every call (TOTAL | INDEXES | NONE) and the slow-operation log threshold.
+    ddb_consumed_capacity: str = Field(default="TOTAL", validation_alias="DDB_CONSUMED_CAPACITY")
+    ddb_slow_op_ms: float = Field(default=500.0, validation_alias="DDB_SLOW_OP_MS")
+    # "resource" (boto3 resource layer, Decimal numbers) or "client" (low-level client fast path, native numbers).
+    ddb_table_backend: str = Field(default="resource", validation_alias="DDB_TABLE_BACKEND")
 
     # Public portal hardening
     portal_rate_limit_rpm: int = Field(default=120, validation_alias="PORTAL_RATE_LIMIT_RPM")
@@ -114,6 +205,49 @@ class Settings(BaseSettings):
         default="low", validation_alias="OPENAI_TEXT_VERBOSITY_JSON"
     )
 
+    # Response cache for deterministic AI calls that opt in with `cache=True`
+    # (see app/ai/response_cache.py). Backend: off | memory | ddb (memory in
+    # front of the main table). Only purposes listed in AI_CACHE_TTLS
+    # ("purpose=seconds,...") are cached.
+    ai_cache_backend: str = Field(default="memory", validation_alias="AI_CACHE_BACKEND")
+    ai_cache_max_items: int = Field(default=512, validation_alias="AI_CACHE_MAX_ITEMS")
+    ai_cache_ttls: str = Field(
+        default="section_titles=604800,rfp_section_summary=604800,generate_content=86400,buyer_enrichment=604800",
+        validation_alias="AI_CACHE_TTLS",
+    )
+    # Coalesce identical concurrent `cache=True` calls: off | local (threads of
+    # this process) | ddb (plus a lease item so other processes wait for the
+    # leader's result in the shared response cache).
+    ai_single_flight: str = Field(default="local", validation_alias="AI_SINGLE_FLIGHT")
+    ai_single_flight_lease_s: float = Field(default=120.0, validation_alias="AI_SINGLE_FLIGHT_LEASE_S")
+    # Async AI client (app/ai/async_client.py): max concurrent upstream requests
+    # per model and event loop, "model=N,...,default=N".
+    ai_async_model_concurrency: str = Field(default="default=8", validation_alias="AI_ASYNC_MODEL_CONCURRENCY")
+    # Process-wide AIMD limit on in-flight model requests (app/ai/concurrency.py):
+    # starts at the max, halves on 429s/timeouts, grows back on success. Callers
+    # over the limit wait up to AI_QUEUE_TIMEOUT_S, then get a 503.
+    ai_adaptive_concurrency: bool = Field(default=True, validation_alias="AI_ADAPTIVE_CONCURRENCY")
+    ai_concurrency_min: int = Field(default=1, validation_alias="AI_CONCURRENCY_MIN")
+    ai_concurrency_max: int = Field(default=32, validation_alias="AI_CONCURRENCY_MAX")
+    ai_concurrency_increase_per_s: float = Field(default=1.0, validation_alias="AI_CONCURRENCY_INCREASE_PER_S")
+    ai_queue_timeout_s: float = Field(default=30.0, validation_alias="AI_QUEUE_TIMEOUT_S")
+    # Per (model, endpoint) circuit breakers (app/ai/circuit_breaker.py).
+    ai_circuit_failure_threshold: int = Field(default=5, validation_alias="AI_CIRCUIT_FAILURE_THRESHOLD")
+    ai_circuit_window_s: float = Field(default=60.0, validation_alias="AI_CIRCUIT_WINDOW_S")
+    ai_circuit_open_s: float = Field(default=15.0, validation_alias="AI_CIRCUIT_OPEN_S")
+    # Hedged requests for interactive purposes (app/ai/hedging.py, async client):
+    # after the purpose's recent p95, also ask the next fallback model; extra
+    # requests are capped at AI_HEDGE_MAX_FRACTION of calls. Empty list disables.
+    ai_hedge_purposes: str = Field(
+        default="text_edit,generate_content,rfp_section_summary",
+        validation_alias="AI_HEDGE_PURPOSES",
+    )
+    ai_hedge_max_fraction: float = Field(default=0.05, validation_alias="AI_HEDGE_MAX_FRACTION")
+    ai_hedge_min_delay_s: float = Field(default=1.0, validation_alias="AI_HEDGE_MIN_DELAY_S")
+    # Prompt token budgeting (app/ai/tokens.py): context window overrides in
+    # tokens, "model=N,...,default=N"; built-in values cover the OpenAI models we use.
+    ai_context_windows: str = Field(default="", validation_alias="AI_CONTEXT_WINDOWS")
+
     # Slack (optional; enables /api/integrations/slack/*)
     slack_enabled: bool = Field(default=False, validation_alias="SLACK_ENABLED")
     slack_bot_token: str | None = Field(default=None, validation_alias="SLACK_BOT_TOKEN")
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
-import json
+import threading
 import time
 from typing import Any
 
-import boto3
-
 from app.observability.logging import configure_logging, get_logger
 from app.pipeline.contracting.contracting_docgen import generate_budget_xlsx, render_contract_docx
 from app.repositories.contracting_jobs_repo import (
@@ -18,39 +16,21 @@ from app.repositories.contracting_jobs_repo import (
 from app.repositories.contracting_repo import get_client_package
 from app.infrastructure.storage.s3_assets import get_object_bytes, put_object_bytes
 from app.settings import settings
+from app.workers.job_engine import JobEngine, build_job_engine
+from app.workers.job_handlers import CONTRACTING_JOB_TYPE
 
 
 log = get_logger("contracting_worker")
 
 
-def _sqs():
-    return boto3.client("sqs", region_name=settings.aws_region)
-
-
-def _queue_url() -> str:
-    q = str(settings.contracting_jobs_queue_url or "").strip()
-    if not q:
-        raise RuntimeError("CONTRACTING_JOBS_QUEUE_URL is not set")
-    return q
-
-
-def _receive_count(msg: dict[str, Any]) -> int:
-    try:
-        attrs = msg.get("Attributes") or {}
-        n = int(attrs.get("ApproximateReceiveCount") or 0)
-        return n
-    except Exception:
-        return 0
-
-
 def _process_job(job_id: str, *, receive_count: int) -> None:
     job = get_job(job_id) or {}
     if not job:
         # Nothing to do; message may be stale.
         return
 
-    # Only one worker should process.
-    running = try_mark_running(job_id=job_id)
+    # Only one worker should process (the engine lease); retries take over a stale "running".
+    running = try_mark_running(job_id=job_id, reclaim=receive_count > 1)
     if not running:
         return
 
@@ -144,8 +124,7 @@ def _process_job(job_id: str, *, receive_count: int) -> None:
         # Unknown job types should fail.
         fail_job(job_id=job_id, error=f"Unknown jobType: {job_type or 'unknown'}")
     except Exception as e:
-        # If SQS is configured with a DLQ redrive policy, we can rely on it.
-        # Still write a failure status when we're at/over our max receive count.
+        # The job engine retries with backoff; write a failure status on the last attempt.
         msg = (str(e) or "job_failed")[:800]
         max_recv = max(1, int(settings.contracting_jobs_max_receives or 6))
         if receive_count >= max_recv:
@@ -156,59 +135,35 @@ def _process_job(job_id: str, *, receive_count: int) -> None:
         raise
 
 
-def run_forever() -> None:
-    configure_logging(level="INFO")
-    qurl = _queue_url()
-    sqs = _sqs()
+def _drain_legacy_queue(engine: JobEngine, queue_url: str) -> None:
+    # Jobs queued on SQS before the move to the job engine; remove with CONTRACTING_JOBS_QUEUE_URL.
+    from app.infrastructure.aws_clients import sqs_client
+    from app.pipeline.contracting.contracting_queue import drain_legacy_queue
+
     wait_s = max(1, min(20, int(settings.contracting_jobs_poll_wait_seconds or 10)))
-    max_msgs = max(1, min(10, int(settings.contracting_jobs_poll_max_messages or 5)))
+    while True:
+        try:
+            drain_legacy_queue(engine, queue_url=queue_url, sqs=sqs_client(), wait_seconds=wait_s)
+        except Exception:
+            log.exception("contracting_legacy_drain_failed", queue_url=queue_url)
+            time.sleep(5)
 
+
+def run_forever() -> None:
+    configure_logging(level="INFO")
+    engine = build_job_engine(types={CONTRACTING_JOB_TYPE})
+    qurl = str(settings.contracting_jobs_queue_url or "").strip()
     log.info(
         "contracting_worker_starting",
-        queue_url=qurl,
-        wait_seconds=wait_s,
-        max_messages=max_msgs,
+        owner=engine.owner,
+        poll_seconds=engine.poll_interval_s,
+        legacy_queue_url=qurl or None,
     )
-
-    while True:
-        try:
-            resp = sqs.receive_message(
-                QueueUrl=qurl,
-                MaxNumberOfMessages=max_msgs,
-                WaitTimeSeconds=wait_s,
-                AttributeNames=["ApproximateReceiveCount"],
-            )
-            msgs = resp.get("Messages") or []
-            if not msgs:
-                continue
-
-            for m in msgs:
-                receipt = m.get("ReceiptHandle")
-                body = str(m.get("Body") or "")
-                rc = _receive_count(m)
-                try:
-                    data = json.loads(body) if body else {}
-                except Exception:
-                    data = {}
-                job_id = str((data or {}).get("jobId") or "").strip()
-                if not job_id:
-                    # Malformed; drop.
-                    if receipt:
-                        sqs.delete_message(QueueUrl=qurl, ReceiptHandle=receipt)
-                    continue
-
-                try:
-                    _process_job(job_id, receive_count=rc)
-                    if receipt:
-                        sqs.delete_message(QueueUrl=qurl, ReceiptHandle=receipt)
-                except Exception:
-                    # Let visibility timeout + retries handle it.
-                    log.exception("contracting_job_failed", jobId=job_id, receiveCount=rc)
-                    continue
-        except Exception:
-            # Prevent tight crash loops.
-            log.exception("contracting_worker_loop_error")
-            time.sleep(2.0)
+    if qurl:
+        threading.Thread(
+            target=_drain_legacy_queue, args=(engine, qurl), name="contracting-sqs-drain", daemon=True
+        ).start()
+    engine.run_forever()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,734 @@
+from __future__ import annotations
+
+"""
+Durable job engine for long-running backend work.
+
+One place for claiming, leases, heartbeats, retries, per-type concurrency and
+progress, shared by RFP uploads, scraper runs, finder runs, proposal
+generation and contracting jobs. Feature records (upload job, scraper job,
+...) stay the user-facing status; the engine job drives execution.
+
+Lifecycle: queued -> running -> succeeded | failed | cancelled. A running job
+holds a lease that the engine renews while the handler runs; if the worker
+dies the lease expires and any engine re-queues the job (or fails it once
+attempts are exhausted).
+
+Backends: `DynamoJobBackend` (repositories/job_queue_repo.py) in production,
+`LocalJobBackend` (below) for tests and single-process dev.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable
+
+from app.observability.logging import get_logger
+
+log = get_logger("job_engine")
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+def iso_at(ts: float) -> str:
+    # Fixed-width (millisecond) UTC timestamps so string order == time order in index keys.
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts)) + f".{int((ts % 1) * 1000):03d}Z"
+
+
+def new_job_id(job_type: str) -> str:
+    return f"job_{job_type}_{uuid.uuid4().hex[:20]}"
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler to fail the job without retrying."""
+
+
+class JobLeaseLost(Exception):
+    """The job's lease expired and was taken over; the handler should stop."""
+
+
+class JobBackend(ABC):
+    """
+    Storage contract for the engine. All methods are atomic per job; `claim`
+    and `finish` also maintain the global running count per job type.
+    """
+
+    @abstractmethod
+    def enqueue(self, job: dict[str, Any]) -> dict[str, Any]:
+        """Insert `job` unless a job with the same jobId exists; return the stored job."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def find_ready(self, job_type: str, *, now: float, limit: int) -> list[dict[str, Any]]:
+        """Queued jobs with runAt <= now, highest priority first, then oldest runAt."""
+
+    @abstractmethod
+    def claim(
+        self, job: dict[str, Any], *, owner: str, now: float, lease_until: float, max_running: int
+    ) -> tuple[dict[str, Any] | None, bool]:
+        """Returns `(claimed_job, at_capacity)`; claimed_job is None if lost or at capacity."""
+
+    @abstractmethod
+    def heartbeat(
+        self, job_id: str, *, owner: str, now: float, lease_until: float, progress: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        """Extend the lease; returns the job (incl. `cancelRequested`) or None if the lease was lost."""
+
+    @abstractmethod
+    def finish(
+        self,
+        job: dict[str, Any],
+        *,
+        owner: str,
+        now: float,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+        retry_at: float | None = None,
+    ) -> bool:
+        """
+        Release a running job: `status` in succeeded/failed/cancelled, or `retry_at`
+        to re-queue. False if the lease had already been lost.
+        """
+
+    @abstractmethod
+    def find_expired(self, job_type: str, *, now: float, limit: int) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    def reap(self, job: dict[str, Any], *, now: float, retry_at: float | None) -> bool:
+        """Take back an expired lease: re-queue (retry_at) or fail. False if it was renewed meanwhile."""
+
+    @abstractmethod
+    def request_cancel(self, job_id: str, *, now: float) -> dict[str, Any] | None:
+        """Cancel a queued job immediately, or flag a running one (`cancelRequested`)."""
+
+
+class LocalJobBackend(JobBackend):
+    """In-memory backend with the same semantics as DynamoJobBackend."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._running: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, job: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            existing = self._jobs.get(job["jobId"])
+            if existing is not None:
+                return dict(existing)
+            self._jobs[job["jobId"]] = dict(job)
+            return dict(job)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            j = self._jobs.get(job_id)
+            return dict(j) if j else None
+
+    def find_ready(self, job_type: str, *, now: float, limit: int) -> list[dict[str, Any]]:
+        cutoff = iso_at(now)
+        with self._lock:
+            ready = [
+                j
+                for j in self._jobs.values()
+                if j["jobType"] == job_type and j["status"] == "queued" and j["runAt"] <= cutoff
+            ]
+        ready.sort(key=lambda j: (int(j.get("priority", PRIORITY_NORMAL)), j["runAt"], j["jobId"]))
+        return [dict(j) for j in ready[: max(0, limit)]]
+
+    def claim(
+        self, job: dict[str, Any], *, owner: str, now: float, lease_until: float, max_running: int
+    ) -> tuple[dict[str, Any] | None, bool]:
+        with self._lock:
+            t = job["jobType"]
+            if self._running.get(t, 0) >= max_running:
+                return None, True
+            cur = self._jobs.get(job["jobId"])
+            if not cur or cur["status"] != "queued":
+                return None, False
+            self._running[t] = self._running.get(t, 0) + 1
+            cur.update(
+                status="running",
+                leaseOwner=owner,
+                leaseExpiresAt=iso_at(lease_until),
+                heartbeatAt=iso_at(now),
+                attempts=int(cur.get("attempts") or 0) + 1,
+                updatedAt=iso_at(now),
+            )
+            cur.setdefault("startedAt", iso_at(now))
+            return dict(cur), False
+
+    def heartbeat(
+        self, job_id: str, *, owner: str, now: float, lease_until: float, progress: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        with self._lock:
+            cur = self._jobs.get(job_id)
+            if not cur or cur["status"] != "running" or cur.get("leaseOwner") != owner:
+                return None
+            cur.update(leaseExpiresAt=iso_at(lease_until), heartbeatAt=iso_at(now), updatedAt=iso_at(now))
+            if progress is not None:
+                cur["progress"] = dict(progress)
+            return dict(cur)
+
+    def finish(
+        self,
+        job: dict[str, Any],
+        *,
+        owner: str,
+        now: float,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+        retry_at: float | None = None,
+    ) -> bool:
+        with self._lock:
+            cur = self._jobs.get(job["jobId"])
+            if not cur or cur["status"] != "running" or cur.get("leaseOwner") != owner:
+                return False
+            self._release_locked(cur, now=now, status=status, result=result, error=error, retry_at=retry_at)
+            return True
+
+    def _release_locked(
+        self,
+        cur: dict[str, Any],
+        *,
+        now: float,
+        status: str,
+        result: dict[str, Any] | None,
+        error: str | None,
+        retry_at: float | None,
+    ) -> None:
+        t = cur["jobType"]
+        self._running[t] = max(0, self._running.get(t, 0) - 1)
+        for k in ("leaseOwner", "leaseExpiresAt"):
+            cur.pop(k, None)
+        cur["updatedAt"] = iso_at(now)
+        if error is not None:
+            cur["error"] = error
+        if retry_at is not None:
+            cur.update(status="queued", runAt=iso_at(retry_at))
+            return
+        cur.update(status=status, finishedAt=iso_at(now))
+        if result is not None:
+            cur["result"] = result
+
+    def find_expired(self, job_type: str, *, now: float, limit: int) -> list[dict[str, Any]]:
+        cutoff = iso_at(now)
+        with self._lock:
+            out = [
+                dict(j)
+                for j in self._jobs.values()
+                if j["jobType"] == job_type and j["status"] == "running" and j.get("leaseExpiresAt", "") < cutoff
+            ]
+        return out[: max(0, limit)]
+
+    def reap(self, job: dict[str, Any], *, now: float, retry_at: float | None) -> bool:
+        with self._lock:
+            cur = self._jobs.get(job["jobId"])
+            if not cur or cur["status"] != "running" or cur.get("leaseExpiresAt", "") >= iso_at(now):
+                return False
+            self._release_locked(
+                cur, now=now, status="failed", result=None, error="lease_expired", retry_at=retry_at
+            )
+            return True
+
+    def request_cancel(self, job_id: str, *, now: float) -> dict[str, Any] | None:
+        with self._lock:
+            cur = self._jobs.get(job_id)
+            if not cur:
+                return None
+            if cur["status"] == "queued":
+                cur.update(status="cancelled", finishedAt=iso_at(now), updatedAt=iso_at(now))
+            elif cur["status"] == "running":
+                cur.update(cancelRequested=True, updatedAt=iso_at(now))
+            return dict(cur)
+
+
+@dataclass(frozen=True, slots=True)
+class JobType:
+    name: str
+    handler: Callable[["JobContext"], dict[str, Any] | None]
+    # Max jobs of this type running at once across all engines sharing the backend.
+    concurrency: int = 2
+    max_attempts: int = 3
+    lease_seconds: float = 120.0
+    backoff_base_s: float = 10.0
+    backoff_max_s: float = 600.0
+    # False keeps the type off API processes (embedded engines); only workers run it.
+    run_embedded: bool = True
+
+    def backoff(self, attempt: int) -> float:
+        return min(self.backoff_max_s, self.backoff_base_s * (2 ** max(0, attempt - 1)))
+
+
+class JobContext:
+    """Handed to handlers: payload, attempt number, progress and heartbeat."""
+
+    def __init__(self, engine: "JobEngine", job_type: JobType, job: dict[str, Any]):
+        self._engine = engine
+        self.job_type = job_type
+        self.job = job
+        self.job_id = str(job["jobId"])
+        self.payload: dict[str, Any] = dict(job.get("payload") or {})
+        self.attempt = int(job.get("attempts") or 1)
+        self.cancel_requested = False
+        self.lease_until = 0.0
+        self.last_heartbeat = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempt >= self.job_type.max_attempts
+
+    def heartbeat(self, progress: dict[str, Any] | None = None) -> None:
+        """Renew the lease now; raises JobLeaseLost if another worker took the job."""
+        self._engine._heartbeat(self, progress=progress)
+
+    def progress(self, pct: int, step: str = "", message: str = "") -> None:
+        self.heartbeat(
+            progress={"pct": max(0, min(100, int(pct or 0))), "step": str(step or ""), "message": str(message or "")}
+        )
+
+
+@dataclass(slots=True)
+class JobTypeStats:
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    cancelled: int = 0
+    reaped: int = 0
+    lease_lost: int = 0
+    running: int = 0
+    run_ms_total: int = 0
+    wait_ms_total: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        done = self.succeeded + self.failed + self.retried + self.cancelled
+        return {
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "cancelled": self.cancelled,
+            "reaped": self.reaped,
+            "leaseLost": self.lease_lost,
+            "running": self.running,
+            "avgRunMs": int(self.run_ms_total / done) if done else None,
+            "avgWaitMs": int(self.wait_ms_total / self.claimed) if self.claimed else None,
+        }
+
+
+def _parse_iso(s: Any) -> float | None:
+    try:
+        return datetime.fromisoformat(str(s).replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
+
+
+class JobEngine:
+    def __init__(
+        self,
+        backend: JobBackend,
+        *,
+        owner: str | None = None,
+        poll_interval_s: float = 5.0,
+        types: set[str] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval_s = max(0.05, float(poll_interval_s))
+        # Job types this engine executes (None = every registered type). Any engine can enqueue.
+        self.types = set(types) if types else None
+        self._clock = clock
+        self._types: dict[str, JobType] = {}
+        self._stats: dict[str, JobTypeStats] = {}
+        self._active: dict[str, JobContext] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pool: ThreadPoolExecutor | None = None
+        self._thread: threading.Thread | None = None
+
+    # --- registry ---
+
+    def register(self, jt: JobType) -> None:
+        with self._lock:
+            self._types[jt.name] = jt
+            self._stats.setdefault(jt.name, JobTypeStats())
+            if self._pool is not None:
+                log.warning("job_type_registered_after_start", jobType=jt.name)
+
+    def job_type(self, name: str) -> JobType | None:
+        return self._types.get(name)
+
+    def _executes(self, name: str) -> bool:
+        return name in self._types and (self.types is None or name in self.types)
+
+    # --- producer API ---
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: dict[str, Any] | None = None,
+        *,
+        priority: int = PRIORITY_NORMAL,
+        run_at: float | None = None,
+        job_id: str | None = None,
+        max_attempts: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Persist a job. Passing a deterministic `job_id` (e.g. `rfp_upload:<uploadJobId>`)
+        makes enqueueing idempotent.
+        """
+        jt = self._types.get(job_type)
+        now = self._clock()
+        job: dict[str, Any] = {
+            "jobId": str(job_id or new_job_id(job_type)),
+            "jobType": str(job_type),
+            "status": "queued",
+            "priority": int(priority if priority in PRIORITIES else PRIORITY_NORMAL),
+            "payload": dict(payload or {}),
+            "attempts": 0,
+            "maxAttempts": int(max_attempts or (jt.max_attempts if jt else 3)),
+            "runAt": iso_at(run_at if run_at is not None else now),
+            "createdAt": iso_at(now),
+            "updatedAt": iso_at(now),
+        }
+        stored = self.backend.enqueue(job)
+        self._wake.set()
+        return stored
+
+    def submit(self, job_type: str, payload: dict[str, Any] | None = None, **kwargs: Any) -> dict[str, Any]:
+        """Enqueue and make sure this process's dispatcher is running (embedded mode)."""
+        job = self.enqueue(job_type, payload, **kwargs)
+        if self._executes(job_type):
+            self.start()
+        return job
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        return self.backend.get(job_id)
+
+    def cancel(self, job_id: str) -> dict[str, Any] | None:
+        return self.backend.request_cancel(job_id, now=self._clock())
+
+    # --- execution ---
+
+    def _max_attempts(self, jt: JobType, job: dict[str, Any]) -> int:
+        return int(job.get("maxAttempts") or jt.max_attempts)
+
+    def reap_expired(self) -> int:
+        n = 0
+        now = self._clock()
+        for name, jt in list(self._types.items()):
+            for job in self.backend.find_expired(name, now=now, limit=25):
+                attempts = int(job.get("attempts") or 0)
+                retry_at = now + jt.backoff(attempts) if attempts < self._max_attempts(jt, job) else None
+                if self.backend.reap(job, now=now, retry_at=retry_at):
+                    n += 1
+                    with self._lock:
+                        self._stats[name].reaped += 1
+                    log.warning(
+                        "job_lease_expired",
+                        jobId=job.get("jobId"),
+                        jobType=name,
+                        attempts=attempts,
+                        requeued=retry_at is not None,
+                    )
+        return n
+
+    def run_once(self) -> int:
+        """Reap expired leases, then claim and dispatch as many ready jobs as fit. Returns jobs started."""
+        self.reap_expired()
+        started = 0
+        for name, jt in list(self._types.items()):
+            if not self._executes(name):
+                continue
+            with self._lock:
+                free = jt.concurrency - self._stats[name].running
+            if free <= 0:
+                continue
+            for job in self.backend.find_ready(name, now=self._clock(), limit=free):
+                now = self._clock()
+                claimed, at_capacity = self.backend.claim(
+                    job, owner=self.owner, now=now, lease_until=now + jt.lease_seconds, max_running=jt.concurrency
+                )
+                if at_capacity:
+                    break
+                if claimed is None:
+                    continue
+                self._dispatch(jt, claimed, now=now)
+                started += 1
+        return started
+
+    def _dispatch(self, jt: JobType, job: dict[str, Any], *, now: float) -> None:
+        ctx = JobContext(self, jt, job)
+        ctx.lease_until = now + jt.lease_seconds
+        ctx.last_heartbeat = now
+        wait_from = _parse_iso(job.get("runAt")) or now
+        with self._lock:
+            st = self._stats[jt.name]
+            st.claimed += 1
+            st.running += 1
+            st.wait_ms_total += max(0, int((now - wait_from) * 1000))
+            self._active[ctx.job_id] = ctx
+        if self._pool is None:
+            # Synchronous mode (tests / run_once without start()).
+            self._execute(ctx)
+        else:
+            self._pool.submit(self._execute, ctx)
+
+    def _execute(self, ctx: JobContext) -> None:
+        jt = ctx.job_type
+        t0 = time.perf_counter()
+        outcome = "succeeded"
+        try:
+            try:
+                result = jt.handler(ctx)
+                done = self.backend.finish(
+                    ctx.job, owner=self.owner, now=self._clock(), status="succeeded", result=result or {}
+                )
+            except JobLeaseLost:
+                outcome, done = "lease_lost", False
+            except Exception as e:  # noqa: BLE001
+                err = (str(e) or type(e).__name__)[:800]
+                permanent = isinstance(e, PermanentJobError)
+                if ctx.cancel_requested:
+                    outcome = "cancelled"
+                    done = self.backend.finish(ctx.job, owner=self.owner, now=self._clock(), status="cancelled", error=err)
+                elif not permanent and ctx.attempt < self._max_attempts(jt, ctx.job):
+                    outcome = "retried"
+                    done = self.backend.finish(
+                        ctx.job,
+                        owner=self.owner,
+                        now=self._clock(),
+                        status="queued",
+                        error=err,
+                        retry_at=self._clock() + jt.backoff(ctx.attempt),
+                    )
+                else:
+                    outcome = "failed"
+                    done = self.backend.finish(ctx.job, owner=self.owner, now=self._clock(), status="failed", error=err)
+                log.warning(
+                    "job_handler_failed",
+                    jobId=ctx.job_id,
+                    jobType=jt.name,
+                    attempt=ctx.attempt,
+                    outcome=outcome,
+                    error=err,
+                )
+            if not done and outcome != "lease_lost":
+                outcome = "lease_lost"
+        except Exception as e:  # noqa: BLE001
+            # Backend failure while releasing: the lease will expire and the reaper retries.
+            outcome = "lease_lost"
+            log.warning("job_release_failed", jobId=ctx.job_id, jobType=jt.name, error=str(e) or type(e).__name__)
+        finally:
+            ms = int((time.perf_counter() - t0) * 1000)
+            with self._lock:
+                st = self._stats[jt.name]
+                st.running = max(0, st.running - 1)
+                st.run_ms_total += ms
+                if outcome == "succeeded":
+                    st.succeeded += 1
+                elif outcome == "failed":
+                    st.failed += 1
+                elif outcome == "retried":
+                    st.retried += 1
+                elif outcome == "cancelled":
+                    st.cancelled += 1
+                else:
+                    st.lease_lost += 1
+                self._active.pop(ctx.job_id, None)
+            log.info("job_finished", jobId=ctx.job_id, jobType=jt.name, attempt=ctx.attempt, outcome=outcome, ms=ms)
+            self._wake.set()
+
+    def _heartbeat(self, ctx: JobContext, *, progress: dict[str, Any] | None = None) -> None:
+        with ctx._lock:
+            now = self._clock()
+            lease_until = now + ctx.job_type.lease_seconds
+            got = self.backend.heartbeat(
+                ctx.job_id, owner=self.owner, now=now, lease_until=lease_until, progress=progress
+            )
+            if got is None:
+                raise JobLeaseLost(ctx.job_id)
+            ctx.lease_until = lease_until
+            ctx.last_heartbeat = now
+            ctx.cancel_requested = bool(got.get("cancelRequested"))
+
+    def heartbeat_active(self) -> None:
+        """Renew leases of running jobs once a third of their lease has elapsed."""
+        now = self._clock()
+        with self._lock:
+            active = list(self._active.values())
+        for ctx in active:
+            if now - ctx.last_heartbeat < ctx.job_type.lease_seconds / 3:
+                continue
+            try:
+                self._heartbeat(ctx)
+            except JobLeaseLost:
+                log.warning("job_lease_lost", jobId=ctx.job_id, jobType=ctx.job_type.name)
+            except Exception as e:  # noqa: BLE001
+                log.warning("job_heartbeat_failed", jobId=ctx.job_id, error=str(e) or type(e).__name__)
+
+    # --- dispatcher thread ---
+
+    def _tick_interval(self) -> float:
+        leases = [jt.lease_seconds / 3 for jt in self._types.values()]
+        return min([self.poll_interval_s, *leases]) if leases else self.poll_interval_s
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.heartbeat_active()
+                self.run_once()
+            except Exception as e:  # noqa: BLE001
+                log.warning("job_engine_loop_error", error=str(e) or type(e).__name__)
+            self._wake.wait(self._tick_interval())
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            workers = max(1, sum(jt.concurrency for n, jt in self._types.items() if self._executes(n)))
+            self._stop.clear()
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+            self._thread = threading.Thread(target=self._loop, name="job-engine", daemon=True)
+            self._thread.start()
+        log.info("job_engine_started", owner=self.owner, types=sorted(n for n in self._types if self._executes(n)))
+
+    def stop(self, *, wait: bool = True) -> None:
+        with self._lock:
+            thread, pool = self._thread, self._pool
+            self._thread = None
+            self._pool = None
+        self._stop.set()
+        self._wake.set()
+        if thread is not None and wait:
+            thread.join(timeout=10)
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def run_forever(self) -> None:
+        """Blocking worker-process entry point."""
+        self.start()
+        try:
+            while not self._stop.wait(60):
+                log.info("job_engine_stats", stats=self.stats())
+        finally:
+            self.stop()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {name: st.as_dict() for name, st in sorted(self._stats.items())}
+
+
+_ENGINE: JobEngine | None = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def _parse_concurrency_overrides(raw: str) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for part in str(raw or "").split(","):
+        name, _, n = part.partition("=")
+        try:
+            if name.strip() and n.strip():
+                out[name.strip()] = max(1, int(n))
+        except ValueError:
+            continue
+    return out
+
+
+def build_job_engine(*, types: set[str] | None = None, embedded: bool | None = None) -> JobEngine:
+    """
+    Engine with every job type in `job_handlers` registered, on the configured backend.
+
+    `types` restricts what this engine executes; by default it comes from
+    `JOB_ENGINE_TYPES`, falling back to the `run_embedded` types in embedded mode
+    and to every type in a dedicated worker. `embedded` defaults to
+    `JOB_ENGINE_EMBEDDED`; worker processes pass False.
+    """
+    from app.settings import settings
+    from app.workers.job_handlers import job_types
+
+    if str(settings.job_engine_backend or "").strip().lower() == "local":
+        backend: JobBackend = LocalJobBackend()
+    else:
+        from app.repositories.job_queue_repo import DynamoJobBackend
+
+        backend = DynamoJobBackend()
+    all_types = job_types()
+    if types is None:
+        types = {t.strip() for t in str(settings.job_engine_types or "").split(",") if t.strip()} or None
+    if embedded is None:
+        embedded = bool(settings.job_engine_embedded)
+    if types is None and embedded:
+        types = {jt.name for jt in all_types if jt.run_embedded}
+    engine = JobEngine(backend, poll_interval_s=float(settings.job_engine_poll_seconds), types=types)
+    overrides = _parse_concurrency_overrides(settings.job_engine_concurrency)
+    for jt in all_types:
+        if jt.name in overrides:
+            jt = replace(jt, concurrency=overrides[jt.name])
+        engine.register(jt)
+    return engine
+
+
+def get_job_engine() -> JobEngine:
+    """Process singleton (see `build_job_engine`)."""
+    global _ENGINE
+    if _ENGINE is not None:
+        return _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = build_job_engine()
+        return _ENGINE
+
+
+def set_job_engine(engine: JobEngine | None) -> None:
+    """Replace the process singleton (tests)."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        _ENGINE = engine
+
+
+def start_embedded_job_engine() -> JobEngine | None:
+    """App startup: run this process's dispatcher now (embedded mode) instead of on the first submit."""
+    from app.settings import settings
+
+    if not settings.job_engine_embedded:
+        return None
+    engine = get_job_engine()
+    engine.start()
+    return engine
+
+
+def stop_job_engine() -> None:
+    """App shutdown: stop the singleton's dispatcher if it was started."""
+    if _ENGINE is not None:
+        _ENGINE.stop()
+
+
+def submit_job(job_type: str, payload: dict[str, Any] | None = None, **kwargs: Any) -> dict[str, Any]:
+    """
+    Enqueue a job. In embedded mode (API processes, `JOB_ENGINE_EMBEDDED=true`) this
+    process also starts executing jobs; otherwise a dedicated `job_worker` picks it up.
+    """
+    from app.settings import settings
+
+    engine = get_job_engine()
+    if settings.job_engine_embedded:
+        return engine.submit(job_type, payload, **kwargs)
+    return engine.enqueue(job_type, payload, **kwargs)
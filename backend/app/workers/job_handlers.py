@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+"""
+Job types executed by the job engine.
+
+Handlers are thin adapters onto the existing processing functions; imports are
+local so registering the types doesn't pull routers / Playwright / docgen into
+every process.
+"""
+
+from typing import Any
+
+from app.workers.job_engine import JobContext, JobType
+
+RFP_UPLOAD_JOB_TYPE = "rfp_upload"
+RFP_SCRAPER_JOB_TYPE = "rfp_scraper"
+FINDER_RUN_JOB_TYPE = "finder_run"
+PROPOSAL_GENERATE_JOB_TYPE = "proposal_generate"
+PROPOSAL_GENERATE_SECTIONS_JOB_TYPE = "proposal_generate_sections"
+CONTRACTING_JOB_TYPE = "contracting"
+
+
+def _rfp_upload(ctx: JobContext) -> dict[str, Any] | None:
+    from app.routers.rfp import _process_rfp_upload_job
+
+    # Marks the upload job failed itself; the engine only re-runs it after a crash.
+    _process_rfp_upload_job(str(ctx.payload["jobId"]))
+    return None
+
+
+def _rfp_scraper(ctx: JobContext) -> dict[str, Any] | None:
+    from app.pipeline.search.rfp_scraper_job_runner import process_scraper_job
+
+    process_scraper_job(str(ctx.payload["jobId"]))
+    return None
+
+
+def _finder_run(ctx: JobContext) -> dict[str, Any] | None:
+    from app.pipeline.search.finder_worker import run_finder_job
+
+    run_finder_job(**ctx.payload)
+    return None
+
+
+def _proposal_generate(ctx: JobContext) -> dict[str, Any] | None:
+    from app.routers.proposals import run_generate_proposal_job
+
+    p = ctx.payload
+    run_generate_proposal_job(
+        proposal_id=str(p["proposalId"]),
+        rfp_id=str(p.get("rfpId") or ""),
+        company_id=p.get("companyId"),
+        titles=[str(t) for t in (p.get("titles") or [])],
+        team_member_ids=p.get("teamMemberIds") or [],
+        reference_ids=p.get("referenceIds") or [],
+        user_ctx=p.get("userCtx"),
+    )
+    return None
+
+
+def _proposal_generate_sections(ctx: JobContext) -> dict[str, Any] | None:
+    from app.routers.proposals import run_generate_sections_job
+
+    p = ctx.payload
+    run_generate_sections_job(job_id=str(p["jobId"]), proposal_id=str(p["proposalId"]), user_ctx=p.get("userCtx"))
+    return None
+
+
+def _contracting(ctx: JobContext) -> dict[str, Any] | None:
+    from app.workers.contracting_worker import _process_job
+
+    # Raises on failure so the engine retries; fails the job record on the last attempt.
+    _process_job(str(ctx.payload["jobId"]), receive_count=ctx.attempt)
+    return None
+
+
+def job_types() -> list[JobType]:
+    from app.settings import settings
+
+    return [
+        JobType(name=RFP_UPLOAD_JOB_TYPE, handler=_rfp_upload, concurrency=4, max_attempts=3, lease_seconds=300),
+        JobType(name=RFP_SCRAPER_JOB_TYPE, handler=_rfp_scraper, concurrency=2, max_attempts=2, lease_seconds=300),
+        JobType(name=FINDER_RUN_JOB_TYPE, handler=_finder_run, concurrency=1, max_attempts=1, lease_seconds=600),
+        JobType(name=PROPOSAL_GENERATE_JOB_TYPE, handler=_proposal_generate, concurrency=4, max_attempts=2),
+        JobType(
+            name=PROPOSAL_GENERATE_SECTIONS_JOB_TYPE,
+            handler=_proposal_generate_sections,
+            concurrency=4,
+            max_attempts=2,
+        ),
+        JobType(
+            name=CONTRACTING_JOB_TYPE,
+            handler=_contracting,
+            concurrency=4,
+            max_attempts=max(1, int(settings.contracting_jobs_max_receives or 6)),
+            lease_seconds=300,
+            backoff_base_s=15,
+            run_embedded=False,
+        ),
+    ]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from app.observability.logging import configure_logging, get_logger
+from app.workers.job_engine import build_job_engine
+
+log = get_logger("job_worker")
+
+
+def run_forever() -> None:
+    """
+    Dedicated job-engine worker. Executes `JOB_ENGINE_TYPES` (default: every job
+    type, including worker-only ones like `contracting`) regardless of
+    `JOB_ENGINE_EMBEDDED`, which only applies to API processes.
+    """
+    configure_logging(level="INFO")
+    engine = build_job_engine(embedded=False)
+    log.info("job_worker_starting", owner=engine.owner, types=sorted(engine.types or []))
+    engine.run_forever()
+
+
+if __name__ == "__main__":
+    run_forever()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+"""
+Backfill the agent job list-index items (status / type / scope) for existing jobs.
+
+Idempotent and resumable: prints a cursor after every chunk; pass it back with
+--resume to continue after an interruption.
+
+Usage (from backend/):
+  python scripts/backfill_agent_job_indexes.py [--page-size 200] [--resume <token>]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.agent_jobs_repo import backfill_indexes  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--page-size", type=int, default=200)
+    ap.add_argument("--resume", default=None, help="cursor printed by a previous run")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    tok = args.resume
+    jobs = failed = 0
+    while True:
+        res = backfill_indexes(page_size=args.page_size, next_token=tok, max_pages=10)
+        jobs += res["jobs"]
+        failed += res["failed"]
+        tok = res["nextToken"]
+        print(f"jobs={jobs} failed={failed} elapsed={time.perf_counter() - t0:.1f}s cursor={tok or '-'}", flush=True)
+        if not tok:
+            break
+
+
+if __name__ == "__main__":
+    main()
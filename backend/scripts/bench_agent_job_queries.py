@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+"""
+Benchmark agent job listing: index-backed queries vs the legacy over-fetch + filter.
+
+Loads N synthetic historical jobs (default 100k) into an in-memory stand-in for
+the main table (GSI1 partitions kept sorted, pagination by cursor), then for
+typical list calls reports:
+- completeness: rows returned vs rows that actually match (legacy reads only the
+  newest `limit * 3..5` due-queue entries, so rare slices come back short/empty)
+- read cost: DynamoDB RCUs (eventually consistent, 4 KB units) for the items read
+- latency of the in-process work (no network)
+
+Usage (from backend/):
+  python scripts/bench_agent_job_queries.py --jobs 100000
+"""
+
+import argparse
+import bisect
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories import agent_jobs_repo  # noqa: E402
+from app.repositories.agent_jobs_repo import _due_index, job_key  # noqa: E402
+
+
+class _Page:
+    def __init__(self, items: list[dict[str, Any]], next_token: str | None):
+        self.items = items
+        self.next_token = next_token
+
+
+class FakeTable:
+    """Just enough of DynamoTable for the repo's list paths, with RCU accounting."""
+
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.gsi: dict[str, list[tuple[str, str, str]]] = {}
+        self.rcu = 0.0
+        self.items_read = 0
+
+    @staticmethod
+    def _size(it: dict[str, Any]) -> int:
+        return len(json.dumps(it, default=str))
+
+    def put(self, it: dict[str, Any]) -> None:
+        key = (it["pk"], it["sk"])
+        old = self.items.get(key)
+        if old and old.get("gsi1pk"):
+            lst = self.gsi[old["gsi1pk"]]
+            lst.pop(bisect.bisect_left(lst, (old["gsi1sk"], it["pk"], it["sk"])))
+        self.items[key] = it
+        if it.get("gsi1pk"):
+            bisect.insort(self.gsi.setdefault(it["gsi1pk"], []), (it["gsi1sk"], it["pk"], it["sk"]))
+
+    # --- DynamoTable surface ---
+
+    def tx_put(self, *, item: dict[str, Any], **_: Any) -> dict[str, Any]:
+        return {"Item": item}
+
+    def tx_delete(self, *, key: dict[str, Any], **_: Any) -> dict[str, Any]:
+        return {"Key": key}
+
+    def transact_write(self, *, puts=(), deletes=(), updates=()) -> dict[str, Any]:
+        for p in puts:
+            self.put(p["Item"])
+        return {"ok": True}
+
+    def batch_get_items(self, *, keys: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        out = []
+        for k in keys:
+            it = self.items.get((k["pk"], k["sk"]))
+            if it:
+                out.append(it)
+                self.items_read += 1
+                self.rcu += 0.5 * math.ceil(self._size(it) / 4096)
+        return out
+
+    def query_page(
+        self,
+        *,
+        key_condition_expression: Any,
+        index_name: str | None = None,
+        limit: int = 50,
+        scan_index_forward: bool = False,
+        filter_expression: Any = None,
+        next_token: str | None = None,
+    ) -> _Page:
+        pk = key_condition_expression.get_expression()["values"][1]
+        lst = self.gsi.get(pk, [])
+        order = lst if scan_index_forward else lst[::-1]
+        start = int(next_token or 0)
+        chunk = order[start : start + limit]
+        items = [self.items[(p, s)] for _sk, p, s in chunk]
+        self.items_read += len(items)
+        self.rcu += 0.5 * math.ceil(sum(self._size(i) for i in items) / 4096) if items else 0.5
+        nxt = start + len(chunk)
+        return _Page(items, str(nxt) if nxt < len(order) else None)
+
+
+def _load(table: FakeTable, n: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    types = [f"type_{i}" for i in range(12)]
+    type_w = [1.0 / (i + 1) ** 1.3 for i in range(len(types))]
+    statuses = ["completed"] * 90 + ["failed"] * 6 + ["cancelled"] * 2 + ["queued", "running"]
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    jobs: list[dict[str, Any]] = []
+    for i in range(n):
+        created = (t0 + timedelta(minutes=7 * i)).isoformat().replace("+00:00", "Z")
+        jid = f"aj_{i:08d}"
+        job = {
+            **job_key(job_id=jid),
+            "entityType": "AgentJob",
+            "jobId": jid,
+            "jobType": rng.choices(types, weights=type_w)[0],
+            "status": rng.choice(statuses),
+            "scope": {"rfpId": f"rfp_{rng.randrange(n // 20 or 1)}"},
+            "payload": {"notes": "x" * rng.randint(200, 1500)},
+            "dueAt": created,
+            "createdAt": created,
+            "updatedAt": created,
+            **_due_index(due_at=created, job_id=jid),
+        }
+        table.put(job)
+        jobs.append(job)
+    return jobs
+
+
+def _legacy(table: FakeTable, *, limit: int, factor: int, match: Callable[[dict], bool]) -> list[dict]:
+    from boto3.dynamodb.conditions import Key
+
+    pg = table.query_page(
+        index_name="GSI1",
+        key_condition_expression=Key("gsi1pk").eq("AGENTJOB_DUE"),
+        scan_index_forward=False,
+        limit=min(limit * factor, 300 if factor == 5 else 200),
+    )
+    return [it for it in pg.items if match(it)][:limit]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    table = FakeTable()
+    t0 = time.perf_counter()
+    jobs = _load(table, args.jobs, args.seed)
+    agent_jobs_repo.get_main_table = lambda: table  # type: ignore[assignment]
+    t1 = time.perf_counter()
+    res = agent_jobs_repo.backfill_indexes(page_size=500)
+    t2 = time.perf_counter()
+    print(f"loaded {len(jobs)} jobs in {t1 - t0:.1f}s; backfilled indexes for {res['jobs']} (failed {res['failed']}) in {t2 - t1:.1f}s")
+
+    lim = args.limit
+    rare_type = "type_11"
+    rfp = jobs[-1]["scope"]["rfpId"]
+    cases: list[tuple[str, Callable[[dict], bool], int, Callable[[], dict]]] = [
+        ("recent", lambda j: True, 3, lambda: agent_jobs_repo.list_recent_jobs_page(limit=lim)),
+        (
+            "recent status=failed",
+            lambda j: j["status"] == "failed",
+            3,
+            lambda: agent_jobs_repo.list_recent_jobs_page(limit=lim, status="failed"),
+        ),
+        (
+            f"type={rare_type}",
+            lambda j: j["jobType"] == rare_type,
+            5,
+            lambda: agent_jobs_repo.list_jobs_by_type_page(job_type=rare_type, limit=lim),
+        ),
+        (
+            f"type={rare_type} status=failed",
+            lambda j: j["jobType"] == rare_type and j["status"] == "failed",
+            5,
+            lambda: agent_jobs_repo.list_jobs_by_type_page(job_type=rare_type, limit=lim, status="failed"),
+        ),
+        (
+            f"scope rfpId={rfp}",
+            lambda j: j["scope"]["rfpId"] == rfp,
+            5,
+            lambda: agent_jobs_repo.list_jobs_by_scope_page(scope={"rfpId": rfp}, limit=lim),
+        ),
+    ]
+
+    print(f"\n{'query':36} {'matching':>8} {'want':>5} | {'legacy rows':>11} {'RCU':>6} {'ms':>6} | {'index rows':>10} {'RCU':>6} {'ms':>6}")
+    for label, match, factor, run in cases:
+        total = sum(1 for j in jobs if match(j))
+        want = min(lim, total)
+
+        table.rcu = 0.0
+        s = time.perf_counter()
+        legacy_rows = _legacy(table, limit=lim, factor=factor, match=match)
+        legacy_ms = (time.perf_counter() - s) * 1000
+        legacy_rcu = table.rcu
+
+        table.rcu = 0.0
+        s = time.perf_counter()
+        page = run()
+        new_ms = (time.perf_counter() - s) * 1000
+        new_rcu = table.rcu
+        assert all(match(j) for j in page["data"]), label
+
+        print(
+            f"{label:36} {total:>8} {want:>5} | {len(legacy_rows):>11} {legacy_rcu:>6.1f} {legacy_ms:>6.1f} |"
+            f" {len(page['data']):>10} {new_rcu:>6.1f} {new_ms:>6.1f}"
+        )
+
+    # Walk a whole slice with the cursor: every matching job exactly once.
+    table.rcu = 0.0
+    seen: list[str] = []
+    tok = None
+    while True:
+        page = agent_jobs_repo.list_jobs_by_type_page(job_type=rare_type, limit=100, status="failed", next_token=tok)
+        seen.extend(j["jobId"] for j in page["data"])
+        tok = page["nextToken"]
+        if not tok:
+            break
+    expected = sum(1 for j in jobs if j["jobType"] == rare_type and j["status"] == "failed")
+    assert len(seen) == len(set(seen)) == expected
+    print(f"\npaginated full slice type={rare_type} status=failed: {len(seen)} jobs, {table.rcu:.1f} RCU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+"""
+Benchmark DynamoTable backends on large items: boto3 resource layer vs the
+low-level client fast path (`DDB_TABLE_BACKEND=client`, see
+`app/db/dynamodb/codec.py`).
+
+Both backends run the same `DynamoTable.query_page_raw` / `get_item` code
+against botocore Stubbers (responses queued before timing, no network), so the
+difference is the request/response conversion: the resource layer's
+TypeSerializer/TypeDeserializer hooks producing Decimals, vs the cached codec
+producing native numbers. Reports items/s and MB/s of wire-format JSON.
+
+Usage (from backend/):
+  python scripts/bench_ddb_fast_path.py --items 50 --sections 40 --rounds 40
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+import boto3  # noqa: E402
+from boto3.dynamodb.conditions import Key  # noqa: E402
+from botocore.stub import Stubber  # noqa: E402
+
+from app.db.dynamodb.codec import serialize_item  # noqa: E402
+from app.db.dynamodb.table import DynamoTable  # noqa: E402
+
+TABLE = "bench"
+
+
+def make_item(i: int, sections: int, rng: random.Random) -> dict[str, Any]:
+    """A proposal-like item: many sections, nested maps/lists, plenty of numbers."""
+    words = ["scope", "deliver", "budget", "timeline", "staff", "quality", "risk", "report"]
+    return {
+        "pk": f"PROPOSAL#{i:06d}",
+        "sk": "PROFILE",
+        "title": f"Proposal {i}",
+        "score": rng.randint(0, 100),
+        "ratio": round(rng.random(), 4),
+        "sections": {
+            f"Section {s}": {
+                "content": " ".join(rng.choice(words) for _ in range(60)),
+                "order": s,
+                "wordCount": rng.randint(50, 900),
+                "confidence": round(rng.random(), 3),
+                "tags": [rng.choice(words) for _ in range(4)],
+                "meta": {"edited": rng.random() < 0.5, "revisions": rng.randint(0, 9), "by": None},
+            }
+            for s in range(sections)
+        },
+        "budget": [{"line": n, "amount": round(rng.uniform(100, 99999), 2), "qty": rng.randint(1, 40)} for n in range(25)],
+    }
+
+
+def _table(fast: bool) -> tuple[DynamoTable, Stubber]:
+    t = object.__new__(DynamoTable)
+    t.table_name = TABLE
+    if fast:
+        t._client = boto3.client("dynamodb", region_name="us-east-1")
+        t._fast = True
+        stub = Stubber(t._client)
+    else:
+        t._table = boto3.resource("dynamodb", region_name="us-east-1").Table(TABLE)
+        t._fast = False
+        stub = Stubber(t._table.meta.client)
+    stub.activate()
+    return t, stub
+
+
+def run(fast: bool, op: str, wire: list[dict[str, Any]], rounds: int) -> list[float]:
+    t, stub = _table(fast)
+    # The resource layer rewrites responses in place: queue a fresh copy per call.
+    for _ in range(rounds):
+        if op == "query":
+            stub.add_response("query", {"Items": copy.deepcopy(wire), "Count": len(wire)})
+        else:
+            for it in wire:
+                stub.add_response("get_item", {"Item": copy.deepcopy(it)})
+    times: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        if op == "query":
+            items, _ = t.query_page_raw(key_condition_expression=Key("pk").eq("x"), limit=len(wire))
+            assert len(items) == len(wire)
+        else:
+            for it in wire:
+                assert t.get_item(key={"pk": it["pk"]["S"], "sk": "PROFILE"}) is not None
+        times.append(time.perf_counter() - start)
+    stub.deactivate()
+    return times
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=50, help="items per Query page")
+    ap.add_argument("--sections", type=int, default=40, help="sections per item (item size)")
+    ap.add_argument("--rounds", type=int, default=40)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    wire = [serialize_item(make_item(i, args.sections, rng)) for i in range(args.items)]
+    wire_mb = len(json.dumps(wire).encode("utf-8")) / 1e6
+    print(f"{args.items} items/page, ~{1000 * wire_mb / args.items:.1f} KB/item (wire JSON), {args.rounds} rounds")
+
+    for op in ("query", "get_item"):
+        results = {}
+        for name, fast in (("resource", False), ("client fast path", True)):
+            run(fast, op, wire, 2)  # warm-up
+            med = statistics.median(run(fast, op, wire, args.rounds))
+            results[name] = med
+            print(
+                f"  {op:9s} {name:17s} {1000 * med:8.2f} ms/page  "
+                f"{args.items / med:9.0f} items/s  {wire_mb / med:7.1f} MB/s"
+            )
+        print(f"  {op:9s} speedup: {results['resource'] / results['client fast path']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+"""
+Benchmark URL-intake HTML extraction: legacy regex stripping vs. the streaming extractor.
+
+Reports wall time and peak Python memory (tracemalloc, separate run) for:
+- a large "normal" page (paragraphs, tables, scripts, nav boilerplate)
+- a pathological page (many unterminated <script tags, which make the legacy
+  lazy `<script[\\s\\S]*?</script>` scan quadratic)
+
+The streaming extractor is fed 64KB chunks, as it would be from `iter_bytes()`.
+
+Usage (from backend/):
+  python scripts/bench_html_extract.py --mb 20
+"""
+
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.pipeline.intake.html_text import HtmlTextExtractor  # noqa: E402
+
+ANALYSIS_MAX_CHARS = 200_000
+CHUNK = 64 * 1024
+
+
+def _legacy(data: bytes) -> str:
+    html = data.decode("utf-8", errors="ignore")
+    text = html.replace("<br>", "\n").replace("<br/>", "\n").replace("<br />", "\n").replace("</p>", "\n")
+    text = re.sub(r"<script[\s\S]*?</script>", " ", text, flags=re.IGNORECASE)
+    text = re.sub(r"<style[\s\S]*?</style>", " ", text, flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _chunks(data: bytes) -> Iterator[bytes]:
+    for i in range(0, len(data), CHUNK):
+        yield data[i : i + CHUNK]
+
+
+def _streaming(data: bytes, *, max_chars: int | None) -> str:
+    p = HtmlTextExtractor(max_chars=max_chars)
+    for c in _chunks(data):
+        p.feed(c.decode("utf-8", errors="replace"))
+        if p.done:
+            break
+    else:
+        p.close()
+    return p.text()
+
+
+def _normal_html(target_bytes: int) -> bytes:
+    block = (
+        "<nav><ul><li><a href='/'>Home</a></li><li><a href='/bids'>Bids</a></li></ul></nav>"
+        "<script>window.dataLayer=window.dataLayer||[];function g(){{dataLayer.push(arguments)}}</script>"
+        "<h2>Section {i}: Scope of Work</h2>"
+        "<p>The Contractor shall provide all labor, materials, and equipment necessary to complete item {i}. "
+        "Proposals are due no later than 03/15/2026 at 2:00 PM local time.</p>"
+        "<table><tr><th>Line</th><th>Description</th><th>Qty</th></tr>"
+        "<tr><td>{i}</td><td>Site survey &amp; assessment</td><td>1</td></tr></table>"
+        "<style>.x{{color:red}}</style>"
+    )
+    parts = ["<html><head><title>RFP</title></head><body>"]
+    size = 0
+    i = 0
+    while size < target_bytes:
+        s = block.format(i=i)
+        parts.append(s)
+        size += len(s)
+        i += 1
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def _pathological_html(n: int) -> bytes:
+    return ("<p>text</p>" + "<script " * n).encode("utf-8")
+
+
+def _measure(label: str, fn: Callable[[], str]) -> None:
+    # Time and memory are measured in separate runs: tracemalloc slows allocation-heavy code a lot.
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<24} {dt:8.3f}s  peak={peak / 1e6:8.1f}MB  chars={len(out):>10}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, default=20.0)
+    ap.add_argument("--pathological", type=int, default=8_000)
+    args = ap.parse_args()
+
+    normal = _normal_html(int(args.mb * 1024 * 1024))
+    print(f"normal page: {len(normal) / 1e6:.1f}MB")
+    _measure("legacy regex", lambda: _legacy(normal))
+    _measure("streaming (no budget)", lambda: _streaming(normal, max_chars=None))
+    _measure("streaming (200k budget)", lambda: _streaming(normal, max_chars=ANALYSIS_MAX_CHARS))
+
+    bad = _pathological_html(args.pathological)
+    print(f"pathological page: {len(bad) / 1e6:.2f}MB ({args.pathological} unterminated <script tags)")
+    _measure("legacy regex", lambda: _legacy(bad))
+    _measure("streaming (no budget)", lambda: _streaming(bad, max_chars=None))
+
+
+if __name__ == "__main__":
+    main()
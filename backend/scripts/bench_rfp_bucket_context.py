@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+"""
+Benchmark per-bucket context selection for RFP analysis against the full-text baseline.
+
+Generates a fixture corpus of synthetic RFPs (cover page, key dates, scope,
+deliverables, evaluation, insurance, long terms and conditions, contacts) at
+several sizes. Each one is run through `analyze_rfp` twice: once with targeted
+contexts and once with RFP_ANALYSIS_TARGETED_CONTEXT off. Chunking is off for
+both runs. The report gives, per bucket:
+- prompt tokens sent (targeted vs full text)
+- the local pre-pass time
+- with --live, the model latency of each call (needs OPENAI_API_KEY)
+
+Without --live, model calls are stubbed and only prompts are measured.
+
+Usage (from backend/):
+  python scripts/bench_rfp_bucket_context.py --pages 10 40 120
+  python scripts/bench_rfp_bucket_context.py --pages 40 --live
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.ai.client import AiMeta  # noqa: E402
+from app.ai.tokens import count_tokens  # noqa: E402
+from app.pipeline.intake import rfp_analyzer  # noqa: E402
+from app.pipeline.intake.rfp_context import select_bucket_contexts  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+_FILLER = (
+    "general provisions apply to this solicitation and any resulting agreement between the parties "
+    "including all attachments exhibits and amendments made in writing through the procurement office "
+    "the terms herein are to be read together and interpreted as a whole according to applicable law"
+).split()
+
+_PURPOSES = ("rfp_analysis_meta", "rfp_analysis_dates", "rfp_analysis_lists")
+
+
+def _filler(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_FILLER) for _ in range(words)).capitalize() + "."
+
+
+def make_rfp(pages: int, seed: int) -> str:
+    """About `pages` pages (3,000 characters each) of RFP-shaped text."""
+    rng = random.Random(seed)
+    city = rng.choice(["Springfield", "Riverton", "Lakeside", "Fairview"])
+    out = [
+        f"CITY OF {city.upper()}\nREQUEST FOR PROPOSALS\nRFP No. 2026-{seed:03d}",
+        f"Parks Maintenance and Landscaping Services\nIssued by the Department of Public Works, City of {city}",
+        f"Date issued: January {seed % 20 + 1}, 2026",
+        "1. Introduction",
+        _filler(rng, 120),
+        "2. Key Dates",
+        "Pre-proposal conference: 02/10/2026 at 10:00 AM, City Hall, Room 200.\n"
+        "Questions due: February 17, 2026 by 5:00 PM.\n"
+        "Proposals due: 03/03/2026 at 2:00 PM local time.\n"
+        "Anticipated contract start date: 2026-05-01.",
+        "3. Scope of Work",
+    ]
+    out += [
+        f"The Contractor shall maintain {rng.choice(['turf', 'irrigation', 'playgrounds', 'trails'])} at all "
+        f"park sites and must respond to service requests within {rng.randint(2, 48)} hours. " + _filler(rng, 40)
+        for _ in range(8)
+    ]
+    out += [
+        "4. Deliverables",
+        "Monthly maintenance reports; annual condition assessment; GIS inventory updates.",
+        "5. Evaluation Criteria",
+        "Price 40%, experience 30%, approach 20%, references 10%.",
+        "6. Budget",
+        "The estimated budget is not to exceed $1,250,000 per year, subject to appropriation.",
+        "7. Insurance Requirements",
+        "The Contractor must carry general liability insurance of at least $2,000,000 per occurrence.",
+        "8. General Terms and Conditions",
+    ]
+    size = sum(len(p) for p in out)
+    contact = (
+        f"Contact: Jordan Lee, Procurement Officer, purchasing@{city.lower()}.gov, phone 555-0100. "
+        "All questions must be submitted in writing."
+    )
+    while size < pages * 3000:
+        para = _filler(rng, rng.randint(60, 160))
+        out.append(para)
+        size += len(para)
+    out.insert(len(out) - 3, "9. Contact Information")
+    out.insert(len(out) - 3, contact)
+    return "\n\n".join(out)
+
+
+def _run(text: str, *, targeted: bool, live: bool) -> dict[str, list[tuple[int, float]]]:
+    settings.rfp_analysis_targeted_context = targeted
+    calls: dict[str, list[tuple[int, float]]] = {p: [] for p in _PURPOSES}
+    real = rfp_analyzer.call_json_verified
+
+    def _measured(*, purpose: str, response_model: type, messages: list[dict[str, str]], **kw: Any):
+        tokens = count_tokens(messages[0]["content"], model=settings.openai_model_for(purpose))
+        t0 = time.perf_counter()
+        if live:
+            out = real(purpose=purpose, response_model=response_model, messages=messages, **kw)
+        else:
+            out = response_model(), AiMeta(purpose=purpose, model="stub", attempts=1, used_response_format=None)
+        calls.setdefault(purpose, []).append((tokens, (time.perf_counter() - t0) * 1000))
+        return out
+
+    rfp_analyzer.call_json_verified = _measured
+    try:
+        rfp_analyzer.analyze_rfp(text, "bench.pdf")
+    finally:
+        rfp_analyzer.call_json_verified = real
+    return calls
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, nargs="+", default=[10, 40, 60])
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--live", action="store_true", help="call the configured model instead of a stub")
+    args = ap.parse_args()
+
+    settings.rfp_analysis_chunking = "off"
+    settings.rfp_paragraph_index_store = False
+    model = settings.openai_model_for("rfp_analysis")
+    for i, pages in enumerate(args.pages):
+        text = make_rfp(pages, args.seed + i)
+        t0 = time.perf_counter()
+        contexts = select_bucket_contexts(text, model=model)
+        prepass_ms = (time.perf_counter() - t0) * 1000
+        full = _run(text, targeted=False, live=args.live)
+        targeted = _run(text, targeted=True, live=args.live)
+        print(f"pages={pages} chars={len(text)} tokens={count_tokens(text, model=model)} pre-pass={prepass_ms:.1f}ms")
+        for purpose in _PURPOSES:
+            (f_tok, f_ms), (t_tok, t_ms) = full[purpose][0], targeted[purpose][0]
+            kind = purpose.rsplit("_", 1)[-1]
+            line = (
+                f"  {kind:<6} full={f_tok:>7} tok  targeted={t_tok:>7} tok  "
+                f"({t_tok / max(1, f_tok):6.1%})  context={'targeted' if contexts[kind] else 'full'}"
+            )
+            if args.live:
+                line += f"  latency full={f_ms:8.0f}ms targeted={t_ms:8.0f}ms"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
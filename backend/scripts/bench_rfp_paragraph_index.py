@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+"""
+Benchmark paragraph retrieval over one synthetic RFP.
+
+Builds a document of N paragraphs (default: about 200k characters, the stored
+rawText limit) with a Zipf-like vocabulary, then reports:
+- index build time, gzipped payload size and load (`from_bytes`) time
+- BM25 top-k query latency (p50/p95/max) for common, rare and multi-term queries
+- the legacy selector (split paragraphs + substring count per query token) for comparison
+
+Usage (from backend/):
+  python scripts/bench_rfp_paragraph_index.py --paragraphs 1500 --words 15
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.ai.context import split_paragraphs  # noqa: E402
+from app.infrastructure.search.paragraph_index import ParagraphIndex  # noqa: E402
+
+_SYLLABLES = ["ar", "be", "co", "da", "en", "fi", "go", "ha", "in", "jo", "ka", "lu", "mo", "ne", "or", "pa"]
+
+
+def _vocab(n: int, rng: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _make_text(paragraphs: int, words: int, seed: int) -> tuple[str, list[str]]:
+    rng = random.Random(seed)
+    vocab = _vocab(8_000, rng)
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    paras = [
+        " ".join(rng.choices(vocab, weights=weights, k=rng.randint(words // 2, words * 2))) for _ in range(paragraphs)
+    ]
+    return "\n\n".join(paras), vocab
+
+
+def _legacy_top_k(text: str, query: str, k: int = 12) -> list[str]:
+    # The substring selector the index replaced.
+    toks = [t for t in re.split(r"[^a-z0-9]+", query.lower()) if len(t) >= 3]
+    paras = split_paragraphs(text)
+    scored = []
+    for idx, p in enumerate(paras):
+        low = p.lower()
+        score = sum(1 for t in toks[:16] if t in low)
+        if score:
+            scored.append((score, idx))
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [paras[i] for i in sorted(i for _s, i in scored[:k])]
+
+
+def _latency(label: str, fn: Callable[[], object], runs: int) -> None:
+    samples: list[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"  {label:<34} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  max={samples[-1]:8.2f}ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--paragraphs", type=int, default=1500)
+    ap.add_argument("--words", type=int, default=15)
+    ap.add_argument("--runs", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    text, vocab = _make_text(args.paragraphs, args.words, args.seed)
+    print(f"paragraphs={args.paragraphs} chars={len(text)}")
+
+    t0 = time.perf_counter()
+    index = ParagraphIndex.build(text)
+    t_build = time.perf_counter() - t0
+    payload = index.to_bytes()
+    t0 = time.perf_counter()
+    ParagraphIndex.from_bytes(payload)
+    t_load = time.perf_counter() - t0
+    print(
+        f"build: {t_build * 1000:.1f}ms   load: {t_load * 1000:.1f}ms   "
+        f"payload (gzip): {len(payload) / 1e3:.1f}KB   terms={len(index.postings)}"
+    )
+
+    common, mid, rare = vocab[0], vocab[200], vocab[6_000]
+    queries = {
+        f"common term ({common})": common,
+        f"mid term ({mid})": mid,
+        f"rare term ({rare})": rare,
+        "5 terms": f"{mid} {vocab[300]} {vocab[40]} {vocab[1000]} {rare}",
+    }
+    print("BM25 paragraph index (top 12):")
+    for label, q in queries.items():
+        _latency(label, lambda q=q: index.top_k(q, k=12), args.runs)
+
+    print("legacy substring selector (top 12):")
+    for label, q in queries.items():
+        _latency(label, lambda q=q: _legacy_top_k(text, q), max(3, args.runs // 10))
+
+
+if __name__ == "__main__":
+    main()
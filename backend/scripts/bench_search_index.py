@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+"""
+Benchmark full-text search over synthetic RFP/proposal documents.
+
+Builds an in-memory index over N documents (default 50k) with a Zipf-like
+vocabulary, then reports:
+- index build time and approximate S3 shard payload size (gzipped JSON)
+- BM25 query latency (p50/p95/max) for common, rare and multi-term queries
+- the legacy approach (lowercased substring scan over every record) for comparison
+
+Usage (from backend/):
+  python scripts/bench_search_index.py --docs 50000 --words 400
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.infrastructure.search.index_store import MemoryIndexStore, S3IndexStore  # noqa: E402
+from app.infrastructure.search.search_index import (  # noqa: E402
+    SearchIndex,
+    build_proposal_doc,
+    build_rfp_doc,
+)
+
+_SYLLABLES = ["ar", "be", "co", "da", "en", "fi", "go", "ha", "in", "jo", "ka", "lu", "mo", "ne", "or", "pa"]
+
+
+def _vocab(n: int, rng: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _make_docs(n: int, words_per_doc: int, seed: int) -> tuple[list[dict], list[str]]:
+    rng = random.Random(seed)
+    vocab = _vocab(20_000, rng)
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    docs: list[dict] = []
+    for i in range(n):
+        body = " ".join(rng.choices(vocab, weights=weights, k=words_per_doc))
+        title = " ".join(rng.choices(vocab, weights=weights, k=5))
+        if i % 5 == 0:
+            docs.append(
+                {
+                    "proposalId": f"p{i}",
+                    "rfpId": f"r{i}",
+                    "title": title,
+                    "sections": {"Approach": {"content": body}},
+                }
+            )
+        else:
+            docs.append(
+                {
+                    "rfpId": f"r{i}",
+                    "title": title,
+                    "clientName": rng.choice(vocab[:500]),
+                    "projectType": rng.choice(vocab[:50]),
+                    "rawText": body,
+                }
+            )
+    return docs, vocab
+
+
+def _latency(label: str, fn: Callable[[], object], runs: int) -> None:
+    samples: list[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"  {label:<34} p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms  max={samples[-1]:8.2f}ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=50_000)
+    ap.add_argument("--words", type=int, default=400)
+    ap.add_argument("--runs", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    raw, vocab = _make_docs(args.docs, args.words, args.seed)
+    print(f"docs={len(raw)} words/doc={args.words}")
+
+    t0 = time.perf_counter()
+    built = [build_rfp_doc(d) if "rawText" in d else build_proposal_doc(d) for d in raw]
+    t_build = time.perf_counter() - t0
+
+    store = MemoryIndexStore(shard_count=32)
+    idx = SearchIndex(store, refresh_interval_s=3600)
+    t0 = time.perf_counter()
+    idx.replace_all([d for d in built if d is not None])
+    t_load = time.perf_counter() - t0
+    print(f"build docs: {t_build:.2f}s   load index: {t_load:.2f}s   indexed={len(idx.index)}")
+
+    docs0, _ = store.load_shard(0)
+    shard_bytes = len(S3IndexStore._encode({d.doc_id: d.to_dict() for d in docs0}))
+    print(f"S3 shard payload (gzip, 1 of 32): {shard_bytes / 1e6:.1f}MB")
+
+    common, mid, rare = vocab[0], vocab[200], vocab[15_000]
+    queries = {
+        f"common term ({common})": common,
+        f"mid term ({mid})": mid,
+        f"rare term ({rare})": rare,
+        "3 terms": f"{mid} {vocab[300]} {rare}",
+    }
+    print("BM25 index:")
+    for label, q in queries.items():
+        _latency(label, lambda q=q: idx.search(q, limit=20), args.runs)
+    _latency("3 terms, page 5", lambda: idx.search(queries["3 terms"], limit=20, offset=80), args.runs)
+
+    print("legacy substring scan (all docs):")
+
+    def _legacy(q: str) -> list[dict]:
+        ql = q.lower()
+        out = []
+        for r in raw:
+            hay = f"{r.get('title') or ''} {r.get('clientName') or ''} {r.get('projectType') or ''} {r.get('rawText') or ''}"
+            if ql in hay.lower():
+                out.append(r)
+        return out[:20]
+
+    _latency(f"mid term ({mid})", lambda: _legacy(mid), max(3, args.runs // 10))
+
+
+if __name__ == "__main__":
+    main()
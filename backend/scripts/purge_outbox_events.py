@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+"""
+Delete old finished outbox events with a parallel, rate-limited table scan.
+
+Resumable: progress is checkpointed per scan segment under --checkpoint (in the
+main table); re-running with the same name and --segments continues an
+interrupted run. Use --restart to discard the checkpoint and scan from scratch.
+
+Usage (from backend/):
+  python scripts/purge_outbox_events.py --older-than-days 30 --status done --status failed \
+      --segments 16 --max-rcu 200 --checkpoint purge-outbox
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.dynamodb.scan import ScanCheckpoint  # noqa: E402
+from app.db.dynamodb.table import get_main_table  # noqa: E402
+from app.repositories.outbox_repo import purge_events  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--older-than-days", type=float, default=30)
+    ap.add_argument("--status", action="append", help="event status to purge (repeatable; default: done)")
+    ap.add_argument("--segments", type=int, default=8, help="Scan TotalSegments")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-rcu", type=float, default=None, help="read capacity budget per second")
+    ap.add_argument("--checkpoint", default=None, help="checkpoint name (enables resume)")
+    ap.add_argument("--restart", action="store_true", help="clear the checkpoint first")
+    ap.add_argument("--dry-run", action="store_true", help="count only; never reads or writes the checkpoint")
+    args = ap.parse_args()
+
+    if args.restart and args.checkpoint and not args.dry_run:
+        n = ScanCheckpoint(get_main_table(), args.checkpoint).clear()
+        print(f"cleared {n} checkpoint segment(s)", flush=True)
+
+    res = purge_events(
+        older_than_days=args.older_than_days,
+        statuses=tuple(args.status or ["done"]),
+        total_segments=args.segments,
+        max_workers=args.workers,
+        max_rcu_per_s=args.max_rcu,
+        checkpoint_name=args.checkpoint,
+        dry_run=args.dry_run,
+    )
+    print(
+        f"{'would delete' if res['dryRun'] else 'deleted'}={res['deleted']} conflicts={res['conflicts']}"
+        f" scanned={res['scanned']} pages={res['pages']} rcu={res['consumedRcu']}"
+        f" resumed={res['resumedSegments']} skipped={res['skippedSegments']} elapsed={res['elapsedS']}s",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+"""
+Recompute the hourly/daily agent event rollups from raw events.
+
+Run once after deploying rollups to seed history (events written before rollups
+existed are otherwise missing from metrics). Only completed hours/days are
+rewritten, so re-running is safe.
+
+Usage (from backend/):
+  python scripts/rebuild_agent_event_rollups.py [--days 7]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.repositories.agent_events_repo import rebuild_rollups  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=7, help="how many days back to rebuild")
+    args = ap.parse_args()
+
+    since = datetime.now(timezone.utc) - timedelta(days=max(1, args.days))
+    t0 = time.perf_counter()
+    res = rebuild_rollups(since_iso=since.isoformat().replace("+00:00", "Z"))
+    print(
+        f"events={res['events']} hours={res['hours']} days={res['days']} elapsed={time.perf_counter() - t0:.1f}s",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
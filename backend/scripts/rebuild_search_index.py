@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+"""
+Rebuild the full-text search index from DynamoDB (all RFPs and proposals).
+
+Writes to the backend selected by SEARCH_INDEX_BACKEND (dynamodb by default, or s3);
+run it once per environment (processes do not backfill unless
+SEARCH_INDEX_BOOTSTRAP=true), or to repair drift.
+
+Usage (from backend/):
+  SEARCH_INDEX_BACKEND=dynamodb python scripts/rebuild_search_index.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.infrastructure.search.search_index import get_search_index, rebuild_index  # noqa: E402
+
+
+def main() -> None:
+    idx = get_search_index()
+    if idx is None:
+        print("SEARCH_INDEX_BACKEND=off; nothing to rebuild")
+        return
+    t0 = time.perf_counter()
+    n = rebuild_index(idx)
+    print(f"indexed {n} documents into {type(idx.store).__name__} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
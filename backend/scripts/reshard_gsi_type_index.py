@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+"""
+Rebalance a write-sharded GSI1 partition after changing DDB_GSI_SHARDS.
+
+Raising the shard count needs no migration (existing items stay readable in
+shard 0); run this to spread them over the new shards. After lowering the count,
+run it with --scan-shards set to the old count so items in retired shards move
+back into readable ones. Idempotent.
+
+Usage (from backend/):
+  DDB_GSI_SHARDS="TYPE#AGENT_EVENT=8" python scripts/reshard_gsi_type_index.py --base TYPE#AGENT_EVENT
+  python scripts/reshard_gsi_type_index.py --base TYPE#RFP --scan-shards 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.dynamodb.sharding import MAX_SHARDS, reshard, shard_count  # noqa: E402
+from app.db.dynamodb.table import get_main_table  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--base", action="append", required=True, help="base partition key, e.g. TYPE#AGENT_EVENT (repeatable)")
+    ap.add_argument("--scan-shards", type=int, default=MAX_SHARDS, help="highest shard count ever configured")
+    ap.add_argument("--page-size", type=int, default=200)
+    args = ap.parse_args()
+
+    t = get_main_table()
+    for base in args.base:
+        t0 = time.perf_counter()
+        res = reshard(t, base_pk=base, scan_shards=args.scan_shards, page_size=args.page_size)
+        print(
+            f"{base}: shards={shard_count(base)} scanned={res['scanned']} moved={res['moved']}"
+            f" skipped={res['skipped']} elapsed={time.perf_counter() - t0:.1f}s",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
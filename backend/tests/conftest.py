@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
@@ -11,3 +12,6 @@ sys.path.insert(0, str(BACKEND_DIR))
 
 
 
+
+# Process-local search index; the shared backends need AWS.
+os.environ.setdefault("SEARCH_INDEX_BACKEND", "memory")
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from app.db.dynamodb.table import DynamoTable
+from app.repositories import agent_events_repo
+from app.routers import agents as agents_router
+
+
+class FakeTable:
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.reads = 0
+        self._lock = threading.Lock()
+
+    def put_item(self, *, item, condition_expression=None, **_):
+        self.items[(item["pk"], item["sk"])] = dict(item)
+
+    def update_item(self, *, key, update_expression, expression_attribute_names, expression_attribute_values, **_):
+        set_part, add_part = update_expression.split(" ADD ")
+        with self._lock:
+            it = self.items.setdefault((key["pk"], key["sk"]), dict(key))
+            for n, v in re.findall(r"(#\w+) = (:\w+)", set_part):
+                it[expression_attribute_names[n]] = expression_attribute_values[v]
+            for n, v in re.findall(r"(#\w+) (:\w+)", add_part):
+                attr = expression_attribute_names[n]
+                it[attr] = it.get(attr, 0) + expression_attribute_values[v]
+
+    def batch_get_items(self, *, keys):
+        self.reads += len(keys)
+        return [dict(self.items[(k["pk"], k["sk"])]) for k in keys if (k["pk"], k["sk"]) in self.items]
+
+    def query_page_raw(self, *, key_condition_expression, limit=50, exclusive_start_key=None, **_):
+        vals = key_condition_expression.get_expression()["values"]
+        pk, (lo, hi) = vals[0].get_expression()["values"][1], vals[1].get_expression()["values"][1:]
+        rows = sorted(
+            (it for it in self.items.values() if it.get("gsi1pk") == pk and lo <= it["gsi1sk"] <= hi),
+            key=lambda it: it["gsi1sk"],
+        )
+        start = int((exclusive_start_key or {}).get("i") or 0)
+        chunk = rows[start : start + limit]
+        nxt = start + len(chunk)
+        return chunk, ({"i": nxt} if nxt < len(rows) else None)
+
+    query_iter = DynamoTable.query_iter
+
+
+@pytest.fixture()
+def table(monkeypatch):
+    t = FakeTable()
+    monkeypatch.setattr(agent_events_repo, "get_main_table", lambda: t)
+    return t
+
+
+def _completion(i: int, **payload):
+    return agent_events_repo.append_event(
+        rfp_id=f"rfp_{i % 3}",
+        type="agent_completion",
+        tool="analyze" if i % 2 else "draft",
+        payload=payload,
+    )
+
+
+def test_concurrent_appends_are_counted_exactly(table):
+    threads = [
+        threading.Thread(target=_completion, args=(i,), kwargs={"durationMs": 200 * i, "steps": 2, "success": i % 5 != 0})
+        for i in range(40)
+    ]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    agent_events_repo.append_event(rfp_id="r", type="tool_call", payload={"status": "error"})
+
+    counters = agent_events_repo.get_rollup_counters(start=datetime.now(timezone.utc) - timedelta(hours=1))
+    summary = agent_events_repo.summarize_rollup(counters, dim="agent_completion")
+    assert summary["count"] == 40
+    assert summary["succeeded"] == 32
+    assert summary["errors"] == 8
+    assert summary["statuses"] == {"succeeded": 32, "failed": 8}
+    assert summary["avgSteps"] == 2
+    assert summary["avgDurationMs"] == sum(200 * i for i in range(40)) // 40
+    assert sum(summary["durationHistogram"].values()) == 40
+    assert summary["durationHistogram"]["100"] == 1  # durationMs == 0
+    assert agent_events_repo.summarize_rollup(counters, dim="agent_completion|analyze")["count"] == 20
+    assert agent_events_repo.rollup_event_types(counters) == ["agent_completion", "tool_call"]
+    assert agent_events_repo.summarize_rollup(counters, dim="tool_call")["errors"] == 1
+
+
+def test_metrics_endpoint_reads_rollups_not_events(table, monkeypatch):
+    for i in range(1500):
+        _completion(i, durationMs=1000, steps=3, success=True)
+    monkeypatch.setattr(agents_router, "list_recent_events_global", lambda **_: pytest.fail("raw event scan"))
+
+    out = agents_router._get_metrics_impl(hours=168)
+    # Not capped by a page size any more.
+    assert out["metrics"]["count"] == 1500
+    assert out["metrics"]["success_rate"] == 1.0
+    assert out["metrics"]["avg_duration_ms"] == 1000
+    assert agents_router._get_metrics_impl(hours=24, operation_type="draft")["metrics"]["count"] == 750
+    assert table.reads <= 2 * 60
+
+
+def test_window_uses_day_buckets_for_whole_days():
+    start = datetime(2025, 3, 1, 22, 30, tzinfo=timezone.utc)
+    end = datetime(2025, 3, 4, 1, 5, tzinfo=timezone.utc)
+    pks = [k["pk"] for k in agent_events_repo._rollup_keys_for_window(start, end)]
+    assert pks == [
+        "AGENTMETRICS#HOUR#2025-03-01T22",
+        "AGENTMETRICS#HOUR#2025-03-01T23",
+        "AGENTMETRICS#DAY#2025-03-02",
+        "AGENTMETRICS#DAY#2025-03-03",
+        "AGENTMETRICS#HOUR#2025-03-04T00",
+        "AGENTMETRICS#HOUR#2025-03-04T01",
+    ]
+
+
+def test_rebuild_matches_live_rollups_for_completed_buckets(table):
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=2)
+    for i in range(30):
+        ts = (base + timedelta(minutes=97 * i)).isoformat().replace("+00:00", "Z")
+        ev = {
+            **agent_events_repo.event_key(rfp_id="r", event_id=f"e{i}", created_at=ts),
+            "gsi1pk": "TYPE#AGENT_EVENT",
+            "gsi1sk": f"{ts}#e{i}",
+            "createdAt": ts,
+            "type": "agent_completion",
+            "payload": {"durationMs": 10 * i, "success": i % 3 != 0},
+        }
+        table.put_item(item=ev)
+        agent_events_repo._add_to_rollups(ev)
+    live = {k: dict(v) for k, v in table.items.items() if k[0].startswith("AGENTMETRICS#")}
+
+    res = agent_events_repo.rebuild_rollups(since_iso=base.isoformat())
+    assert res["events"] == 30
+    for key, item in live.items():
+        rebuilt = table.items[key]
+        drop = ("updatedAt",)
+        assert {k: v for k, v in rebuilt.items() if k not in drop} == {k: v for k, v in item.items() if k not in drop}
+    # Re-running is idempotent.
+    agent_events_repo.rebuild_rollups(since_iso=base.isoformat())
+    assert table.items[next(iter(live))]["n#agent_completion"] == live[next(iter(live))]["n#agent_completion"]
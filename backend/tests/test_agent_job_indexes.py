@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from app.repositories import agent_jobs_repo
+from app.repositories.agent_jobs_repo import _due_index, job_key
+
+
+class _Page:
+    def __init__(self, items, next_token):
+        self.items = items
+        self.next_token = next_token
+
+
+class FakeTable:
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def put(self, it: dict[str, Any]) -> None:
+        self.items[(it["pk"], it["sk"])] = dict(it)
+
+    def tx_put(self, *, item, **_):
+        return {"Item": item}
+
+    def tx_delete(self, *, key, **_):
+        return {"Key": key}
+
+    def transact_write(self, *, puts=(), deletes=(), updates=()):
+        for p in puts:
+            self.put(p["Item"])
+        for d in deletes:
+            self.items.pop((d["Key"]["pk"], d["Key"]["sk"]), None)
+        return {"ok": True}
+
+    def batch_get_items(self, *, keys):
+        return [self.items[(k["pk"], k["sk"])] for k in keys if (k["pk"], k["sk"]) in self.items]
+
+    def query_page(self, *, key_condition_expression, index_name=None, limit=50, scan_index_forward=False, next_token=None, **_):
+        pk = key_condition_expression.get_expression()["values"][1]
+        rows = sorted(
+            (it for it in self.items.values() if it.get("gsi1pk") == pk),
+            key=lambda it: it["gsi1sk"],
+            reverse=not scan_index_forward,
+        )
+        start = int(next_token or 0)
+        chunk = rows[start : start + limit]
+        nxt = start + len(chunk)
+        return _Page(chunk, str(nxt) if nxt < len(rows) else None)
+
+
+def _job(i: int, *, job_type: str, status: str, rfp_id: str) -> dict[str, Any]:
+    ts = f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}Z"
+    jid = f"aj_{i:04d}"
+    return {
+        **job_key(job_id=jid),
+        "entityType": "AgentJob",
+        "jobId": jid,
+        "jobType": job_type,
+        "status": status,
+        "scope": {"rfpId": rfp_id, "extra": {"nested": True}},
+        "dueAt": ts,
+        "createdAt": ts,
+        "updatedAt": ts,
+        **_due_index(due_at=ts, job_id=jid),
+    }
+
+
+@pytest.fixture()
+def table(monkeypatch):
+    t = FakeTable()
+    monkeypatch.setattr(agent_jobs_repo, "get_main_table", lambda: t)
+    for i in range(300):
+        # One rare type, mostly completed jobs: the old over-fetch returned short pages here.
+        t.put(
+            _job(
+                i,
+                job_type="rare" if i % 37 == 0 else "common",
+                status="failed" if i % 10 == 0 else "completed",
+                rfp_id=f"rfp_{i % 4}",
+            )
+        )
+    assert agent_jobs_repo.backfill_indexes(page_size=50) == {"jobs": 300, "failed": 0, "nextToken": None}
+    return t
+
+
+def test_index_queries_return_exact_newest_first_slices(table):
+    rare = agent_jobs_repo.list_jobs_by_type(job_type="rare", limit=50)
+    assert [j["jobId"] for j in rare] == [f"aj_{i:04d}" for i in range(299, -1, -1) if i % 37 == 0]
+
+    failed_rare = agent_jobs_repo.list_jobs_by_type(job_type="rare", status="failed", limit=50)
+    assert {j["jobId"] for j in failed_rare} == {f"aj_{i:04d}" for i in range(300) if i % 370 == 0}
+
+    by_rfp = agent_jobs_repo.list_jobs_by_scope(scope={"rfpId": "rfp_1"}, status="FAILED", limit=100)
+    assert {j["jobId"] for j in by_rfp} == {f"aj_{i:04d}" for i in range(300) if i % 4 == 1 and i % 10 == 0}
+
+    recent = agent_jobs_repo.list_recent_jobs(limit=3)
+    assert [j["jobId"] for j in recent] == ["aj_0299", "aj_0298", "aj_0297"]
+    assert all("gsi1pk" not in j for j in recent)
+
+
+def test_cursor_pagination_covers_slice_once(table):
+    seen: list[str] = []
+    tok = None
+    while True:
+        page = agent_jobs_repo.list_recent_jobs_page(limit=7, status="failed", next_token=tok)
+        assert len(page["data"]) <= 7
+        seen.extend(j["jobId"] for j in page["data"])
+        tok = page["nextToken"]
+        if not tok:
+            break
+    assert seen == [f"aj_{i:04d}" for i in range(299, -1, -1) if i % 10 == 0]
+
+
+def test_status_and_scope_changes_move_index_entries(table):
+    before = dict(table.items[("AGENTJOB#aj_0001", "PROFILE")])
+    after = {**before, "status": "failed", "scope": {"proposalId": "p1"}, "updatedAt": "2026-01-01T00:00:00Z"}
+    table.put(after)
+    assert agent_jobs_repo._sync_indexes(after, previous=before)
+
+    assert "aj_0001" in {j["jobId"] for j in agent_jobs_repo.list_recent_jobs(status="failed", limit=100)}
+    assert table.items[("AGENTJOB#aj_0001", "IDX#STATUS")]["gsi1pk"] == "AGENTJOBS#S#failed"
+    assert [j["jobId"] for j in agent_jobs_repo.list_jobs_by_scope(scope={"proposalId": "p1"})] == ["aj_0001"]
+    assert ("AGENTJOB#aj_0001", "IDX#SCOPE#rfpId") not in table.items
+    assert "aj_0001" not in {j["jobId"] for j in agent_jobs_repo.list_jobs_by_scope(scope={"rfpId": "rfp_1"}, limit=100)}
+
+
+def test_known_scope_keys_are_always_indexed():
+    scope: dict[str, Any] = {f"a{i}": f"v{i}" for i in range(10)}
+    scope.update({"rfpId": "rfp_1", "proposalId": "p1", "flag": True, "nested": {"x": 1}})
+    pairs = agent_jobs_repo._scope_pairs(scope)
+    assert pairs[:2] == [("rfpId", "rfp_1"), ("proposalId", "p1")]
+    assert [k for k, _ in pairs[2:]] == ["a0", "a1", "a2", "a3"]  # extra scalar keys, capped
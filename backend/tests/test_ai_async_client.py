@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.ai import async_client
+from app.ai import client as ai_client
+from app.ai.async_client import ModelConcurrency, set_model_concurrency
+from app.ai.response_cache import set_ai_cache
+
+
+class _Titles(BaseModel):
+    titles: list[str]
+
+
+class _AsyncChat:
+    """AsyncOpenAI chat.completions stand-in tracking concurrency per model."""
+
+    def __init__(self, reply) -> None:
+        self.reply = reply
+        self.calls: list[str] = []
+        self.inflight: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+
+    async def create(self, *, model: str, **kw: Any):
+        self.calls.append(model)
+        self.inflight[model] = self.inflight.get(model, 0) + 1
+        self.peak[model] = max(self.peak.get(model, 0), self.inflight[model])
+        try:
+            await asyncio.sleep(0.01)
+            content = self.reply(model, kw)
+        finally:
+            self.inflight[model] -= 1
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+def _install(monkeypatch, chat: _AsyncChat, models: list[str]) -> None:
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client, "_models_to_try", lambda _purpose: models)
+    monkeypatch.setattr(async_client.asyncio, "sleep", _no_sleep(asyncio.sleep))
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=chat))
+    monkeypatch.setattr(async_client, "_aclient", lambda timeout_s=60: fake)
+    set_ai_cache(None)
+    monkeypatch.setattr(ai_client.settings, "ai_cache_backend", "off")
+
+
+def _no_sleep(real_sleep):
+    async def sleep(s: float) -> None:
+        # Keep the fake upstream's latency; skip retry backoff.
+        await real_sleep(s if s <= 0.01 else 0)
+
+    return sleep
+
+
+def test_fan_out_respects_per_model_limit(monkeypatch):
+    chat = _AsyncChat(lambda model, kw: f"summary from {model}")
+    _install(monkeypatch, chat, ["gpt-4o-mini"])
+    limiter = ModelConcurrency({"gpt-4o-mini": 3}, default=8)
+    set_model_concurrency(limiter)
+    try:
+
+        async def main():
+            return await asyncio.gather(
+                *[
+                    async_client.acall_text(purpose="text_edit", messages=[{"role": "user", "content": f"p{i}"}])
+                    for i in range(12)
+                ]
+            )
+
+        results = asyncio.run(main())
+        assert len(results) == 12 and all(out == "summary from gpt-4o-mini" for out, _ in results)
+        assert chat.peak["gpt-4o-mini"] == 3
+        meta = results[0][1]
+        assert meta.used_response_format == "chat_text" and meta.attempts == 1
+        assert (meta.input_tokens, meta.output_tokens, meta.total_tokens) == (10, 5, 15)
+        st = limiter.stats()["gpt-4o-mini"]
+        assert st["acquired"] == 12 and st["inflight"] == 0 and st["limit"] == 3
+    finally:
+        set_model_concurrency(None)
+
+
+def test_fallback_chain_and_verification_retry(monkeypatch):
+    def reply(model: str, kw: dict[str, Any]) -> str:
+        if model == "gpt-4.1":
+            raise RuntimeError("The model `gpt-4.1` does not exist or you do not have access to model gpt-4.1")
+        feedback = any("[RETRY_FEEDBACK" in m["content"] for m in kw["messages"])
+        if kw.get("response_format"):
+            return '{"titles": ["Approach", "Team", "Schedule"]}' if feedback else '{"titles": ["Only one"]}'
+        return "Plain text"
+
+    chat = _AsyncChat(reply)
+    _install(monkeypatch, chat, ["gpt-4.1", "gpt-4o-mini"])
+    set_model_concurrency(ModelConcurrency())
+
+    def at_least_three(p: _Titles) -> str | None:
+        return None if len(p.titles) >= 3 else "need 3 titles"
+
+    try:
+        parsed, meta = asyncio.run(
+            async_client.acall_json(
+                purpose="section_titles",
+                response_model=_Titles,
+                messages=[{"role": "user", "content": "titles"}],
+                validate_parsed=at_least_three,
+            )
+        )
+        assert parsed.titles == ["Approach", "Team", "Schedule"]
+        assert meta.model == "gpt-4o-mini" and meta.attempts == 2 and meta.used_response_format == "chat_json_schema"
+        assert chat.calls[0] == "gpt-4.1"  # access error: straight to the next model
+
+        # Exhausted retries return the caller's fallback, marked as such.
+        out, fb = asyncio.run(
+            async_client.acall_json(
+                purpose="section_titles",
+                response_model=_Titles,
+                messages=[{"role": "user", "content": "titles"}],
+                validate_parsed=lambda p: "never good enough",
+                retries=1,
+                fallback=lambda: _Titles(titles=["Fallback"]),
+            )
+        )
+        assert out.titles == ["Fallback"] and fb.used_response_format is None
+    finally:
+        set_model_concurrency(None)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.ai import client as ai_client
+from app.ai.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, set_circuit_breakers
+from app.ai.concurrency import set_ai_limiter
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def test_breaker_opens_then_admits_a_single_probe():
+    now = {"t": 0.0}
+    b = CircuitBreaker("gpt-x|chat", failure_threshold=3, open_s=10, probe_timeout_s=30, clock=lambda: now["t"])
+
+    b.record_failure(BadRequest("bad"))  # the upstream answered: not a failure
+    for _ in range(3):
+        assert b.allow()
+        b.record_failure(Unavailable("503"))
+    assert b.state == "open" and b.is_open() and not b.allow()
+
+    # After open_s exactly one concurrent caller gets through.
+    now["t"] = 10.0
+    assert not b.is_open()
+    admitted: list[bool] = []
+    barrier = threading.Barrier(8)
+
+    def try_once() -> None:
+        barrier.wait()
+        admitted.append(b.allow())
+
+    threads = [threading.Thread(target=try_once) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert admitted.count(True) == 1 and b.state == "half_open" and b.is_open()
+
+    # A failed probe re-opens; a stale success from before doesn't close it.
+    b.record_failure(Unavailable("still down"))
+    assert b.state == "open"
+    b.record_success()
+    assert b.state == "open"
+
+    # A probe that never reports back is replaced after probe_timeout_s.
+    now["t"] = 20.0
+    assert b.allow() and not b.allow()
+    now["t"] = 50.0
+    assert b.allow()
+    b.record_success()
+    assert b.state == "closed" and b.allow()
+
+    s = b.stats()
+    assert s["opens"] == 2 and s["probes"] == 3 and s["transitions"] == 5 and s["rejected"] >= 8
+
+
+def test_open_primary_routes_straight_to_fallback(monkeypatch):
+    now = {"t": 0.0}
+    registry = CircuitBreakerRegistry(failure_threshold=3, open_s=15, clock=lambda: now["t"])
+    set_circuit_breakers(registry)
+    set_ai_limiter(None)
+    monkeypatch.setattr(ai_client.settings, "ai_adaptive_concurrency", False)
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client, "_model_chain", lambda _purpose: ["gpt-4.1", "gpt-4o-mini"])
+    monkeypatch.setattr(ai_client.time, "sleep", lambda _s: None)
+
+    calls: list[str] = []
+    down = {"gpt-4.1": True}
+
+    class _Chat:
+        def create(self, *, model: str, **_kw: Any):
+            calls.append(model)
+            if down.get(model):
+                raise Unavailable("Error code: 503 - upstream overloaded")
+            msg = SimpleNamespace(content=f"from {model}")
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)], usage=None)
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=_Chat()))
+    monkeypatch.setattr(ai_client, "_client", lambda timeout_s=60: fake)
+    msgs = [{"role": "user", "content": "hi"}]
+    try:
+        # Retries on the degraded primary trip its breaker, then the fallback answers.
+        out, meta = ai_client.call_text(purpose="text_edit", messages=msgs, retries=2)
+        assert out == "from gpt-4o-mini" and calls == ["gpt-4.1"] * 3 + ["gpt-4o-mini"]
+        assert registry.stats()["open"] == ["gpt-4.1|chat"]
+
+        # While open, callers skip the primary entirely.
+        calls.clear()
+        for _ in range(3):
+            assert ai_client.call_text(purpose="text_edit", messages=msgs)[0] == "from gpt-4o-mini"
+        assert calls == ["gpt-4o-mini"] * 3
+
+        # After open_s one probe goes to the recovered primary and closes the breaker.
+        now["t"] = 16.0
+        down["gpt-4.1"] = False
+        calls.clear()
+        assert ai_client.call_text(purpose="text_edit", messages=msgs)[0] == "from gpt-4.1"
+        assert calls == ["gpt-4.1"] and registry.stats()["open"] == []
+
+        # Every model open: fail fast with the 503-style error.
+        for m in ("gpt-4.1", "gpt-4o-mini"):
+            for _ in range(3):
+                registry.get(m, "chat").record_failure(Unavailable("503"))
+        calls.clear()
+        with pytest.raises(ai_client.AiCircuitOpen, match="ai_temporarily_unavailable"):
+            ai_client.call_text(purpose="text_edit", messages=msgs)
+        assert calls == []
+    finally:
+        set_circuit_breakers(None)
+        set_ai_limiter(None)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.ai import client as ai_client
+from app.ai.concurrency import THROTTLED, TIMEOUT, AdaptiveConcurrencyLimiter, classify_outcome, set_ai_limiter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class StubUpstream:
+    """Accepts `capacity` concurrent requests of `service_s` each (a fixed request rate); 429s beyond that."""
+
+    def __init__(self, capacity: int, service_s: float = 0.003) -> None:
+        self.capacity = capacity
+        self.service_s = service_s
+        self.inflight = 0
+        self.ok = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def call(self) -> str:
+        with self._lock:
+            self.inflight += 1
+            over = self.inflight > self.capacity
+        try:
+            if over:
+                with self._lock:
+                    self.rejected += 1
+                raise RateLimited("Error code: 429 - rate limit reached")
+            time.sleep(self.service_s)
+            with self._lock:
+                self.ok += 1
+            return "ok"
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+
+def _drive(upstream: StubUpstream, limiter: AdaptiveConcurrencyLimiter | None, *, workers: int, calls: int) -> None:
+    def worker() -> None:
+        for _ in range(calls):
+            try:
+                if limiter is None:
+                    upstream.call()
+                else:
+                    with limiter.slot():
+                        upstream.call()
+            except RateLimited:
+                time.sleep(0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_limiter_converges_below_upstream_capacity():
+    baseline = StubUpstream(capacity=4)
+    _drive(baseline, None, workers=16, calls=25)
+
+    limiter = AdaptiveConcurrencyLimiter(max_limit=16, increase_per_s=20, cooldown_s=0.02, queue_timeout_s=10)
+    limited = StubUpstream(capacity=4)
+    _drive(limited, limiter, workers=16, calls=25)
+
+    s = limiter.stats()
+    assert s["requests"] == 16 * 25 and s["inflight"] == 0 and s["waiting"] == 0
+    assert s["decreases"] >= 1 and s["throttles"] == limited.rejected
+    assert s["limit"] <= 8 and s["delayed"] > 0
+    # Far fewer requests bounce off the upstream once the limit has adapted.
+    assert limited.rejected < baseline.rejected / 2
+
+
+def test_burst_cuts_once_and_success_grows_back():
+    now = {"t": 0.0}
+    lim = AdaptiveConcurrencyLimiter(max_limit=20, increase_per_s=1.0, cooldown_s=1.0, clock=lambda: now["t"])
+    for _ in range(10):
+        lim.acquire()
+    for _ in range(10):
+        lim.release(THROTTLED)
+    s = lim.stats()
+    assert s["decreases"] == 1 and s["throttles"] == 10 and s["limit"] == 5  # half of 10 in flight
+
+    now["t"] = 5.0
+    for _ in range(4):
+        lim.acquire()
+    lim.release(TIMEOUT)
+    assert lim.stats()["limit"] == 2 and lim.stats()["timeouts"] == 1
+    for _ in range(3):
+        lim.release()
+    assert lim.stats()["limit"] == 2  # no time has passed: no growth yet
+
+    # +1 per second of successful traffic (gaps count at most one second).
+    for _ in range(5):
+        now["t"] += 1.0
+        lim.acquire()
+        lim.release()
+    assert lim.stats()["limit"] == 7
+
+
+def test_queue_deadline_raises_and_is_not_retried(monkeypatch):
+    lim = AdaptiveConcurrencyLimiter(max_limit=1, queue_timeout_s=0.05)
+    lim.acquire()
+    with pytest.raises(ai_client.AiQueueTimeout):
+        lim.acquire()
+    assert lim.stats()["queueTimeouts"] == 1 and lim.stats()["waiting"] == 0
+
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client, "_models_to_try", lambda _purpose: ["gpt-4o-mini"])
+    monkeypatch.setattr(ai_client.time, "sleep", lambda _s: None)
+    calls: list[str] = []
+
+    class _Chat:
+        def create(self, *, model: str, **_kw: Any):
+            calls.append(model)
+            if len(calls) == 1:
+                raise RateLimited("Error code: 429 - rate limit reached")
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="fine"))], usage=None)
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=_Chat()))
+    monkeypatch.setattr(ai_client, "_client", lambda timeout_s=60: fake)
+    try:
+        # Saturated: the call fails fast with a 503-style error and never reaches upstream.
+        set_ai_limiter(lim)
+        with pytest.raises(ai_client.AiQueueTimeout, match="ai_temporarily_unavailable"):
+            ai_client.call_text(purpose="text_edit", messages=[{"role": "user", "content": "hi"}], retries=2)
+        assert calls == []
+
+        # A 429 is retried as before and cuts the limit.
+        fresh = AdaptiveConcurrencyLimiter(max_limit=8)
+        set_ai_limiter(fresh)
+        out, _meta = ai_client.call_text(purpose="text_edit", messages=[{"role": "user", "content": "hi"}], retries=2)
+        assert out == "fine" and len(calls) == 2
+        s = fresh.stats()
+        assert s["throttles"] == 1 and s["decreases"] == 1 and s["successes"] == 1 and s["inflight"] == 0
+    finally:
+        set_ai_limiter(None)
+
+
+def test_outcome_classification():
+    assert classify_outcome(None) == "ok"
+    assert classify_outcome(RateLimited("x")) == "throttled"
+    assert classify_outcome(ai_client.AiUpstreamError("responses_api_http_error 429: slow down")) == "throttled"
+    assert classify_outcome(TimeoutError("read timed out")) == "timeout"
+    assert classify_outcome(ai_client.AiParseError("validation_failed")) == "ok"
+    assert classify_outcome(RuntimeError("boom")) == "error"
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.ai import async_client
+from app.ai import client as ai_client
+from app.ai.async_client import ModelConcurrency, set_model_concurrency
+from app.ai.hedging import Hedger, run_hedged, set_hedger
+from app.ai.response_cache import set_ai_cache
+
+
+class _SlowPrimaryChat:
+    """AsyncOpenAI chat stand-in: `slow_model` takes `slow_s`, everything else answers quickly."""
+
+    def __init__(self, slow_model: str, slow_s: float) -> None:
+        self.slow_model = slow_model
+        self.slow_s = slow_s
+        self.calls: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def create(self, *, model: str, **_kw: Any):
+        self.calls.append(model)
+        try:
+            await asyncio.sleep(self.slow_s if model == self.slow_model else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        msg = SimpleNamespace(content=f"edited by {model}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)], usage=None)
+
+
+def test_run_hedged_first_success_wins_and_loser_is_cancelled():
+    state: dict[str, Any] = {"hedges": 0, "primary_cancelled": False}
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["primary_cancelled"] = True
+            raise
+        return "primary"
+
+    async def fast():
+        state["hedges"] += 1
+        return "hedge"
+
+    async def fail():
+        raise RuntimeError("primary failed")
+
+    async def main():
+        assert await run_hedged(slow, fast, delay_s=0.01, allow_hedge=lambda: True) == ("hedge", True)
+        await asyncio.sleep(0)
+        assert state["primary_cancelled"]
+        # Fast primary: the hedge is never sent.
+        assert await run_hedged(lambda: asyncio.sleep(0, "quick"), fast, delay_s=1, allow_hedge=lambda: True) == (
+            "quick",
+            False,
+        )
+        # Over budget: no hedge, wait for the primary.
+        assert await run_hedged(lambda: asyncio.sleep(0.05, "p"), fast, delay_s=0.01, allow_hedge=lambda: False) == (
+            "p",
+            False,
+        )
+        # Both fail: the primary's error surfaces.
+        with pytest.raises(RuntimeError, match="primary failed"):
+            await run_hedged(fail, fail, delay_s=0, allow_hedge=lambda: True)
+
+    asyncio.run(main())
+    assert state["hedges"] == 1
+
+
+def test_hedge_budget_caps_extra_requests():
+    h = Hedger(purposes={"text_edit"}, max_fraction=0.25, min_samples=1)
+    assert h.enabled_for("text_edit") and not h.enabled_for("rfp_analysis")
+    hedged = 0
+    for _ in range(40):
+        h.admit("text_edit")
+        hedged += h.try_spend("text_edit")  # worst case: every call is slow
+    assert hedged == 10
+    st = h.stats()["byPurpose"]["text_edit"]
+    assert st["calls"] == 40 and st["hedged"] == 10 and st["skippedBudget"] == 30
+
+    # No hedge delay until there are enough samples; then p95 (floored at min_delay_s).
+    h = Hedger(purposes={"text_edit"}, min_samples=20, min_delay_s=0.5)
+    for i in range(19):
+        h.record_latency("text_edit", 0.1 * (i + 1))
+    assert h.delay_for("text_edit") is None
+    h.record_latency("text_edit", 2.0)
+    assert h.delay_for("text_edit") == 2.0
+
+
+def test_slow_primary_is_hedged_to_fallback_model(monkeypatch):
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client.settings, "ai_cache_backend", "off")
+    monkeypatch.setattr(ai_client, "_models_to_try", lambda _purpose: ["gpt-4.1", "gpt-4o-mini"])
+    chat = _SlowPrimaryChat("gpt-4.1", slow_s=5)
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=chat))
+    monkeypatch.setattr(async_client, "_aclient", lambda timeout_s=60: fake)
+    set_ai_cache(None)
+    set_model_concurrency(ModelConcurrency())
+    hedger = Hedger(purposes={"text_edit"}, max_fraction=1.0, min_delay_s=0.02, min_samples=3)
+    for _ in range(3):
+        hedger.record_latency("text_edit", 0.02)
+    set_hedger(hedger)
+    try:
+        msgs = [{"role": "user", "content": "tighten this"}]
+        out, meta = asyncio.run(async_client.acall_text(purpose="text_edit", messages=msgs))
+        assert out == "edited by gpt-4o-mini" and meta.hedged and meta.model == "gpt-4o-mini"
+        assert chat.calls == ["gpt-4.1", "gpt-4o-mini"] and chat.cancelled == ["gpt-4.1"]
+        st = hedger.stats()["byPurpose"]["text_edit"]
+        assert st["hedged"] == 1 and st["hedgeWins"] == 1
+        # The call is sampled once, from the caller's side, and no faster than the hedge delay.
+        assert st["samples"] == 4 and st["p95Ms"] >= 20
+
+        # Purposes without hedging just wait.
+        chat.slow_s = 0.05
+        out, meta = asyncio.run(async_client.acall_text(purpose="rfp_analysis", messages=msgs))
+        assert out == "edited by gpt-4.1" and not meta.hedged
+    finally:
+        set_hedger(None)
+        set_model_concurrency(None)
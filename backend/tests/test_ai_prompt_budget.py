@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import re
+from types import SimpleNamespace
+from typing import Any
+
+from app.ai import client as ai_client
+from app.ai import tokens
+from app.ai.context import clip_text_to_tokens
+from app.ai.response_cache import set_ai_cache
+
+
+class _WordEncoding:
+    """tiktoken stand-in: one token per word (with its trailing whitespace)."""
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._words: list[str] = []
+
+    def encode_ordinary(self, text: str) -> list[int]:
+        out = []
+        for w in re.findall(r"\S+\s*|\s+", text):
+            if w not in self._ids:
+                self._ids[w] = len(self._words)
+                self._words.append(w)
+            out.append(self._ids[w])
+        return out
+
+    def decode(self, toks: list[int]) -> str:
+        return "".join(self._words[t] for t in toks)
+
+
+def _doc(n: int) -> str:
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_fit_messages_cuts_the_document_to_the_model_budget(monkeypatch):
+    enc = _WordEncoding()
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: enc)
+    monkeypatch.setattr(tokens, "_SAFETY_TOKENS", 0)
+    monkeypatch.setattr(ai_client.settings, "ai_context_windows", "tiny-model=1000,default=50000")
+    assert tokens.context_window("tiny-model") == 1000
+    assert tokens.context_window("gpt-4o-mini") == 128_000  # built-in table
+    assert tokens.context_window("unknown-model") == 50_000
+
+    msgs = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "RFP_TEXT:\n" + _doc(2000)}]
+    small = [{"role": "user", "content": "short prompt"}]
+    same, fit = tokens.fit_messages(small, model="tiny-model", max_output_tokens=200)
+    assert same == small and fit.truncated_tokens == 0 and fit.prompt_tokens == 2 + 4 + 3 and fit.exact
+
+    out, fit = tokens.fit_messages(msgs, model="tiny-model", max_output_tokens=200)
+    assert fit.budget == 800 and fit.prompt_tokens == 800
+    assert out[0] == msgs[0]  # only the longest message is cut, from the tail
+    assert out[1]["content"].startswith("RFP_TEXT:\nw0 w1")
+    assert len(enc.encode_ordinary(out[1]["content"])) == 800 - 2 - 11
+    assert fit.truncated_tokens == tokens.count_message_tokens(msgs, model="tiny-model") - 800
+
+    # Without an encoding the count is a conservative chars/3 estimate.
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)
+    assert tokens.count_tokens("x" * 30, model="tiny-model") == 10
+    _, fit = tokens.fit_messages(msgs, model="tiny-model", max_output_tokens=200)
+    assert not fit.exact and fit.prompt_tokens <= 800
+
+
+def test_call_text_sends_a_fitted_prompt_and_records_it(monkeypatch):
+    enc = _WordEncoding()
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: enc)
+    monkeypatch.setattr(ai_client.settings, "ai_context_windows", "gpt-4o-mini=6000")
+    monkeypatch.setattr(ai_client.settings, "ai_cache_backend", "off")
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client, "_models_to_try", lambda _purpose: ["gpt-4o-mini"])
+    set_ai_cache(None)
+    sent: list[list[dict[str, Any]]] = []
+
+    class _Chat:
+        def create(self, *, messages: list[dict[str, Any]], **_kw: Any):
+            sent.append(messages)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=_Chat()))
+    monkeypatch.setattr(ai_client, "_client", lambda timeout_s=60: fake)
+    msgs = [{"role": "user", "content": _doc(20_000)}]
+    out, meta = ai_client.call_text(purpose="text_edit", messages=msgs, max_tokens=400)
+    # 6000 window - 600 (1.5x output reserve for retries) - 1024 safety.
+    assert out == "ok" and meta.prompt_tokens == 6000 - 600 - 1024
+    assert meta.prompt_truncated_tokens == (20_000 + 4 + 3) - meta.prompt_tokens
+    assert len(enc.encode_ordinary(sent[0][0]["content"])) == meta.prompt_tokens - 7
+
+    # Prompt builders clip by the purpose model's tokens, not characters.
+    monkeypatch.setattr(ai_client.settings, "openai_model_rfp_analysis", "gpt-4o-mini")
+    clipped = clip_text_to_tokens(_doc(20_000), purpose="rfp_analysis", max_output_tokens=1000, reserve_tokens=500)
+    assert len(enc.encode_ordinary(clipped)) == 6000 - 1000 - 1024 - 500
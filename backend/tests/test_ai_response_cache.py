@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from app.ai import client as ai_client
+from app.ai.response_cache import AiResponseCache, set_ai_cache
+
+
+class _Titles(BaseModel):
+    titles: list[str]
+
+
+class _FakeChat:
+    def __init__(self, content: str) -> None:
+        self.content = content
+        self.calls = 0
+
+    def create(self, **_kw: Any):
+        self.calls += 1
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20, total_tokens=120)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))], usage=usage)
+
+
+class _FakeTable:
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def get_item(self, *, key: dict[str, Any], **_: Any) -> dict[str, Any] | None:
+        return self.items.get((key["pk"], key["sk"]))
+
+    def put_item(self, *, item: dict[str, Any], **_: Any) -> None:
+        self.items[(item["pk"], item["sk"])] = dict(item)
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client.settings, "ai_cache_ttls", "section_titles=60,rfp_section_summary=60")
+    monkeypatch.setattr(ai_client, "_models_to_try", lambda _purpose: ["gpt-4o-mini"])
+    monkeypatch.setattr(ai_client.time, "sleep", lambda _s: None)
+
+    def install(content: str) -> _FakeChat:
+        chat = _FakeChat(content)
+        fake = SimpleNamespace(chat=SimpleNamespace(completions=chat))
+        monkeypatch.setattr(ai_client, "_client", lambda timeout_s=60: fake)
+        return chat
+
+    yield install
+    set_ai_cache(None)
+
+
+def test_identical_text_calls_hit_the_cache(fake_ai):
+    cache = AiResponseCache(max_items=8)
+    set_ai_cache(cache)
+    chat = fake_ai("A short summary.")
+    msgs = [{"role": "user", "content": "summarize"}]
+
+    out1, meta1 = ai_client.call_text(purpose="rfp_section_summary", messages=msgs, cache=True)
+    out2, meta2 = ai_client.call_text(purpose="rfp_section_summary", messages=msgs, cache=True)
+    assert out1 == out2 == "A short summary."
+    assert chat.calls == 1
+    assert not meta1.cached and meta2.cached and meta2.model == "gpt-4o-mini"
+
+    # Different sampling params, no opt-in, or an unconfigured purpose all go upstream.
+    ai_client.call_text(purpose="rfp_section_summary", messages=msgs, temperature=0.9, cache=True)
+    ai_client.call_text(purpose="rfp_section_summary", messages=msgs)
+    ai_client.call_text(purpose="text_edit", messages=msgs, cache=True)
+    assert chat.calls == 4
+
+    # A cached value that fails this caller's validator is treated as a miss.
+    with pytest.raises(ai_client.AiError):
+        ai_client.call_text(
+            purpose="rfp_section_summary",
+            messages=msgs,
+            validate=lambda t: "too short" if len(t) < 50 else None,
+            retries=0,
+            cache=True,
+        )
+
+    s = cache.stats()["byPurpose"]["rfp_section_summary"]
+    assert s["hits"] == 1 and s["memoryHits"] == 1 and s["rejected"] == 1
+    assert s["savedInputTokens"] == 100 and s["savedOutputTokens"] == 20
+
+
+def test_json_cache_uses_shared_table_tier_and_skips_fallbacks(fake_ai):
+    table = _FakeTable()
+    chat = fake_ai('{"titles": ["Approach", "Team", "Schedule"]}')
+    msgs = [{"role": "user", "content": "titles please"}]
+
+    set_ai_cache(AiResponseCache(table=lambda: table))
+    parsed, meta = ai_client.call_json(purpose="section_titles", response_model=_Titles, messages=msgs, cache=True)
+    assert parsed.titles == ["Approach", "Team", "Schedule"] and not meta.cached
+    (item,) = table.items.values()
+    assert item["pk"].startswith("AICACHE#") and item["expiresAt"] > 0
+
+    # A fresh process (empty memory tier) is served from the table.
+    other = AiResponseCache(table=lambda: table)
+    set_ai_cache(other)
+    parsed2, meta2 = ai_client.call_json(purpose="section_titles", response_model=_Titles, messages=msgs, cache=True)
+    assert parsed2 == parsed and meta2.cached and chat.calls == 1
+    assert other.stats()["byPurpose"]["section_titles"]["ddbHits"] == 1
+
+    # Fallback results are returned but never stored.
+    table.items.clear()
+    set_ai_cache(AiResponseCache(table=lambda: table))
+    chat.content = "not json"
+    out, fb_meta = ai_client.call_json(
+        purpose="section_titles",
+        response_model=_Titles,
+        messages=[{"role": "user", "content": "other prompt"}],
+        retries=1,
+        allow_json_extract=False,
+        fallback=lambda: _Titles(titles=["Fallback"]),
+        cache=True,
+    )
+    assert out.titles == ["Fallback"] and fb_meta.used_response_format is None
+    assert table.items == {}
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from app.ai import client as ai_client
+from app.ai.response_cache import set_ai_cache
+from app.ai.single_flight import SingleFlight, set_single_flight
+from app.db.dynamodb.errors import DdbConflict
+
+
+class _GatedChat:
+    """Chat completions stand-in that blocks until released."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def create(self, **_kw: Any):
+        with self._lock:
+            self.calls += 1
+        assert self.release.wait(5)
+        msg = SimpleNamespace(content="Shared summary.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)], usage=None)
+
+
+def _wait_for(cond, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_concurrent_identical_calls_share_one_upstream_request(monkeypatch):
+    ai_client.settings.openai_api_key = "test"
+    monkeypatch.setattr(ai_client.settings, "ai_cache_backend", "off")
+    monkeypatch.setattr(ai_client, "_models_to_try", lambda _purpose: ["gpt-4o-mini"])
+    monkeypatch.setattr(ai_client.time, "sleep", lambda _s: None)
+    chat = _GatedChat()
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=chat))
+    monkeypatch.setattr(ai_client, "_client", lambda timeout_s=60: fake)
+    set_ai_cache(None)
+    flights = SingleFlight()
+    set_single_flight(flights)
+    try:
+        msgs = [{"role": "user", "content": "summarize section 3"}]
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futs = [
+                pool.submit(ai_client.call_text, purpose="rfp_section_summary", messages=msgs, cache=True)
+                for _ in range(5)
+            ]
+            _wait_for(lambda: sum(f.followers for f in flights._inflight.values()) == 4)
+            chat.release.set()
+            results = [f.result(timeout=5) for f in futs]
+
+        assert chat.calls == 1
+        assert {out for out, _ in results} == {"Shared summary."}
+        assert sorted(meta.coalesced for _, meta in results) == [False] + [True] * 4
+        st = flights.stats()
+        assert st["leaders"] == 1 and st["coalesced"] == 4 and st["inflight"] == 0
+
+        # Without opt-in every caller goes upstream.
+        ai_client.call_text(purpose="rfp_section_summary", messages=msgs)
+        assert chat.calls == 2
+    finally:
+        set_single_flight(None)
+        set_ai_cache(None)
+
+
+def test_leader_errors_propagate_and_parse_failures_rerun():
+    flights = SingleFlight()
+    started = threading.Event()
+    gate = threading.Event()
+
+    def failing():
+        started.set()
+        assert gate.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "k", failing)
+        assert started.wait(5)
+        follower = pool.submit(flights.do, "k", lambda: "unused")
+        _wait_for(lambda: flights._inflight["k"].followers == 1)
+        gate.set()
+        with pytest.raises(RuntimeError):
+            leader.result(timeout=5)
+        with pytest.raises(RuntimeError):
+            follower.result(timeout=5)
+
+    # A leader result the follower rejects makes the follower call for itself.
+    started.clear()
+    gate.clear()
+
+    def slow():
+        started.set()
+        assert gate.wait(5)
+        return "short"
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "k2", slow)
+        assert started.wait(5)
+        follower = pool.submit(flights.do, "k2", lambda: "a longer answer", accept=lambda r: len(r) > 5)
+        _wait_for(lambda: flights._inflight["k2"].followers == 1)
+        gate.set()
+        assert leader.result(timeout=5) == ("short", False)
+        assert follower.result(timeout=5) == ("a longer answer", False)
+    assert flights.stats()["followerReruns"] == 1
+
+
+class _LeaseTable:
+    def __init__(self, clock) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.clock = clock
+
+    def put_item(self, *, item: dict[str, Any], expression_attribute_values: dict[str, Any], **_: Any) -> None:
+        cur = self.items.get((item["pk"], item["sk"]))
+        if cur is not None and cur["leaseUntil"] >= expression_attribute_values[":now"]:
+            raise DdbConflict(message="conditional check failed")
+        self.items[(item["pk"], item["sk"])] = dict(item)
+
+    def delete_item(self, *, key: dict[str, Any], expression_attribute_values: dict[str, Any], **_: Any) -> None:
+        cur = self.items.get((key["pk"], key["sk"]))
+        if cur is None or cur["leaseOwner"] != expression_attribute_values[":o"]:
+            raise DdbConflict(message="conditional check failed")
+        del self.items[(key["pk"], key["sk"])]
+
+
+def test_lease_mode_waits_for_the_other_process_result():
+    now = {"t": 1000.0}
+    table = _LeaseTable(lambda: now["t"])
+    published: dict[str, str] = {}
+
+    def sleep(s: float) -> None:
+        now["t"] += s
+        if now["t"] >= 1002:
+            published["k"] = "from process A"
+
+    proc_a = SingleFlight(lease_table=lambda: table, lease_s=30, clock=lambda: now["t"], sleep=sleep)
+    proc_b = SingleFlight(lease_table=lambda: table, lease_s=30, poll_s=0.5, clock=lambda: now["t"], sleep=sleep)
+
+    # Process A holds the lease (mid-call); B polls the shared cache instead of calling upstream.
+    assert proc_a._acquire("k")
+    calls: list[str] = []
+    out = proc_b.do("k", lambda: calls.append("b") or "from process B", peek=lambda: published.get("k"))
+    assert out == ("from process A", True) and calls == []
+    assert proc_b.stats()["remoteCoalesced"] == 1
+
+    # Once A releases (or its lease expires) another process may lead.
+    proc_a._release("k")
+    assert table.items == {}
+    published.clear()
+    assert proc_b.do("k2", lambda: "fresh", peek=lambda: None) == ("fresh", False)
+    assert table.items == {}  # lease released after the call
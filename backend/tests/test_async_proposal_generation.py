@@ -1,10 +1,25 @@
 from __future__ import annotations
 
-import anyio
-from starlette.background import BackgroundTasks
+import pytest
 
 
-def test_async_generate_sets_status_and_updates_sections(monkeypatch):
+@pytest.fixture()
+def job_engine(monkeypatch):
+    from app.settings import settings
+    from app.workers.job_engine import JobEngine, LocalJobBackend, set_job_engine
+    from app.workers.job_handlers import job_types
+
+    engine = JobEngine(LocalJobBackend())
+    for jt in job_types():
+        engine.register(jt)
+    # Enqueue only; the test drives execution synchronously with run_once().
+    monkeypatch.setattr(settings, "job_engine_embedded", False)
+    set_job_engine(engine)
+    yield engine
+    set_job_engine(None)
+
+
+def test_async_generate_sets_status_and_updates_sections(monkeypatch, job_engine):
     # Import inside test so monkeypatching module attributes is straightforward.
     from app.routers import proposals as proposals_router
 
@@ -85,7 +100,6 @@ def test_async_generate_sets_status_and_updates_sections(monkeypatch):
         ],
     )
 
-    bg = BackgroundTasks()
     body = {
         "rfpId": "rfp_1",
         "templateId": "ai-template",
@@ -95,17 +109,14 @@ def test_async_generate_sets_status_and_updates_sections(monkeypatch):
         "async": True,
     }
 
-    proposal = proposals_router.generate(body, bg)
+    proposal = proposals_router.generate(body)
     assert proposal["generationStatus"] == "queued"
     assert "Title" in proposal["sections"]
     assert "(Generating" in str(proposal["sections"]["Title"]["content"])
 
-    async def _run_bg():
-        for t in bg.tasks:
-            await t()
-
-    # Execute queued background tasks.
-    anyio.run(_run_bg)
+    # Execute the queued generation job.
+    assert job_engine.run_once() == 1
+    assert job_engine.get("proposal_generate:proposal_test_1")["status"] == "succeeded"
 
     assert updates, "Expected update_proposal to be called during async generation"
     assert updates[0]["generationStatus"] == "running"
@@ -118,7 +129,7 @@ def test_async_generate_sets_status_and_updates_sections(monkeypatch):
     assert "Example Org" in str(final_sections["References"]["content"])
 
 
-def test_async_generate_sets_error_on_failure(monkeypatch):
+def test_async_generate_sets_error_on_failure(monkeypatch, job_engine):
     from app.routers import proposals as proposals_router
 
     updates: list[dict] = []
@@ -158,16 +169,11 @@ def test_async_generate_sets_error_on_failure(monkeypatch):
         lambda limit=1: [{"companyId": "c1", "name": "Acme", "coreCapabilities": []}],
     )
 
-    bg = BackgroundTasks()
     body = {"rfpId": "rfp_1", "templateId": "ai-template", "title": "T", "async": True}
-    proposal = proposals_router.generate(body, bg)
+    proposal = proposals_router.generate(body)
     assert proposal["generationStatus"] == "queued"
 
-    async def _run_bg():
-        for t in bg.tasks:
-            await t()
-
-    anyio.run(_run_bg)
+    job_engine.run_once()
 
     assert updates, "Expected updates even on failure"
     assert updates[-1]["generationStatus"] == "error"
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from app.db.dynamodb import codec
+from app.db.dynamodb.table import DynamoTable
+
+
+def test_codec_matches_boto3_but_returns_native_numbers():
+    item = {
+        "pk": "P#1",
+        "n": 42,
+        "big": 2**70,
+        "ratio": Decimal("0.125"),
+        "ok": True,
+        "none": None,
+        "nested": {"list": [1, "a", {"x": Decimal("-3.5")}], "empty": {}},
+        "tags": {"a", "b"},
+        "nums": {1, 2},
+        "blob": b"\x00\x01",
+    }
+    boto_wire = {k: TypeSerializer().serialize(v) for k, v in item.items()}
+    assert codec.serialize_item(item) == boto_wire
+
+    out = codec.deserialize_item(boto_wire)
+    assert out == {k: TypeDeserializer().deserialize(v) for k, v in boto_wire.items()}
+    assert type(out["n"]) is int and type(out["big"]) is int
+    assert type(out["ratio"]) is float and type(out["nested"]["list"][2]["x"]) is float
+    assert all(type(n) is int for n in out["nums"])
+
+    # Floats can be written directly (the resource layer rejects them).
+    assert codec.to_attribute_value(0.1) == {"N": "0.1"}
+    assert codec.deserialize_item(codec.serialize_item({"f": 1e-7}))["f"] == 1e-7
+
+
+class _FakeClient:
+    """Low-level client stand-in storing AttributeValue-shaped items."""
+
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def put_item(self, **kw: Any) -> dict[str, Any]:
+        self.calls.append(("put_item", kw))
+        it = kw["Item"]
+        self.items[(it["pk"]["S"], it["sk"]["S"])] = it
+        return {}
+
+    def get_item(self, **kw: Any) -> dict[str, Any]:
+        self.calls.append(("get_item", kw))
+        it = self.items.get((kw["Key"]["pk"]["S"], kw["Key"]["sk"]["S"]))
+        return {"Item": it} if it else {}
+
+    def update_item(self, **kw: Any) -> dict[str, Any]:
+        self.calls.append(("update_item", kw))
+        it = self.items[(kw["Key"]["pk"]["S"], kw["Key"]["sk"]["S"])]
+        it["n"] = kw["ExpressionAttributeValues"][":n"]
+        return {"Attributes": it}
+
+    def query(self, **kw: Any) -> dict[str, Any]:
+        self.calls.append(("query", kw))
+        rows = sorted(self.items.values(), key=lambda r: r["sk"]["S"])
+        if "ExclusiveStartKey" in kw:
+            rows = [r for r in rows if r["sk"]["S"] > kw["ExclusiveStartKey"]["sk"]["S"]]
+        page = rows[: kw["Limit"]]
+        out: dict[str, Any] = {"Items": page}
+        if len(rows) > len(page):
+            out["LastEvaluatedKey"] = {"pk": page[-1]["pk"], "sk": page[-1]["sk"]}
+        return out
+
+
+def _fast_table() -> tuple[DynamoTable, _FakeClient]:
+    t = object.__new__(DynamoTable)
+    t.table_name = "test"
+    t._fast = True
+    t._client = _FakeClient()
+    return t, t._client
+
+
+def test_fast_path_table_round_trip():
+    t, client = _fast_table()
+    for i in range(5):
+        t.put_item(item={"pk": "P", "sk": f"S#{i}", "n": i, "score": i / 4}, condition_expression="attribute_not_exists(pk)")
+    assert client.calls[0][1]["TableName"] == "test"
+    assert client.calls[1][1]["Item"]["score"] == {"N": "0.25"}
+
+    got = t.get_item(key={"pk": "P", "sk": "S#2"})
+    assert got == {"pk": "P", "sk": "S#2", "n": 2, "score": 0.5}
+    assert type(got["n"]) is int
+
+    new = t.update_item(
+        key={"pk": "P", "sk": "S#2"},
+        update_expression="SET n = :n",
+        expression_attribute_names=None,
+        expression_attribute_values={":n": 7},
+    )
+    assert new["n"] == 7
+
+    rows = list(
+        t.query_iter(
+            key_condition_expression=Key("pk").eq("P") & Key("sk").begins_with("S#"),
+            filter_expression=Attr("n").gte(0),
+            page_size=2,
+        )
+    )
+    assert [r["sk"] for r in rows] == [f"S#{i}" for i in range(5)]
+    queries = [kw for op, kw in client.calls if op == "query"]
+    assert len(queries) == 3
+    q = queries[1]
+    assert isinstance(q["KeyConditionExpression"], str) and isinstance(q["FilterExpression"], str)
+    assert set(q["ExpressionAttributeNames"].values()) == {"pk", "sk", "n"}
+    assert {"S": "P"} in q["ExpressionAttributeValues"].values()
+    assert q["ExclusiveStartKey"] == {"pk": {"S": "P"}, "sk": {"S": "S#1"}}
+
+    tx = t.tx_put(item={"pk": "P", "sk": "S#9", "ratio": 0.25})
+    assert tx["Item"]["ratio"] == {"N": "0.25"}
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from boto3.dynamodb.conditions import Key
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db.dynamodb import instrumentation
+from app.db.dynamodb.instrumentation import begin_request_stats, end_request_stats
+from app.db.dynamodb.table import DynamoTable
+from app.middleware import access_log
+from app.settings import settings
+
+
+class _FakeResource:
+    """boto3 Table stand-in returning response sizes and ConsumedCapacity."""
+
+    def __init__(self, n: int) -> None:
+        self.rows = [{"pk": "P", "sk": f"S#{i:04d}", "n": i} for i in range(n)]
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.threads: set[str] = set()
+
+    def _resp(self, body: dict[str, Any], capacity: float) -> dict[str, Any]:
+        return {
+            **body,
+            "ConsumedCapacity": {"TableName": "test", "CapacityUnits": capacity},
+            "ResponseMetadata": {"HTTPHeaders": {"content-length": "100"}},
+        }
+
+    def get_item(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(("GetItem", kwargs))
+        row = next((r for r in self.rows if r["sk"] == kwargs["Key"]["sk"]), None)
+        return self._resp({"Item": dict(row)} if row else {}, 0.5)
+
+    def put_item(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(("PutItem", kwargs))
+        return self._resp({}, 1.0)
+
+    def query(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(("Query", kwargs))
+        self.threads.add(threading.current_thread().name)
+        start = 0
+        if "ExclusiveStartKey" in kwargs:
+            start = next(i for i, r in enumerate(self.rows) if r["sk"] == kwargs["ExclusiveStartKey"]["sk"]) + 1
+        chunk = self.rows[start : start + kwargs["Limit"]]
+        out: dict[str, Any] = {"Items": [dict(r) for r in chunk]}
+        if start + len(chunk) < len(self.rows):
+            out["LastEvaluatedKey"] = {"pk": "P", "sk": chunk[-1]["sk"]}
+        return self._resp(out, 2.0)
+
+
+def _table(n: int) -> tuple[DynamoTable, _FakeResource]:
+    t = object.__new__(DynamoTable)
+    t.table_name = "test"
+    res = _FakeResource(n)
+    t._table = res
+    return t, res
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict[str, Any]]] = []
+
+    def _add(self, event: str, **kw: Any) -> None:
+        self.events.append((event, kw))
+
+    info = warning = exception = _add
+
+
+def test_calls_are_aggregated_per_request_including_prefetch_threads():
+    t, res = _table(12)
+    stats, token = begin_request_stats()
+    try:
+        assert t.get_item(key={"pk": "P", "sk": "S#0003"})["n"] == 3
+        t.put_item(item={"pk": "P", "sk": "S#9999"})
+        items = list(
+            t.query_iter(key_condition_expression=Key("pk").eq("P"), index_name="GSI1", page_size=5, prefetch=True)
+        )
+        assert len(items) == 12
+    finally:
+        end_request_stats(token)
+
+    assert any(name.startswith("ddb-prefetch") for name in res.threads)
+    assert all(kw.get("ReturnConsumedCapacity") == "TOTAL" for _, kw in res.calls)
+    fields = stats.log_fields()
+    assert fields["ddb_calls"] == 5 and fields["ddb_retries"] == 0
+    assert fields["ddb_ops"] == {"GetItem": 1, "PutItem": 1, "Query#GSI1": 3}
+    assert fields["ddb_items"] == 13 and fields["ddb_bytes"] == 500
+    assert fields["ddb_rcu"] == 6.5 and fields["ddb_wcu"] == 1.0
+
+    # Nothing is attributed once the request is over.
+    t.get_item(key={"pk": "P", "sk": "S#0001"})
+    assert stats.log_fields()["ddb_calls"] == 5
+
+
+def test_consumed_capacity_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(settings, "ddb_consumed_capacity", "NONE")
+    t, res = _table(1)
+    t.get_item(key={"pk": "P", "sk": "S#0000"})
+    assert "ReturnConsumedCapacity" not in res.calls[0][1]
+
+
+def test_slow_operations_are_logged(monkeypatch):
+    rec = _Recorder()
+    monkeypatch.setattr(instrumentation, "log", rec)
+    monkeypatch.setattr(settings, "ddb_slow_op_ms", 0.0001)
+    t, _ = _table(3)
+    t.get_item(key={"pk": "P", "sk": "S#0000"})
+    slow = [kw for ev, kw in rec.events if ev == "ddb_slow_operation"]
+    assert len(slow) == 1
+    assert slow[0]["operation"] == "GetItem" and slow[0]["consumed_capacity"] == 0.5
+
+    rec.events.clear()
+    monkeypatch.setattr(settings, "ddb_slow_op_ms", 60_000.0)
+    t.get_item(key={"pk": "P", "sk": "S#0000"})
+    assert rec.events == []
+
+
+def test_access_log_carries_request_ddb_totals(monkeypatch):
+    rec = _Recorder()
+    monkeypatch.setattr(access_log, "get_logger", lambda _name=None: rec)
+    t, _ = _table(4)
+
+    app = FastAPI()
+    app.add_middleware(access_log.AccessLogMiddleware)
+
+    @app.get("/items")
+    def _items():  # sync route: runs on the threadpool, like the real routers
+        for i in range(3):
+            t.get_item(key={"pk": "P", "sk": f"S#{i:04d}"})
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/items").status_code == 200
+    assert client.get("/items").status_code == 200
+
+    requests = [kw for ev, kw in rec.events if ev == "request"]
+    assert len(requests) == 2
+    for kw in requests:
+        assert kw["ddb_calls"] == 3 and kw["ddb_ops"] == {"GetItem": 3} and kw["ddb_rcu"] == 1.5
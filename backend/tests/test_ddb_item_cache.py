@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from app.db.dynamodb import item_cache
+from app.db.dynamodb.item_cache import ItemCache
+from app.infrastructure.storage import content_repo
+from app.repositories import rfp_proposals_repo, templates_repo
+
+
+class FakeTable:
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.gets = 0
+
+    def get_item(self, *, key, **_):
+        self.gets += 1
+        it = self.items.get((key["pk"], key["sk"]))
+        return dict(it) if it else None
+
+    def put_item(self, *, item, **_):
+        self.items[(item["pk"], item["sk"])] = dict(item)
+
+    def delete_item(self, *, key, **_):
+        self.items.pop((key["pk"], key["sk"]), None)
+
+    def tx_put(self, *, item, **_):
+        return {"Item": item}
+
+    def transact_write(self, *, puts=(), **_):
+        for p in puts:
+            self.put_item(item=p["Item"])
+
+    def update_item(self, *, key, expression_attribute_names, expression_attribute_values, **_):
+        it = self.items[(key["pk"], key["sk"])]
+        for nk, name in (expression_attribute_names or {}).items():
+            it[name] = expression_attribute_values[":v" + nk[2:]]
+        if ":r" in expression_attribute_values:
+            it["review"] = expression_attribute_values[":r"]
+        it["updatedAt"] = expression_attribute_values[":u"]
+        return dict(it)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.t = 1000.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def cache(clock):
+    c = ItemCache(max_items=3, ttl_seconds=30, clock=clock)
+    item_cache.set_item_cache(c)
+    yield c
+    item_cache.set_item_cache(None)
+
+
+@pytest.fixture()
+def table(monkeypatch, cache):
+    t = FakeTable()
+    for mod in (content_repo, templates_repo, rfp_proposals_repo):
+        monkeypatch.setattr(mod, "get_main_table", lambda: t)
+    from app.infrastructure.search import search_index
+
+    monkeypatch.setattr(search_index, "index_proposal", lambda *_a, **_k: None)
+    return t
+
+
+def test_repeated_reads_hit_the_cache_and_see_own_writes(table, cache):
+    company = content_repo.upsert_company({"companyId": "c1", "name": "Acme"})
+    for _ in range(5):
+        assert content_repo.get_company_by_company_id("c1")["name"] == "Acme"
+    assert table.gets == 0  # populated by the write itself
+
+    content_repo.upsert_company({**company, "name": "Acme 2"})
+    assert content_repo.get_company_by_company_id("c1")["name"] == "Acme 2"
+
+    tpl = templates_repo.create_template({"name": "T", "sections": [{"title": "Intro"}]})
+    templates_repo.update_template(tpl["id"], {"name": "T2"})
+    got = templates_repo.get_template_by_id(tpl["id"])
+    assert got["name"] == "T2"
+    got["sections"].append({"title": "mutated by caller"})
+    assert templates_repo.get_template_by_id(tpl["id"])["sections"] == [{"title": "Intro"}]
+
+    templates_repo.delete_template(tpl["id"])
+    assert templates_repo.get_template_by_id(tpl["id"]) is None
+    assert table.gets == 1
+
+    stats = item_cache.item_cache_stats()
+    assert stats["enabled"] and stats["hits"] == 8 and stats["misses"] == 1 and stats["invalidations"] == 1
+
+
+def test_proposal_updates_are_visible_to_the_next_read(table, cache):
+    p = rfp_proposals_repo.create_proposal(
+        rfp_id="r1", company_id=None, template_id="t", title="Old", sections={}, custom_content={}, rfp_summary=None
+    )
+    assert rfp_proposals_repo.get_proposal_by_id(p["_id"])["title"] == "Old"
+    rfp_proposals_repo.update_proposal(p["_id"], {"title": "New"})
+    assert rfp_proposals_repo.get_proposal_by_id(p["_id"])["title"] == "New"
+    rfp_proposals_repo.update_proposal_review(p["_id"], {"decision": "go"})
+    assert rfp_proposals_repo.get_proposal_by_id(p["_id"], include_sections=False)["review"] == {"decision": "go"}
+    rfp_proposals_repo.delete_proposal(p["_id"])
+    assert rfp_proposals_repo.get_proposal_by_id(p["_id"]) is None
+    assert table.gets == 1
+
+
+def test_fill_racing_a_local_write_does_not_resurrect_old_value(cache):
+    key = {"pk": "TEAM#m1", "sk": "PROFILE"}
+    old = {**key, "name": "old", "updatedAt": "2025-01-01T00:00:00Z"}
+    new = {**key, "name": "new", "updatedAt": "2025-01-02T00:00:00Z"}
+
+    def slow_read():
+        cache.remember(new)  # a write lands while the read is in flight
+        return dict(old)
+
+    assert cache.get_item(key, slow_read)["name"] == "new"
+    assert cache.get_item(key, lambda: pytest.fail("should be cached"))["name"] == "new"
+
+    # An out-of-order write completion with an older updatedAt is ignored.
+    cache.remember(old)
+    assert cache.get_item(key, lambda: pytest.fail("should be cached"))["name"] == "new"
+    assert cache.stats()["staleFills"] == 1
+
+
+def test_ttl_and_size_bounds(cache, clock):
+    loads: list[str] = []
+
+    def loader(pk):
+        def _load():
+            loads.append(pk)
+            return {"pk": pk, "sk": "PROFILE", "updatedAt": "x"}
+
+        return _load
+
+    for pk in ("A", "B", "C", "A", "D", "B"):
+        cache.get_item({"pk": pk, "sk": "PROFILE"}, loader(pk))
+    assert loads == ["A", "B", "C", "D", "B"]  # B was least recently used when D arrived
+    assert cache.stats()["evictions"] == 2
+
+    clock.t += 31
+    cache.get_item({"pk": "D", "sk": "PROFILE"}, loader("D"))
+    assert loads[-1] == "D"
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import gzip
+import json
+from decimal import Decimal
+from typing import Any
+
+import pytest
+
+from app.db.dynamodb import offload
+from app.db.dynamodb.offload import MemoryBlobStore, hydrate_attributes, hydrate_many, is_pointer, offload_attributes
+from app.infrastructure.search import search_index
+from app.repositories import attachments_repo, rfp_proposals_repo, rfp_rfps_repo
+
+LIMITS = {"rawText": 1000, "sections": 1000, "textContent": 1000, "_analysis": 1000}
+
+
+class FakeTable:
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def put_item(self, *, item, **_):
+        self.items[(item["pk"], item["sk"])] = dict(item)
+
+    def get_item(self, *, key, **_):
+        it = self.items.get((key["pk"], key["sk"]))
+        return dict(it) if it else None
+
+    def tx_put(self, *, item, **_):
+        return {"Item": item}
+
+    def transact_write(self, *, puts=(), **_):
+        for p in puts:
+            self.put_item(item=p["Item"])
+
+    def update_item(self, *, key, expression_attribute_names, expression_attribute_values, **_):
+        it = self.items[(key["pk"], key["sk"])]
+        for nk, name in (expression_attribute_names or {}).items():
+            it[name] = expression_attribute_values[":v" + nk[2:]]
+        it["updatedAt"] = expression_attribute_values[":u"]
+        return dict(it)
+
+
+@pytest.fixture()
+def store(monkeypatch):
+    s = MemoryBlobStore()
+    offload.set_blob_store(s)
+    monkeypatch.setattr(offload, "offload_thresholds", lambda: dict(LIMITS))
+    yield s
+    offload.set_blob_store(None)
+
+
+@pytest.fixture()
+def table(monkeypatch, store):
+    t = FakeTable()
+    for mod in (rfp_rfps_repo, rfp_proposals_repo, attachments_repo):
+        monkeypatch.setattr(mod, "get_main_table", lambda: t)
+    monkeypatch.setattr(search_index, "index_proposal", lambda *_a, **_k: None)
+    monkeypatch.setattr(search_index, "index_rfp", lambda *_a, **_k: None)
+    return t
+
+
+def _drop_cache(store: MemoryBlobStore) -> None:
+    offload.set_blob_store(store)
+    store.gets = 0
+
+
+def test_oversized_attributes_round_trip_through_compressed_blobs(store):
+    sections = {"intro": {"content": "lorem ipsum " * 400, "score": Decimal("0.75")}}
+    item = {"pk": "P", "sk": "S", "sections": sections, "rawText": "short", "title": "t"}
+
+    out = offload_attributes(item, ("sections", "rawText"))
+    assert item["sections"] is sections  # input left untouched
+    assert out["rawText"] == "short"
+    ptr = out["sections"]
+    assert is_pointer(ptr) and ptr["codec"] == "json.gz" and ptr["bytes"] > 1000
+    assert len(json.dumps(ptr)) < 150
+    blob = store.blobs[ptr["__blob"]]
+    assert len(blob) < ptr["bytes"] / 10
+    assert json.loads(gzip.decompress(blob))["intro"]["score"] == 0.75
+
+    # Same content, same blob; already-offloaded values pass through unchanged.
+    assert offload_attributes(dict(item), ("sections",))["sections"] == ptr
+    assert offload_attributes(out, ("sections",)) is out
+    assert len(store.blobs) == 1
+
+    _drop_cache(store)
+    back = hydrate_attributes(out, ("rawText",))
+    assert back is out and store.gets == 0  # only pointer fields asked for are fetched
+    back = hydrate_attributes(out)
+    assert back["sections"] == sections and store.gets == 1
+    assert hydrate_attributes(out)["sections"] == sections and store.gets == 1  # LRU hit
+
+
+def test_hydrate_many_fetches_each_blob_once_and_degrades_missing_blobs(store):
+    items = [offload_attributes({"i": i, "rawText": f"{i % 3} " * 800}, ("rawText",)) for i in range(9)]
+    items.append({"i": 9, "rawText": {"__blob": "0" * 64, "bytes": 1, "codec": "json.gz"}})
+    _drop_cache(store)
+
+    got = hydrate_many(items, ["rawText"])
+    assert [g["rawText"][:2] for g in got[:9]] == [f"{i % 3} " for i in range(9)]
+    assert got[9]["rawText"] is None
+    assert store.gets == 4  # three distinct blobs + the missing one
+
+
+def test_offload_is_a_no_op_when_disabled():
+    offload.set_blob_store(None)
+    item = {"rawText": "x" * 100_000}
+    assert offload_attributes(item, ("rawText",)) is item
+
+
+def test_proposal_sections_hydrate_only_when_requested(table, store):
+    sections = {f"s{i}": {"content": "body text " * 200} for i in range(5)}
+    created = rfp_proposals_repo.create_proposal(
+        rfp_id="rfp_1",
+        company_id=None,
+        template_id="tpl",
+        title="Big",
+        sections=sections,
+        custom_content={},
+        rfp_summary=None,
+    )
+    assert created["sections"] == sections
+    stored = table.items[("PROPOSAL#" + created["_id"], "PROFILE")]
+    assert is_pointer(stored["sections"])
+
+    _drop_cache(store)
+    light = rfp_proposals_repo.get_proposal_by_id(created["_id"], include_sections=False)
+    assert "sections" not in light and store.gets == 0
+    full = rfp_proposals_repo.get_proposal_by_id(created["_id"])
+    assert full["sections"] == sections and store.gets == 1
+
+    sections["s5"] = {"content": "more " * 300}
+    updated = rfp_proposals_repo.update_proposal(created["_id"], {"sections": sections})
+    assert updated["sections"] == sections
+    assert is_pointer(table.items[("PROPOSAL#" + created["_id"], "PROFILE")]["sections"])
+
+
+def test_rfp_raw_text_and_attachment_text_are_stored_out_of_line(table, store):
+    raw = "Scope of work. " * 500
+    table.put_item(item={**rfp_rfps_repo.rfp_key("r1"), "rfpId": "r1", "title": "T", "createdAt": "2025-01-01T00:00:00Z"})
+    upd = rfp_rfps_repo.update_rfp("r1", {"rawText": raw, "title": "T2"})
+    assert upd["rawText"] == raw and upd["title"] == "T2"
+    assert is_pointer(table.items[("RFP#r1", "PROFILE")]["rawText"])
+
+    _drop_cache(store)
+    assert rfp_rfps_repo.get_rfp_by_id("r1")["rawText"] == raw
+
+    att = attachments_repo.add_attachments("r1", [{"originalName": "a.txt", "textContent": "words " * 400}])[0]
+    assert is_pointer(table.items[("RFP#r1", "ATTACHMENT#" + att["id"])]["textContent"])
+    _drop_cache(store)
+    assert "__blob" in attachments_repo.get_attachment("r1", att["id"], include_text=False)["textContent"]
+    assert store.gets == 0
+    assert attachments_repo.get_attachment("r1", att["id"])["textContent"] == "words " * 400
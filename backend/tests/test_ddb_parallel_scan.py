@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from typing import Any
+
+import pytest
+
+from app.db.dynamodb.scan import RcuRateLimiter, ScanCheckpoint
+from app.db.dynamodb.table import DynamoTable
+
+
+class _FakeResource:
+    """boto3 Table.scan stand-in: items spread over segments by hash, paged by Limit."""
+
+    def __init__(self, n: int) -> None:
+        self.rows = [{"pk": f"ITEM#{i:04d}", "sk": "PROFILE", "n": i} for i in range(n)]
+        self.calls: list[dict[str, Any]] = []
+        self.threads: set[str] = set()
+        self._lock = threading.Lock()
+
+    def scan(self, **kw: Any) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append(kw)
+            self.threads.add(threading.current_thread().name)
+        total = kw.get("TotalSegments", 1)
+        seg = kw.get("Segment", 0)
+        rows = sorted((r for r in self.rows if zlib.crc32(r["pk"].encode()) % total == seg), key=lambda r: r["pk"])
+        if "ExclusiveStartKey" in kw:
+            rows = [r for r in rows if r["pk"] > kw["ExclusiveStartKey"]["pk"]]
+        page = rows[: kw["Limit"]]
+        out: dict[str, Any] = {
+            "Items": [dict(r) for r in page],
+            "ScannedCount": len(page),
+            "ConsumedCapacity": {"CapacityUnits": 0.5 * len(page)},
+        }
+        if len(rows) > len(page):
+            out["LastEvaluatedKey"] = {"pk": page[-1]["pk"], "sk": page[-1]["sk"]}
+        return out
+
+
+class _CheckpointTable:
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def put_item(self, *, item: dict[str, Any], **_: Any) -> None:
+        self.items[(item["pk"], item["sk"])] = dict(item)
+
+    def query_iter(self, *, key_condition_expression: Any, **_: Any):
+        pk = key_condition_expression.get_expression()["values"][1]
+        return [dict(v) for (p, _s), v in sorted(self.items.items()) if p == pk]
+
+    def delete_item(self, *, key: dict[str, Any], **_: Any) -> None:
+        self.items.pop((key["pk"], key["sk"]), None)
+
+
+def _table(n: int) -> tuple[DynamoTable, _FakeResource]:
+    t = object.__new__(DynamoTable)
+    t.table_name = "test"
+    res = _FakeResource(n)
+    t._table = res
+    return t, res
+
+
+def test_parallel_scan_visits_every_item_once():
+    t, res = _table(250)
+    res.rows.append({"pk": "SCANCKPT#old", "sk": "SEGMENT#00000", "segment": 0})
+    seen: list[int] = []
+    lock = threading.Lock()
+
+    def process(items):
+        with lock:
+            seen.extend(it["n"] for it in items)
+
+    out = t.parallel_scan(process, total_segments=4, max_workers=3, page_size=20, projection=["n"])
+    assert sorted(seen) == list(range(250))
+    assert out["matched"] == 250 and out["scanned"] == 251 and out["segments"] == 4
+    assert {c["Segment"] for c in res.calls} == {0, 1, 2, 3}
+    assert all(c["TotalSegments"] == 4 and c["Limit"] == 20 for c in res.calls)
+    assert set(res.calls[0]["ExpressionAttributeNames"].values()) == {"pk", "sk", "n"}
+    assert all(name.startswith("ddb-scan") for name in res.threads)
+
+
+def test_interrupted_scan_resumes_from_checkpoint():
+    t, res = _table(300)
+    ckpt = ScanCheckpoint(_CheckpointTable(), "backfill")
+    processed: list[int] = []
+    lock = threading.Lock()
+    calls = {"n": 0}
+
+    def flaky(items):
+        with lock:
+            calls["n"] += 1
+            if calls["n"] == 6:
+                raise RuntimeError("worker crashed")
+            processed.extend(it["n"] for it in items)
+
+    with pytest.raises(RuntimeError):
+        t.parallel_scan(flaky, total_segments=3, max_workers=3, page_size=25, checkpoint=ckpt)
+    first_pass = len(processed)
+    assert 0 < first_pass < 300
+
+    res.calls.clear()
+    out = t.parallel_scan(lambda items: processed.extend(it["n"] for it in items), total_segments=3, page_size=25, checkpoint=ckpt)
+    assert set(processed) == set(range(300))
+    # Only the crashed page (at most) is processed twice; finished pages are not re-read.
+    assert len(processed) - 300 <= 25
+    assert out["resumedSegments"] + out["skippedSegments"] >= 1
+    assert any("ExclusiveStartKey" in c for c in res.calls)
+
+    # A finished run is a no-op; a different segment count is refused.
+    res.calls.clear()
+    again = t.parallel_scan(lambda items: None, total_segments=3, checkpoint=ckpt)
+    assert again["skippedSegments"] == 3 and res.calls == []
+    with pytest.raises(ValueError):
+        t.parallel_scan(lambda items: None, total_segments=4, checkpoint=ckpt)
+    assert ckpt.clear() == 3
+
+
+def test_rcu_rate_limiter_paces_combined_reads():
+    class Clock:
+        t = 0.0
+
+    clock = Clock()
+
+    def sleep(s: float) -> None:
+        clock.t += s
+
+    limiter = RcuRateLimiter(100, clock=lambda: clock.t, sleep=sleep)
+    for _ in range(30):
+        limiter.charge(50)  # 1500 RCU against 100 RCU/s with 100 of burst
+    assert clock.t == pytest.approx(14.0)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from boto3.dynamodb.conditions import Key
+
+from app.db.dynamodb import pagination
+from app.db.dynamodb.table import DynamoTable
+
+
+class _FakeResource:
+    """boto3 Table.query stand-in over a sorted list of items."""
+
+    def __init__(self, n: int) -> None:
+        self.rows = [{"pk": "P", "sk": f"S#{i:04d}", "n": i} for i in range(n)]
+        self.calls: list[dict[str, Any]] = []
+        self.threads: set[str] = set()
+
+    def query(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(kwargs)
+        self.threads.add(threading.current_thread().name)
+        start = 0
+        if "ExclusiveStartKey" in kwargs:
+            start = next(i for i, r in enumerate(self.rows) if r["sk"] == kwargs["ExclusiveStartKey"]["sk"]) + 1
+        chunk = self.rows[start : start + kwargs["Limit"]]
+        out: dict[str, Any] = {"Items": [dict(r) for r in chunk]}
+        if start + len(chunk) < len(self.rows):
+            out["LastEvaluatedKey"] = {"pk": "P", "sk": chunk[-1]["sk"]}
+        return out
+
+
+def _table(n: int) -> tuple[DynamoTable, _FakeResource]:
+    t = object.__new__(DynamoTable)
+    t.table_name = "test"
+    res = _FakeResource(n)
+    t._table = res
+    return t, res
+
+
+def _cond():
+    return Key("pk").eq("P")
+
+
+def test_query_iter_follows_pages_without_cursor_crypto(monkeypatch):
+    def _boom(*_a, **_k):
+        raise AssertionError("internal paging must not encode/decode cursors")
+
+    monkeypatch.setattr(pagination, "encrypt_string", _boom)
+    monkeypatch.setattr(pagination, "decrypt_string", _boom)
+    t, res = _table(23)
+    assert [it["n"] for it in t.query_iter(key_condition_expression=_cond(), page_size=5)] == list(range(23))
+    assert [c["Limit"] for c in res.calls] == [5, 5, 5, 5, 5]
+
+
+def test_query_iter_max_items_only_requests_what_is_needed():
+    t, res = _table(100)
+    got = list(t.query_iter(key_condition_expression=_cond(), page_size=8, max_items=19))
+    assert [it["n"] for it in got] == list(range(19))
+    assert [c["Limit"] for c in res.calls] == [8, 8, 3]
+    assert list(t.query_iter(key_condition_expression=_cond(), max_items=0)) == []
+
+
+def test_query_iter_prefetches_next_page_in_background():
+    t, res = _table(30)
+    it = t.query_iter(key_condition_expression=_cond(), page_size=10, prefetch=True)
+    first = next(it)
+    assert first["n"] == 0
+    got = [first["n"], *(x["n"] for x in it)]
+    assert got == list(range(30))
+    assert len(res.calls) == 3
+    assert any(name.startswith("ddb-prefetch") for name in res.threads)
+
+    # Abandoning the iterator early is fine.
+    t2, res2 = _table(30)
+    it2 = t2.query_iter(key_condition_expression=_cond(), page_size=10, prefetch=True, max_items=12)
+    assert [x["n"] for x in it2] == list(range(12))
+    assert [c["Limit"] for c in res2.calls] == [10, 2]
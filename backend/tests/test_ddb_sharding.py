@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from app.db.dynamodb import sharding
+from app.db.dynamodb.errors import DdbConflict
+from app.db.dynamodb.pagination import decode_next_token
+from app.db.dynamodb.table import DynamoTable
+from app.settings import settings
+
+
+def _order(it: dict[str, Any]) -> tuple[str, str, str]:
+    return (it["gsi1sk"], it["pk"], it["sk"])
+
+
+class FakeTable:
+    """GSI1 queries with DynamoDB cursor semantics (Limit applies before the filter)."""
+
+    def __init__(self) -> None:
+        self.items: dict[tuple[str, str], dict[str, Any]] = {}
+        self.queries: list[str] = []
+
+    def put(self, it: dict[str, Any]) -> None:
+        self.items[(it["pk"], it["sk"])] = dict(it)
+
+    def query_page_raw(
+        self, *, key_condition_expression, index_name=None, limit=50, scan_index_forward=False, filter_expression=None, exclusive_start_key=None
+    ):
+        pk = key_condition_expression.get_expression()["values"][1]
+        self.queries.append(pk)
+        rows = sorted((it for it in self.items.values() if it.get("gsi1pk") == pk), key=_order, reverse=not scan_index_forward)
+        if exclusive_start_key:
+            k = _order(exclusive_start_key)
+            rows = [r for r in rows if (_order(r) > k if scan_index_forward else _order(r) < k)]
+        chunk = rows[:limit]
+        items = [dict(r) for r in chunk if filter_expression is None or filter_expression(r)]
+        last = chunk[-1] if chunk and len(rows) > limit else None
+        return items, ({k: last[k] for k in ("pk", "sk", "gsi1pk", "gsi1sk")} if last else None)
+
+    query_iter = DynamoTable.query_iter
+
+    def update_item(self, *, key, expression_attribute_values, **_):
+        it = self.items[(key["pk"], key["sk"])]
+        if it["gsi1pk"] != expression_attribute_values[":src"]:
+            raise DdbConflict(message="conditional check failed")
+        it["gsi1pk"] = expression_attribute_values[":dst"]
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    monkeypatch.setattr(settings, "jwt_secret", settings.jwt_secret or "test-secret")
+    monkeypatch.setattr(settings, "ddb_gsi_shards", "")
+
+
+def _item(i: int, base: str = "TYPE#THING") -> dict[str, Any]:
+    key = {"pk": f"THING#{i:04d}", "sk": "PROFILE"}
+    # Coarse timestamps so sort-key ties are broken by the table key.
+    return {**key, "n": i, "gsi1pk": sharding.shard_pk(base, key), "gsi1sk": f"2025-01-01T00:{i // 10:02d}#x"}
+
+
+def _read_all(t: FakeTable, *, limit: int, forward: bool = False, filt=None) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    tok = None
+    while True:
+        pg = sharding.query_sharded_page(
+            t, base_pk="TYPE#THING", limit=limit, scan_index_forward=forward, filter_expression=filt, next_token=tok
+        )
+        assert len(pg.items) <= limit
+        out.extend(pg.items)
+        tok = pg.next_token
+        if not tok:
+            return out
+
+
+def test_scatter_gather_pages_are_globally_ordered_and_complete(monkeypatch):
+    monkeypatch.setattr(settings, "ddb_gsi_shards", "TYPE#THING=5")
+    t = FakeTable()
+    for i in range(137):
+        t.put(_item(i))
+    assert len({it["gsi1pk"] for it in t.items.values()}) == 5
+    assert "TYPE#THING" in {it["gsi1pk"] for it in t.items.values()}  # shard 0 is the base key
+
+    expected_desc = sorted(t.items.values(), key=_order, reverse=True)
+    for lim in (1, 7, 50, 500):
+        got = _read_all(t, limit=lim)
+        assert [_order(x) for x in got] == [_order(x) for x in expected_desc]
+    got = _read_all(t, limit=9, forward=True)
+    assert [_order(x) for x in got] == [_order(x) for x in reversed(expected_desc)]
+
+    # Filtered reads: short shard pages must not let later items overtake earlier ones.
+    got = _read_all(t, limit=4, filt=lambda it: it["n"] % 7 == 0)
+    assert [x["n"] for x in got] == [x["n"] for x in expected_desc if x["n"] % 7 == 0]
+
+
+def test_single_shard_is_a_plain_query():
+    t = FakeTable()
+    for i in range(30):
+        t.put(_item(i))
+    pg = sharding.query_sharded_page(t, base_pk="TYPE#THING", limit=10)
+    assert t.queries == ["TYPE#THING"]
+    assert "_sh" not in decode_next_token(pg.next_token)
+    assert len(_read_all(t, limit=8)) == 30
+
+
+def test_enabling_and_lowering_shards_with_reshard(monkeypatch):
+    t = FakeTable()
+    for i in range(60):
+        t.put(_item(i))  # written before sharding: all in the base partition
+
+    monkeypatch.setattr(settings, "ddb_gsi_shards", "TYPE#THING=4")
+    # Readable immediately, before any migration.
+    assert len(_read_all(t, limit=11)) == 60
+    assert sharding.reshard(t, base_pk="TYPE#THING", scan_shards=4)["moved"] > 0
+    assert len({it["gsi1pk"] for it in t.items.values()}) == 4
+    assert sharding.reshard(t, base_pk="TYPE#THING", scan_shards=4)["moved"] == 0
+    assert len(_read_all(t, limit=11)) == 60
+
+    monkeypatch.setattr(settings, "ddb_gsi_shards", "TYPE#THING=2")
+    sharding.reshard(t, base_pk="TYPE#THING", scan_shards=4)
+    assert {it["gsi1pk"] for it in t.items.values()} == {"TYPE#THING", "TYPE#THING#SHARD#1"}
+    assert len(_read_all(t, limit=11)) == 60
+
+
+def test_prefix_config_and_outbox_is_transparent(monkeypatch):
+    from app.repositories import outbox_repo
+
+    monkeypatch.setattr(settings, "ddb_gsi_shards", "SCRAPEDRFP_SOURCE#*=3, OUTBOX#PENDING=4")
+    assert sharding.shard_count("SCRAPEDRFP_SOURCE#sam_gov") == 3
+    assert sharding.shard_count("TYPE#RFP") == 1
+
+    t = FakeTable()
+    t.put_item = lambda *, item, **_: t.put(item)  # type: ignore[attr-defined]
+    monkeypatch.setattr(outbox_repo, "get_main_table", lambda: t)
+    ids = [outbox_repo.enqueue_event(event_type="slack", payload={}, dedupe_key=f"e{i:03d}")["eventId"] for i in range(40)]
+    assert len({it["gsi1pk"] for it in t.items.values()}) == 4
+    seen: list[str] = []
+    tok = None
+    while True:
+        res = outbox_repo.list_pending(limit=6, next_token=tok)
+        seen.extend(it["eventId"] for it in res["items"])
+        tok = res["nextToken"]
+        if not tok:
+            break
+    assert sorted(seen) == sorted(ids)
+
+
+@pytest.mark.parametrize("shards", ["", "TYPE#THING=3"])
+def test_iter_sharded_and_cursor_after_resume_where_iteration_stopped(monkeypatch, shards):
+    monkeypatch.setattr(settings, "ddb_gsi_shards", shards)
+    t = FakeTable()
+    for i in range(45):
+        t.put(_item(i))
+    expected = [_order(x) for x in sorted(t.items.values(), key=_order, reverse=True)]
+
+    walked = list(sharding.iter_sharded(t, base_pk="TYPE#THING", page_size=4))
+    assert [_order(x) for x in walked] == expected
+    head = list(sharding.iter_sharded(t, base_pk="TYPE#THING", page_size=4, max_items=20))
+    assert head == walked[:20]
+
+    tok = sharding.cursor_after("TYPE#THING", head)
+    rest = sharding.query_sharded_page(t, base_pk="TYPE#THING", limit=100, next_token=tok)
+    assert [_order(x) for x in rest.items] == expected[20:]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.db.dynamodb import retry, throttle
+from app.db.dynamodb.errors import DdbThrottled, DdbValidation
+from app.db.dynamodb.retry import RetryPolicy, ddb_call
+from app.db.dynamodb.throttle import AdaptiveRateController
+
+
+def _client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "GetItem")
+
+
+class VirtualTime:
+    def __init__(self) -> None:
+        self.t = 0.0
+
+    def clock(self) -> float:
+        return self.t
+
+    def sleep(self, s: float) -> None:
+        self.t += s
+
+
+class FakeClient:
+    """GetItem against a table that sustains `capacity` requests per (virtual) second."""
+
+    def __init__(self, vt: VirtualTime, capacity: float) -> None:
+        self.vt = vt
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = 0.0
+        self.sent: list[float] = []
+        self.throttled = 0
+
+    def get_item(self, **_: Any) -> dict[str, Any]:
+        now = self.vt.t
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.capacity)
+        self.last = now
+        self.sent.append(now)
+        self.vt.t += 0.0005  # service time
+        if self.tokens < 1:
+            self.throttled += 1
+            raise _client_error("ProvisionedThroughputExceededException")
+        self.tokens -= 1
+        return {"Item": {"pk": "x"}}
+
+
+@pytest.fixture()
+def vt():
+    return VirtualTime()
+
+
+@pytest.fixture()
+def controller(vt):
+    c = AdaptiveRateController(
+        min_rate=5, max_rate=1000, increase_per_s=20, cooldown_s=0.5, clock=vt.clock, sleep=vt.sleep
+    )
+    throttle.set_throttle_controller(c)
+    yield c
+    throttle.set_throttle_controller(None)
+
+
+def test_controller_is_transparent_until_throttled_then_aimd(controller, vt):
+    for _ in range(200):
+        assert controller.acquire() == 0.0
+        vt.t += 0.005  # ~200 req/s
+    assert not controller.limiting
+
+    # A burst of simultaneous throttles counts as one congestion signal.
+    for _ in range(10):
+        controller.on_throttle()
+    s = controller.stats()
+    assert s["limiting"] and s["decreases"] == 1 and s["throttles"] == 10
+    assert 90 <= s["permittedRate"] <= 110  # half the measured send rate
+
+    # Paced: 20 back-to-back requests take ~20 / rate seconds of queueing.
+    start = vt.t
+    for _ in range(20):
+        controller.acquire()
+    assert vt.t - start == pytest.approx(20 / controller.rate, rel=0.05)
+    assert controller.stats()["delayed"] == 20
+
+    # Additive increase while successful, limiting switches off at max_rate.
+    rate = controller.rate
+    vt.t += 1.0
+    controller.on_success()
+    assert controller.rate == pytest.approx(rate + 20)
+    controller.rate = 995
+    vt.t += 1.0
+    controller.on_success()
+    assert not controller.limiting and controller.stats()["permittedRate"] is None
+
+
+def test_ddb_call_converges_to_table_capacity(controller, vt, monkeypatch):
+    def backoff(policy: RetryPolicy, attempt: int) -> None:
+        vt.sleep(min(policy.max_delay_s, policy.base_delay_s * 2 ** (attempt - 1)) / 2)
+
+    monkeypatch.setattr(retry, "_sleep_backoff", backoff)
+    client = FakeClient(vt, capacity=50)
+
+    for _ in range(600):
+        assert ddb_call("GetItem", lambda: client.get_item(Key={"pk": "x"}), table_name="t") == {"Item": {"pk": "x"}}
+
+    s = controller.stats()
+    assert s["limiting"] and s["decreases"] >= 1
+    assert s["permittedRate"] <= 60
+    # Once converged, requests go through first time at about the table's capacity.
+    tail = [t for t in client.sent if t > vt.t - 4.0]
+    assert len(tail) <= 4 * 60
+    # Without the controller this workload is throttled ~420 times (independent backoff only).
+    assert client.throttled < 150
+
+
+def test_non_throttle_errors_keep_their_handling(controller, monkeypatch):
+    sleeps: list[int] = []
+    monkeypatch.setattr(retry, "_sleep_backoff", lambda _p, attempt: sleeps.append(attempt))
+
+    def bad():
+        raise _client_error("ValidationException")
+
+    with pytest.raises(DdbValidation):
+        ddb_call("GetItem", bad)
+
+    calls = {"n": 0}
+
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise _client_error("InternalServerError")
+        return "ok"
+
+    assert ddb_call("GetItem", flaky) == "ok"
+    assert sleeps == [1, 2] and controller.throttles == 0
+
+    def always_throttled():
+        raise _client_error("ThrottlingException")
+
+    with pytest.raises(DdbThrottled):
+        ddb_call("GetItem", always_throttled, retry_policy=RetryPolicy(max_attempts=2, max_throttled_attempts=4))
+    assert controller.throttles == 4
+
+
+def test_threads_share_one_controller():
+    c = AdaptiveRateController(min_rate=100, max_rate=400, increase_per_s=0, cooldown_s=5)
+    throttle.set_throttle_controller(c)
+    try:
+        lock = threading.Lock()
+        state = {"throttle_left": 8, "ok": 0}
+
+        def op():
+            with lock:
+                if state["throttle_left"] > 0:
+                    state["throttle_left"] -= 1
+                    raise _client_error("ThrottlingException")
+                state["ok"] += 1
+            return True
+
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            for _ in range(5):
+                ddb_call("GetItem", op)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        s = c.stats()
+        assert state["ok"] == 40
+        assert s["throttles"] == 8 and s["decreases"] == 1
+        assert s["delayed"] > 0 and s["maxQueueWaitMs"] < 1000
+    finally:
+        throttle.set_throttle_controller(None)
+
+
+def test_transport_and_5xx_errors_are_retried_with_botocore_retries_off(controller, monkeypatch):
+    from botocore.exceptions import ConnectionClosedError, EndpointConnectionError, ReadTimeoutError
+
+    from app.db.dynamodb import client
+
+    monkeypatch.setattr(client.settings, "ddb_adaptive_throttle", True)
+    client.botocore_config.cache_clear()
+    try:
+        assert client.botocore_config().retries["total_max_attempts"] == 1
+    finally:
+        client.botocore_config.cache_clear()
+
+    sleeps: list[int] = []
+    monkeypatch.setattr(retry, "_sleep_backoff", lambda _p, attempt: sleeps.append(attempt))
+    gateway = ClientError(
+        {"Error": {"Code": "BadGateway", "Message": ""}, "ResponseMetadata": {"HTTPStatusCode": 502}}, "GetItem"
+    )
+    errors: list[Exception] = [
+        EndpointConnectionError(endpoint_url="https://dynamodb"),
+        ReadTimeoutError(endpoint_url="https://dynamodb"),
+        ConnectionClosedError(endpoint_url="https://dynamodb"),
+        gateway,
+    ]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert ddb_call("GetItem", flaky) == "ok"
+    assert sleeps == [1, 2, 3, 4] and controller.throttles == 0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+
+def test_html_to_text_drops_boilerplate_and_keeps_tables():
+    from app.pipeline.intake.html_text import html_to_text
+
+    html = (
+        "<html><head><title>t</title><style>.a{}</style></head><body>"
+        "<nav><ul><li>Home</li><li>About</li></ul></nav>"
+        "<h1>Request for Proposals</h1><p>The <b>Contractor</b> shall&nbsp;provide services.<br>Second line</p>"
+        "<script>var s = '<p>not text</p>';</script>"
+        "<table><tr><th>Milestone</th><th>Date</th></tr><tr><td>Proposals due</td><td>03/15/2026</td></tr></table>"
+        "<ul><li>One</li><li>Two</li></ul>"
+        "<footer>Copyright</footer>"
+        "</body></html>"
+    )
+    # Feed in tiny chunks to exercise incremental parsing across tag boundaries.
+    out = html_to_text(html, chunk_chars=7)
+
+    assert out == (
+        "Request for Proposals\n\n"
+        "The Contractor shall provide services.\nSecond line\n\n"
+        "Milestone | Date\nProposals due | 03/15/2026\n\n"
+        "- One\n- Two"
+    )
+
+
+def test_html_extractor_stops_at_budget_and_survives_unterminated_tags():
+    from app.pipeline.intake.html_text import HtmlTextExtractor, html_to_text
+
+    p = HtmlTextExtractor(max_chars=50)
+    p.feed("<p>" + "word " * 100 + "</p>")
+    assert p.done is True
+    assert len(p.text()) <= 50
+    p.feed("<p>ignored</p>")
+    assert "ignored" not in p.text()
+
+    # Previously quadratic: thousands of unterminated start tags.
+    bad = "<p>ok</p>" + "<script " * 20_000
+    assert html_to_text(bad).startswith("ok")
+
+
+def test_html_to_text_keeps_form_wrapped_pages():
+    from app.pipeline.intake.html_text import html_to_text
+
+    # ASP.NET WebForms wraps the whole body in a <form>.
+    html = '<html><body><form id="form1"><h1>RFP 24-001</h1><p>Proposals due 03/15/2026.</p></form></body></html>'
+    assert html_to_text(html) == "RFP 24-001\n\nProposals due 03/15/2026."
+
+
+def test_html_to_text_ends_unclosed_head_at_body_content():
+    from app.pipeline.intake.html_text import html_to_text
+
+    assert html_to_text("<head><title>x</title><p>Body text here.") == "Body text here."
+    assert html_to_text("<html><head><title>x</title><body>Plain body") == "Plain body"
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from app.workers.job_engine import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    JobEngine,
+    JobType,
+    LocalJobBackend,
+    PermanentJobError,
+    build_job_engine,
+    set_job_engine,
+    start_embedded_job_engine,
+    stop_job_engine,
+)
+from app.workers.job_handlers import job_types
+
+
+class FakeClock:
+    def __init__(self, t: float = 1_700_000_000.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+    def advance(self, s: float) -> None:
+        self.t += s
+
+
+def _engine(*types: JobType) -> tuple[JobEngine, LocalJobBackend, FakeClock]:
+    clock = FakeClock()
+    backend = LocalJobBackend()
+    engine = JobEngine(backend, owner="test-worker", clock=clock)
+    for jt in types:
+        engine.register(jt)
+    return engine, backend, clock
+
+
+def test_priority_order_and_idempotent_enqueue():
+    ran: list[str] = []
+    engine, _backend, clock = _engine(
+        JobType(name="t", handler=lambda ctx: ran.append(ctx.payload["n"]) or {"n": ctx.payload["n"]}, concurrency=1)
+    )
+    engine.enqueue("t", {"n": "low"}, priority=PRIORITY_LOW, job_id="low")
+    clock.advance(1)
+    engine.enqueue("t", {"n": "normal"}, job_id="normal")
+    clock.advance(1)
+    engine.enqueue("t", {"n": "high"}, priority=PRIORITY_HIGH, job_id="high")
+    # Same jobId: no duplicate job, original payload kept.
+    assert engine.enqueue("t", {"n": "dup"}, job_id="high")["payload"] == {"n": "high"}
+    # Not due yet.
+    engine.enqueue("t", {"n": "later"}, run_at=clock() + 60, job_id="later")
+
+    while engine.run_once():
+        pass
+    assert ran == ["high", "normal", "low"]
+    assert engine.get("high")["status"] == "succeeded"
+    assert engine.get("high")["result"] == {"n": "high"}
+    assert engine.get("later")["status"] == "queued"
+
+    clock.advance(61)
+    engine.run_once()
+    assert ran[-1] == "later"
+
+
+def test_per_type_concurrency_is_enforced_by_backend():
+    engine, backend, clock = _engine(JobType(name="t", handler=lambda ctx: None, concurrency=2))
+    for i in range(3):
+        engine.enqueue("t", {}, job_id=f"j{i}")
+    now = clock()
+    got = [backend.claim(j, owner="other", now=now, lease_until=now + 60, max_running=2) for j in backend.find_ready("t", now=now, limit=10)]
+    assert [c is not None for c, _ in got] == [True, True, False]
+    assert got[2] == (None, True)
+
+
+def test_retry_with_backoff_then_success_and_progress():
+    calls = {"n": 0}
+
+    def handler(ctx):
+        calls["n"] += 1
+        ctx.progress(50, step="work", message="halfway")
+        if ctx.attempt == 1:
+            raise RuntimeError("transient")
+        return {"ok": True}
+
+    engine, backend, clock = _engine(JobType(name="t", handler=handler, max_attempts=3, backoff_base_s=10))
+    engine.enqueue("t", {}, job_id="j")
+    engine.run_once()
+    job = backend.get("j")
+    assert job["status"] == "queued"
+    assert job["attempts"] == 1
+    assert job["error"] == "transient"
+    assert job["progress"]["pct"] == 50
+
+    # Backoff: not runnable until 10s later.
+    assert engine.run_once() == 0
+    clock.advance(10)
+    assert engine.run_once() == 1
+    job = backend.get("j")
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert engine.stats()["t"]["retried"] == 1
+    assert engine.stats()["t"]["succeeded"] == 1
+
+
+def test_permanent_error_and_exhausted_attempts_fail():
+    def permanent(ctx):
+        raise PermanentJobError("bad input")
+
+    def always(ctx):
+        raise RuntimeError("nope")
+
+    engine, backend, clock = _engine(
+        JobType(name="p", handler=permanent, max_attempts=5),
+        JobType(name="a", handler=always, max_attempts=2, backoff_base_s=1),
+    )
+    engine.enqueue("p", {}, job_id="p1")
+    engine.enqueue("a", {}, job_id="a1")
+    engine.run_once()
+    assert backend.get("p1")["status"] == "failed"
+    assert backend.get("a1")["status"] == "queued"
+    clock.advance(5)
+    engine.run_once()
+    assert backend.get("a1")["status"] == "failed"
+    assert backend.get("a1")["attempts"] == 2
+
+
+def test_expired_lease_is_reaped_and_requeued():
+    engine, backend, clock = _engine(JobType(name="t", handler=lambda ctx: {"ok": True}, lease_seconds=30, backoff_base_s=5))
+    engine.enqueue("t", {}, job_id="j")
+    # A worker that dies right after claiming.
+    now = clock()
+    dead, _ = backend.claim(backend.get("j"), owner="dead-worker", now=now, lease_until=now + 30, max_running=2)
+    assert dead is not None
+
+    clock.advance(10)
+    assert engine.run_once() == 0  # still leased by the dead worker
+    clock.advance(30)
+    assert engine.reap_expired() == 1
+    job = backend.get("j")
+    assert job["status"] == "queued"
+    assert job["error"] == "lease_expired"
+    # The dead worker can no longer release or renew it.
+    assert backend.finish(dead, owner="dead-worker", now=clock(), status="succeeded") is False
+    assert backend.heartbeat("j", owner="dead-worker", now=clock(), lease_until=clock() + 30) is None
+
+    clock.advance(5)
+    assert engine.run_once() == 1
+    assert backend.get("j")["status"] == "succeeded"
+    assert backend.get("j")["attempts"] == 2
+
+
+def test_cancel_queued_and_running_jobs():
+    seen: dict[str, bool] = {}
+
+    def handler(ctx):
+        engine.cancel(ctx.job_id)
+        ctx.heartbeat()
+        seen["cancel"] = ctx.cancel_requested
+        raise RuntimeError("stopped")
+
+    engine, backend, _clock = _engine(JobType(name="t", handler=handler, max_attempts=3))
+    engine.enqueue("t", {}, job_id="queued")
+    assert engine.cancel("queued")["status"] == "cancelled"
+
+    engine.enqueue("t", {}, job_id="running")
+    engine.run_once()
+    assert seen["cancel"] is True
+    assert backend.get("running")["status"] == "cancelled"
+
+
+def test_embedded_filter_and_app_lifecycle(monkeypatch):
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "job_engine_backend", "local")
+    monkeypatch.setattr(settings, "job_engine_embedded", True)
+    monkeypatch.setattr(settings, "job_engine_types", "")
+    worker_only = {jt.name for jt in job_types() if not jt.run_embedded}
+    assert worker_only
+    # API processes skip worker-only types; a dedicated worker runs them even with the embedded flag set.
+    assert not worker_only & build_job_engine().types
+    assert build_job_engine(embedded=False).types is None
+
+    engine = build_job_engine()
+    set_job_engine(engine)
+    try:
+        assert start_embedded_job_engine() is engine and engine._thread is not None
+        stop_job_engine()
+        assert engine._thread is None
+        monkeypatch.setattr(settings, "job_engine_embedded", False)
+        assert start_embedded_job_engine() is None and engine._thread is None
+    finally:
+        set_job_engine(None)
+
+
+def test_legacy_contracting_queue_is_drained_into_engine():
+    from app.pipeline.contracting.contracting_queue import drain_legacy_queue
+
+    class FakeSqs:
+        def __init__(self, bodies: list[str]):
+            self.messages = [{"ReceiptHandle": f"rh{i}", "Body": b} for i, b in enumerate(bodies)]
+            self.deleted: list[str] = []
+
+        def receive_message(self, **_kw):
+            return {"Messages": [m for m in self.messages if m["ReceiptHandle"] not in self.deleted]}
+
+        def delete_message(self, *, QueueUrl, ReceiptHandle):
+            self.deleted.append(ReceiptHandle)
+
+    engine, _backend, _clock = _engine()
+    sqs = FakeSqs(['{"jobId": "j1"}', '{"jobId": "j1"}', "not json"])
+    assert drain_legacy_queue(engine, queue_url="q", sqs=sqs, wait_seconds=0) == 3
+    assert sqs.deleted == ["rh0", "rh1", "rh2"]
+    job = engine.get("contracting:j1")
+    assert job["status"] == "queued" and job["payload"] == {"jobId": "j1"}
+    assert drain_legacy_queue(engine, queue_url="q", sqs=sqs, wait_seconds=0) == 0
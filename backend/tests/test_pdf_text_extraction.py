@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import io
+
+
+def _pdf(pages: int) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    for p in range(pages):
+        c.drawString(40, 750, f"PAGE-{p + 1:03d} the contractor shall provide services")
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def test_parallel_extraction_preserves_page_order_and_stops_at_budget():
+    from app.pipeline.intake import pdf_text
+
+    data = _pdf(pdf_text.PARALLEL_MIN_PAGES + 8)
+
+    full, complete = pdf_text.extract_pdf_text(data, max_workers=2)
+    assert complete is True
+    idx = [full.index(f"PAGE-{p + 1:03d}") for p in range(pdf_text.PARALLEL_MIN_PAGES + 8)]
+    assert idx == sorted(idx)
+
+    serial, _ = pdf_text.extract_pdf_text(data, max_workers=1)
+    assert serial == full
+
+    partial, complete = pdf_text.extract_pdf_text(data, max_workers=1, max_chars=200)
+    assert complete is False
+    assert full.startswith(partial)
+    assert 200 <= len(partial) < len(full)
+
+
+def test_extract_pdf_text_uses_sha256_cache(monkeypatch):
+    from app.pipeline.intake import rfp_analyzer
+
+    store: dict[str, bytes] = {}
+    monkeypatch.setattr(rfp_analyzer.settings, "assets_bucket_name", "bucket")
+    monkeypatch.setattr(rfp_analyzer.settings, "pdf_text_cache_enabled", True)
+    monkeypatch.setattr(
+        rfp_analyzer, "put_object_bytes", lambda *, key, data, content_type=None: store.__setitem__(key, data)
+    )
+
+    def _get(*, key, max_bytes=0):
+        if key not in store:
+            raise RuntimeError("NoSuchKey")
+        return store[key]
+
+    monkeypatch.setattr(rfp_analyzer, "get_object_bytes", _get)
+
+    data = _pdf(3)
+    first = rfp_analyzer._extract_pdf_text(data)
+    assert "PAGE-001" in first
+    assert len(store) == 1
+    assert next(iter(store)).startswith("rfp/text-cache/sha256/")
+
+    def _boom(*_a, **_kw):
+        raise AssertionError("extraction should be served from cache")
+
+    monkeypatch.setattr(rfp_analyzer, "extract_pdf_text", _boom)
+    assert rfp_analyzer._extract_pdf_text(data) == first
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.ai import tokens
+from app.ai.client import AiMeta
+from app.pipeline.intake import rfp_analyzer
+from app.pipeline.intake.rfp_context import heading_of, select_bucket_contexts
+
+_TERMS = " ".join(["General provisions apply to this solicitation and any resulting agreement."] * 12)
+
+_RFP = "\n\n".join(
+    [
+        "CITY OF SPRINGFIELD\nREQUEST FOR PROPOSALS\nRFP No. 2026-014",
+        "Parks Maintenance Services",
+        "1. Introduction",
+        _TERMS,
+        "2. Key Dates",
+        "Questions due: February 17, 2026.\nProposals due: 03/03/2026 at 2:00 PM.",
+        "3. Scope of Work",
+        "The Contractor shall maintain turf and irrigation at all park sites.",
+        "Weekly mowing from April through October.",
+        "4. General Terms",
+        *([_TERMS] * 6),
+        "Contact: Jordan Lee, purchasing@springfield.gov. Budget not to exceed $1,250,000.",
+    ]
+)
+
+
+def test_pre_pass_selects_passages_per_bucket(monkeypatch):
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)
+    assert heading_of("2. Key Dates") and heading_of("SCOPE OF WORK\nThe Contractor shall")
+    assert heading_of("The Contractor shall maintain turf.") is None and heading_of("2026 budget is $4M") is None
+
+    ctx = select_bucket_contexts(_RFP, model="m")
+    assert ctx["dates"].text == "Questions due: February 17, 2026.\nProposals due: 03/03/2026 at 2:00 PM."
+    meta = ctx["meta"].text.split("\n\n")
+    assert meta[0].startswith("CITY OF SPRINGFIELD") and meta[-1].startswith("Contact: Jordan Lee")
+    assert _TERMS not in ctx["meta"].text
+    # Everything under the scope heading, and nothing under the unrelated terms heading.
+    assert ctx["lists"].text.split("\n\n") == [
+        "3. Scope of Work",
+        "The Contractor shall maintain turf and irrigation at all park sites.",
+        "Weekly mowing from April through October.",
+    ]
+    full = tokens.count_tokens(_RFP, model="m")
+    assert all(c.tokens < full / 10 for c in ctx.values())
+
+    # Nothing found: the bucket gets None (full text). Budgets cap what is packed.
+    ctx = select_bucket_contexts("no dates or headings here, only prose.", model="m", budgets={"meta": 1})
+    assert ctx["dates"] is None and ctx["lists"] is None and ctx["meta"] is None
+
+
+def test_analyze_rfp_sends_each_bucket_its_passages(monkeypatch):
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)
+    monkeypatch.setattr(rfp_analyzer, "ensure_paragraph_index", lambda _text: None)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_targeted_context", True)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunking", "off")
+    sent: dict[str, str] = {}
+
+    def _fake_call_json_verified(*, purpose: str, response_model: type, messages: list[dict[str, str]], **_kw: Any):
+        sent[purpose] = messages[0]["content"]
+        data = {"title": "Parks Maintenance Services"} if purpose == "rfp_analysis_meta" else {}
+        return response_model(**data), AiMeta(purpose=purpose, model="m", attempts=1, used_response_format=None)
+
+    monkeypatch.setattr(rfp_analyzer, "call_json_verified", _fake_call_json_verified)
+    out = rfp_analyzer.analyze_rfp(_RFP, "parks.pdf")
+    assert out["title"] == "Parks Maintenance Services"
+    dates_text = "Questions due: February 17, 2026.\nProposals due: 03/03/2026 at 2:00 PM."
+    assert sent["rfp_analysis_dates"].endswith(f"RFP_TEXT:\n{dates_text}")
+    assert _TERMS not in sent["rfp_analysis_meta"] and _TERMS not in sent["rfp_analysis_lists"]
+    fields = {f["purpose"]: f for f in out["_analysis"]["fields"]}
+    assert fields["rfp_analysis_dates"]["context"] == "targeted" and fields["rfp_analysis_dates"]["contextTokens"] > 0
+
+    # A document without any date: the dates bucket falls back to the full text.
+    undated = _RFP.replace("February 17, 2026", "the posted date").replace("03/03/2026", "the deadline")
+    out = rfp_analyzer.analyze_rfp(undated, "parks.pdf")
+    assert sent["rfp_analysis_dates"].endswith(undated) and _TERMS not in sent["rfp_analysis_lists"]
+    fields = {f["purpose"]: f for f in out["_analysis"]["fields"]}
+    assert fields["rfp_analysis_dates"]["context"] == "full" and fields["rfp_analysis_meta"]["context"] == "targeted"
+
+
+def test_long_document_chunks_oversized_passages_instead_of_dropping(monkeypatch):
+    from app.pipeline.intake import rfp_context
+
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)
+    monkeypatch.setattr(rfp_analyzer, "ensure_paragraph_index", lambda _text: None)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_targeted_context", True)
+    monkeypatch.setitem(rfp_context.BUCKET_BUDGET_TOKENS, "lists", 150)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunk_tokens", 150)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunk_overlap_tokens", 0)
+    reqs = [f"R{i:02d}. The Contractor shall provide service item {i} at every park site." for i in range(20)]
+    text = _RFP.replace("Weekly mowing from April through October.", "\n\n".join(reqs))
+    sent: dict[str, list[str]] = {}
+
+    def _fake_call_json_verified(*, purpose: str, response_model: type, messages: list[dict[str, str]], **_kw: Any):
+        sent.setdefault(purpose, []).append(messages[0]["content"])
+        return response_model(), AiMeta(purpose=purpose, model="m", attempts=1, used_response_format=None)
+
+    monkeypatch.setattr(rfp_analyzer, "call_json_verified", _fake_call_json_verified)
+
+    # Short-document mode: one call on what fits the budget.
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunking", "off")
+    out = rfp_analyzer.analyze_rfp(text, "parks.pdf")
+    lists = next(f for f in out["_analysis"]["fields"] if f["purpose"] == "rfp_analysis_lists")
+    assert len(sent["rfp_analysis_lists"]) == 1 and lists["droppedParagraphs"] > 0
+
+    # Long-document mode: every selected passage is sent, across chunks.
+    sent.clear()
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunking", "always")
+    out = rfp_analyzer.analyze_rfp(text, "parks.pdf")
+    prompts = sent["rfp_analysis_lists"]
+    assert len(prompts) > 1 and all(any(r in p for p in prompts) for r in reqs)
+    assert all(_TERMS not in p for p in prompts) and len(sent["rfp_analysis_dates"]) == 1
+    assert out["_analysis"]["chunked"]["purposes"] == ["rfp_analysis_lists"]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from app.ai import tokens
+from app.ai.client import AiMeta
+from app.pipeline.intake import rfp_analyzer
+from app.pipeline.intake.rfp_chunked import chunk_text, merge_chunk_results
+
+
+def test_merge_votes_scalars_and_unions_lists():
+    merged, conflicts = merge_chunk_results(
+        [
+            {"title": "City Parks RFP", "submissionDeadline": "Not available", "deliverables": ["Plan"]},
+            {"title": "Parks maintenance", "clientName": "City of Springfield", "submissionDeadline": "03/03/2026"},
+            {"title": "city parks  RFP.", "submissionDeadline": "03/10/2026", "deliverables": ["plan", "Report"]},
+            {"submissionDeadline": "03/03/2026", "questionsDeadline": "n/a", "keyRequirements": ["Insurance"]},
+        ]
+    )
+    # Majority wins regardless of case, spacing and punctuation; the first spelling is kept.
+    assert merged["title"] == "City Parks RFP"
+    assert merged["clientName"] == "City of Springfield"
+    assert merged["submissionDeadline"] == "03/03/2026"
+    assert "questionsDeadline" not in merged and "timeline" not in merged  # caller defaults apply
+    assert merged["deliverables"] == ["Plan", "Report"] and merged["keyRequirements"] == ["Insurance"]
+    assert conflicts == {
+        "title": ["City Parks RFP", "Parks maintenance"],
+        "submissionDeadline": ["03/03/2026", "03/10/2026"],
+    }
+    # A tie goes to the earliest chunk.
+    merged, _ = merge_chunk_results([{"budgetRange": "$1M"}, {"budgetRange": "$2M"}])
+    assert merged["budgetRange"] == "$1M"
+
+
+def test_chunk_text_is_paragraph_aligned_with_overlap(monkeypatch):
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)  # 3 chars per token
+    paras = [f"P{i:02d} " + "x" * 56 for i in range(20)]  # 20 tokens each
+    chunks = chunk_text("\n\n".join(paras), model="m", chunk_tokens=100, overlap_tokens=30)
+    assert len(chunks) == 7  # 4 paragraphs per chunk, advancing by 3
+    for c in chunks:
+        assert tokens.count_tokens(c, model="m") <= 100 and all(p in paras for p in c.split("\n\n"))
+    # Every paragraph is covered; each chunk repeats the previous chunk's last paragraph.
+    assert {p for c in chunks for p in c.split("\n\n")} == set(paras)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert nxt.split("\n\n")[0] == prev.split("\n\n")[-1]
+    # A paragraph bigger than a chunk is split by tokens.
+    assert [len(c) for c in chunk_text("y" * 700, model="m", chunk_tokens=100, overlap_tokens=0)] == [300, 300, 100]
+
+
+def test_analyze_rfp_maps_buckets_over_chunks_and_merges(monkeypatch):
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)
+    monkeypatch.setattr(rfp_analyzer, "ensure_paragraph_index", lambda _text: None)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunking", "auto")
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_targeted_context", False)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunk_threshold_tokens", 300)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunk_tokens", 200)
+    monkeypatch.setattr(rfp_analyzer.settings, "rfp_analysis_chunk_overlap_tokens", 0)
+    prompts: list[str] = []
+
+    def _fake_call_json_verified(*, purpose: str, response_model: type, messages: list[dict[str, str]], **_kw: Any):
+        prompt = messages[0]["content"]
+        prompts.append(prompt)
+        part = int(re.search(r"This is part (\d+) of", prompt).group(1))
+        if purpose == "rfp_analysis_meta":
+            data = {"title": "Parks RFP" if part != 2 else "Lighting", "clientName": "City" if part == 1 else ""}
+        elif purpose == "rfp_analysis_dates":
+            if part == 3:
+                raise RuntimeError("model timed out")
+            data = {"submissionDeadline": "03/03/2026" if part == 2 else "Not available"}
+        else:
+            data = {"keyRequirements": [f"Requirement {part}", "Insurance"]}
+        return response_model(**data), AiMeta(purpose=purpose, model="m", attempts=1, used_response_format=None)
+
+    monkeypatch.setattr(rfp_analyzer, "call_json_verified", _fake_call_json_verified)
+    text = "\n\n".join(f"Section {i}. " + "word " * 100 for i in range(6))  # ~1.1k tokens estimated
+    out = rfp_analyzer.analyze_rfp(text, "parks.pdf")
+
+    n = out["_analysis"]["chunked"]["chunks"]
+    assert n >= 3 and len(prompts) == 3 * n
+    assert all(len(p) < 2000 for p in prompts)  # small prompts: one chunk each, not the whole text
+    assert out["title"] == "Parks RFP" and out["clientName"] == "City"
+    assert out["submissionDeadline"] == "03/03/2026" and out["questionsDeadline"] == "Not available"
+    assert out["keyRequirements"][:2] == ["Requirement 1", "Insurance"] and len(out["keyRequirements"]) == n + 1
+    assert out["_analysis"]["chunked"]["conflicts"] == {"title": ["Parks RFP", "Lighting"]}
+    dates = next(f for f in out["_analysis"]["fields"] if f["purpose"] == "rfp_analysis_dates")
+    assert dates["failed"] == 1 and dates["chunks"] == n
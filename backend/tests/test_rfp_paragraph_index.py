@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.ai import context, tokens
+from app.infrastructure.search import rfp_paragraphs
+from app.infrastructure.search.paragraph_index import ParagraphIndex
+from app.infrastructure.search.rfp_paragraphs import ParagraphIndexCache, set_paragraph_index_cache
+from app.infrastructure.storage import s3_assets
+from app.settings import settings
+
+_RFP = "\n\n".join(
+    [
+        "  Section 1. Introduction to the city parks program.  ",
+        "Insurance: the contractor must carry general liability insurance of $2M.",
+        "Schedule: proposals are due March 3. Questions are due February 20.",
+        "The parks program covers landscaping, playgrounds and park lighting.",
+        "\n  \n",
+        "Evaluation criteria: price 40%, experience 30%, approach 30%.",
+    ]
+)
+
+
+def test_paragraph_index_ranks_by_bm25_and_round_trips():
+    index = ParagraphIndex.build(_RFP)
+    assert len(index) == 5
+    s, e = index.span(0)
+    assert _RFP[s:e] == "Section 1. Introduction to the city parks program."  # trimmed offsets into the source
+
+    hits = index.top_k("liability insurance", k=3)
+    assert [pid for pid, _ in hits] == [1]
+    # "parks" is in two paragraphs; "lighting" only in one, which therefore ranks first.
+    assert [pid for pid, _ in index.top_k("parks lighting", k=5)] == [3, 0]
+    assert index.top_k("nothing matches", k=5) == [] and index.top_k("insurance", k=0) == []
+
+    loaded = ParagraphIndex.from_bytes(index.to_bytes())
+    assert loaded is not None and list(loaded.offsets) == list(index.offsets)
+    assert loaded.top_k("parks lighting", k=5) == index.top_k("parks lighting", k=5)
+
+
+def test_select_rfp_text_packs_best_paragraphs_in_document_order(monkeypatch):
+    monkeypatch.setattr(tokens, "encoding_for", lambda _model: None)  # 3 chars per token
+    cache = ParagraphIndexCache(store=False)
+    set_paragraph_index_cache(cache)
+    try:
+        # Short texts are indexed on the fly, outside the shared cache.
+        monkeypatch.setattr(settings, "rfp_paragraph_index_min_tokens", 30_000)
+        assert context.top_k_paragraphs(text=_RFP, query="insurance", k=1, max_chars_each=10) == ["Insurance:"]
+        rfp_paragraphs.ensure_paragraph_index(_RFP)
+        assert cache.stats()["builds"] == 0 and cache.stats()["entries"] == 0
+        monkeypatch.setattr(settings, "rfp_paragraph_index_min_tokens", 10)
+
+        # Fits: sent whole, and no index is built.
+        kw: dict[str, Any] = {"purpose": "rfp_section_summary", "max_output_tokens": 100}
+        assert context.select_rfp_text(_RFP, query="insurance", max_tokens=10_000, **kw) == _RFP.strip()
+        assert cache.stats()["builds"] == 0
+
+        # 50 tokens (~150 chars): the two best paragraphs fit, emitted in document order.
+        out = context.select_rfp_text(_RFP, query="parks lighting schedule", max_tokens=50, **kw)
+        assert out.split("\n\n") == [
+            "Schedule: proposals are due March 3. Questions are due February 20.",
+            "The parks program covers landscaping, playgrounds and park lighting.",
+        ]
+        # No match: head clip.
+        assert context.select_rfp_text(_RFP, query="zzz", max_tokens=10, **kw) == _RFP.strip()[:30]
+        assert cache.stats()["builds"] == 1 and cache.stats()["hits"] == 1
+
+        assert context.top_k_paragraphs(text=_RFP, query="evaluation price", k=2, max_chars_each=20) == [
+            "Evaluation criteria:"
+        ]
+    finally:
+        set_paragraph_index_cache(None)
+
+
+def test_index_is_stored_at_intake_and_loaded_lazily_elsewhere(monkeypatch):
+    stored: dict[str, bytes] = {}
+    monkeypatch.setattr(s3_assets.settings, "assets_bucket_name", "bucket")
+    monkeypatch.setattr(
+        s3_assets, "put_object_bytes", lambda *, key, data, content_type=None: stored.update({key: data})
+    )
+    monkeypatch.setattr(s3_assets, "get_object_bytes", lambda *, key, max_bytes: stored[key])
+
+    intake = ParagraphIndexCache()
+    intake.ensure(_RFP)
+    key = s3_assets.make_rfp_paragraph_index_key_for_hash(sha256=rfp_paragraphs.text_sha256(_RFP))
+    assert list(stored) == [key] and intake.stats()["storeWrites"] == 1
+
+    # Another process: loads the stored index instead of rebuilding.
+    other = ParagraphIndexCache()
+    assert [pid for pid, _ in other.get(_RFP).top_k("insurance")] == [1]
+    other.get(_RFP)
+    st = other.stats()
+    assert st["storeHits"] == 1 and st["builds"] == 0 and st["hits"] == 1
+
+    # A store failure only costs a rebuild.
+    monkeypatch.setattr(s3_assets, "get_object_bytes", lambda **_kw: (_ for _ in ()).throw(RuntimeError("down")))
+    third = ParagraphIndexCache()
+    assert len(third.get(_RFP)) == 5 and third.stats()["builds"] == 1
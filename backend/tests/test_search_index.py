@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+
+def _rfp(rid: str, title: str, client: str = "City", raw: str = "") -> dict:
+    return {"rfpId": rid, "title": title, "clientName": client, "projectType": "", "rawText": raw}
+
+
+def test_bm25_ranking_pagination_and_kind_filter():
+    from app.infrastructure.search.index_store import MemoryIndexStore
+    from app.infrastructure.search.search_index import SearchIndex, build_proposal_doc, build_rfp_doc
+
+    idx = SearchIndex(MemoryIndexStore(shard_count=4), refresh_interval_s=0)
+    idx.upsert(build_rfp_doc(_rfp("r1", "Stormwater Master Plan", raw="drainage culverts")))
+    idx.upsert(build_rfp_doc(_rfp("r2", "Park Design", raw="includes a stormwater swale")))
+    idx.upsert(build_rfp_doc(_rfp("r3", "Library Roof", raw="roofing only")))
+    idx.upsert(
+        build_proposal_doc(
+            {"proposalId": "p1", "rfpId": "r1", "title": "Response", "sections": {"Approach": {"content": "stormwater"}}}
+        )
+    )
+
+    out = idx.search("stormwater plans")
+    assert out["total"] == 3
+    # Title hit (boosted, plus "plans" -> "plan") outranks body-only hits.
+    assert out["hits"][0]["rfpId"] == "r1"
+
+    rfps = idx.search("stormwater", kinds=["rfp"], limit=1, offset=1)
+    assert rfps["total"] == 2 and len(rfps["hits"]) == 1
+    assert rfps["hits"][0]["kind"] == "rfp" and rfps["hits"][0]["rfpId"] == "r2"
+
+    assert idx.search("the and of")["total"] == 0
+
+
+def test_incremental_updates_and_cross_process_refresh():
+    from app.infrastructure.search.index_store import MemoryIndexStore
+    from app.infrastructure.search.search_index import SearchIndex, build_rfp_doc, rfp_doc_id
+
+    store = MemoryIndexStore(shard_count=4)
+    a = SearchIndex(store, refresh_interval_s=0)
+    b = SearchIndex(store, refresh_interval_s=3600)
+
+    a.upsert(build_rfp_doc(_rfp("r1", "Bridge Inspection")))
+    assert [h["rfpId"] for h in b.search("bridge")["hits"]] == ["r1"]
+
+    # Another process renames the RFP: b only sees it after its refresh interval.
+    a.upsert(build_rfp_doc(_rfp("r1", "Tunnel Inspection")))
+    assert a.search("bridge")["total"] == 0
+    assert b.search("bridge")["total"] == 1
+    b.ensure_fresh(force=True)
+    assert b.search("bridge")["total"] == 0
+    assert b.search("tunnel")["total"] == 1
+
+    a.remove(rfp_doc_id("r1"))
+    b.ensure_fresh(force=True)
+    assert b.search("tunnel")["total"] == 0 and len(b.index) == 0
+
+
+def test_module_search_falls_back_until_index_is_built():
+    from app.infrastructure.search import search_index as si
+    from app.infrastructure.search.index_store import MemoryIndexStore
+
+    idx = si.SearchIndex(MemoryIndexStore(shard_count=2), refresh_interval_s=0)
+    si.set_search_index(idx)
+    try:
+        si.index_rfp(_rfp("r1", "Bridge Inspection"))
+        # Incremental writes alone don't make the index authoritative.
+        assert si.search("bridge") is None
+        idx.replace_all([si.build_rfp_doc(_rfp("r1", "Bridge Inspection"))])
+        assert [h["rfpId"] for h in si.search("bridge")["hits"]] == ["r1"]
+    finally:
+        si.set_search_index(None)
+
+
+def test_index_writes_never_raise_on_malformed_items(monkeypatch):
+    from app.infrastructure.search import search_index as si
+    from app.infrastructure.search.index_store import MemoryIndexStore
+
+    idx = si.SearchIndex(MemoryIndexStore(shard_count=2), refresh_interval_s=0)
+    si.set_search_index(idx)
+    try:
+        si.index_proposal({"proposalId": "p1", "title": "Response", "sections": ["Approach"]})
+        si.index_proposal({"proposalId": "p2", "title": "Other", "sections": "Approach"})
+        assert [h["proposalId"] for h in idx.search("response")["hits"]] == ["p1"]
+
+        def _boom(*_a, **_k):
+            raise ValueError("bad item")
+
+        # Doc building runs inside the guarded write, so the repository write never sees the error.
+        monkeypatch.setattr(si, "build_rfp_doc", _boom)
+        si.index_rfp({"rfpId": "r1", "title": "Roof"})
+        assert idx.search("roof")["total"] == 0
+    finally:
+        si.set_search_index(None)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+def test_run_urls_concurrently_respects_global_and_per_host_limits():
+    from app.pipeline.intake.url_batch import run_urls_concurrently, url_host
+
+    lock = threading.Lock()
+    running: dict[str, int] = {}
+    peak_by_host: dict[str, int] = {}
+    peak_total = 0
+
+    def _fn(url: str) -> str:
+        nonlocal peak_total
+        host = url_host(url)
+        with lock:
+            running[host] = running.get(host, 0) + 1
+            peak_by_host[host] = max(peak_by_host.get(host, 0), running[host])
+            peak_total = max(peak_total, sum(running.values()))
+        time.sleep(0.02)
+        with lock:
+            running[host] -= 1
+        if url.endswith("/bad"):
+            raise RuntimeError("boom")
+        return url.upper()
+
+    urls = [f"https://a.example/{i}" for i in range(6)] + [f"https://b.example/{i}" for i in range(3)]
+    urls.append("https://c.example/bad")
+
+    outcomes = list(run_urls_concurrently(urls, _fn, max_concurrency=4, per_host_concurrency=2))
+
+    assert sorted(o.index for o in outcomes) == list(range(len(urls)))
+    assert peak_total <= 4
+    assert max(peak_by_host.values()) <= 2
+    bad = [o for o in outcomes if o.error is not None]
+    assert [o.url for o in bad] == ["https://c.example/bad"]
+    assert all(o.result == o.url.upper() for o in outcomes if o.error is None)
+    assert all(o.elapsed_ms >= 0 and o.queued_ms >= 0 for o in outcomes)